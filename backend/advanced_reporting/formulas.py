@@ -0,0 +1,398 @@
+"""
+Report Formula Engine
+A small expression language for report calculated fields, parsed once and
+evaluated a column at a time with NumPy or pushed into the SQL query
+
+Grammar (Python-like, numeric only):
+    numbers, column names, ( ), + - * / %, unary -
+    < <= > >= == !=, and, or, not
+    abs(x), round(x[, digits]), min(a, b, ...), max(a, b, ...),
+    coalesce(a, b, ...), if(condition, then, else)
+
+Missing, non-numeric and non-finite values (including division by zero)
+evaluate to None, the way a failing row did under eval().
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any
+
+import numpy as np
+
+MAX_FORMULA_LENGTH = 1000
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+        |(?P<op><=|>=|==|!=|[-+*/%()<>,])
+    )
+""", re.VERBOSE)
+
+KEYWORDS = {'and', 'or', 'not'}
+
+COMPARISONS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal,
+}
+ARITHMETIC = {
+    '+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide, '%': np.mod,
+}
+# name -> (min args, max args or None)
+FUNCTIONS = {
+    'abs': (1, 1),
+    'round': (1, 2),
+    'min': (2, None),
+    'max': (2, None),
+    'coalesce': (1, None),
+    'if': (3, 3),
+}
+
+
+class FormulaError(ValueError):
+    """Formula could not be parsed"""
+
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+
+
+@dataclass(frozen=True)
+class Unary:
+    op: str
+    operand: Any
+
+
+@dataclass(frozen=True)
+class Binary:
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class Call:
+    function: str
+    args: tuple
+
+
+def _tokenize(formula: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    formula = formula.rstrip()
+    while position < len(formula):
+        match = TOKEN_PATTERN.match(formula, position)
+        if not match:
+            raise FormulaError(f'Unexpected character {formula[position:].lstrip()[:1]!r} in formula')
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'name' and text in KEYWORDS:
+            kind = 'op'
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser, lowest precedence first"""
+
+    def __init__(self, formula: str):
+        self.tokens = _tokenize(formula)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise FormulaError('Formula is empty')
+        node = self._or()
+        if self.position < len(self.tokens):
+            raise FormulaError(f'Unexpected {self.tokens[self.position][1]!r} in formula')
+        return node
+
+    def _peek(self) -> str | None:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def _take(self, *ops: str) -> str | None:
+        if self.position < len(self.tokens) and self.tokens[self.position][0] == 'op' and self._peek() in ops:
+            self.position += 1
+            return self.tokens[self.position - 1][1]
+        return None
+
+    def _expect(self, op: str) -> None:
+        if not self._take(op):
+            raise FormulaError(f'Expected {op!r} in formula')
+
+    def _or(self):
+        node = self._and()
+        while self._take('or'):
+            node = Binary('or', node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._take('and'):
+            node = Binary('and', node, self._not())
+        return node
+
+    def _not(self):
+        if self._take('not'):
+            return Unary('not', self._not())
+        return self._comparison()
+
+    def _comparison(self):
+        node = self._additive()
+        while op := self._take(*COMPARISONS):
+            node = Binary(op, node, self._additive())
+        return node
+
+    def _additive(self):
+        node = self._multiplicative()
+        while op := self._take('+', '-'):
+            node = Binary(op, node, self._multiplicative())
+        return node
+
+    def _multiplicative(self):
+        node = self._unary()
+        while op := self._take('*', '/', '%'):
+            node = Binary(op, node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._take('-'):
+            return Unary('-', self._unary())
+        if self._take('+'):
+            return self._unary()
+        return self._primary()
+
+    def _primary(self):
+        if self.position >= len(self.tokens):
+            raise FormulaError('Formula ends unexpectedly')
+        kind, text = self.tokens[self.position]
+
+        if self._take('('):
+            node = self._or()
+            self._expect(')')
+            return node
+        if kind == 'number':
+            self.position += 1
+            return Number(float(text))
+        if kind == 'name':
+            self.position += 1
+            if self._take('('):
+                return self._call(text)
+            return Field(text)
+        raise FormulaError(f'Unexpected {text!r} in formula')
+
+    def _call(self, function: str):
+        if function not in FUNCTIONS:
+            raise FormulaError(f'Unknown function {function!r}')
+        args = []
+        if not self._take(')'):
+            args.append(self._or())
+            while self._take(','):
+                args.append(self._or())
+            self._expect(')')
+
+        fewest, most = FUNCTIONS[function]
+        if len(args) < fewest or (most is not None and len(args) > most):
+            raise FormulaError(f'Wrong number of arguments to {function}()')
+        return Call(function, tuple(args))
+
+
+def _fields(node) -> frozenset[str]:
+    if isinstance(node, Field):
+        return frozenset({node.name})
+    if isinstance(node, Unary):
+        return _fields(node.operand)
+    if isinstance(node, Binary):
+        return _fields(node.left) | _fields(node.right)
+    if isinstance(node, Call):
+        return frozenset().union(*(_fields(arg) for arg in node.args))
+    return frozenset()
+
+
+class Formula:
+    """Parsed formula: evaluate over columns or turn into a query expression"""
+
+    def __init__(self, source: str):
+        if len(source) > MAX_FORMULA_LENGTH:
+            raise FormulaError('Formula is too long')
+        self.source = source
+        self.tree = _Parser(source).parse()
+        self.fields = _fields(self.tree)
+
+    def evaluate(self, columns: dict[str, np.ndarray], length: int) -> np.ndarray:
+        """
+        Evaluate over whole columns
+
+        Args:
+            columns: Float arrays by name, NaN where a value is missing
+            length: Number of rows
+
+        Returns:
+            Float or bool array with one value per row
+        """
+        with np.errstate(all='ignore'):
+            result = _evaluate(self.tree, columns)
+        return np.broadcast_to(result, (length,))
+
+    def to_expression(self, numeric_fields: set[str], annotations: set[str]):
+        """
+        Equivalent Django expression, or None when it cannot be pushed down
+
+        Arithmetic, abs() and coalesce() over numeric model fields and
+        earlier annotations are pushed down; anything else, including
+        formulas reading date, boolean or text columns, is evaluated in
+        Python. Fields are cast to float so integer columns divide like
+        NumPy, and division by zero yields NULL.
+        """
+        if not self.fields or not self.fields <= (numeric_fields | annotations):
+            return None
+        try:
+            return _expression(self.tree, annotations)
+        except _NotPushable:
+            return None
+
+
+@lru_cache(maxsize=512)
+def parse_formula(source: str) -> Formula:
+    """Parse a formula, reusing the parse for formulas seen before"""
+    return Formula(source)
+
+
+def validate_calculated_fields(calculated_fields: list[dict]) -> None:
+    """
+    Check that every calculated field has a name and a formula that parses
+
+    Raises:
+        FormulaError: naming the first invalid field
+    """
+    for field in calculated_fields:
+        if not field.get('name'):
+            raise FormulaError('Calculated fields need a name')
+        try:
+            parse_formula(field.get('formula') or '')
+        except FormulaError as e:
+            raise FormulaError(f"{field['name']}: {e}") from e
+
+
+def _as_float(value) -> np.ndarray:
+    return np.asarray(value, dtype=float)
+
+
+def _evaluate(node, columns: dict[str, np.ndarray]):
+    if isinstance(node, Number):
+        return np.float64(node.value)
+    if isinstance(node, Field):
+        try:
+            return columns[node.name]
+        except KeyError:
+            return np.float64('nan')
+    if isinstance(node, Unary):
+        operand = _evaluate(node.operand, columns)
+        if node.op == 'not':
+            return np.logical_not(_truthy(operand))
+        return np.negative(_as_float(operand))
+    if isinstance(node, Binary):
+        left = _evaluate(node.left, columns)
+        right = _evaluate(node.right, columns)
+        if node.op == 'and':
+            return np.logical_and(_truthy(left), _truthy(right))
+        if node.op == 'or':
+            return np.logical_or(_truthy(left), _truthy(right))
+        if node.op in COMPARISONS:
+            return COMPARISONS[node.op](_as_float(left), _as_float(right))
+        return ARITHMETIC[node.op](_as_float(left), _as_float(right))
+
+    args = [_evaluate(arg, columns) for arg in node.args]
+    if node.function == 'abs':
+        return np.abs(_as_float(args[0]))
+    if node.function == 'round':
+        digits = args[1] if len(args) == 2 else 0
+        digits = int(digits) if np.ndim(digits) == 0 and np.isfinite(digits) else 0
+        return np.round(_as_float(args[0]), digits)
+    if node.function in ('min', 'max'):
+        combine = np.minimum if node.function == 'min' else np.maximum
+        result = _as_float(args[0])
+        for arg in args[1:]:
+            result = combine(result, _as_float(arg))
+        return result
+    if node.function == 'coalesce':
+        result = _as_float(args[0])
+        for arg in args[1:]:
+            result = np.where(np.isnan(result), _as_float(arg), result)
+        return result
+    # if(condition, then, else)
+    return np.where(_truthy(args[0]), _as_float(args[1]), _as_float(args[2]))
+
+
+def _truthy(value) -> np.ndarray:
+    value = np.asarray(value)
+    if value.dtype == bool:
+        return value
+    return np.nan_to_num(value.astype(float), nan=0.0) != 0
+
+
+class _NotPushable(Exception):
+    pass
+
+
+def _expression(node, annotations: set[str]):
+    from django.db.models import F, FloatField, Value
+    from django.db.models.functions import Abs, Cast, Coalesce, NullIf
+
+    if isinstance(node, Number):
+        return Value(node.value, output_field=FloatField())
+    if isinstance(node, Field):
+        if node.name in annotations:
+            return F(node.name)
+        return Cast(F(node.name), FloatField())
+    if isinstance(node, Unary) and node.op == '-':
+        return _expression(node.operand, annotations) * Value(-1.0, output_field=FloatField())
+    if isinstance(node, Binary) and node.op in ('+', '-', '*', '/'):
+        left = _expression(node.left, annotations)
+        right = _expression(node.right, annotations)
+        if node.op == '+':
+            return left + right
+        if node.op == '-':
+            return left - right
+        if node.op == '*':
+            return left * right
+        return left / NullIf(right, Value(0.0, output_field=FloatField()))
+    if isinstance(node, Call) and node.function == 'abs':
+        return Abs(_expression(node.args[0], annotations))
+    if isinstance(node, Call) and node.function == 'coalesce' and len(node.args) > 1:
+        return Coalesce(*(_expression(arg, annotations) for arg in node.args), output_field=FloatField())
+    raise _NotPushable
+
+
+def column_values(rows: list[dict], name: str) -> np.ndarray:
+    """A result column as floats, NaN where missing or not numeric"""
+    try:
+        return np.fromiter(map(itemgetter(name), rows), dtype=float, count=len(rows))
+    except (KeyError, TypeError, ValueError):
+        return np.array([_to_float(row.get(name)) for row in rows], dtype=float)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def to_python(values: np.ndarray) -> list:
+    """Row values for a result column; non-finite numbers become None"""
+    if values.dtype == bool:
+        return values.tolist()
+    result = values.astype(object)
+    result[~np.isfinite(values)] = None
+    return result.tolist()
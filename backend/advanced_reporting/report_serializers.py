@@ -4,6 +4,7 @@ Custom Report Builder Serializers
 
 from rest_framework import serializers
 
+from .formulas import FormulaError, validate_calculated_fields
 from .report_models import (
     DashboardWidget,
     DataSource,
@@ -305,6 +306,13 @@ class CreateReportSerializer(serializers.Serializer):
         default='private'
     )
 
+    def validate_calculated_fields(self, value):
+        try:
+            validate_calculated_fields(value)
+        except FormulaError as e:
+            raise serializers.ValidationError(str(e)) from e
+        return value
+
 
 class ExecuteReportSerializer(serializers.Serializer):
     """Request serializer for executing a report"""
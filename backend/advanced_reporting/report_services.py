@@ -8,9 +8,11 @@ from decimal import Decimal
 from typing import Any
 
 from django.apps import apps
-from django.db.models import Avg, Count, Max, Min, Sum
+from django.db.models import Avg, Count, DecimalField, FloatField, IntegerField, Max, Min, Sum
 from django.utils import timezone
 
+from .formulas import FormulaError, column_values, parse_formula, to_python
+
 
 class ReportBuilderService:
     """Service for building and executing reports"""
@@ -86,15 +88,16 @@ class ReportBuilderService:
                 filters=template.filters,
                 grouping=template.grouping,
                 sorting=template.sorting,
-                parameters=parameters or {}
+                parameters=parameters or {},
+                calculated_fields=template.calculated_fields
             )
 
             data = query_builder.execute()
 
-            # Apply calculated fields
+            # Apply calculated fields not already computed by the query
             if template.calculated_fields:
                 data = self._apply_calculated_fields(
-                    data, template.calculated_fields
+                    data, template.calculated_fields, computed=query_builder.annotated_fields
                 )
 
             end_time = timezone.now()
@@ -131,22 +134,37 @@ class ReportBuilderService:
             }
 
     def _apply_calculated_fields(
-        self, data: dict, calculated_fields: list[dict]
+        self, data: dict, calculated_fields: list[dict], computed: set[str] | None = None
     ) -> dict:
-        """Apply calculated fields to report data"""
+        """
+        Apply calculated fields to report data
+
+        Each formula is evaluated once over whole columns; fields in
+        ``computed`` were already annotated by the query and only get
+        their column metadata. A formula that does not parse yields None
+        in every row.
+        """
         rows = data.get('rows', [])
+        computed = computed or set()
+        columns = {}
 
         for field in calculated_fields:
             field_name = field.get('name')
-            formula = field.get('formula')
 
-            for row in rows:
+            if field_name not in computed:
                 try:
-                    # Simple formula evaluation (would use safer method in production)
-                    result = self._evaluate_formula(formula, row)
-                    row[field_name] = result
-                except Exception:
-                    row[field_name] = None
+                    formula = parse_formula(field.get('formula') or '')
+                except FormulaError:
+                    values = [None] * len(rows)
+                else:
+                    for name in formula.fields - columns.keys():
+                        columns[name] = column_values(rows, name)
+                    result = formula.evaluate(columns, len(rows))
+                    columns[field_name] = result.astype(float)
+                    values = to_python(result)
+
+                for row, value in zip(rows, values, strict=True):
+                    row[field_name] = value
 
             # Add to columns
             data['columns'].append({
@@ -158,12 +176,6 @@ class ReportBuilderService:
 
         return data
 
-    def _evaluate_formula(self, formula: str, row: dict) -> Any:
-        """Safely evaluate a formula"""
-        # Simplified - would use a proper expression parser
-        allowed_names = {**row}
-        return eval(formula, {"__builtins__": {}}, allowed_names)
-
     def clone_report(self, report_id: str, new_name: str) -> dict[str, Any]:
         """Clone an existing report"""
         from .report_models import ReportTemplate, ReportWidget
@@ -292,7 +304,8 @@ class ReportQueryBuilder:
         filters: list[dict],
         grouping: list[str],
         sorting: list[dict],
-        parameters: dict[str, Any]
+        parameters: dict[str, Any],
+        calculated_fields: list[dict] | None = None
     ):
         self.data_source = data_source
         self.columns = columns
@@ -300,6 +313,9 @@ class ReportQueryBuilder:
         self.grouping = grouping
         self.sorting = sorting
         self.parameters = parameters
+        self.calculated_fields = calculated_fields or []
+        # Calculated fields computed in SQL by the last execute()
+        self.annotated_fields: set[str] = set()
 
     def execute(self) -> dict[str, Any]:
         """Execute the query and return results"""
@@ -393,8 +409,45 @@ class ReportQueryBuilder:
 
         return queryset
 
+    def _annotate_calculated_fields(self, queryset):
+        """
+        Compute calculated fields in SQL where the formula allows
+
+        Fields are pushed down in order until the first one that cannot be,
+        so later formulas never depend on a value computed in Python. Only
+        numeric columns and foreign key ids are read in SQL; the database
+        would reject casting other columns to float.
+        """
+        concrete_fields = queryset.model._meta.concrete_fields
+        model_fields = {f.name for f in concrete_fields} | {f.attname for f in concrete_fields}
+        numeric_fields = {
+            f.attname for f in concrete_fields
+            if isinstance(f.target_field if f.is_relation else f, (IntegerField, FloatField, DecimalField))
+        }
+        annotations = {}
+
+        for field in self.calculated_fields:
+            name = field.get('name')
+            if not isinstance(name, str) or not name.isidentifier() or name in model_fields:
+                break
+            try:
+                formula = parse_formula(field.get('formula') or '')
+            except FormulaError:
+                break
+            expression = formula.to_expression(numeric_fields, set(annotations))
+            if expression is None:
+                break
+            annotations[name] = expression
+
+        self.annotated_fields = set(annotations)
+        return queryset.annotate(**annotations) if annotations else queryset
+
     def _execute_flat(self, queryset) -> dict[str, Any]:
         """Execute flat (non-grouped) query"""
+        self.annotated_fields = set()
+        if self.calculated_fields:
+            queryset = self._annotate_calculated_fields(queryset)
+
         # Limit results
         limit = self.parameters.get('limit', 1000)
         queryset = queryset[:limit]
@@ -402,7 +455,11 @@ class ReportQueryBuilder:
         # Get column names
         column_names = [c.get('name') for c in self.columns] if self.columns else []
 
-        queryset = queryset.values(*column_names) if column_names else queryset.values()
+        # values() without names already includes annotations
+        if column_names:
+            queryset = queryset.values(*column_names, *self.annotated_fields)
+        else:
+            queryset = queryset.values()
 
         rows = list(queryset)
 
@@ -414,10 +471,12 @@ class ReportQueryBuilder:
                 elif isinstance(value, Decimal):
                     row[key] = float(value)
 
-        # Build column metadata
+        # Build column metadata; calculated columns are described by the caller
         columns = []
         if rows:
             for key in rows[0]:
+                if key in self.annotated_fields:
+                    continue
                 columns.append({
                     'name': key,
                     'label': key.replace('_', ' ').title(),
@@ -25,6 +25,18 @@ app.conf.beat_schedule = {
         'task': 'core.tasks.retrain_lead_scoring_model',
         'schedule': crontab(hour=2, minute=0, day_of_week=1),  # Every Monday at 2 AM
     },
+    'rescore-dirty-leads': {
+        'task': 'core.tasks.rescore_dirty_leads',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    'flush-search-logs': {
+        'task': 'core.tasks.flush_search_logs',
+        'schedule': 30.0,  # Every 30 seconds
+    },
+    'dispatch-workflow-timers': {
+        'task': 'core.tasks.dispatch_workflow_timers',
+        'schedule': 30.0,  # Every 30 seconds
+    },
     'send-daily-digest': {
         'task': 'activity_feed.tasks.send_daily_digest',
         'schedule': crontab(hour=8, minute=0),  # Every day at 8 AM
@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Trigram lookups for the search index
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -175,6 +176,9 @@ def _resolve_env_host(env_name: str, default: str = 'localhost') -> str:
 REDIS_HOST = _resolve_env_host('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
 REDIS_DB = int(os.getenv('REDIS_DB', '0'))
+# Direct Redis access for autocomplete indexes, counters and similar structures.
+# Leave empty to use in-process fallbacks (development and tests).
+REDIS_URL = os.getenv('REDIS_URL', '')
 
 
 # Check if USE_SQLITE is set in environment
@@ -524,6 +528,8 @@ VERSION = os.getenv('APP_VERSION', '1.0.0')
 
 # Prometheus Metrics
 PROMETHEUS_ENABLED = os.getenv('PROMETHEUS_ENABLED', 'true').lower() == 'true'
+# Shared directory where each worker writes its core.monitoring totals (multiprocess mode)
+METRICS_MULTIPROCESS_DIR = os.getenv('METRICS_MULTIPROCESS_DIR', '')
 
 # Datadog APM
 DATADOG_ENABLED = os.getenv('DATADOG_ENABLED', 'false').lower() == 'true'
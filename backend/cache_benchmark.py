@@ -0,0 +1,142 @@
+"""
+Cache Serialization Benchmark for MyCRM
+Compares the enterprise cache serializers on CRM-shaped payloads and,
+given a Redis URL, single-key reads against pipelined get_many
+
+Usage:
+    python cache_benchmark.py
+    python cache_benchmark.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import datetime
+import random
+import statistics
+import time
+
+from enterprise.caching import (
+    COMPRESSION_CODECS,
+    SERIALIZATION_FORMATS,
+    CacheSerializer,
+    RedisCache,
+    _module_available,
+)
+
+
+def build_payloads() -> dict[str, object]:
+    """Payloads shaped like what the API caches: list pages, detail views, dashboards"""
+    rng = random.Random(7)  # noqa: S311 - seeded synthetic payloads
+    now = datetime.datetime(2024, 6, 1, tzinfo=datetime.UTC)
+    statuses = ['new', 'contacted', 'qualified', 'proposal', 'negotiation']
+    sources = ['website', 'referral', 'social_media', 'email_campaign', 'trade_show']
+
+    def lead(i):
+        return {
+            'id': i,
+            'first_name': f'First{i}',
+            'last_name': f'Last{i}',
+            'email': f'lead{i}@example.com',
+            'company_name': f'Company {i % 40}',
+            'status': rng.choice(statuses),
+            'lead_source': rng.choice(sources),
+            'lead_score': rng.randint(0, 100),
+            'estimated_value': f'{rng.uniform(1_000, 250_000):.2f}',
+            'created_at': (now - datetime.timedelta(hours=i)).isoformat(),
+            'tags': rng.sample(['enterprise', 'smb', 'inbound', 'outbound', 'hot'], 2),
+        }
+
+    return {
+        'lead_list_page': {'count': 1250, 'next': '?page=2', 'results': [lead(i) for i in range(50)]},
+        'contact_detail': {
+            **lead(1),
+            'notes': 'Met at the trade show, interested in the enterprise tier. ' * 10,
+            'activities': [
+                {'type': rng.choice(['call', 'email', 'meeting']), 'subject': f'Follow-up {n}',
+                 'at': (now - datetime.timedelta(days=n)).isoformat()}
+                for n in range(30)
+            ],
+        },
+        'dashboard_metrics': {
+            'pipeline_by_stage': {stage: rng.randint(10_000, 900_000) for stage in statuses},
+            'daily_revenue': [[(now - datetime.timedelta(days=d)).date().isoformat(),
+                               rng.uniform(0, 50_000)] for d in range(90)],
+            'top_reps': [{'user_id': u, 'won': rng.randint(0, 40), 'revenue': rng.uniform(0, 1e6)}
+                         for u in range(10)],
+        },
+        'small_counter': {'unread': 3},
+    }
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Median microseconds per call over a few rounds"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        rounds.append((time.perf_counter() - start) / iterations * 1_000_000)
+    return statistics.median(rounds)
+
+
+def benchmark_serializers(iterations: int = 500):
+    payloads = build_payloads()
+    combinations = [
+        (fmt, codec)
+        for fmt, spec in SERIALIZATION_FORMATS.items() if _module_available(spec[3])
+        for codec, codec_spec in COMPRESSION_CODECS.items() if _module_available(codec_spec[3])
+    ]
+
+    print(f"\n{'='*78}")
+    print("Serializer Benchmark")
+    print(f"{'='*78}")
+    print(f"{'payload':<20}{'format':<10}{'codec':<8}{'bytes':>10}{'dumps us':>14}{'loads us':>14}")
+    for name, payload in payloads.items():
+        for fmt, codec in combinations:
+            serializer = CacheSerializer(fmt, codec)
+            data = serializer.dumps(payload)
+            dumps_us = _time_per_call(lambda s=serializer, p=payload: s.dumps(p), iterations)
+            loads_us = _time_per_call(lambda d=data: CacheSerializer.loads(d), iterations)
+            print(f"{name:<20}{fmt:<10}{codec:<8}{len(data):>10}{dumps_us:>14.1f}{loads_us:>14.1f}")
+        print()
+
+    missing = [name for name, spec in {**SERIALIZATION_FORMATS, **COMPRESSION_CODECS}.items()
+               if not _module_available(spec[3])]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+
+
+def benchmark_round_trips(redis_url: str, keys: int = 50, iterations: int = 50):
+    import urllib.parse
+    parsed = urllib.parse.urlparse(redis_url)
+    cache = RedisCache(
+        host=parsed.hostname or 'localhost',
+        port=parsed.port or 6379,
+        db=int(parsed.path.lstrip('/') or 0),
+        password=parsed.password,
+        prefix='mycrm:benchmark:'
+    )
+    payload = build_payloads()['contact_detail']
+    names = [f'contact:{i}' for i in range(keys)]
+    cache.set_many(dict.fromkeys(names, payload), ttl=60)
+
+    single_us = _time_per_call(lambda: [cache.get(name) for name in names], iterations)
+    many_us = _time_per_call(lambda: cache.get_many(names), iterations)
+    cache.delete_many(names)
+
+    print(f"\n{'='*78}")
+    print(f"Fetching {keys} keys from {parsed.hostname}")
+    print(f"{'='*78}")
+    print(f"Single GETs:          {single_us / 1000:.2f}ms")
+    print(f"Pipelined get_many:   {many_us / 1000:.2f}ms")
+    print(f"Speedup:              {single_us / many_us:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--redis-url', help='Also compare single GETs with get_many against this Redis')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    benchmark_serializers(args.iterations)
+    if args.redis_url:
+        benchmark_round_trips(args.redis_url)
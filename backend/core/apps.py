@@ -18,6 +18,18 @@ class CoreConfig(AppConfig):
         except ImportError:
             pass
 
+        # Keep the persistent search index in sync with writes
+        from .search import register_search_index_signals
+        register_search_index_signals()
+
+        # Keep autocomplete prefix indexes in sync with writes
+        from .autocomplete import register_autocomplete_signals
+        register_autocomplete_signals()
+
+        # Rebuild workflow trigger indexes when workflows change
+        from .workflows import register_workflow_trigger_signals
+        register_workflow_trigger_signals()
+
         # Import notification signal handlers
         try:
             from . import notification_signals  # noqa: F401
@@ -0,0 +1,491 @@
+"""
+Autocomplete Prefix Index
+Serves search suggestions and popular searches from a prefix index
+instead of querying the live tables on every keystroke
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .cache_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Fields with a prefix index per model. Besides concrete fields,
+# 'email_domain' and 'tags' are derived from the email and tags columns.
+# Override with the AUTOCOMPLETE_FIELDS setting.
+DEFAULT_AUTOCOMPLETE_FIELDS = {
+    'contact_management.Contact': ['company_name', 'first_name', 'last_name', 'email_domain', 'tags'],
+    'lead_management.Lead': ['company_name', 'first_name', 'last_name', 'email_domain', 'tags'],
+    'opportunity_management.Opportunity': ['name', 'company_name'],
+}
+
+# Separates the lowercased sort key from the original value in index members
+MEMBER_SEPARATOR = '\x00'
+BUILD_LOCK_TIMEOUT = 300  # 5 minutes
+BUILD_CHUNK_SIZE = 5000
+
+
+def get_autocomplete_fields():
+    """Prefix-indexed fields per model label"""
+    return getattr(settings, 'AUTOCOMPLETE_FIELDS', DEFAULT_AUTOCOMPLETE_FIELDS)
+
+
+def _email_domain(email):
+    if email and '@' in email:
+        return [email.rsplit('@', 1)[1].lower()]
+    return []
+
+
+def _tag_values(tags):
+    if isinstance(tags, (list, tuple)):
+        return [str(tag) for tag in tags if tag]
+    return []
+
+
+# Derived field -> (source column, function returning the values for a row)
+DERIVED_FIELDS = {
+    'email_domain': ('email', _email_domain),
+    'tags': ('tags', _tag_values),
+}
+
+
+def field_values(field, raw_value):
+    """Values contributed to a field's index by one raw column value"""
+    if field in DERIVED_FIELDS:
+        return DERIVED_FIELDS[field][1](raw_value)
+    if raw_value in (None, ''):
+        return []
+    return [str(raw_value)]
+
+
+def source_column(field):
+    """Database column a (possibly derived) field is read from"""
+    return DERIVED_FIELDS[field][0] if field in DERIVED_FIELDS else field
+
+
+def _member(value):
+    return f'{value.lower()}{MEMBER_SEPARATOR}{value}'
+
+
+def _value(member):
+    return member.split(MEMBER_SEPARATOR, 1)[1]
+
+
+class LocalPrefixStore:
+    """
+    In-process prefix store backed by sorted member lists
+
+    Prefix lookups are a bisect into the sorted list; reference counts
+    drop members once no record holds the value any more.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._members = {}
+        self._counts = {}
+        self._state = {}
+        self._claimed_at = {}
+        self._popular = {}
+
+    def claim_build(self, name):
+        with self._lock:
+            if name in self._state and not self._claim_expired(name):
+                return False
+            self._state[name] = 'building'
+            self._claimed_at[name] = time.monotonic()
+            return True
+
+    def _claim_expired(self, name):
+        # Builds queued from this process may run in another worker
+        return (
+            self._state[name] == 'building'
+            and time.monotonic() - self._claimed_at.get(name, 0) >= BUILD_LOCK_TIMEOUT
+        )
+
+    def release_build(self, name):
+        with self._lock:
+            if self._state.get(name) == 'building':
+                del self._state[name]
+
+    def is_built(self, name):
+        return self._state.get(name) == 'built'
+
+    def is_tracking(self, name):
+        return name in self._state
+
+    def load(self, name, counts):
+        with self._lock:
+            self._counts[name] = Counter({_member(v): n for v, n in counts.items() if n > 0})
+            self._members[name] = sorted(self._counts[name])
+            self._state[name] = 'built'
+
+    def add(self, name, values, delta):
+        with self._lock:
+            counts = self._counts.setdefault(name, Counter())
+            members = self._members.setdefault(name, [])
+            for value in values:
+                member = _member(value)
+                before = counts[member]
+                counts[member] += delta
+                if counts[member] <= 0:
+                    del counts[member]
+                    if before > 0:
+                        index = bisect.bisect_left(members, member)
+                        if index < len(members) and members[index] == member:
+                            members.pop(index)
+                elif before <= 0:
+                    bisect.insort(members, member)
+
+    def prefix(self, name, prefix, limit):
+        with self._lock:
+            members = self._members.get(name, [])
+            index = bisect.bisect_left(members, prefix)
+            results = []
+            while index < len(members) and len(results) < limit and members[index].startswith(prefix):
+                results.append(_value(members[index]))
+                index += 1
+            return results
+
+    def incr_popular(self, model_label, query, amount=1):
+        with self._lock:
+            self._popular.setdefault(model_label, Counter())[query] += amount
+
+    def has_popular(self, model_label):
+        return model_label in self._popular
+
+    def top_popular(self, model_label, limit):
+        with self._lock:
+            return [query for query, _ in self._popular.get(model_label, Counter()).most_common(limit)]
+
+    def clear(self):
+        with self._lock:
+            self._members.clear()
+            self._counts.clear()
+            self._state.clear()
+            self._claimed_at.clear()
+            self._popular.clear()
+
+
+class RedisPrefixStore:
+    """
+    Redis prefix store shared by all workers
+
+    Members live in a sorted set with equal scores and are looked up with
+    ZRANGEBYLEX; a hash keeps reference counts so values disappear once no
+    record holds them.
+    """
+
+    PREFIX = 'autocomplete'
+
+    # Adjust a member's reference count and keep the lex set in step
+    ADD_SCRIPT = """
+    local count = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+    if count > 0 then
+        redis.call('ZADD', KEYS[2], 0, ARGV[1])
+    else
+        redis.call('HDEL', KEYS[1], ARGV[1])
+        redis.call('ZREM', KEYS[2], ARGV[1])
+    end
+    return count
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._add = client.register_script(self.ADD_SCRIPT)
+
+    def _keys(self, name):
+        base = f'{self.PREFIX}:{name}'
+        return f'{base}:counts', f'{base}:lex', f'{base}:state'
+
+    def claim_build(self, name):
+        return bool(self.client.set(self._keys(name)[2], 'building', nx=True, ex=BUILD_LOCK_TIMEOUT))
+
+    def release_build(self, name):
+        state_key = self._keys(name)[2]
+        if self.client.get(state_key) == 'building':
+            self.client.delete(state_key)
+
+    def is_built(self, name):
+        return self.client.get(self._keys(name)[2]) == 'built'
+
+    def is_tracking(self, name):
+        return self.client.exists(self._keys(name)[2]) > 0
+
+    def load(self, name, counts):
+        counts_key, lex_key, state_key = self._keys(name)
+        pipe = self.client.pipeline()
+        pipe.delete(counts_key, lex_key)
+        members = {_member(v): n for v, n in counts.items() if n > 0}
+        items = list(members.items())
+        for start in range(0, len(items), BUILD_CHUNK_SIZE):
+            chunk = dict(items[start:start + BUILD_CHUNK_SIZE])
+            pipe.hset(counts_key, mapping=chunk)
+            pipe.zadd(lex_key, dict.fromkeys(chunk, 0))
+        pipe.set(state_key, 'built')
+        pipe.execute()
+
+    def add(self, name, values, delta):
+        counts_key, lex_key, _ = self._keys(name)
+        for value in values:
+            self._add(keys=[counts_key, lex_key], args=[_member(value), delta])
+
+    def prefix(self, name, prefix, limit):
+        lex_key = self._keys(name)[1]
+        encoded = prefix.encode()
+        # 0xff never occurs in UTF-8, so it bounds every member with this prefix
+        members = self.client.zrangebylex(lex_key, b'[' + encoded, b'[' + encoded + b'\xff', 0, limit)
+        return [_value(member) for member in members]
+
+    def incr_popular(self, model_label, query, amount=1):
+        self.client.zincrby(f'{self.PREFIX}:popular:{model_label}', amount, query)
+
+    def has_popular(self, model_label):
+        return self.client.exists(f'{self.PREFIX}:popular:{model_label}') > 0
+
+    def top_popular(self, model_label, limit):
+        return self.client.zrevrange(f'{self.PREFIX}:popular:{model_label}', 0, limit - 1)
+
+
+_local_store = LocalPrefixStore()
+
+
+def get_prefix_store():
+    """Redis store when REDIS_URL is configured, otherwise the process-local store"""
+    client = get_redis_client()
+    return RedisPrefixStore(client) if client is not None else _local_store
+
+
+class AutocompleteIndex:
+    """Suggestions and popular searches served from the prefix store"""
+
+    def __init__(self, store=None):
+        self.store = store or get_prefix_store()
+
+    @staticmethod
+    def index_name(model_label, field):
+        return f'{model_label}:{field}'
+
+    def is_indexed(self, model_label, field):
+        return field in get_autocomplete_fields().get(model_label, [])
+
+    def suggest(self, model_label, field, partial_query, limit=10):
+        """
+        Values of a field starting with partial_query (case-insensitive)
+
+        Until the field's index is built, suggestions come from the table
+        and the first request queues the build.
+        """
+        name = self.index_name(model_label, field)
+        if not self.store.is_built(name):
+            self.schedule_build(model_label, field)
+            return self._suggest_from_table(model_label, field, partial_query, limit)
+
+        return self.store.prefix(name, (partial_query or '').lower(), limit)
+
+    def schedule_build(self, model_label, field):
+        """Queue a background build of a field's index; False if already claimed"""
+        name = self.index_name(model_label, field)
+        if not self.store.claim_build(name):
+            return False
+
+        try:
+            from .tasks import build_autocomplete_index
+            build_autocomplete_index.delay(model_label, field)
+        except Exception as e:
+            self.store.release_build(name)
+            logger.warning(f"Could not queue build of autocomplete index {name}: {str(e)}")
+            return False
+        return True
+
+    def build(self, model_label, field, claimed=False):
+        """
+        Load a field's distinct values and their counts
+
+        Args:
+            model_label: Model label, e.g. 'contact_management.Contact'
+            field: Indexed field
+            claimed: The build was already claimed by schedule_build
+
+        Returns:
+            False if another worker holds the build, otherwise True
+        """
+        name = self.index_name(model_label, field)
+        if not claimed and not self.store.claim_build(name):
+            return self.store.is_built(name)
+
+        try:
+            counts = self._count_values(apps.get_model(model_label), field)
+            self.store.load(name, counts)
+        except Exception:
+            self.store.release_build(name)
+            raise
+
+        logger.info(f"Built autocomplete index {name} with {len(counts)} values")
+        return True
+
+    @staticmethod
+    def _count_values(model, field):
+        column = source_column(field)
+        counts = Counter()
+
+        if field in DERIVED_FIELDS:
+            rows = model.objects.order_by().values_list(column, flat=True).iterator(
+                chunk_size=BUILD_CHUNK_SIZE
+            )
+            for raw_value in rows:
+                counts.update(field_values(field, raw_value))
+        else:
+            rows = model.objects.order_by().values(column).annotate(count=Count('pk'))
+            for row in rows.iterator(chunk_size=BUILD_CHUNK_SIZE):
+                for value in field_values(field, row[column]):
+                    counts[value] += row['count']
+
+        return counts
+
+    def warm(self, model_labels=None):
+        """
+        Build every configured index that is not built yet
+
+        Args:
+            model_labels: Limit to these models (None warms all)
+
+        Returns:
+            Names of the indexes built
+        """
+        built = []
+        for model_label, fields in get_autocomplete_fields().items():
+            if model_labels is not None and model_label not in model_labels:
+                continue
+            for field in fields:
+                name = self.index_name(model_label, field)
+                if not self.store.is_built(name) and self.build(model_label, field):
+                    built.append(name)
+        return built
+
+    def update(self, model_label, field, old_values, new_values):
+        """Apply a record's change to a field's index, if that index exists"""
+        name = self.index_name(model_label, field)
+        if not self.store.is_tracking(name):
+            return
+
+        old_counts = Counter(old_values)
+        new_counts = Counter(new_values)
+        removed = list((old_counts - new_counts).elements())
+        added = list((new_counts - old_counts).elements())
+        if removed:
+            self.store.add(name, removed, -1)
+        if added:
+            self.store.add(name, added, 1)
+
+    def record_search(self, model_label, query):
+        """Count a search towards popular_searches"""
+        if query:
+            self.record_searches(model_label, {query: 1})
+
+    def record_searches(self, model_label, counts):
+        """
+        Count logged searches towards popular_searches
+
+        Counts are only added once the store has been seeded; seeding reads
+        SearchLog, which already holds the logged searches.
+        """
+        if not self.store.has_popular(model_label):
+            return
+        for query, count in counts.items():
+            self.store.incr_popular(model_label, query, count)
+
+    def popular_searches(self, model_label, limit=10):
+        """Most frequent queries, seeded once from SearchLog when empty"""
+        if not self.store.has_popular(model_label):
+            self._seed_popular(model_label)
+        return list(self.store.top_popular(model_label, limit))
+
+    def _seed_popular(self, model_label):
+        from .models import SearchLog
+
+        rows = SearchLog.objects.filter(
+            model_name=model_label,
+            query__isnull=False
+        ).exclude(query='').values('query').annotate(count=Count('id'))
+
+        for row in rows.iterator(chunk_size=BUILD_CHUNK_SIZE):
+            self.store.incr_popular(model_label, row['query'], row['count'])
+
+    def _suggest_from_table(self, model_label, field, partial_query, limit):
+        model = apps.get_model(model_label)
+        if field in DERIVED_FIELDS:
+            return []
+        # Order by the field itself so default ordering columns do not defeat DISTINCT
+        return list(model.objects.filter(
+            **{f"{field}__istartswith": partial_query}
+        ).order_by(field).values_list(field, flat=True).distinct()[:limit])
+
+
+def _indexed_values(instance, fields):
+    # Read from __dict__ so deferred fields are never fetched
+    return {
+        field: field_values(field, instance.__dict__.get(source_column(field)))
+        for field in fields
+    }
+
+
+def _remember_indexed_values(sender, instance, **kwargs):
+    fields = get_autocomplete_fields().get(sender._meta.label)
+    if fields:
+        instance._autocomplete_values = _indexed_values(instance, fields)
+
+
+def _update_index_on_save(sender, instance, created, **kwargs):
+    fields = get_autocomplete_fields().get(sender._meta.label)
+    if not fields:
+        return
+
+    previous = {} if created else getattr(instance, '_autocomplete_values', {})
+    current = _indexed_values(instance, fields)
+    try:
+        index = AutocompleteIndex()
+        for field in fields:
+            index.update(sender._meta.label, field, previous.get(field, []), current[field])
+    except Exception as e:
+        logger.warning(f"Failed to update autocomplete index for {sender._meta.label}: {str(e)}")
+    instance._autocomplete_values = current
+
+
+def _update_index_on_delete(sender, instance, **kwargs):
+    fields = get_autocomplete_fields().get(sender._meta.label)
+    if not fields:
+        return
+
+    previous = getattr(instance, '_autocomplete_values', None) or _indexed_values(instance, fields)
+    try:
+        index = AutocompleteIndex()
+        for field in fields:
+            index.update(sender._meta.label, field, previous.get(field, []), [])
+    except Exception as e:
+        logger.warning(f"Failed to update autocomplete index for {sender._meta.label}: {str(e)}")
+
+
+def register_autocomplete_signals():
+    """Keep autocomplete indexes in sync with writes to configured models"""
+    for model_label in get_autocomplete_fields():
+        post_init.connect(
+            _remember_indexed_values, sender=model_label,
+            dispatch_uid=f'autocomplete_init_{model_label}'
+        )
+        post_save.connect(
+            _update_index_on_save, sender=model_label,
+            dispatch_uid=f'autocomplete_save_{model_label}'
+        )
+        post_delete.connect(
+            _update_index_on_delete, sender=model_label,
+            dispatch_uid=f'autocomplete_delete_{model_label}'
+        )
@@ -66,8 +66,12 @@ class BulkOperationService:
         if not objects:
             raise ValueError("No valid objects found")
 
+        from .search import index_records
+
         # Perform update
-        count = queryset.filter(id__in=[obj.id for obj in objects]).update(**sanitized_data)
+        updated_ids = [obj.id for obj in objects]
+        count = queryset.filter(id__in=updated_ids).update(**sanitized_data)
+        index_records(queryset.model._meta.label, updated_ids)
 
         return {
             'updated': count,
@@ -0,0 +1,296 @@
+"""
+Cache Request Coalescing
+Stampede-safe get_or_compute shared by the cache-aside helpers in
+core.cache_utils, core.caching_services and enterprise.caching
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_utils import CacheKey, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CACHE_LOCK_TIMEOUT = 30  # seconds a computation may hold the distributed lock
+CACHE_XFETCH_BETA = 1.0  # >1 refreshes earlier, <1 later
+CACHE_REFRESH_WORKERS = 4
+# Waiting for another process's computation polls with this backoff
+LOCK_POLL_INITIAL = 0.05
+LOCK_POLL_MAX = 0.5
+
+# Compare-and-delete so a lock that expired and was re-acquired is left alone
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_inflight: dict[tuple[str, str], Future] = {}
+_inflight_lock = threading.Lock()
+_refresh_executor = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            workers = getattr(settings, 'CACHE_REFRESH_WORKERS', CACHE_REFRESH_WORKERS)
+            _refresh_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-refresh')
+        return _refresh_executor
+
+
+def _callable_path(func: Callable) -> str | None:
+    """Dotted path a Celery worker can import, or None for closures and lambdas"""
+    module = getattr(func, '__module__', None)
+    qualname = getattr(func, '__qualname__', '')
+    if not module or not qualname or '<' in qualname or '.' in qualname:
+        return None
+    return f'{module}.{qualname}'
+
+
+class RequestCoalescer:
+    """
+    Cache-aside computation without stampedes
+
+    - Concurrent misses in one process share a single computation (future)
+    - Concurrent misses across processes are serialized by a distributed
+      lock; the others wait for the winner's value
+    - Hot keys are refreshed early with probability rising towards expiry
+      (XFetch), scaled by how long the value took to compute
+    - Within ``stale_ttl`` after expiry the stale value is served while a
+      refresh runs in the background, through Celery when the backend is
+      shared with the workers and the computation is importable
+
+    The value is stored under its key unchanged; the computation time and
+    expiry are stored next to it under ``<key>:xf``. ``backend`` needs
+    get_many(keys) and set_many(mapping, timeout), as both the Django cache
+    and enterprise.caching.MultiTierCache provide. ``name`` scopes the
+    in-process single-flight registry to one backend.
+    """
+
+    META_SUFFIX = ':xf'
+
+    def __init__(
+        self,
+        backend=None,
+        name: str = 'default',
+        lock_timeout: float | None = None,
+        beta: float | None = None,
+        celery_refresh: bool = False,
+        clock: Callable[[], float] = time.time
+    ):
+        self.backend = backend if backend is not None else cache
+        self.name = name
+        self.lock_timeout = lock_timeout or getattr(settings, 'CACHE_LOCK_TIMEOUT', CACHE_LOCK_TIMEOUT)
+        self.beta = beta if beta is not None else getattr(settings, 'CACHE_XFETCH_BETA', CACHE_XFETCH_BETA)
+        self.celery_refresh = celery_refresh
+        self.clock = clock
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[..., T],
+        ttl: int,
+        stale_ttl: int = 0,
+        args: tuple = (),
+        kwargs: dict | None = None
+    ) -> T:
+        """
+        Return the cached value for ``key``, computing ``compute(*args, **kwargs)`` on a miss
+
+        Args:
+            key: Cache key
+            compute: Produces the value; called at most once per process per miss
+            ttl: Seconds the value is fresh
+            stale_ttl: Seconds after that it may still be served while refreshing
+            args, kwargs: Passed to ``compute``; keep them JSON-serializable
+                so refreshes can run on Celery
+        """
+        kwargs = kwargs or {}
+        found = self._read(key)
+        if found is not None:
+            value, meta = found
+            if meta is None:
+                # Written without metadata; nothing to refresh on
+                return value
+
+            now = self.clock()
+            expires_at, stale_until = meta['expires_at'], meta['stale_until']
+            if now < expires_at:
+                if self._refresh_early(meta['delta'], expires_at, now):
+                    self._schedule_refresh(key, compute, ttl, stale_ttl, args, kwargs)
+                return value
+            if now < stale_until:
+                self._schedule_refresh(key, compute, ttl, stale_ttl, args, kwargs)
+                return value
+
+        return self._single_flight(key, lambda: self._compute_locked(key, compute, ttl, stale_ttl, args, kwargs))
+
+    def refresh(
+        self,
+        key: str,
+        compute: Callable[..., T],
+        ttl: int,
+        stale_ttl: int = 0,
+        args: tuple = (),
+        kwargs: dict | None = None,
+        token: str | None = None
+    ) -> T | None:
+        """Recompute and store a value, releasing the refresh lock ``token`` afterwards"""
+        try:
+            return self._compute_and_store(key, compute, ttl, stale_ttl, args, kwargs or {})
+        except Exception as e:
+            logger.error(f"Background refresh of cache key {key} failed: {e}")
+            return None
+        finally:
+            if token:
+                self._release(self._lock_key(key, 'refresh'), token)
+
+    def _read(self, key: str) -> tuple[Any, dict | None] | None:
+        meta_key = key + self.META_SUFFIX
+        found = self.backend.get_many([key, meta_key])
+        if key not in found or found[key] is None:
+            return None
+        meta = found.get(meta_key)
+        return found[key], meta if isinstance(meta, dict) else None
+
+    def _refresh_early(self, delta: float, expires_at: float, now: float) -> bool:
+        """XFetch: refresh with probability rising as expiry nears"""
+        if delta <= 0 or self.beta <= 0:
+            return False
+        return now - delta * self.beta * math.log(1.0 - random.random()) >= expires_at  # noqa: S311 - jitter, not security
+
+    def _single_flight(self, key: str, fn: Callable[[], T]) -> T:
+        flight = (self.name, key)
+        with _inflight_lock:
+            future = _inflight.get(flight)
+            leader = future is None
+            if leader:
+                future = _inflight[flight] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(flight, None)
+
+    def _compute_locked(self, key, compute, ttl, stale_ttl, args, kwargs):
+        """Compute under the distributed lock, or wait for the process holding it"""
+        lock_key = self._lock_key(key, 'compute')
+        token = self._acquire(lock_key)
+        if token is None:
+            found = self._wait_for_value(key)
+            if found is not None:
+                return found[0]
+            # The holder died or is too slow; compute without the lock
+            logger.warning(f"Timed out waiting for cache key {key}, computing it here")
+            return self._compute_and_store(key, compute, ttl, stale_ttl, args, kwargs)
+
+        try:
+            # Another process may have finished between our read and the lock
+            found = self._read(key)
+            if found is not None and (found[1] is None or self.clock() < found[1]['expires_at']):
+                return found[0]
+            return self._compute_and_store(key, compute, ttl, stale_ttl, args, kwargs)
+        finally:
+            self._release(lock_key, token)
+
+    def _wait_for_value(self, key: str):
+        deadline = time.monotonic() + self.lock_timeout
+        delay = LOCK_POLL_INITIAL
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, LOCK_POLL_MAX)
+            found = self._read(key)
+            if found is not None and (found[1] is None or self.clock() < found[1]['expires_at']):
+                return found
+        return None
+
+    def _compute_and_store(self, key, compute, ttl, stale_ttl, args, kwargs):
+        started = time.perf_counter()
+        value = compute(*args, **kwargs)
+        delta = time.perf_counter() - started
+
+        now = self.clock()
+        meta = {'delta': delta, 'expires_at': now + ttl, 'stale_until': now + ttl + stale_ttl}
+        self.backend.set_many({key: value, key + self.META_SUFFIX: meta}, ttl + stale_ttl)
+        return value
+
+    def _schedule_refresh(self, key, compute, ttl, stale_ttl, args, kwargs):
+        """Refresh in the background, at most once at a time per key across processes"""
+        token = self._acquire(self._lock_key(key, 'refresh'))
+        if token is None:
+            return
+
+        path = _callable_path(compute) if self.celery_refresh else None
+        if path is not None:
+            try:
+                from .tasks import refresh_cached_value
+                refresh_cached_value.delay(key, path, list(args), kwargs, ttl, stale_ttl, token)
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue refresh of cache key {key}, refreshing in-process: {e}")
+
+        _get_refresh_executor().submit(self.refresh, key, compute, ttl, stale_ttl, args, kwargs, token)
+
+    def _lock_key(self, key: str, purpose: str) -> str:
+        # Not scoped by name: the lock must be shared by every process
+        return CacheKey.make('lock', purpose, key)
+
+    def _acquire(self, lock_key: str) -> str | None:
+        """Take a lock that expires after lock_timeout; returns its token"""
+        token = uuid.uuid4().hex
+        client = get_redis_client()
+        try:
+            if client is not None:
+                acquired = client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+            else:
+                acquired = cache.add(lock_key, token, timeout=self.lock_timeout)
+        except Exception as e:
+            # Without the lock we only lose cross-process coalescing
+            logger.warning(f"Cache lock {lock_key} unavailable: {e}")
+            return token
+        return token if acquired else None
+
+    def _release(self, lock_key: str, token: str):
+        client = get_redis_client()
+        try:
+            if client is not None:
+                client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+            elif cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Failed to release cache lock {lock_key}: {e}")
+
+
+_default_coalescer = None
+
+
+def get_coalescer() -> RequestCoalescer:
+    """Coalescer over the Django cache, shared with Celery workers"""
+    global _default_coalescer
+    if _default_coalescer is None:
+        _default_coalescer = RequestCoalescer(cache, name='default', celery_refresh=True)
+    return _default_coalescer
@@ -11,10 +11,12 @@ Provides advanced caching patterns for:
 import hashlib
 import json
 import logging
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterable
 from functools import wraps
 from typing import Any, TypeVar
 
+from django.conf import settings
 from django.core.cache import cache, caches
 from django.db.models import Model, QuerySet
 from django.db.models.signals import post_delete, post_save
@@ -24,6 +26,29 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_redis_client = None
+
+# Tag -> cache keys, used when no Redis is configured
+_local_tags: dict[str, set[str]] = {}
+_local_tags_lock = threading.Lock()
+
+
+def get_redis_client():
+    """
+    Shared Redis client for data structures the Django cache API cannot express.
+
+    Returns None when REDIS_URL is not configured so callers can fall back
+    to in-process implementations.
+    """
+    global _redis_client
+    url = getattr(settings, 'REDIS_URL', '')
+    if not url:
+        return None
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(url, decode_responses=True)
+    return _redis_client
+
 
 class CacheKey:
     """Generate consistent cache keys."""
@@ -57,6 +82,19 @@ class CacheKey:
         return cls.make('user', str(user_id), *parts)
 
 
+class _VersionedCache:
+    """The default cache bound to one key version."""
+
+    def __init__(self, version: int):
+        self.version = version
+
+    def get_many(self, keys: list[str]) -> dict:
+        return cache.get_many(keys, version=self.version)
+
+    def set_many(self, mapping: dict, timeout: int | None) -> None:
+        cache.set_many(mapping, timeout=timeout, version=self.version)
+
+
 class CacheManager:
     """
     Advanced cache management with patterns for common use cases.
@@ -72,19 +110,29 @@ class CacheManager:
         key: str,
         factory: Callable[[], T],
         timeout: int = DEFAULT_TIMEOUT,
-        version: int | None = None
+        version: int | None = None,
+        tags: Iterable[str] | None = None
     ) -> T:
-        """Get value from cache or compute and store it."""
-        value = cache.get(key, version=version)
+        """
+        Get value from cache or compute and store it, indexed under ``tags``.
 
-        if value is None:
-            value = factory()
-            cache.set(key, value, timeout=timeout, version=version)
+        Concurrent misses are coalesced into one computation and hot keys
+        are refreshed early; see core.cache_coalescing.
+        """
+        from .cache_coalescing import RequestCoalescer, get_coalescer
+
+        def compute():
             logger.debug(f"Cache miss for key: {key}")
-        else:
-            logger.debug(f"Cache hit for key: {key}")
+            value = factory()
+            if tags:
+                cls.tag(key, tags, timeout)
+            return value
 
-        return value
+        if version is None:
+            coalescer = get_coalescer()
+        else:
+            coalescer = RequestCoalescer(_VersionedCache(version), name=f'default:v{version}')
+        return coalescer.get_or_compute(key, compute, timeout)
 
     @classmethod
     def get_many_or_set(
@@ -104,9 +152,94 @@ class CacheManager:
 
         return cached
 
+    @classmethod
+    def tag(cls, key: str, tags: Iterable[str], timeout: int | None = DEFAULT_TIMEOUT) -> None:
+        """
+        Index a cache key under tags so invalidate_tags can find it.
+
+        With Redis each tag is a SET of keys that lives as long as its
+        longest-lived member; otherwise tags are tracked in-process.
+        """
+        client = get_redis_client()
+        if client is None:
+            with _local_tags_lock:
+                for tag in tags:
+                    _local_tags.setdefault(tag, set()).add(key)
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for tag in tags:
+                tag_key = CacheKey.make('tag', tag)
+                pipe.sadd(tag_key, key)
+                if timeout is None:
+                    pipe.persist(tag_key)
+                else:
+                    # Only ever extend the set's lifetime
+                    pipe.expire(tag_key, timeout, nx=True)
+                    pipe.expire(tag_key, timeout, gt=True)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to tag cache key {key}: {e}")
+
+    @classmethod
+    def invalidate_tags(cls, tags: Iterable[str]) -> int:
+        """Delete every key indexed under any of the tags."""
+        tags = list(tags)
+        client = get_redis_client()
+        if client is None:
+            with _local_tags_lock:
+                keys = set().union(*(_local_tags.pop(tag, set()) for tag in tags))
+        else:
+            tag_keys = [CacheKey.make('tag', tag) for tag in tags]
+            try:
+                # Read and drop the sets atomically so concurrent tags aren't lost
+                pipe = client.pipeline()
+                pipe.sunion(tag_keys)
+                pipe.delete(*tag_keys)
+                keys = set(pipe.execute()[0])
+            except Exception as e:
+                logger.warning(f"Failed to invalidate tags {tags}: {e}")
+                return 0
+
+        if keys:
+            cache.delete_many(list(keys))
+        return len(keys)
+
+    @classmethod
+    def namespace_version(cls, namespace: str) -> int:
+        """Current version of a key namespace."""
+        version_key = CacheKey.make('ns', namespace)
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, 1, timeout=None)
+            version = cache.get(version_key, 1)
+        return version
+
+    @classmethod
+    def namespaced_key(cls, namespace: str, *parts: str) -> str:
+        """Key inside the current version of a namespace."""
+        version = cls.namespace_version(namespace)
+        return ':'.join([namespace, f'v{version}', *(str(p) for p in parts)])
+
+    @classmethod
+    def bump_namespace(cls, namespace: str) -> int:
+        """
+        Invalidate every key in a namespace in O(1).
+
+        Readers move to the next version; old entries expire on their own.
+        """
+        version_key = CacheKey.make('ns', namespace)
+        cache.add(version_key, 1, timeout=None)
+        return cache.incr(version_key)
+
     @classmethod
     def delete_pattern(cls, pattern: str) -> int:
-        """Delete all keys matching a pattern."""
+        """
+        Delete all keys matching a pattern.
+
+        Scans the whole keyspace; prefer invalidate_tags or bump_namespace.
+        """
         # Note: This works with Redis backend
         try:
             redis_cache = caches['default']
@@ -118,19 +251,18 @@ class CacheManager:
 
     @classmethod
     def invalidate_model(cls, model: type[Model], pk: Any = None) -> None:
-        """Invalidate cache for a model or instance."""
-        if pk is not None:
-            # Invalidate specific instance
-            key = CacheKey.for_model(model, pk)
-            cache.delete(key)
-        else:
-            # Invalidate all instances
-            key = CacheKey.for_model(model)
-            cache.delete(key)
+        """
+        Invalidate cache for a model or instance.
+
+        Touches only the instance key, keys tagged with it, and the
+        model's list namespace version.
+        """
+        key = CacheKey.for_model(model, pk)
+        cache.delete(key)
+        cls.invalidate_tags([key])
 
         # Also invalidate list cache
-        list_key = CacheKey.for_model(model) + ':list*'
-        cls.delete_pattern(list_key)
+        cls.bump_namespace(CacheKey.for_model(model, 'list'))
 
         logger.debug(f"Invalidated cache for {model.__name__}")
 
@@ -165,17 +297,21 @@ def cached_query(
         def get_leads_by_status(status):
             return Lead.objects.filter(status=status)
     """
+    namespace = CacheKey.make(key_prefix)
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            # Build cache key
+            # Build cache key; custom keys are found through the namespace tag
+            tags = None
             if key_builder:
                 key = key_builder(*args, **kwargs)
+                tags = [namespace]
             else:
-                key_parts = [key_prefix, func.__name__]
+                key_parts = [func.__name__]
                 key_parts.extend(str(a) for a in args)
                 key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                key = CacheKey.make(*key_parts)
+                key = CacheManager.namespaced_key(namespace, *key_parts)
 
             # Get or compute
             def factory():
@@ -185,10 +321,14 @@ def cached_query(
                     return list(result)
                 return result
 
-            return CacheManager.get_or_set(key, factory, timeout)
+            return CacheManager.get_or_set(key, factory, timeout, tags=tags)
+
+        def invalidate():
+            CacheManager.bump_namespace(namespace)
+            CacheManager.invalidate_tags([namespace])
 
         # Add method to invalidate this query's cache
-        wrapper.invalidate = lambda: CacheManager.delete_pattern(key_prefix)
+        wrapper.invalidate = invalidate
 
         return wrapper
     return decorator
@@ -267,7 +407,7 @@ class QueryResultCache:
         limit: int = None
     ) -> list[Model]:
         """Get a cached list of model instances."""
-        key_parts = [CacheKey.for_model(self.model), 'list']
+        key_parts = []
         if filters:
             key_parts.append(CacheKey.hash_query('', filters))
         if order_by:
@@ -275,7 +415,7 @@ class QueryResultCache:
         if limit:
             key_parts.append(f'limit_{limit}')
 
-        key = ':'.join(key_parts)
+        key = CacheManager.namespaced_key(CacheKey.for_model(self.model, 'list'), *key_parts)
 
         def factory():
             qs = self.model.objects.all()
@@ -301,7 +441,7 @@ class QueryResultCache:
 
 class RateLimitCache:
     """
-    Rate limiting using cache backend.
+    Rate limiting backed by the shared GCRA engine in core.rate_limiting.
     """
 
     def __init__(self, key_prefix: str, limit: int, window: int):
@@ -309,27 +449,22 @@ class RateLimitCache:
         self.limit = limit
         self.window = window  # seconds
 
+    @property
+    def limiter(self):
+        from .rate_limiting import get_rate_limiter
+        return get_rate_limiter(CacheKey.make(self.key_prefix, 'ratelimit'), self.limit, self.window)
+
     def is_allowed(self, identifier: str) -> tuple[bool, int]:
         """
         Check if request is allowed.
         Returns (is_allowed, remaining_requests).
         """
-        key = CacheKey.make(self.key_prefix, 'ratelimit', identifier)
-        current = cache.get(key, 0)
-
-        if current >= self.limit:
-            return False, 0
-
-        # Increment counter
-        new_count = CacheManager.increment(key, 1, self.window)
-        remaining = max(0, self.limit - new_count)
-
-        return True, remaining
+        result = self.limiter.hit(identifier)
+        return result.allowed, result.remaining
 
     def reset(self, identifier: str) -> None:
         """Reset rate limit for an identifier."""
-        key = CacheKey.make(self.key_prefix, 'ratelimit', identifier)
-        cache.delete(key)
+        self.limiter.reset(identifier)
 
 
 # Pre-configured caches for common models
@@ -14,6 +14,8 @@ from django.core.cache import caches
 from django.db import models
 from django.utils import timezone
 
+from .cache_coalescing import get_coalescer
+
 
 class CacheConfiguration(models.Model):
     """Configuration for different cache layers."""
@@ -351,24 +353,23 @@ class SmartCacheService:
         tags: list[str] = None,
         stale_ttl: int = 60,
     ) -> Any:
-        """Get from cache or set using callback."""
-        # Try to get from cache
-        result = self.cache.get(key)
+        """Get from cache or set using callback, coalescing concurrent misses."""
+        computed = {}
 
-        if result is not None:
-            self._record_hit(key)
+        def compute():
+            start_time = timezone.now()
+            result = callback()
+            computed['execution_time'] = (timezone.now() - start_time).total_seconds() * 1000
             return result
 
-        # Cache miss - execute callback
-        start_time = timezone.now()
-        result = callback()
-        execution_time = (timezone.now() - start_time).total_seconds() * 1000
+        result = get_coalescer().get_or_compute(key, compute, ttl)
 
-        # Store in cache
-        self.cache.set(key, result, ttl)
+        if 'execution_time' not in computed:
+            self._record_hit(key)
+            return result
 
         # Record metrics
-        self._record_miss(key, execution_time)
+        self._record_miss(key, computed['execution_time'])
 
         # Store entry for tracking
         if tags:
@@ -392,32 +393,19 @@ class SmartCacheService:
         callback: Callable,
         ttl: int = 300,
         stale_ttl: int = 60,
+        args: tuple = (),
+        kwargs: dict | None = None,
     ) -> Any:
-        """Get from cache, serving stale data while revalidating."""
-        stale_key = f'{key}:stale'
-        fresh_key = f'{key}:fresh'
-
-        # Check for fresh data
-        fresh = self.cache.get(fresh_key)
-        if fresh is not None:
-            return fresh
-
-        # Check for stale data
-        stale = self.cache.get(stale_key)
-
-        if stale is not None:
-            # Serve stale, trigger background refresh
-            self._trigger_background_refresh(key, callback, ttl, stale_ttl)
-            return stale
-
-        # Complete cache miss
-        result = callback()
-
-        # Store both fresh and stale versions
-        self.cache.set(fresh_key, result, ttl)
-        self.cache.set(stale_key, result, ttl + stale_ttl)
-
-        return result
+        """
+        Get from cache, serving stale data while revalidating.
+
+        For up to ``stale_ttl`` seconds after expiry the old value is
+        returned while one background refresh runs; pass a module-level
+        ``callback`` with JSON-serializable ``args`` to refresh on Celery.
+        """
+        return get_coalescer().get_or_compute(
+            key, callback, ttl, stale_ttl=stale_ttl, args=args, kwargs=kwargs
+        )
 
     def _record_hit(self, key: str) -> None:
         """Record a cache hit."""
@@ -430,17 +418,6 @@ class SmartCacheService:
         """Record a cache miss."""
         pass  # Metrics aggregation
 
-    def _trigger_background_refresh(
-        self,
-        key: str,
-        callback: Callable,
-        ttl: int,
-        stale_ttl: int,
-    ) -> None:
-        """Trigger a background cache refresh."""
-        # In production, use Celery or similar for background task
-        pass
-
 
 class PrefetchService:
     """Service for intelligent data prefetching."""
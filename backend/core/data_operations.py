@@ -4,45 +4,165 @@ Handles bulk data operations with validation and mapping
 """
 
 import csv
+import io
 import json
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import reduce
 from io import BytesIO, StringIO
+from itertools import islice
+from operator import or_
 
 import openpyxl
 import pandas as pd
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import connection, connections, router, transaction
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import capfirst
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Errors kept on the importer and DataImportLog; further errors are only counted
+MAX_LOGGED_IMPORT_ERRORS = 1000
+
+TRUE_VALUES = frozenset(['true', '1', 'yes', 'y'])
+
+# Natural keys used to match existing records in upsert imports.
+# Override with the IMPORT_NATURAL_KEYS setting.
+DEFAULT_IMPORT_NATURAL_KEYS = {
+    'contact_management.Contact': ['email'],
+    'lead_management.Lead': ['email'],
+}
+
+IMPORT_MODES = ('insert', 'upsert')
+
+
+def get_import_natural_keys(model_label):
+    """Natural key fields for a model label, or an empty list"""
+    natural_keys = getattr(settings, 'IMPORT_NATURAL_KEYS', DEFAULT_IMPORT_NATURAL_KEYS)
+    return list(natural_keys.get(model_label, []))
+
+
+def _to_bool(value):
+    return str(value).lower() in TRUE_VALUES
+
+
+def _to_int(value):
+    return int(value)
+
+
+def _to_float(value):
+    return float(value)
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return parse_date(str(value)) or pd.to_datetime(value).date()
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return parse_datetime(str(value)) or pd.to_datetime(value).to_pydatetime()
+
+
+def _to_str(value):
+    return str(value)
+
+
+FIELD_CONVERTERS = {
+    'BooleanField': _to_bool,
+    'IntegerField': _to_int,
+    'BigIntegerField': _to_int,
+    'FloatField': _to_float,
+    'DecimalField': _to_float,
+    'DateField': _to_date,
+    'DateTimeField': _to_datetime,
+}
+
+
+def _init_validation_worker():
+    """Set up Django in validation worker processes"""
+    import django
+    if not apps.ready:
+        django.setup()
+
+
+def validate_batch(model_label, required_fields, exclude, rows):
+    """
+    Validate mapped rows for a model
+
+    Runs in the importing process or in a validation worker process.
+
+    Args:
+        model_label: Model label (e.g., 'contact_management.Contact')
+        required_fields: Fields every row must provide
+        exclude: Fields skipped by full_clean
+        rows: Mapped field dicts
+
+    Returns:
+        List of error lists, one per row
+    """
+    model = apps.get_model(model_label)
+    results = []
+
+    for data in rows:
+        errors = [
+            f"Required field '{name}' is missing"
+            for name in required_fields if name not in data
+        ]
+        try:
+            # Uniqueness is checked per batch by the importer, not per row here
+            model(**data).full_clean(exclude=exclude, validate_unique=False)
+        except Exception as e:
+            errors.append(str(e))
+        results.append(errors)
+
+    return results
+
 
 class DataImporter:
     """Handle data import from various formats"""
 
-    SUPPORTED_FORMATS = ['csv', 'xlsx', 'xls', 'json']
+    SUPPORTED_FORMATS = ['csv', 'xlsx', 'xls', 'json', 'jsonl']
 
-    def __init__(self, model_name, file_obj, file_format, field_mapping=None, user=None):
+    def __init__(self, model_name, file_obj, file_format, field_mapping=None, user=None,
+                 mode='insert', unique_fields=None):
         """
         Initialize data importer
 
         Args:
             model_name: Model to import data into (e.g., 'contact_management.Contact')
-            file_obj: File object or file path
-            file_format: File format ('csv', 'xlsx', 'json')
+            file_obj: File object, bytes or file path
+            file_format: File format ('csv', 'xlsx', 'json', 'jsonl')
             field_mapping: Dict mapping file columns to model fields
             user: User performing the import
+            mode: 'insert' to always create, 'upsert' to update records matching unique_fields
+            unique_fields: Natural key fields for upserts (defaults to IMPORT_NATURAL_KEYS)
         """
         self.model_name = model_name
         self.file_obj = file_obj
         self.file_format = file_format.lower()
         self.field_mapping = field_mapping or {}
         self.user = user
+        self.mode = mode
         self.errors = []
         self.imported_count = 0
         self.skipped_count = 0
+        self.processed_count = 0
+        self.duplicate_count = 0
+        self.import_log = None
 
         # Get model class
         try:
@@ -50,138 +170,268 @@ class DataImporter:
         except LookupError:
             raise ValueError(f"Model {model_name} not found")
 
-    def import_data(self, validate_only=False, batch_size=100):
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Unsupported import mode: {mode}")
+
+        self.unique_fields = list(unique_fields or get_import_natural_keys(self.model._meta.label))
+        if mode == 'upsert':
+            self._check_unique_fields()
+
+        self._converters = self._compile_converters()
+        self._required_fields = self._compile_required_fields()
+        self._unique_checks = self._compile_unique_checks()
+
+    @classmethod
+    def resume(cls, import_log, file_obj=None, batch_size=100):
         """
-        Import data from file
+        Continue an interrupted import from its last committed batch
 
         Args:
-            validate_only: If True, only validate without importing
+            import_log: DataImportLog of the interrupted import
+            file_obj: Source file; defaults to the log's source_file path
             batch_size: Number of records to process per batch
 
         Returns:
             dict with import results
         """
-        # Read data based on format
-        if self.file_format == 'csv':
-            data = self._read_csv()
-        elif self.file_format in ['xlsx', 'xls']:
-            data = self._read_excel()
-        elif self.file_format == 'json':
-            data = self._read_json()
-        else:
-            raise ValueError(f"Unsupported format: {self.file_format}")
-
-        # Process data
-        results = self._process_data(data, validate_only, batch_size)
-
-        # Create import log
-        from .models import DataImportLog
-        DataImportLog.objects.create(
-            model_name=self.model_name,
-            file_format=self.file_format,
-            total_records=len(data),
-            imported_records=self.imported_count,
-            skipped_records=self.skipped_count,
-            errors=self.errors,
-            field_mapping=self.field_mapping,
-            validate_only=validate_only,
-            imported_by=self.user,
-            status='completed' if not self.errors else 'completed_with_errors'
+        importer = cls(
+            import_log.model_name,
+            file_obj if file_obj is not None else import_log.source_file,
+            import_log.file_format,
+            field_mapping=import_log.field_mapping,
+            user=import_log.imported_by,
+            mode=import_log.mode,
+            unique_fields=import_log.unique_fields
+        )
+        return importer.import_data(
+            validate_only=import_log.validate_only,
+            batch_size=batch_size,
+            import_log=import_log
         )
 
-        return results
+    def import_data(self, validate_only=False, batch_size=100, import_log=None, workers=None):
+        """
+        Import data from file
 
-    def _read_csv(self):
-        """Read CSV file"""
-        if isinstance(self.file_obj, bytes):
-            content = self.file_obj.decode('utf-8')
-            reader = csv.DictReader(StringIO(content))
-        else:
-            reader = csv.DictReader(self.file_obj)
+        Rows are streamed from the file and written batch by batch; each
+        batch commits together with its checkpoint on the DataImportLog.
 
-        return list(reader)
+        Args:
+            validate_only: If True, only validate without importing
+            batch_size: Number of records to process per batch
+            import_log: DataImportLog to resume; rows it already covers are skipped
+            workers: Validation worker processes (defaults to IMPORT_VALIDATION_WORKERS)
 
-    def _read_excel(self):
-        """Read Excel file"""
-        if isinstance(self.file_obj, bytes):
-            wb = openpyxl.load_workbook(BytesIO(self.file_obj))
-        else:
-            wb = openpyxl.load_workbook(self.file_obj)
+        Returns:
+            dict with import results
+        """
+        if self.file_format not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format: {self.file_format}")
 
-        ws = wb.active
-        data = []
+        import_log = self._start_log(import_log, validate_only)
+        rows = islice(self._iter_rows(), import_log.processed_records, None)
 
-        # Get headers from first row
-        headers = [cell.value for cell in ws[1]]
+        try:
+            for batch, batch_errors in self._validated_batches(rows, batch_size, workers):
+                if self.mode == 'insert':
+                    self._check_unique(batch, batch_errors)
+                records = []
+                for (row_number, mapped), errors in zip(batch, batch_errors, strict=True):
+                    if errors:
+                        self._add_error(row_number, errors)
+                        self.skipped_count += 1
+                    elif not validate_only:
+                        records.append(self.model(**mapped))
+                self._commit_batch(records, len(batch), import_log)
+        except Exception as e:
+            import_log.status = 'failed'
+            import_log.save(update_fields=['status', 'updated_at'])
+            logger.error(f"Import {import_log.pk} failed after {self.processed_count} rows: {str(e)}")
+            raise
 
-        # Read data rows
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            data.append(dict(zip(headers, row, strict=False)))
+        import_log.total_records = self.processed_count
+        import_log.status = 'completed' if not self.errors else 'completed_with_errors'
+        import_log.completed_at = timezone.now()
+        import_log.save(update_fields=['total_records', 'status', 'completed_at', 'updated_at'])
 
-        return data
+        return {
+            'imported': self.imported_count,
+            'skipped': self.skipped_count,
+            'duplicates': self.duplicate_count,
+            'errors': self.errors,
+            'total': self.processed_count,
+            'import_log_id': str(import_log.pk)
+        }
 
-    def _read_json(self):
-        """Read JSON file"""
-        if isinstance(self.file_obj, bytes):
-            content = self.file_obj.decode('utf-8')
-            return json.loads(content)
-        else:
-            return json.load(self.file_obj)
+    def _start_log(self, import_log, validate_only):
+        """Create the import log, or restore progress from the one being resumed"""
+        from .models import DataImportLog
 
-    def _process_data(self, data, validate_only, batch_size):
-        """Process and import data"""
-        records_to_create = []
+        if import_log is None:
+            self.import_log = DataImportLog.objects.create(
+                model_name=self.model_name,
+                file_format=self.file_format,
+                field_mapping=self.field_mapping,
+                validate_only=validate_only,
+                mode=self.mode,
+                unique_fields=self.unique_fields if self.mode == 'upsert' else [],
+                source_file=self.file_obj if isinstance(self.file_obj, str) else '',
+                imported_by=self.user,
+                status='processing'
+            )
+            return self.import_log
+
+        self.imported_count = import_log.imported_records
+        self.skipped_count = import_log.skipped_records
+        self.processed_count = import_log.processed_records
+        self.errors = list(import_log.errors)
+        import_log.status = 'processing'
+        import_log.save(update_fields=['status', 'updated_at'])
+        self.import_log = import_log
+        return import_log
+
+    def _iter_rows(self):
+        """Stream (row number, row dict) pairs from the file"""
+        if self.file_format == 'csv':
+            return self._iter_csv()
+        elif self.file_format in ['xlsx', 'xls']:
+            return self._iter_excel()
+        return self._iter_json()
 
-        for idx, row in enumerate(data):
-            try:
-                # Map fields
-                mapped_data = self._map_fields(row)
-
-                # Validate data
-                validation_errors = self._validate_record(mapped_data)
-                if validation_errors:
-                    self.errors.append({
-                        'row': idx + 2,  # +2 for header and 0-index
-                        'errors': validation_errors
-                    })
-                    self.skipped_count += 1
-                    continue
+    def _open_text(self):
+        if isinstance(self.file_obj, bytes):
+            return io.TextIOWrapper(BytesIO(self.file_obj), encoding='utf-8', newline='')
+        if isinstance(self.file_obj, str):
+            return open(self.file_obj, encoding='utf-8', newline='')
+        return self.file_obj
+
+    def _iter_csv(self):
+        """Stream CSV rows"""
+        handle = self._open_text()
+        try:
+            for idx, row in enumerate(csv.DictReader(handle)):
+                yield idx + 2, row  # +2 for header and 0-index
+        finally:
+            if handle is not self.file_obj:
+                handle.close()
 
-                if not validate_only:
-                    records_to_create.append(self.model(**mapped_data))
+    def _iter_excel(self):
+        """Stream Excel rows from a read-only workbook"""
+        source = BytesIO(self.file_obj) if isinstance(self.file_obj, bytes) else self.file_obj
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
 
-                # Batch create
-                if len(records_to_create) >= batch_size:
-                    self._bulk_create(records_to_create)
-                    records_to_create = []
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = next(rows, None) or []
+            for idx, row in enumerate(rows):
+                yield idx + 2, dict(zip(headers, row, strict=False))
+        finally:
+            wb.close()
+
+    def _iter_json(self):
+        """
+        Stream JSON rows
 
-            except Exception as e:
-                self.errors.append({
-                    'row': idx + 2,
-                    'errors': [str(e)]
-                })
-                self.skipped_count += 1
+        JSON lines are streamed one object per line; a JSON array has to be
+        parsed whole.
+        """
+        handle = self._open_text()
+        try:
+            first = handle.read(1)
+            while first and first.isspace():
+                first = handle.read(1)
+
+            if first == '[':
+                data = json.loads(first + handle.read())
+                for idx, row in enumerate(data):
+                    yield idx + 2, row
+                return
+
+            lines = (first + line if idx == 0 else line for idx, line in enumerate(handle))
+            for idx, line in enumerate(lines):
+                if line.strip():
+                    yield idx + 1, json.loads(line)
+        finally:
+            if handle is not self.file_obj:
+                handle.close()
+
+    def _compile_converters(self):
+        """Resolve each mapped column's model field and converter once"""
+        converters = []
 
-        # Create remaining records
-        if records_to_create and not validate_only:
-            self._bulk_create(records_to_create)
+        for file_field, model_field in self.field_mapping.items():
+            field = self.model._meta.get_field(model_field)
+            converter = FIELD_CONVERTERS.get(field.get_internal_type(), _to_str)
+            converters.append((file_field, model_field, converter))
+
+        return converters
+
+    def _check_unique_fields(self):
+        """Upserts need natural keys that every row maps"""
+        if not self.unique_fields:
+            raise ValueError(f"No natural keys configured for upserting {self.model_name}")
+
+        mapped_fields = set(self.field_mapping.values())
+        missing = [name for name in self.unique_fields if name not in mapped_fields]
+        if missing:
+            raise ValueError(f"Natural key fields not in field mapping: {', '.join(missing)}")
+
+    def _compile_required_fields(self):
+        return [
+            field.name for field in self.model._meta.fields
+            if not field.null and not field.blank and not field.has_default()
+        ]
+
+    def _compile_unique_checks(self):
+        """Unique fields set by the mapping, checked against existing records on insert"""
+        mapped_fields = set(self.field_mapping.values())
+        return [
+            field for field in self.model._meta.concrete_fields
+            if field.unique and field.name in mapped_fields
+        ]
+
+    def _check_unique(self, batch, batch_errors):
+        """
+        Report rows whose unique values already exist or repeat in the batch
 
-        return {
-            'imported': self.imported_count,
-            'skipped': self.skipped_count,
-            'errors': self.errors,
-            'total': len(data)
-        }
+        One query per unique field replaces full_clean's per-row lookups,
+        so the batch never fails on the database constraint. Upserts match
+        existing records on purpose and skip this check.
+        """
+        candidates = [
+            (mapped, errors) for (_, mapped), errors in zip(batch, batch_errors, strict=True)
+            if not errors
+        ]
+        manager = self.model._default_manager
+
+        for field in self._unique_checks:
+            values = {mapped[field.name] for mapped, _ in candidates if mapped.get(field.name) is not None}
+            if not values:
+                continue
+            taken = set(manager.filter(**{f'{field.name}__in': values}).values_list(field.name, flat=True))
+            message = field.error_messages['unique'] % {
+                'model_name': capfirst(self.model._meta.verbose_name),
+                'field_label': capfirst(field.verbose_name),
+            }
+
+            for mapped, errors in candidates:
+                value = mapped.get(field.name)
+                if value is None or errors:
+                    continue
+                if value in taken:
+                    errors.append(str({field.name: [message]}))
+                else:
+                    taken.add(value)
 
     def _map_fields(self, row):
         """Map file fields to model fields"""
         mapped = {}
 
-        for file_field, model_field in self.field_mapping.items():
+        for file_field, model_field, converter in self._converters:
             if file_field in row:
                 value = row[file_field]
                 # Clean and convert value
-                mapped[model_field] = self._convert_value(model_field, value)
+                mapped[model_field] = None if value is None or value == '' else converter(value)
 
         # Add default values
         if self.user and hasattr(self.model, 'created_by'):
@@ -189,56 +439,242 @@ class DataImporter:
 
         return mapped
 
-    def _convert_value(self, field_name, value):
-        """Convert value to appropriate type"""
-        if value is None or value == '':
-            return None
+    def _mapped_batches(self, rows, batch_size):
+        """
+        Group mapped rows into batches
 
-        # Get field type
-        field = self.model._meta.get_field(field_name)
+        Yields lists of (row number, mapped dict) pairs; rows that fail to
+        convert carry the conversion error instead of a dict.
+        """
+        batch = []
 
-        # Convert based on field type
-        if field.get_internal_type() == 'BooleanField':
-            return str(value).lower() in ['true', '1', 'yes', 'y']
-        elif field.get_internal_type() in ['IntegerField', 'BigIntegerField']:
-            return int(value)
-        elif field.get_internal_type() in ['FloatField', 'DecimalField']:
-            return float(value)
-        elif field.get_internal_type() in ['DateField', 'DateTimeField']:
-            return pd.to_datetime(value)
+        for row_number, row in rows:
+            try:
+                batch.append((row_number, self._map_fields(row)))
+            except Exception as e:
+                batch.append((row_number, e))
 
-        return str(value)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-    def _validate_record(self, data):
-        """Validate record data"""
-        errors = []
+        if batch:
+            yield batch
 
-        # Check required fields
-        for field in self.model._meta.fields:
-            if not field.null and not field.blank and field.name not in data:
-                if not field.has_default():
-                    errors.append(f"Required field '{field.name}' is missing")
+    def _validated_batches(self, rows, batch_size, workers=None):
+        """
+        Yield (batch, errors per row) pairs in file order
 
-        # Try to create instance to validate
-        try:
-            instance = self.model(**data)
-            instance.full_clean()
-        except Exception as e:
-            errors.append(str(e))
+        Validation runs in a process pool when more than one worker is
+        configured, no transaction is open and this process may have
+        children; otherwise in-process. Celery prefork workers are daemonic
+        and cannot start a pool.
+        """
+        if workers is None:
+            workers = getattr(settings, 'IMPORT_VALIDATION_WORKERS', 0)
+
+        exclude = ['created_by'] if self.user and hasattr(self.model, 'created_by') else []
+        validate_args = (self.model._meta.label, self._required_fields, exclude)
+        batches = self._mapped_batches(rows, batch_size)
+
+        if workers <= 1 or connection.in_atomic_block or multiprocessing.current_process().daemon:
+            for batch in batches:
+                yield batch, self._batch_errors(batch, validate_batch(*validate_args, self._valid_rows(batch)))
+            return
+
+        # Workers open their own connections; never share the parent's sockets
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append((batch, pool.submit(validate_batch, *validate_args, self._valid_rows(batch))))
+                # Bound the batches in flight so memory stays flat
+                if len(pending) >= workers * 2:
+                    done, future = pending.popleft()
+                    yield done, self._batch_errors(done, future.result())
+            while pending:
+                done, future = pending.popleft()
+                yield done, self._batch_errors(done, future.result())
+
+    @staticmethod
+    def _valid_rows(batch):
+        return [mapped for _, mapped in batch if not isinstance(mapped, Exception)]
+
+    @staticmethod
+    def _batch_errors(batch, validated):
+        validated = iter(validated)
+        return [
+            [str(mapped)] if isinstance(mapped, Exception) else next(validated)
+            for _, mapped in batch
+        ]
+
+    def _add_error(self, row_number, errors):
+        if len(self.errors) < MAX_LOGGED_IMPORT_ERRORS:
+            self.errors.append({
+                'row': row_number,
+                'errors': errors
+            })
 
-        return errors
+    @transaction.atomic
+    def _commit_batch(self, records, row_count, import_log):
+        """Write a batch and advance the checkpoint in the same transaction"""
+        if records:
+            self._bulk_create(records)
+            self._index_records(records)
+        self.processed_count += row_count
+
+        import_log.processed_records = self.processed_count
+        import_log.imported_records = self.imported_count
+        import_log.skipped_records = self.skipped_count
+        import_log.errors = self.errors
+        import_log.save(update_fields=[
+            'processed_records', 'imported_records', 'skipped_records', 'errors', 'updated_at'
+        ])
 
     @transaction.atomic
     def _bulk_create(self, records):
-        """Bulk create records"""
+        """Bulk create records, or upsert them on their natural keys"""
         try:
-            self.model.objects.bulk_create(records, ignore_conflicts=False)
-            self.imported_count += len(records)
+            if self.mode == 'upsert':
+                self._bulk_upsert(records)
+            else:
+                self.model.objects.bulk_create(records, ignore_conflicts=False)
+                self.imported_count += len(records)
             logger.info(f"Imported {len(records)} {self.model_name} records")
         except Exception as e:
             logger.error(f"Error bulk creating records: {str(e)}")
             raise
 
+    def _index_records(self, records):
+        """bulk_create skips post_save, so index the written records directly"""
+        from .search import index_records
+
+        pks = [record.pk for record in records if record.pk is not None]
+        # Conflict upserts don't always return primary keys; match them on natural keys
+        unmatched = [
+            record for record in records
+            if record.pk is None and self.mode == 'upsert' and None not in self._natural_key(record)
+        ]
+        if unmatched:
+            pks.extend(self.model.objects.filter(self._natural_key_condition(unmatched)).values_list('pk', flat=True))
+        index_records(self.model._meta.label, pks)
+
+    def _natural_key(self, record):
+        return tuple(getattr(record, name) for name in self.unique_fields)
+
+    def _dedupe(self, records):
+        """Collapse records sharing a natural key, keeping the last one in the file"""
+        index = {}
+        unkeyed = []
+
+        for record in records:
+            key = self._natural_key(record)
+            if None in key:
+                # Missing keys never match, so these rows are always inserted
+                unkeyed.append(record)
+            else:
+                index[key] = record
+
+        return list(index.values()), unkeyed
+
+    def _update_fields(self):
+        """Fields overwritten on existing records; keys and ownership are kept"""
+        fields = set(self.field_mapping.values()) - set(self.unique_fields)
+        fields.update(
+            field.name for field in self.model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        )
+        return sorted(fields)
+
+    def _supports_conflict_upsert(self):
+        """Whether the database can upsert in one INSERT ... ON CONFLICT statement"""
+        db = router.db_for_write(self.model)
+        if not connections[db].features.supports_update_conflicts_with_target:
+            return False
+
+        keys = set(self.unique_fields)
+        if len(keys) == 1 and self.model._meta.get_field(self.unique_fields[0]).unique:
+            return True
+
+        meta = self.model._meta
+        unique_sets = [set(fields) for fields in meta.unique_together]
+        unique_sets.extend(
+            set(constraint.fields) for constraint in meta.total_unique_constraints
+        )
+        return keys in unique_sets
+
+    def _bulk_upsert(self, records):
+        """Upsert a batch keyed on the natural keys"""
+        keyed, unkeyed = self._dedupe(records)
+        duplicates = len(records) - len(keyed) - len(unkeyed)
+        update_fields = self._update_fields()
+
+        if self._supports_conflict_upsert():
+            if update_fields:
+                self.model.objects.bulk_create(
+                    keyed,
+                    update_conflicts=True,
+                    unique_fields=self.unique_fields,
+                    update_fields=update_fields
+                )
+            else:
+                # Only keys were mapped, so existing records have nothing to update
+                self.model.objects.bulk_create(keyed, ignore_conflicts=True)
+        else:
+            self._upsert_by_lookup(keyed, update_fields)
+
+        if unkeyed:
+            self.model.objects.bulk_create(unkeyed)
+
+        self.imported_count += len(keyed) + len(unkeyed)
+        self.skipped_count += duplicates
+        self.duplicate_count += duplicates
+
+    def _natural_key_condition(self, records):
+        """Q matching the records' natural keys"""
+        if len(self.unique_fields) == 1:
+            name = self.unique_fields[0]
+            return Q(**{f'{name}__in': [getattr(record, name) for record in records]})
+        return reduce(or_, (
+            Q(**dict(zip(self.unique_fields, self._natural_key(record), strict=True)))
+            for record in records
+        ))
+
+    def _upsert_by_lookup(self, records, update_fields):
+        """Match existing records with one query per batch, then bulk update and create"""
+        if not records:
+            return
+
+        existing = {
+            tuple(row[1:]): row[0]
+            for row in self.model.objects.filter(
+                self._natural_key_condition(records)
+            ).values_list('pk', *self.unique_fields)
+        }
+
+        now = timezone.now()
+        auto_now_fields = [
+            field.attname for field in self.model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+        to_update = []
+        to_create = []
+
+        for record in records:
+            pk = existing.get(self._natural_key(record))
+            if pk is None:
+                to_create.append(record)
+                continue
+            record.pk = pk
+            for attname in auto_now_fields:
+                setattr(record, attname, now)
+            to_update.append(record)
+
+        if to_update and update_fields:
+            self.model.objects.bulk_update(to_update, update_fields)
+        if to_create:
+            self.model.objects.bulk_create(to_create)
+
 
 class DataExporter:
     """Handle data export to various formats"""
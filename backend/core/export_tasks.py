@@ -3,10 +3,8 @@ Export Celery Tasks
 Async tasks for processing data exports
 """
 
-import csv
-import io
 import logging
-import zipfile
+import tempfile
 from datetime import timedelta
 
 from celery import shared_task
@@ -19,12 +17,69 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+class ExportProgress:
+    """
+    Tracks rows written for an export job
+
+    Progress runs from 5 to 95 as rows are written and is saved only when
+    the whole percentage changes.
+    """
+
+    START = 5
+    END = 95
+
+    def __init__(self, job, total_rows):
+        self.job = job
+        self.total_rows = total_rows
+        self.rows = 0
+        self.percent = self.START
+        self._save(self.START)
+
+    def __call__(self, rows=1):
+        self.rows += rows
+        if not self.total_rows:
+            return
+        done = min(self.rows, self.total_rows) / self.total_rows
+        percent = self.START + int((self.END - self.START) * done)
+        if percent != self.percent:
+            self._save(percent)
+
+    def _save(self, percent):
+        from .settings_models import ExportJob
+
+        self.percent = percent
+        self.job.progress = percent
+        ExportJob.objects.filter(id=self.job.id).update(progress=percent)
+
+
+def export_format(job):
+    """Output writer name and file extension for a job"""
+    if job.format == 'json':
+        return 'json', 'json'
+    if job.format == 'xlsx':
+        try:
+            import openpyxl  # noqa: F401
+            return 'xlsx', 'xlsx'
+        except ImportError:
+            logger.warning("openpyxl not installed, falling back to CSV in ZIP")
+            return 'zip', 'zip'
+    # CSV / ZIP
+    if len(job.entities) > 1:
+        return 'zip', 'zip'
+    return 'csv', 'csv'
+
+
 @shared_task(bind=True, max_retries=3)
 def process_export_job(self, job_id):
     """
     Process an export job asynchronously
+    Rows are streamed from the database into a spooled temporary file,
+    so memory stays flat regardless of export size
     """
-    from .export_views import DataExportService
+    from django.conf import settings
+    from django.core.files import File
+
+    from .export_views import EXPORT_SPOOL_MAX_SIZE, DataExportService
     from .settings_models import ExportJob
 
     try:
@@ -41,52 +96,27 @@ def process_export_job(self, job_id):
 
         # Initialize export service
         service = DataExportService(user, config)
+        progress = ExportProgress(job, service.count_rows())
 
-        # Update progress: Starting
-        job.progress = 10
-        job.save(update_fields=['progress'])
-
-        # Export all requested entities
-        data = service.export_all()
-
-        # Update progress: Data extracted
-        job.progress = 50
-        job.save(update_fields=['progress'])
-
-        # Generate output file
-        if job.format == 'json':
-            output_content = service.to_json(data)
-            extension = 'json'
-        elif job.format == 'xlsx':
-            output_content = generate_excel_export(data)
-            extension = 'xlsx'
-        else:  # CSV / ZIP
-            if len(job.entities) > 1:
-                output_content = service.to_zip(data)
-                extension = 'zip'
-            else:
-                output_content = service.to_csv(data)
-                extension = 'csv'
-
-        # Update progress: File generated
-        job.progress = 80
-        job.save(update_fields=['progress'])
-
-        # Save file to storage
-        filename = f"exports/{user.id}/{job.id}.{extension}"
-
-        if isinstance(output_content, bytes):
-            file_content = io.BytesIO(output_content)
-        else:
-            file_content = io.BytesIO(output_content.encode('utf-8'))
-
-        file_path = default_storage.save(filename, file_content)
-        file_size = file_content.getbuffer().nbytes
+        writer_name, extension = export_format(job)
+        writer = getattr(service, f'write_{writer_name}')
+        spool_size = getattr(settings, 'EXPORT_SPOOL_MAX_SIZE', EXPORT_SPOOL_MAX_SIZE)
+
+        with tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+b') as output:
+            # Generate output file
+            writer(output, progress=progress)
+
+            file_size = output.tell()
+            output.seek(0)
+
+            # Save file to storage
+            filename = f"exports/{user.id}/{job.id}.{extension}"
+            file_path = default_storage.save(filename, File(output, name=filename))
 
         # Mark job as completed
         job.mark_completed(file_path, file_size)
 
-        logger.info(f"Export job {job_id} completed successfully")
+        logger.info(f"Export job {job_id} completed successfully: {progress.rows} rows")
         return {'status': 'success', 'file_path': file_path, 'file_size': file_size}
 
     except ExportJob.DoesNotExist:
@@ -106,68 +136,6 @@ def process_export_job(self, job_id):
         self.retry(countdown=60 * (2 ** self.request.retries), exc=e)
 
 
-def generate_excel_export(data):
-    """
-    Generate Excel file from export data
-    Uses openpyxl if available, otherwise falls back to CSV in ZIP
-    """
-    try:
-        from openpyxl import Workbook
-        from openpyxl.utils import get_column_letter
-
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove default sheet
-
-        for entity_name, records in data.items():
-            if not records:
-                continue
-
-            ws = wb.create_sheet(title=entity_name.capitalize()[:31])  # Max 31 chars
-
-            # Write headers
-            headers = list(records[0].keys())
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=str(header))
-                cell.font = cell.font.copy(bold=True)
-
-            # Write data
-            for row_idx, record in enumerate(records, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    value = record.get(header, '')
-                    if hasattr(value, 'isoformat'):
-                        value = value.isoformat()
-                    ws.cell(row=row_idx, column=col_idx, value=str(value) if value else '')
-
-            # Auto-adjust column widths
-            for col in range(1, len(headers) + 1):
-                ws.column_dimensions[get_column_letter(col)].width = 15
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-
-    except ImportError:
-        logger.warning("openpyxl not installed, falling back to CSV in ZIP")
-
-        # Create a pseudo-service to use its methods
-        class MockService:
-            def to_zip(self, data):
-                output = io.BytesIO()
-                with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
-                    for entity_name, records in data.items():
-                        if records:
-                            csv_output = io.StringIO()
-                            writer = csv.DictWriter(csv_output, fieldnames=records[0].keys())
-                            writer.writeheader()
-                            writer.writerows(records)
-                            zf.writestr(f'{entity_name}.csv', csv_output.getvalue())
-                output.seek(0)
-                return output.getvalue()
-
-        return MockService().to_zip(data)
-
-
 @shared_task
 def cleanup_expired_exports():
     """
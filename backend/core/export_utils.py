@@ -13,14 +13,20 @@ import csv
 import io
 import json
 import logging
-from collections.abc import Callable
-from dataclasses import dataclass
+import tempfile
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from typing import Any
 
-from django.db.models import Model, QuerySet
-from django.http import HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import JSONField, Model, QuerySet
+from django.db.models.query import ModelIterable
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 
 logger = logging.getLogger(__name__)
@@ -35,9 +41,111 @@ class ExportColumn:
     width: int = 15
 
 
+EXPORT_CHUNK_SIZE = 2000
+# Rows written per chunk yielded by CSVExporter.export_streaming
+STREAM_BATCH_ROWS = 500
+# Rows per table in PDF exports; small tables keep layout linear
+PDF_TABLE_ROWS = 500
+# reportlab holds the whole document until it is saved, so PDF exports are
+# capped; override with the EXPORT_PDF_MAX_ROWS setting
+PDF_MAX_ROWS = 10000
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+
+def _format_value(value: Any, formatter: Callable[[Any], str] | None) -> str:
+    if formatter and value is not None:
+        return formatter(value)
+
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+
+    return str(value)
+
+
+def _walk(value: Any, parts: list[str]) -> Any:
+    """Follow attribute/key parts the way DataExporter.get_value does."""
+    for part in parts:
+        if value is None:
+            break
+        if hasattr(value, part):
+            value = getattr(value, part)
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = None
+    return value
+
+
+@dataclass
+class _ColumnPath:
+    """How a column path resolves against the exported model."""
+    value_path: str | None = None  # Path values_list can select, if any
+    key_parts: list[str] = field(default_factory=list)  # JSON keys read after it
+    relations: list[str] = field(default_factory=list)  # Forward relations to select_related
+    needs_object: bool = False  # Attributes only available on model instances
+    missing: bool = False  # Neither a field nor an attribute: always empty
+
+
+def _prefixes(parts: list[str]) -> list[str]:
+    return ['__'.join(parts[:i + 1]) for i in range(len(parts))]
+
+
+def _resolve_path(model: type[Model], path: str, annotations=()) -> _ColumnPath:
+    """Resolve a column's field path to a database projection where possible."""
+    parts = path.split('__')
+    if parts[0] in annotations:
+        return _ColumnPath(value_path=parts[0], key_parts=parts[1:])
+
+    current = model
+    walked = []
+
+    for index, part in enumerate(parts):
+        try:
+            model_field = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            if hasattr(current, part):
+                # Properties and methods need the instance
+                return _ColumnPath(relations=_prefixes(walked), needs_object=True)
+            return _ColumnPath(missing=True)
+
+        if model_field.many_to_many or model_field.one_to_many or (
+            model_field.is_relation and model_field.related_model is None
+        ):
+            # Managers and generic relations cannot be joined; read them per object
+            return _ColumnPath(relations=_prefixes(walked), needs_object=True)
+
+        walked.append(part)
+
+        if model_field.is_relation:
+            if index == len(parts) - 1:
+                # The related object itself is exported via str()
+                return _ColumnPath(relations=_prefixes(walked), needs_object=True)
+            current = model_field.related_model
+            continue
+
+        if isinstance(model_field, JSONField):
+            return _ColumnPath(value_path='__'.join(walked), key_parts=parts[index + 1:])
+
+        if index < len(parts) - 1:
+            # Attribute of a plain value (e.g. a date's year)
+            return _ColumnPath(needs_object=True, relations=_prefixes(walked[:-1]))
+
+        return _ColumnPath(value_path=path)
+
+    return _ColumnPath(missing=True)
+
+
 class DataExporter:
     """
     Base class for data export functionality.
+
+    The queryset is projected to the exported columns: plain field paths are
+    read with values_list, and forward relations are fetched with
+    select_related when a column needs model instances.
     """
 
     def __init__(
@@ -50,44 +158,96 @@ class DataExporter:
         self.columns = columns
         self.filename = filename
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._plan = None
 
     def get_value(self, obj: Model, column: ExportColumn) -> str:
         """Extract and format a value from an object."""
-        value = obj
-        for part in column.field.split('__'):
-            if value is None:
-                break
-            if hasattr(value, part):
-                value = getattr(value, part)
-            elif isinstance(value, dict):
-                value = value.get(part)
+        return _format_value(_walk(obj, column.field.split('__')), column.formatter)
+
+    def _compile(self) -> tuple[QuerySet, list[Callable[[Any], str]]]:
+        """Build the projected queryset and one accessor per column."""
+        if self._plan is not None:
+            return self._plan
+
+        queryset = self.queryset
+        if queryset._iterable_class is not ModelIterable:
+            # values()/values_list() querysets are read as given
+            accessors = [self._generic_accessor(col) for col in self.columns]
+            self._plan = (queryset, accessors)
+            return self._plan
+
+        annotations = set(queryset.query.annotations)
+        paths = [_resolve_path(queryset.model, col.field, annotations) for col in self.columns]
+
+        if any(path.needs_object and not path.missing for path in paths):
+            relations = sorted({rel for path in paths for rel in path.relations})
+            if relations:
+                queryset = queryset.select_related(*relations)
+            accessors = [
+                self._empty_accessor(col) if path.missing else self._generic_accessor(col)
+                for col, path in zip(self.columns, paths, strict=True)
+            ]
+            self._plan = (queryset, accessors)
+            return self._plan
+
+        value_paths = list(dict.fromkeys(path.value_path for path in paths if path.value_path))
+        if not value_paths:
+            value_paths = ['pk']
+        queryset = queryset.values_list(*value_paths)
+        positions = {value_path: index for index, value_path in enumerate(value_paths)}
+
+        accessors = []
+        for col, path in zip(self.columns, paths, strict=True):
+            if path.value_path is None:
+                accessors.append(self._empty_accessor(col))
             else:
-                value = None
-
-        if column.formatter and value is not None:
-            return column.formatter(value)
-
-        if value is None:
-            return ''
-        if isinstance(value, bool):
-            return 'Yes' if value else 'No'
-        if isinstance(value, datetime):
-            return value.strftime('%Y-%m-%d %H:%M:%S')
-
-        return str(value)
+                accessors.append(self._tuple_accessor(col, positions[path.value_path], path.key_parts))
+
+        self._plan = (queryset, accessors)
+        return self._plan
+
+    @staticmethod
+    def _generic_accessor(column: ExportColumn) -> Callable[[Any], str]:
+        parts = column.field.split('__')
+        formatter = column.formatter
+        return lambda obj: _format_value(_walk(obj, parts), formatter)
+
+    @staticmethod
+    def _empty_accessor(column: ExportColumn) -> Callable[[Any], str]:
+        value = _format_value(None, column.formatter)
+        return lambda row: value
+
+    @staticmethod
+    def _tuple_accessor(column: ExportColumn, position: int, key_parts: list[str]) -> Callable[[Any], str]:
+        formatter = column.formatter
+        if key_parts:
+            return lambda row: _format_value(_walk(row[position], key_parts), formatter)
+        return lambda row: _format_value(row[position], formatter)
+
+    def iter_rows(self, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[str]]:
+        """Stream formatted rows from the projected queryset."""
+        queryset, accessors = self._compile()
+        for item in queryset.iterator(chunk_size=chunk_size):
+            yield [accessor(item) for accessor in accessors]
 
     def get_rows(self) -> list[list[str]]:
         """Generate rows of data."""
-        rows = []
-        for obj in self.queryset:
-            row = [self.get_value(obj, col) for col in self.columns]
-            rows.append(row)
-        return rows
+        return list(self.iter_rows())
 
     def get_headers(self) -> list[str]:
         """Get column headers."""
         return [col.header for col in self.columns]
 
+    def spooled_response(self, output, content_type: str, extension: str) -> FileResponse:
+        """Stream a spooled output file back as an attachment."""
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"{self.filename}_{self.timestamp}.{extension}",
+            content_type=content_type
+        )
+
 
 class CSVExporter(DataExporter):
     """Export data to CSV format."""
@@ -99,9 +259,7 @@ class CSVExporter(DataExporter):
 
         writer = csv.writer(response)
         writer.writerow(self.get_headers())
-
-        for row in self.get_rows():
-            writer.writerow(row)
+        writer.writerows(self.iter_rows())
 
         return response
 
@@ -113,19 +271,17 @@ class CSVExporter(DataExporter):
 
             # Write headers
             writer.writerow(self.get_headers())
-            buffer.seek(0)
-            yield buffer.read()
-            buffer.truncate(0)
-            buffer.seek(0)
-
-            # Write rows
-            for obj in self.queryset.iterator():
-                row = [self.get_value(obj, col) for col in self.columns]
-                writer.writerow(row)
+
+            # Write rows in batches
+            rows = self.iter_rows()
+            while True:
+                batch = list(islice(rows, STREAM_BATCH_ROWS))
+                writer.writerows(batch)
+                yield buffer.getvalue()
                 buffer.seek(0)
-                yield buffer.read()
                 buffer.truncate(0)
-                buffer.seek(0)
+                if len(batch) < STREAM_BATCH_ROWS:
+                    break
 
         response = StreamingHttpResponse(generate(), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="{self.filename}_{self.timestamp}.csv"'
@@ -137,13 +293,8 @@ class JSONExporter(DataExporter):
 
     def export(self) -> HttpResponse:
         """Generate JSON response."""
-        data = []
-
-        for obj in self.queryset:
-            item = {}
-            for col in self.columns:
-                item[col.field] = self.get_value(obj, col)
-            data.append(item)
+        fields = [col.field for col in self.columns]
+        data = [dict(zip(fields, row, strict=True)) for row in self.iter_rows()]
 
         response = HttpResponse(
             json.dumps(data, indent=2, ensure_ascii=False),
@@ -160,53 +311,71 @@ class ExcelExporter(DataExporter):
         """Generate Excel response."""
         try:
             import openpyxl
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Alignment, Font, PatternFill
         except ImportError:
             logger.error("openpyxl not installed, falling back to CSV")
             return CSVExporter(self.queryset, self.columns, self.filename).export()
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = self.filename[:31]  # Excel sheet name limit
+        # Write-only mode streams rows to disk instead of holding every cell
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(title=self.filename[:31])  # Excel sheet name limit
 
         # Header styling
         header_font = Font(bold=True, color='FFFFFF')
         header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
 
-        # Write headers
+        # Column widths and frozen header must be set before rows are written
         for col_idx, col in enumerate(self.columns, 1):
-            cell = ws.cell(row=1, column=col_idx, value=col.header)
+            ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = col.width
+        ws.freeze_panes = 'A2'
+
+        # Write headers
+        headers = []
+        for col in self.columns:
+            cell = WriteOnlyCell(ws, value=col.header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = Alignment(horizontal='center')
-            ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = col.width
+            headers.append(cell)
+        ws.append(headers)
 
         # Write data
-        for row_idx, row_data in enumerate(self.get_rows(), 2):
-            for col_idx, value in enumerate(row_data, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-
-        # Freeze header row
-        ws.freeze_panes = 'A2'
+        for row_data in self.iter_rows():
+            ws.append(row_data)
 
-        # Create response
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # The response closes the file once it has been sent
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa: SIM115
+        try:
+            wb.save(output)
+        except Exception:
+            output.close()
+            raise
+
+        return self.spooled_response(
+            output,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'xlsx'
         )
-        response['Content-Disposition'] = f'attachment; filename="{self.filename}_{self.timestamp}.xlsx"'
-        return response
 
 
 class PDFExporter(DataExporter):
-    """Export data to PDF format."""
+    """
+    Export data to PDF format.
+
+    Unlike CSV and Excel, PDF output is not streamed: reportlab lays out
+    and keeps every page until the document is saved. Exports over
+    EXPORT_PDF_MAX_ROWS rows are rejected instead.
+    """
 
     def export(self) -> HttpResponse:
         """Generate PDF response."""
+        max_rows = getattr(settings, 'EXPORT_PDF_MAX_ROWS', PDF_MAX_ROWS)
+        if self.queryset[:max_rows + 1].count() > max_rows:
+            raise ValidationError(
+                f"PDF exports are limited to {max_rows} rows; export as CSV or Excel instead"
+            )
+
         try:
             from reportlab.lib import colors
             from reportlab.lib.pagesizes import landscape, letter
@@ -216,43 +385,53 @@ class PDFExporter(DataExporter):
             logger.error("reportlab not installed, falling back to CSV")
             return CSVExporter(self.queryset, self.columns, self.filename).export()
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(letter))
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Title
-        title = Paragraph(f"<b>{self.filename}</b>", styles['Title'])
-        elements.append(title)
-
-        # Table data
-        data = [self.get_headers()] + self.get_rows()
-
-        # Create table
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F0F4F8')),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#CCCCCC')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0F4F8')]),
-        ]))
-        elements.append(table)
-
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{self.filename}_{self.timestamp}.pdf"'
-        return response
+        # The response closes the file once it has been sent
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa: SIM115
+        try:
+            doc = SimpleDocTemplate(output, pagesize=landscape(letter))
+            elements = []
+            styles = getSampleStyleSheet()
+
+            # Title
+            title = Paragraph(f"<b>{self.filename}</b>", styles['Title'])
+            elements.append(title)
+
+            table_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F0F4F8')),
+                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#CCCCCC')),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0F4F8')]),
+            ])
+
+            # One table per batch of rows, each repeating the header, so layout
+            # cost grows linearly instead of re-splitting one huge table per page
+            headers = self.get_headers()
+            rows = self.iter_rows()
+            while True:
+                batch = list(islice(rows, PDF_TABLE_ROWS))
+                if not batch and len(elements) > 1:
+                    break
+                table = Table([headers] + batch, repeatRows=1)
+                table.setStyle(table_style)
+                elements.append(table)
+                if len(batch) < PDF_TABLE_ROWS:
+                    break
+
+            # Build PDF
+            doc.build(elements)
+        except Exception:
+            output.close()
+            raise
+
+        return self.spooled_response(output, 'application/pdf', 'pdf')
 
 
 # Pre-configured exports for common models
@@ -5,11 +5,15 @@ Handles export of CRM data in various formats
 
 import csv
 import io
+import itertools
 import json
 import logging
+import shutil
+import tempfile
 import zipfile
 from datetime import timedelta
 
+from django.conf import settings
 from django.db.models import Q
 from django.http import HttpResponse
 from django.utils import timezone
@@ -20,6 +24,9 @@ from rest_framework.response import Response
 
 logger = logging.getLogger(__name__)
 
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SPOOL_MAX_SIZE = 10 * 1024 * 1024  # Spill to disk past 10 MB
+
 
 class ExportJobViewSet(viewsets.ViewSet):
     """
@@ -223,112 +230,157 @@ class DataExportService:
         else:
             return Q()  # No filter
 
-    def export_contacts(self):
-        """Export contacts"""
-        try:
-            from contact_management.models import Contact
+    def contacts_queryset(self):
+        """Contact rows to export"""
+        from contact_management.models import Contact
 
-            queryset = Contact.objects.filter(
-                Q(owner=self.user) | Q(organization__owner=self.user)
-            ).filter(self.date_filter)
+        queryset = Contact.objects.filter(
+            Q(owner=self.user) | Q(organization__owner=self.user)
+        ).filter(self.date_filter)
 
-            if not self.config.get('include_archived'):
-                queryset = queryset.filter(is_archived=False)
+        if not self.config.get('include_archived'):
+            queryset = queryset.filter(is_archived=False)
 
-            if not self.config.get('include_deleted'):
-                queryset = queryset.filter(is_deleted=False)
+        if not self.config.get('include_deleted'):
+            queryset = queryset.filter(is_deleted=False)
 
-            return list(queryset.values(
-                'id', 'first_name', 'last_name', 'email', 'phone',
-                'job_title', 'organization__name', 'created_at', 'updated_at'
-            ))
-        except ImportError:
-            return []
+        return queryset.values(
+            'id', 'first_name', 'last_name', 'email', 'phone',
+            'job_title', 'organization__name', 'created_at', 'updated_at'
+        )
 
-    def export_companies(self):
-        """Export companies/organizations"""
-        try:
-            from contact_management.models import Organization
+    def companies_queryset(self):
+        """Company/organization rows to export"""
+        from contact_management.models import Organization
 
-            queryset = Organization.objects.filter(
-                owner=self.user
-            ).filter(self.date_filter)
+        queryset = Organization.objects.filter(
+            owner=self.user
+        ).filter(self.date_filter)
 
-            return list(queryset.values(
-                'id', 'name', 'website', 'industry', 'size',
-                'address', 'created_at', 'updated_at'
-            ))
-        except ImportError:
-            return []
+        return queryset.values(
+            'id', 'name', 'website', 'industry', 'size',
+            'address', 'created_at', 'updated_at'
+        )
 
-    def export_deals(self):
-        """Export deals/opportunities"""
-        try:
-            from opportunity_management.models import Opportunity
+    def deals_queryset(self):
+        """Deal/opportunity rows to export"""
+        from opportunity_management.models import Opportunity
 
-            queryset = Opportunity.objects.filter(
-                Q(owner=self.user) | Q(assigned_to=self.user)
-            ).filter(self.date_filter)
+        queryset = Opportunity.objects.filter(
+            Q(owner=self.user) | Q(assigned_to=self.user)
+        ).filter(self.date_filter)
 
-            return list(queryset.values(
-                'id', 'name', 'amount', 'stage', 'status',
-                'probability', 'expected_close', 'organization__name',
-                'created_at', 'updated_at', 'closed_at'
-            ))
-        except ImportError:
-            return []
+        return queryset.values(
+            'id', 'name', 'amount', 'stage', 'status',
+            'probability', 'expected_close', 'organization__name',
+            'created_at', 'updated_at', 'closed_at'
+        )
 
-    def export_tasks(self):
-        """Export tasks"""
-        try:
-            from task_management.models import Task
+    def tasks_queryset(self):
+        """Task rows to export"""
+        from task_management.models import Task
+
+        queryset = Task.objects.filter(
+            assigned_to=self.user
+        ).filter(self.date_filter)
+
+        return queryset.values(
+            'id', 'title', 'description', 'status', 'priority',
+            'due_date', 'completed_at', 'created_at', 'updated_at'
+        )
+
+    def activities_queryset(self):
+        """Activity rows to export"""
+        from activity_feed.models import Activity
+
+        queryset = Activity.objects.filter(
+            actor=self.user
+        ).filter(self.date_filter)
 
-            queryset = Task.objects.filter(
-                assigned_to=self.user
-            ).filter(self.date_filter)
+        return queryset.values(
+            'id', 'action', 'subject', 'subject_type',
+            'created_at'
+        )
+
+    def _entity_methods(self):
+        return {
+            'contacts': self.contacts_queryset,
+            'companies': self.companies_queryset,
+            'deals': self.deals_queryset,
+            'tasks': self.tasks_queryset,
+            'activities': self.activities_queryset,
+        }
 
-            return list(queryset.values(
-                'id', 'title', 'description', 'status', 'priority',
-                'due_date', 'completed_at', 'created_at', 'updated_at'
-            ))
+    def get_queryset(self, entity):
+        """Values queryset for an entity, or None when its app is not installed"""
+        try:
+            return self._entity_methods()[entity]()
         except ImportError:
-            return []
+            return None
+
+    def entity_querysets(self):
+        """(entity, values queryset or None) pairs for the requested entities"""
+        known = self._entity_methods()
+        for entity in self.config.get('entities', []):
+            if entity in known:
+                yield entity, self.get_queryset(entity)
+
+    def count_rows(self):
+        """Total rows across the requested entities"""
+        return sum(
+            queryset.count() for _, queryset in self.entity_querysets() if queryset is not None
+        )
+
+    def iter_rows(self, queryset, progress=None):
+        """
+        Stream rows of a values queryset in chunks
+
+        Args:
+            queryset: Values queryset from get_queryset
+            progress: Optional callable receiving the number of rows processed
+
+        Yields:
+            Row dicts
+        """
+        if queryset is None:
+            return
+        chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', EXPORT_CHUNK_SIZE)
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield row
+            if progress:
+                progress(1)
+
+    def export_contacts(self):
+        """Export contacts"""
+        return self._export_entity('contacts')
+
+    def export_companies(self):
+        """Export companies/organizations"""
+        return self._export_entity('companies')
+
+    def export_deals(self):
+        """Export deals/opportunities"""
+        return self._export_entity('deals')
+
+    def export_tasks(self):
+        """Export tasks"""
+        return self._export_entity('tasks')
 
     def export_activities(self):
         """Export activities"""
-        try:
-            from activity_feed.models import Activity
-
-            queryset = Activity.objects.filter(
-                actor=self.user
-            ).filter(self.date_filter)
+        return self._export_entity('activities')
 
-            return list(queryset.values(
-                'id', 'action', 'subject', 'subject_type',
-                'created_at'
-            ))
-        except ImportError:
-            return []
+    def _export_entity(self, entity):
+        queryset = self.get_queryset(entity)
+        return list(queryset) if queryset is not None else []
 
     def export_all(self):
         """Export all requested entities"""
-        entities = self.config.get('entities', [])
-        data = {}
-
-        entity_methods = {
-            'contacts': self.export_contacts,
-            'companies': self.export_companies,
-            'deals': self.export_deals,
-            'tasks': self.export_tasks,
-            'activities': self.export_activities,
+        return {
+            entity: list(queryset) if queryset is not None else []
+            for entity, queryset in self.entity_querysets()
         }
 
-        for entity in entities:
-            if entity in entity_methods:
-                data[entity] = entity_methods[entity]()
-
-        return data
-
     def to_csv(self, data):
         """Convert data to CSV format"""
         output = io.StringIO()
@@ -374,6 +426,120 @@ class DataExportService:
         output.seek(0)
         return output.getvalue()
 
+    def _non_empty_entities(self, progress=None):
+        """(entity, field names, row iterator) for entities with at least one row"""
+        for entity, queryset in self.entity_querysets():
+            rows = self.iter_rows(queryset, progress)
+            first = next(rows, None)
+            if first is None:
+                continue
+            yield entity, list(first.keys()), itertools.chain([first], rows)
+
+    def write_csv(self, output, progress=None):
+        """
+        Stream the to_csv layout into a binary file object
+
+        Args:
+            output: Writable binary file object
+            progress: Optional callable receiving the number of rows processed
+        """
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+        try:
+            for entity_name, fieldnames, rows in self._non_empty_entities(progress):
+                writer = csv.DictWriter(text, fieldnames=fieldnames)
+                text.write(f"# {entity_name.upper()}\n")
+                writer.writeheader()
+                writer.writerows(rows)
+                text.write("\n")
+        finally:
+            text.detach()
+
+    def write_json(self, output, progress=None):
+        """Stream the to_json document into a binary file object, one record per line"""
+        text = io.TextIOWrapper(output, encoding='utf-8', write_through=True)
+        try:
+            header = json.dumps({
+                'exported_at': timezone.now().isoformat(),
+                'exported_by': self.user.username,
+                'config': self.config,
+            }, default=str)
+            text.write(header[:-1] + ', "data": {')
+
+            for entity_index, (entity_name, queryset) in enumerate(self.entity_querysets()):
+                text.write(f'{", " if entity_index else ""}\n{json.dumps(entity_name)}: [')
+                for row_index, row in enumerate(self.iter_rows(queryset, progress)):
+                    text.write(f'{"," if row_index else ""}\n  {json.dumps(row, default=str)}')
+                text.write('\n]')
+
+            text.write('\n}}\n')
+        finally:
+            text.detach()
+
+    def write_zip(self, output, progress=None):
+        """
+        Stream the to_zip archive into a binary file object
+
+        Each entity's CSV is written straight into the archive; its JSON copy
+        is spooled to a temporary file during the same pass and appended after.
+        """
+        spool_size = getattr(settings, 'EXPORT_SPOOL_MAX_SIZE', EXPORT_SPOOL_MAX_SIZE)
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for entity_name, fieldnames, rows in self._non_empty_entities(progress):
+                with tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+b') as json_spool:
+                    json_text = io.TextIOWrapper(json_spool, encoding='utf-8', write_through=True)
+                    json_text.write('[')
+
+                    with zf.open(f'{entity_name}.csv', 'w', force_zip64=True) as csv_file:
+                        csv_text = io.TextIOWrapper(csv_file, encoding='utf-8', newline='', write_through=True)
+                        writer = csv.DictWriter(csv_text, fieldnames=fieldnames)
+                        writer.writeheader()
+                        for index, row in enumerate(rows):
+                            writer.writerow(row)
+                            json_text.write(f'{"," if index else ""}\n  {json.dumps(row, default=str)}')
+                        csv_text.detach()
+
+                    json_text.write('\n]\n')
+                    json_text.detach()
+                    json_spool.seek(0)
+                    with zf.open(f'{entity_name}.json', 'w', force_zip64=True) as json_file:
+                        shutil.copyfileobj(json_spool, json_file)
+
+    def write_xlsx(self, output, progress=None):
+        """Stream one worksheet per entity into a binary file object (openpyxl write-only mode)"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        wb = Workbook(write_only=True)
+        bold = Font(bold=True)
+
+        for entity_name, fieldnames, rows in self._non_empty_entities(progress):
+            ws = wb.create_sheet(title=entity_name.capitalize()[:31])  # Max 31 chars
+
+            # Column widths must be set before rows are written
+            for col in range(1, len(fieldnames) + 1):
+                ws.column_dimensions[get_column_letter(col)].width = 15
+
+            header = []
+            for name in fieldnames:
+                cell = WriteOnlyCell(ws, value=str(name))
+                cell.font = bold
+                header.append(cell)
+            ws.append(header)
+
+            for record in rows:
+                ws.append([_excel_value(record.get(name, '')) for name in fieldnames])
+
+        wb.save(output)
+
+
+def _excel_value(value):
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return str(value) if value else ''
+
 
 # URL patterns for this view (add to urls.py)
 """
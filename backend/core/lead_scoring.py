@@ -3,9 +3,15 @@ AI-Powered Lead Scoring Module
 Uses machine learning to score and prioritize leads
 """
 
+import json
 import logging
+import os
+import shutil
+import threading
+from datetime import datetime
 
 import numpy as np
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Avg, Count
 from django.utils import timezone
@@ -13,31 +19,70 @@ from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from .cache_utils import get_redis_client
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Rows pulled from the database and fed to predict_proba per batch
+SCORING_CHUNK_SIZE = 5000
+# Rows written back per bulk_update statement
+SCORE_UPDATE_BATCH_SIZE = 1000
+
+OPEN_LEAD_STATUSES = ['new', 'contacted', 'qualified']
+
 
 class LeadScoringEngine:
     """ML-based lead scoring"""
 
+    # Lead attributes read by _extract_features, with the default used when absent
+    FEATURE_ATTRIBUTES = {
+        'source': 'other',
+        'created_at': None,
+        'company_size': 0,
+        'estimated_value': 0,
+        'interaction_count': 0,
+        'email': None,
+        'phone': None,
+        'title': '',
+    }
+
+    FEATURE_NAMES = [
+        'source_score',
+        'age_days',
+        'company_size',
+        'estimated_value',
+        'engagement_count',
+        'has_email',
+        'has_phone',
+        'title_score',
+    ]
+    AGE_FEATURE_INDEX = FEATURE_NAMES.index('age_days')
+    # Bump whenever _compute_features changes so stale snapshots are rebuilt
+    FEATURE_VERSION = 1
+
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
-        self.feature_names = []
+        self.feature_names = list(self.FEATURE_NAMES)
         self.model_type = 'random_forest'  # or 'gradient_boosting'
 
-    def train_model(self, leads_queryset):
+    def train_model(self, leads_queryset, training_data=None):
         """
         Train lead scoring model
 
         Args:
             leads_queryset: QuerySet of leads with conversion data
+            training_data: Optional precomputed (X, y), e.g. from a LeadFeatureSnapshot
 
         Returns:
             Training metrics
         """
         # Extract features and labels
-        X, y = self._prepare_training_data(leads_queryset)
+        if training_data is None:
+            X, y = self._prepare_training_data(leads_queryset)
+        else:
+            X, y = training_data
 
         if len(X) < 10:
             raise ValueError("Not enough training data. Need at least 10 leads.")
@@ -139,25 +184,129 @@ class LeadScoringEngine:
 
         return results
 
-    def _prepare_training_data(self, queryset):
-        """Prepare training data from leads"""
-        X = []
-        y = []
+    def score_leads_batch(self, leads_queryset, chunk_size=SCORING_CHUNK_SIZE):
+        """
+        Score leads in bulk without loading model instances
 
-        for lead in queryset:
-            features = self._extract_features(lead)
-            X.append(features)
+        Only the columns used as features are fetched with values_list and
+        each chunk is scaled and passed to predict_proba as one matrix.
 
-            # Label: 1 if converted, 0 if not
-            is_converted = hasattr(lead, 'status') and lead.status == 'converted'
-            y.append(1 if is_converted else 0)
+        Args:
+            leads_queryset: QuerySet of leads to score
+            chunk_size: Number of leads per prediction batch
 
-        return np.array(X), np.array(y)
+        Yields:
+            Tuples of (lead_ids, scores) for each chunk
+        """
+        if not self.model:
+            raise ValueError("Model not trained. Train model first.")
+
+        for lead_ids, features, _ in self._iter_feature_chunks(leads_queryset, chunk_size=chunk_size):
+            yield lead_ids, self._predict_scores(features)
+
+    def extract_feature_matrix(self, leads_queryset, chunk_size=SCORING_CHUNK_SIZE):
+        """
+        Extract features for a queryset into a preallocated float32 matrix
+
+        Leads are streamed in chunks with values_list, so model instances
+        are never loaded.
+
+        Returns:
+            Tuple of (lead_ids, X, y, created_ts) where y is 1 for converted
+            leads and created_ts holds creation times as epoch seconds
+            (NaN when unknown)
+        """
+        total = leads_queryset.count()
+        lead_ids = np.empty(total, dtype=np.int64)
+        X = np.empty((total, len(self.FEATURE_NAMES)), dtype=np.float32)
+        y = np.empty(total, dtype=np.int8)
+        created_ts = np.empty(total, dtype=np.float64)
+
+        filled = 0
+        for ids, features, extras in self._iter_feature_chunks(
+            leads_queryset, extra_columns=['status'], chunk_size=chunk_size
+        ):
+            end = filled + len(ids)
+            if end > len(lead_ids):
+                # Rows inserted after the count; grow rather than drop them
+                grow = end - len(lead_ids)
+                lead_ids = np.concatenate([lead_ids, np.empty(grow, dtype=np.int64)])
+                X = np.concatenate([X, np.empty((grow, X.shape[1]), dtype=np.float32)])
+                y = np.concatenate([y, np.empty(grow, dtype=np.int8)])
+                created_ts = np.concatenate([created_ts, np.empty(grow, dtype=np.float64)])
+
+            lead_ids[filled:end] = ids
+            X[filled:end] = features
+            y[filled:end] = [1 if row.get('status') == 'converted' else 0 for row in extras]
+            created_ts[filled:end] = [
+                row['created_at'].timestamp() if row['created_at'] else np.nan
+                for row in extras
+            ]
+            filled = end
+
+        return lead_ids[:filled], X[:filled], y[:filled], created_ts[:filled]
+
+    def _iter_feature_chunks(self, leads_queryset, extra_columns=(), chunk_size=SCORING_CHUNK_SIZE):
+        """
+        Stream feature rows for a queryset in fixed-size chunks
+
+        Yields:
+            Tuples of (lead_ids, feature_rows, extras) where extras holds the
+            raw feature values plus any requested extra columns per row
+        """
+        model = leads_queryset.model
+        columns = self._feature_columns(model)
+        concrete = {field.attname for field in model._meta.concrete_fields}
+        extra_columns = [name for name in extra_columns if name in concrete and name not in columns]
+        rows = leads_queryset.order_by().values_list(
+            'pk', *columns, *extra_columns
+        ).iterator(chunk_size=chunk_size)
+        now = timezone.now()
+
+        lead_ids, features, extras = [], [], []
+        for row in rows:
+            values = dict(self.FEATURE_ATTRIBUTES)
+            values.update(zip(columns, row[1:len(columns) + 1], strict=True))
+            lead_ids.append(row[0])
+            features.append(self._compute_features(now=now, **values))
+            values.update(zip(extra_columns, row[len(columns) + 1:], strict=True))
+            extras.append(values)
+
+            if len(lead_ids) >= chunk_size:
+                yield lead_ids, features, extras
+                lead_ids, features, extras = [], [], []
+
+        if lead_ids:
+            yield lead_ids, features, extras
+
+    def _feature_columns(self, model):
+        """Feature attributes that are concrete columns on the lead model"""
+        concrete = {field.attname for field in model._meta.concrete_fields}
+        return [name for name in self.FEATURE_ATTRIBUTES if name in concrete]
+
+    def _predict_scores(self, features):
+        """Convert a batch of feature rows to 0-100 scores"""
+        features_scaled = self.scaler.transform(np.asarray(features, dtype=np.float64))
+        probabilities = self.model.predict_proba(features_scaled)[:, 1]
+        return (probabilities * 100).astype(int)
+
+    def _prepare_training_data(self, queryset):
+        """Prepare training data from leads"""
+        _, X, y, _ = self.extract_feature_matrix(queryset)
+        return X, y
 
     def _extract_features(self, lead):
         """Extract features from a lead"""
+        values = {
+            name: getattr(lead, name, default)
+            for name, default in self.FEATURE_ATTRIBUTES.items()
+        }
+        return self._compute_features(now=timezone.now(), **values)
+
+    def _compute_features(self, now, source, created_at, company_size, estimated_value,
+                          interaction_count, email, phone, title):
+        """Build the feature vector from raw lead values"""
         features = []
-        self.feature_names = []
 
         # Lead source quality (encoded)
         source_scores = {
@@ -168,45 +317,34 @@ class LeadScoringEngine:
             'event': 7,
             'other': 3
         }
-        source = getattr(lead, 'source', 'other')
         features.append(source_scores.get(source, 3))
-        self.feature_names.append('source_score')
 
         # Lead age (days since creation)
-        if hasattr(lead, 'created_at'):
-            age_days = (timezone.now() - lead.created_at).days
+        if created_at:
+            age_days = (now - created_at).days
             features.append(age_days)
         else:
             features.append(0)
-        self.feature_names.append('age_days')
 
         # Company size indicator
-        company_size = getattr(lead, 'company_size', 0)
         features.append(company_size if isinstance(company_size, int) else 0)
-        self.feature_names.append('company_size')
 
         # Estimated value
-        estimated_value = getattr(lead, 'estimated_value', 0)
         features.append(float(estimated_value) if estimated_value else 0)
-        self.feature_names.append('estimated_value')
 
         # Engagement score (interactions count)
-        engagement = getattr(lead, 'interaction_count', 0)
-        features.append(engagement)
-        self.feature_names.append('engagement_count')
+        features.append(interaction_count or 0)
 
         # Email provided
-        has_email = 1 if getattr(lead, 'email', None) else 0
+        has_email = 1 if email else 0
         features.append(has_email)
-        self.feature_names.append('has_email')
 
         # Phone provided
-        has_phone = 1 if getattr(lead, 'phone', None) else 0
+        has_phone = 1 if phone else 0
         features.append(has_phone)
-        self.feature_names.append('has_phone')
 
         # Title/position indicator
-        title = getattr(lead, 'title', '').lower()
+        title = (title or '').lower()
         title_score = 0
         if any(kw in title for kw in ['ceo', 'president', 'owner', 'founder']):
             title_score = 10
@@ -215,7 +353,6 @@ class LeadScoringEngine:
         elif any(kw in title for kw in ['lead', 'head']):
             title_score = 5
         features.append(title_score)
-        self.feature_names.append('title_score')
 
         return features
 
@@ -296,6 +433,132 @@ class LeadScoringEngine:
         logger.info(f"Model loaded from {filename}")
 
 
+class LeadFeatureSnapshot:
+    """
+    Versioned on-disk snapshot of lead scoring features
+
+    Feature rows are stored as .npy arrays and memory-mapped on load, so
+    a refresh only re-extracts leads updated since the previous snapshot.
+    """
+
+    ARRAYS = ('lead_ids', 'features', 'labels', 'created_ts')
+
+    def __init__(self, directory=None, chunk_size=SCORING_CHUNK_SIZE):
+        self.directory = str(directory or getattr(
+            settings, 'LEAD_SCORING_FEATURE_DIR',
+            os.path.join(settings.BASE_DIR, 'ml_models', 'lead_features')
+        ))
+        self.chunk_size = chunk_size
+
+    def refresh(self, engine, leads_queryset):
+        """
+        Bring the snapshot up to date with a queryset and return its data
+
+        Args:
+            engine: LeadScoringEngine used to extract features
+            leads_queryset: QuerySet of leads the snapshot should cover
+
+        Returns:
+            Tuple of (X, y) ready for LeadScoringEngine.train_model
+        """
+        started_at = timezone.now()
+        meta = self.load_meta()
+        model_fields = {field.attname for field in leads_queryset.model._meta.concrete_fields}
+
+        if (
+            meta is None
+            or meta.get('feature_version') != engine.FEATURE_VERSION
+            or 'updated_at' not in model_fields
+        ):
+            lead_ids, X, y, created_ts = engine.extract_feature_matrix(
+                leads_queryset, chunk_size=self.chunk_size
+            )
+            recomputed = len(lead_ids)
+        else:
+            previous = self.load_arrays(meta['version'])
+            since = datetime.fromisoformat(meta['snapshot_at'])
+            changed_ids, changed_X, changed_y, changed_created = engine.extract_feature_matrix(
+                leads_queryset.filter(updated_at__gte=since), chunk_size=self.chunk_size
+            )
+            current_ids = np.fromiter(
+                leads_queryset.order_by().values_list('pk', flat=True).iterator(
+                    chunk_size=self.chunk_size
+                ),
+                dtype=np.int64
+            )
+
+            # Keep unchanged rows still in the queryset, then append recomputed rows
+            keep = np.isin(previous['lead_ids'], current_ids) & ~np.isin(
+                previous['lead_ids'], changed_ids
+            )
+            lead_ids = np.concatenate([previous['lead_ids'][keep], changed_ids])
+            X = np.concatenate([previous['features'][keep], changed_X])
+            y = np.concatenate([previous['labels'][keep], changed_y])
+            created_ts = np.concatenate([previous['created_ts'][keep], changed_created])
+            recomputed = len(changed_ids)
+
+        # Lead age depends on the current time, so derive it from creation times
+        age_days = np.floor((started_at.timestamp() - created_ts) / 86400)
+        X[:, engine.AGE_FEATURE_INDEX] = np.nan_to_num(age_days, nan=0.0)
+
+        version = (meta['version'] + 1) if meta else 1
+        self._write(version, {
+            'lead_ids': lead_ids,
+            'features': X,
+            'labels': y,
+            'created_ts': created_ts,
+        }, {
+            'version': version,
+            'feature_version': engine.FEATURE_VERSION,
+            'feature_names': list(engine.FEATURE_NAMES),
+            'snapshot_at': started_at.isoformat(),
+            'rows': int(len(lead_ids)),
+            'recomputed_rows': int(recomputed),
+        })
+
+        logger.info(
+            f"Lead feature snapshot v{version}: {len(lead_ids)} rows, {recomputed} recomputed"
+        )
+        return X, y
+
+    def load_meta(self):
+        """Load metadata of the current snapshot, or None if there is none"""
+        try:
+            with open(os.path.join(self.directory, 'meta.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_arrays(self, version):
+        """Memory-map the arrays of a snapshot version"""
+        version_dir = self._version_dir(version)
+        return {
+            name: np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode='r')
+            for name in self.ARRAYS
+        }
+
+    def _version_dir(self, version):
+        return os.path.join(self.directory, f'v{version}')
+
+    def _write(self, version, arrays, meta):
+        """Write a new version and atomically point meta.json at it"""
+        version_dir = self._version_dir(version)
+        os.makedirs(version_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(version_dir, f'{name}.npy'), np.ascontiguousarray(array))
+
+        meta_path = os.path.join(self.directory, 'meta.json')
+        tmp_path = f'{meta_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+        # Older versions are no longer referenced
+        for entry in os.listdir(self.directory):
+            if entry.startswith('v') and entry != f'v{version}':
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+
 class RuleBasedScoring:
     """Rule-based lead scoring as alternative/complement to ML"""
 
@@ -338,6 +601,12 @@ class RuleBasedScoring:
         """Initialize with custom or default rules"""
         self.rules = custom_rules or self.DEFAULT_RULES
 
+    def input_fields(self):
+        """Lead attributes that can change the rule-based score"""
+        fields = {'source', 'company_size', 'interaction_count', 'title'}
+        fields.update(self.rules['data_completeness']['required_fields'])
+        return fields
+
     def score_lead(self, lead):
         """
         Score lead based on rules
@@ -410,25 +679,75 @@ class RuleBasedScoring:
         return score
 
 
+class LeadScoreDirtySet:
+    """
+    Set of leads whose rule-based scoring inputs changed
+
+    Backed by a Redis set when REDIS_URL is configured, so any process can
+    add leads while the periodic rescoring task drains them. SADD and SPOP
+    are atomic, so a lead added during a drain is never lost and concurrent
+    drainers never pop the same lead. Without Redis the set is process-local.
+    """
+
+    KEY = 'lead_scoring:dirty'
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else get_redis_client()
+
+    def add(self, *lead_ids):
+        """Mark leads as needing a rescore"""
+        if not lead_ids:
+            return
+        if self.client is None:
+            with _local_dirty_lock:
+                _local_dirty.update(lead_ids)
+        else:
+            self.client.sadd(self.KEY, *lead_ids)
+
+    def pop_batch(self, count):
+        """Remove and return up to count distinct dirty lead ids"""
+        if self.client is None:
+            with _local_dirty_lock:
+                lead_ids = [_local_dirty.pop() for _ in range(min(count, len(_local_dirty)))]
+        else:
+            lead_ids = self.client.spop(self.KEY, count) or []
+        return sorted(int(lead_id) for lead_id in lead_ids)
+
+    def __len__(self):
+        if self.client is None:
+            return len(_local_dirty)
+        return self.client.scard(self.KEY)
+
+
+_local_dirty = set()
+_local_dirty_lock = threading.Lock()
+
+
 class LeadScoringManager:
     """Manage lead scoring operations"""
 
     @staticmethod
-    def update_lead_scores(leads_queryset=None, method='rule_based'):
+    def update_lead_scores(leads_queryset=None, method='rule_based',
+                           batch_size=SCORE_UPDATE_BATCH_SIZE, incremental=False):
         """
         Update scores for all leads
 
         Args:
             leads_queryset: QuerySet of leads (None = all leads)
             method: 'rule_based' or 'ml'
+            batch_size: Rows per bulk_update statement
+            incremental: Rule-based only; rescore just the leads marked dirty
 
         Returns:
             Number of leads scored
         """
         from lead_management.models import Lead
 
+        if method == 'rule_based' and incremental:
+            return LeadScoringManager.rescore_dirty_leads(batch_size=batch_size)['rescored']
+
         if leads_queryset is None:
-            leads_queryset = Lead.objects.filter(status__in=['new', 'contacted', 'qualified'])
+            leads_queryset = Lead.objects.filter(status__in=OPEN_LEAD_STATUSES)
 
         if method == 'ml':
             engine = LeadScoringEngine()
@@ -441,26 +760,118 @@ class LeadScoringManager:
                 engine.train_model(all_leads)
                 engine.save_model('lead_scoring_model.pkl')
 
-            results = engine.score_all_leads(leads_queryset)
+            # Factors are model-wide feature importances, shared by every lead
+            factors = engine._get_scoring_factors(None, None)
+            count = 0
 
-            for lead, score, factors in results:
-                lead.score = score
-                lead.score_factors = factors
-                lead.save(update_fields=['score', 'score_factors'])
+            score_field, detail_fields = LeadScoringManager._score_fields(Lead, 'score_factors')
 
-        else:  # rule_based
-            scorer = RuleBasedScoring()
+            for lead_ids, scores in engine.score_leads_batch(leads_queryset):
+                leads = []
+                for lead_id, score in zip(lead_ids, scores, strict=True):
+                    lead = Lead(pk=lead_id)
+                    setattr(lead, score_field, int(score))
+                    for field in detail_fields:
+                        setattr(lead, field, factors)
+                    leads.append(lead)
+                Lead.objects.bulk_update(leads, [score_field, *detail_fields], batch_size=batch_size)
+                count += len(leads)
 
-            for lead in leads_queryset:
-                score, breakdown = scorer.score_lead(lead)
-                lead.score = min(score, 100)  # Cap at 100
-                lead.score_breakdown = breakdown
-                lead.save(update_fields=['score', 'score_breakdown'])
+        else:  # rule_based
+            stats = LeadScoringManager._rescore_rule_based(leads_queryset, batch_size=batch_size)
+            count = stats['rescored']
 
-        count = leads_queryset.count()
         logger.info(f"Updated scores for {count} leads using {method} method")
         return count
 
+    @staticmethod
+    def rescore_dirty_leads(batch_size=SCORE_UPDATE_BATCH_SIZE, max_batches=None):
+        """
+        Rescore only leads whose rule-based inputs changed
+
+        Args:
+            batch_size: Dirty leads drained and rescored per batch
+            max_batches: Optional cap on batches processed per call
+
+        Returns:
+            Dict with rows scanned, rescored and written
+        """
+        from lead_management.models import Lead
+
+        dirty = LeadScoreDirtySet()
+        stats = {'scanned': 0, 'rescored': 0, 'written': 0}
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            lead_ids = dirty.pop_batch(batch_size)
+            if not lead_ids:
+                break
+
+            batch_stats = LeadScoringManager._rescore_rule_based(
+                Lead.objects.filter(id__in=lead_ids, status__in=OPEN_LEAD_STATUSES),
+                batch_size=batch_size
+            )
+            stats['scanned'] += len(lead_ids)
+            stats['rescored'] += batch_stats['rescored']
+            stats['written'] += batch_stats['written']
+            batches += 1
+
+        logger.info(
+            f"Incremental lead rescoring: {stats['scanned']} scanned, "
+            f"{stats['rescored']} rescored, {stats['written']} written"
+        )
+        return stats
+
+    @staticmethod
+    def _rescore_rule_based(leads_queryset, batch_size=SCORE_UPDATE_BATCH_SIZE):
+        """Score leads with the rules, writing only rows whose result changed"""
+        model = leads_queryset.model
+        score_field, detail_fields = LeadScoringManager._score_fields(model, 'score_breakdown')
+        update_fields = [score_field, *detail_fields]
+        scorer = RuleBasedScoring()
+        stats = {'scanned': 0, 'rescored': 0, 'written': 0}
+        changed = []
+
+        for lead in leads_queryset.iterator(chunk_size=batch_size):
+            stats['scanned'] += 1
+            score, breakdown = scorer.score_lead(lead)
+            score = min(score, 100)  # Cap at 100
+            stats['rescored'] += 1
+
+            if getattr(lead, score_field) == score and all(
+                getattr(lead, field) == breakdown for field in detail_fields
+            ):
+                continue
+
+            setattr(lead, score_field, score)
+            for field in detail_fields:
+                setattr(lead, field, breakdown)
+            changed.append(lead)
+
+            if len(changed) >= batch_size:
+                model.objects.bulk_update(changed, update_fields)
+                stats['written'] += len(changed)
+                changed = []
+
+        if changed:
+            model.objects.bulk_update(changed, update_fields)
+            stats['written'] += len(changed)
+
+        return stats
+
+    @staticmethod
+    def _score_fields(model, *detail_fields):
+        """
+        Resolve the score columns present on the lead model
+
+        Returns:
+            Tuple of (score_field, detail_fields) where detail_fields keeps
+            only the requested fields the model actually has
+        """
+        names = {field.name for field in model._meta.concrete_fields}
+        score_field = 'score' if 'score' in names else 'lead_score'
+        return score_field, [field for field in detail_fields if field in names]
+
     @staticmethod
     def get_hot_leads(limit=20, min_score=70):
         """Get high-scoring leads"""
@@ -468,7 +879,7 @@ class LeadScoringManager:
 
         return Lead.objects.filter(
             score__gte=min_score,
-            status__in=['new', 'contacted', 'qualified']
+            status__in=OPEN_LEAD_STATUSES
         ).order_by('-score')[:limit]
 
     @staticmethod
@@ -0,0 +1,37 @@
+"""
+Django management command to rebuild the persistent search index
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import get_search_backend, get_search_index_fields
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index for indexed models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help='Model labels to reindex (e.g. contact_management.Contact); defaults to all'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of records indexed per batch'
+        )
+
+    def handle(self, *args, **options):
+        indexed = get_search_index_fields()
+        model_labels = options['models'] or list(indexed)
+
+        unknown = [label for label in model_labels if label not in indexed]
+        if unknown:
+            raise CommandError(f'Models are not configured for indexing: {", ".join(unknown)}')
+
+        backend = get_search_backend()
+        for model_label in model_labels:
+            count = backend.rebuild(model_label, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} {model_label} records'))
@@ -0,0 +1,53 @@
+"""
+Django management command to run the workflow timer wheel
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.workflow_timers import (
+    WORKFLOW_TIMER_BATCH_SIZE,
+    WORKFLOW_TIMER_HORIZON,
+    WORKFLOW_TIMER_REFILL_INTERVAL,
+    WorkflowTimerScheduler,
+)
+
+
+class Command(BaseCommand):
+    help = 'Resume waiting workflow instances as their timers come due'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tick',
+            type=float,
+            default=1.0,
+            help='Timer resolution in seconds'
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=WORKFLOW_TIMER_HORIZON,
+            help='Seconds ahead of now loaded into the wheel'
+        )
+        parser.add_argument(
+            '--refill-interval',
+            type=float,
+            default=WORKFLOW_TIMER_REFILL_INTERVAL,
+            help='Seconds between reloads of upcoming timers from the database'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=WORKFLOW_TIMER_BATCH_SIZE,
+            help='Number of instances claimed per batch'
+        )
+
+    def handle(self, *args, **options):
+        if options['horizon'] < options['refill_interval']:
+            options['horizon'] = int(options['refill_interval'])
+
+        scheduler = WorkflowTimerScheduler(batch_size=options['batch_size'], horizon=options['horizon'])
+        self.stdout.write(self.style.SUCCESS('Workflow timer wheel running'))
+        try:
+            scheduler.run_forever(tick=options['tick'], refill_interval=options['refill_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
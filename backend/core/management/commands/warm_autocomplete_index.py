@@ -0,0 +1,32 @@
+"""
+Django management command to build autocomplete prefix indexes ahead of use
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.autocomplete import AutocompleteIndex, get_autocomplete_fields
+
+
+class Command(BaseCommand):
+    help = 'Build the autocomplete prefix indexes that are not built yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help='Model labels to warm (e.g. contact_management.Contact); defaults to all'
+        )
+
+    def handle(self, *args, **options):
+        configured = get_autocomplete_fields()
+        model_labels = options['models'] or list(configured)
+
+        unknown = [label for label in model_labels if label not in configured]
+        if unknown:
+            raise CommandError(f'Models have no autocomplete fields: {", ".join(unknown)}')
+
+        built = AutocompleteIndex().warm(model_labels)
+        for name in built:
+            self.stdout.write(self.style.SUCCESS(f'Built autocomplete index {name}'))
+        if not built:
+            self.stdout.write('Autocomplete indexes are already built')
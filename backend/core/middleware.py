@@ -4,13 +4,15 @@ Implements comprehensive security headers and protections
 """
 
 import logging
+import math
 import time
 
 from django.conf import settings
-from django.core.cache import cache
 from django.http import HttpResponseForbidden
 from django.utils.deprecation import MiddlewareMixin
 
+from .rate_limiting import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -175,28 +177,29 @@ class RateLimitMiddleware(MiddlewareMixin):
 
         # Different rate limits for different endpoints
         if request.path.startswith('/api/auth/'):
+            scope = 'auth'
             max_requests = 20
             window = 300  # 5 minutes
         elif request.path.startswith('/api/'):
+            scope = 'api'
             max_requests = 100
             window = 60  # 1 minute
         else:
             return None  # No rate limit for other paths
 
-        cache_key = f"rate_limit:{ip}:{request.path}"
-        requests = cache.get(cache_key, 0)
+        limiter = get_rate_limiter(scope, max_requests, window)
+        result = limiter.hit(f"{ip}:{request.path}")
 
-        if requests >= max_requests:
+        if not result.allowed:
             logger.warning(
                 f"Rate limit exceeded: IP={ip} Path={request.path} "
-                f"Requests={requests}/{max_requests}"
+                f"Limit={max_requests}/{window}s"
             )
-            return HttpResponseForbidden(
+            response = HttpResponseForbidden(
                 "Rate limit exceeded. Please try again later."
             )
-
-        # Increment counter
-        cache.set(cache_key, requests + 1, window)
+            response['Retry-After'] = str(math.ceil(result.retry_after))
+            return response
 
         return None
 
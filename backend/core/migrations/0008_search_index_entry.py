@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:46
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_postgres_search_indexes(apps, schema_editor):
+    """GIN indexes for the tsvector column and trigram matching (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS crm_search_index_vector_gin '
+        'ON crm_search_index USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS crm_search_index_document_trgm '
+        'ON crm_search_index USING gin (document gin_trgm_ops)'
+    )
+
+
+def drop_postgres_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS crm_search_index_vector_gin')
+    schema_editor.execute('DROP INDEX IF EXISTS crm_search_index_document_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_onboardingprogress_onboarding_xp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=64)),
+                ('document', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Index Entry',
+                'verbose_name_plural': 'Search Index Entries',
+                'db_table': 'crm_search_index',
+                'constraints': [models.UniqueConstraint(fields=('model_name', 'object_id'), name='unique_search_index_entry')],
+            },
+        ),
+        migrations.RunPython(create_postgres_search_indexes, drop_postgres_search_indexes),
+    ]
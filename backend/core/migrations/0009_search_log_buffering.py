@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_search_index_entry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='searchlog',
+            name='result_count',
+            field=models.IntegerField(blank=True, default=0, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_search_log_buffering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='processed_records',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='source_file',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='dataimportlog',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_data_import_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='mode',
+            field=models.CharField(default='insert', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='unique_fields',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
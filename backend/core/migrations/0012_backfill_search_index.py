@@ -0,0 +1,54 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_search_index(apps, schema_editor):
+    """Index records that existed before the search index was introduced"""
+    from core.search import get_search_index_fields, tokenize
+
+    SearchIndexEntry = apps.get_model('core', 'SearchIndexEntry')
+    postgres = schema_editor.connection.vendor == 'postgresql'
+
+    for model_label, fields in get_search_index_fields().items():
+        try:
+            model = apps.get_model(model_label)
+        except LookupError:
+            continue
+
+        indexed = set(SearchIndexEntry.objects.filter(model_name=model_label).values_list('object_id', flat=True))
+        batch = []
+        for instance in model.objects.only('pk', *fields).iterator(chunk_size=BATCH_SIZE):
+            if str(instance.pk) in indexed:
+                continue
+            tokens = [token for field in fields for token in tokenize(getattr(instance, field, ''))]
+            batch.append(SearchIndexEntry(
+                model_name=model_label,
+                object_id=str(instance.pk),
+                document=f" {' '.join(tokens)} " if tokens else ''
+            ))
+            if len(batch) >= BATCH_SIZE:
+                SearchIndexEntry.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            SearchIndexEntry.objects.bulk_create(batch)
+
+        if postgres:
+            SearchIndexEntry.objects.filter(model_name=model_label, search_vector__isnull=True).update(
+                search_vector=SearchVector('document', config='simple')
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_data_import_upsert'),
+        ('contact_management', '0003_alter_contact_assigned_to_alter_contact_created_by'),
+        ('lead_management', '0003_alter_lead_assigned_to'),
+        ('opportunity_management', '0003_alter_opportunity_assigned_to'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
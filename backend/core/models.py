@@ -6,6 +6,7 @@ Advanced security, audit, and enterprise features
 import uuid
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
@@ -435,13 +436,21 @@ class DataImportLog(models.Model):
     total_records = models.IntegerField(default=0)
     imported_records = models.IntegerField(default=0)
     skipped_records = models.IntegerField(default=0)
+    # Checkpoint: source rows covered by committed batches
+    processed_records = models.IntegerField(default=0)
     errors = models.JSONField(default=list)
     field_mapping = models.JSONField(default=dict)
     validate_only = models.BooleanField(default=False)
+    # 'insert' or 'upsert' keyed on unique_fields
+    mode = models.CharField(max_length=10, default='insert')
+    unique_fields = models.JSONField(default=list, blank=True)
+    # Path of the source file, used to resume an interrupted import
+    source_file = models.CharField(max_length=500, blank=True)
     imported_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
-    completed_at = models.DateTimeField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'crm_data_import_logs'
@@ -608,8 +617,10 @@ class SearchLog(models.Model):
     model_name = models.CharField(max_length=100)
     query = models.TextField()
     filters = models.JSONField(default=dict)
-    result_count = models.IntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Null when counting was skipped (SEARCH_LOG_COUNT = 'none')
+    result_count = models.IntegerField(default=0, null=True, blank=True)
+    # Set when the search ran, not when the buffered record was flushed
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'crm_search_logs'
@@ -625,6 +636,26 @@ class SearchLog(models.Model):
         return f"{self.query} on {self.model_name}"
 
 
+class SearchIndexEntry(models.Model):
+    """Denormalized search document for a record, kept in sync on write"""
+    model_name = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    document = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'crm_search_index'
+        verbose_name = 'Search Index Entry'
+        verbose_name_plural = 'Search Index Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['model_name', 'object_id'], name='unique_search_index_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name}:{self.object_id}"
+
+
 class EmailLog(models.Model):
     """Log sent emails"""
     STATUS_CHOICES = [
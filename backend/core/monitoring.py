@@ -8,14 +8,21 @@ Provides comprehensive monitoring including:
 - Alert integration
 """
 
+import atexit
+import json
 import logging
+import os
+import threading
 import time
+import weakref
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from datetime import datetime
 from functools import wraps
 from typing import Any
 
 import psutil
+from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
 from django.http import HttpRequest, JsonResponse
@@ -222,9 +229,76 @@ class HealthChecker:
         }
 
 
+# Default histogram bucket upper bounds, in the unit recorded (ms for request durations)
+DEFAULT_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+METRICS_MAX_SERIES = 5000  # label combinations kept before new ones are dropped
+METRICS_FLUSH_INTERVAL = 5.0  # seconds between multiprocess snapshot writes
+DROPPED_SERIES_METRIC = 'metrics_dropped_series_total'
+
+
+class _ThreadToken:
+    """Kept in a thread's local storage; collected when the thread exits."""
+    __slots__ = ('__weakref__',)
+
+
+class _HistogramCell:
+    """Fixed-bucket histogram written by a single thread."""
+    __slots__ = ('buckets', 'counts', 'sum', 'max')
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+
+def _estimate_quantile(buckets: list[float], counts: list[int], q: float, maximum: float) -> float:
+    """Interpolate a quantile within its bucket, as Prometheus' histogram_quantile does."""
+    rank = q * sum(counts)
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            if i == len(buckets):
+                return maximum
+            lower = buckets[i - 1] if i else min(0, buckets[0])
+            estimate = lower + (buckets[i] - lower) * (rank - cumulative) / count
+            return min(estimate, maximum)
+        cumulative += count
+    return maximum
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
 class MetricsCollector:
     """
     Collect and expose application metrics.
+
+    Each thread records into its own cells, so recording takes no lock:
+    a counter is a one-element list and a histogram fixed bucket counts
+    plus sum and max. Scrapes add the cells up, costing O(series x threads)
+    however many samples were recorded. Cells of exited threads are folded
+    into a retired total, and at most METRICS_MAX_SERIES label combinations
+    are kept.
+
+    With METRICS_MULTIPROCESS_DIR (or PROMETHEUS_MULTIPROC_DIR) set, each
+    process writes its totals to <dir>/metrics_<pid>.json every
+    METRICS_FLUSH_INTERVAL seconds and at exit, and scrapes sum all the
+    files so every gunicorn worker is counted. Gauges of exited processes
+    are left out.
     """
 
     _instance = None
@@ -232,38 +306,45 @@ class MetricsCollector:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._metrics = {}
-            cls._instance._counters = {}
-            cls._instance._histograms = {}
+            cls._instance._init_state()
+            os.register_at_fork(after_in_child=cls._instance._init_state)
+            atexit.register(cls._instance.flush)
         return cls._instance
 
+    def _init_state(self) -> None:
+        """Start empty; also runs in forked children so parent samples are not counted twice."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._series: dict[str, tuple[str, str, tuple[float, ...] | None]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._live: dict[int, dict[str, Any]] = {}
+        self._retired: dict[str, dict[str, Any]] = {}
+        self._gauges: dict[str, tuple[float, float]] = {}
+        self._dropped = 0
+        self._flusher = None
+
+    def configure_histogram(self, name: str, buckets: list[float]) -> None:
+        """Set bucket upper bounds for histogram series created from now on."""
+        with self._lock:
+            self._buckets[name] = tuple(sorted(buckets))
+
     def increment(self, name: str, value: int = 1, labels: dict[str, str] | None = None) -> None:
         """Increment a counter."""
-        key = self._get_key(name, labels)
-        self._counters[key] = self._counters.get(key, 0) + value
+        cell = self._cell(name, labels, 'counter')
+        if cell is not None:
+            cell[0] += value
 
     def gauge(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
         """Set a gauge value."""
         key = self._get_key(name, labels)
-        self._metrics[key] = {
-            'type': 'gauge',
-            'value': value,
-            'timestamp': time.time()
-        }
+        if key in self._gauges or self._register(key, name, 'gauge'):
+            self._gauges[key] = (value, time.time())
 
     def histogram(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
         """Record a histogram value."""
-        key = self._get_key(name, labels)
-        if key not in self._histograms:
-            self._histograms[key] = []
-        self._histograms[key].append({
-            'value': value,
-            'timestamp': time.time()
-        })
-
-        # Keep only last 1000 values
-        if len(self._histograms[key]) > 1000:
-            self._histograms[key] = self._histograms[key][-1000:]
+        cell = self._cell(name, labels, 'histogram')
+        if cell is not None:
+            cell.observe(value)
 
     def _get_key(self, name: str, labels: dict[str, str] | None = None) -> str:
         """Generate metric key with labels."""
@@ -272,57 +353,216 @@ class MetricsCollector:
             return f'{name}{{{label_str}}}'
         return name
 
-    def get_metrics(self) -> dict[str, Any]:
-        """Get all metrics."""
-        metrics = {}
+    def _cell(self, name: str, labels: dict[str, str] | None, kind: str):
+        """This thread's cell for a series, or None if the series is dropped."""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._new_shard()
 
-        # Counters
-        for key, value in self._counters.items():
-            metrics[key] = {'type': 'counter', 'value': value}
+        key = self._get_key(name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            if not self._register(key, name, kind):
+                return None
+            buckets = self._series[key][2]
+            cell = shard[key] = [0] if kind == 'counter' else _HistogramCell(buckets)
+        return cell
+
+    def _new_shard(self) -> dict[str, Any]:
+        shard, token = {}, _ThreadToken()
+        self._local.shard, self._local.token = shard, token
+        with self._lock:
+            self._live[id(token)] = shard
+        weakref.finalize(token, self._retire, id(token)).atexit = False
+        return shard
+
+    def _retire(self, token_id: int) -> None:
+        """Fold an exited thread's cells into the retired totals."""
+        with self._lock:
+            shard = self._live.pop(token_id, None)
+            if shard:
+                for key, cell in shard.items():
+                    self._merge(self._retired, key, self._entry(key, cell))
+
+    def _register(self, key: str, name: str, kind: str) -> bool:
+        with self._lock:
+            known = self._series.get(key)
+            if known is None:
+                if len(self._series) >= getattr(settings, 'METRICS_MAX_SERIES', METRICS_MAX_SERIES):
+                    if not self._dropped:
+                        logger.warning(f"Metrics series limit reached, dropping new series such as {key}")
+                    self._dropped += 1
+                    return False
+                buckets = self._buckets.get(name, DEFAULT_BUCKETS) if kind == 'histogram' else None
+                known = self._series[key] = (kind, name, buckets)
+                self._ensure_flusher()
+            return known[0] == kind
+
+    def _entry(self, key: str, cell) -> dict[str, Any]:
+        """JSON-serializable totals of one cell."""
+        kind, name, buckets = self._series[key]
+        if kind == 'counter':
+            return {'type': kind, 'name': name, 'value': cell[0]}
+        return {
+            'type': kind, 'name': name, 'buckets': list(buckets),
+            'counts': list(cell.counts), 'sum': cell.sum, 'max': cell.max,
+        }
 
-        # Gauges
-        for key, data in self._metrics.items():
-            metrics[key] = data
+    @staticmethod
+    def _merge(totals: dict[str, dict[str, Any]], key: str, entry: dict[str, Any]) -> None:
+        current = totals.get(key)
+        if current is None:
+            totals[key] = {**entry, 'counts': list(entry['counts'])} if 'counts' in entry else dict(entry)
+        elif current['type'] != entry['type']:
+            return
+        elif entry['type'] == 'counter':
+            current['value'] += entry['value']
+        elif entry['type'] == 'gauge':
+            if entry['timestamp'] > current['timestamp']:
+                totals[key] = dict(entry)
+        elif list(current['buckets']) == list(entry['buckets']):
+            current['counts'] = [a + b for a, b in zip(current['counts'], entry['counts'], strict=True)]
+            current['sum'] += entry['sum']
+            if entry['max'] is not None and (current['max'] is None or entry['max'] > current['max']):
+                current['max'] = entry['max']
+
+    def _collect(self) -> dict[str, dict[str, Any]]:
+        """This process's totals."""
+        with self._lock:
+            totals = {}
+            for key, entry in self._retired.items():
+                self._merge(totals, key, entry)
+            shards = [shard.copy() for shard in self._live.values()]
+            gauges = self._gauges.copy()
+            dropped = self._dropped
+
+        for shard in shards:
+            for key, cell in shard.items():
+                self._merge(totals, key, self._entry(key, cell))
+        for key, (value, timestamp) in gauges.items():
+            totals[key] = {'type': 'gauge', 'name': self._series[key][1], 'value': value, 'timestamp': timestamp}
+        if dropped:
+            self._merge(totals, DROPPED_SERIES_METRIC,
+                        {'type': 'counter', 'name': DROPPED_SERIES_METRIC, 'value': dropped})
+        return totals
+
+    # Multiprocess mode
+
+    def _multiprocess_dir(self) -> str:
+        return getattr(settings, 'METRICS_MULTIPROCESS_DIR', '') or os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None and self._multiprocess_dir():
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', METRICS_FLUSH_INTERVAL)
+        while self._flusher is threading.current_thread():
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self, totals: dict[str, dict[str, Any]] | None = None) -> None:
+        """Write this process's totals to the multiprocess directory, if configured."""
+        directory = self._multiprocess_dir()
+        if not directory:
+            return
+        path = os.path.join(directory, f'metrics_{os.getpid()}.json')
+        try:
+            with open(f'{path}.tmp', 'w') as f:
+                json.dump(totals if totals is not None else self._collect(), f)
+            os.replace(f'{path}.tmp', path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot {path}: {e}")
+
+    def _aggregate(self) -> dict[str, dict[str, Any]]:
+        """Totals across processes in multiprocess mode, otherwise this process's."""
+        totals = self._collect()
+        directory = self._multiprocess_dir()
+        if not directory:
+            return totals
+
+        self.flush(totals)
+        for filename in os.listdir(directory):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            try:
+                pid = int(filename[len('metrics_'):-len('.json')])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {filename}: {e}")
+                continue
+            alive = _pid_alive(pid)
+            for key, entry in snapshot.items():
+                if entry['type'] != 'gauge' or alive:
+                    self._merge(totals, key, entry)
+        return totals
+
+    # Export
 
-        # Histograms (compute percentiles)
-        for key, values in self._histograms.items():
-            if values:
-                sorted_values = sorted(v['value'] for v in values)
-                count = len(sorted_values)
+    def get_metrics(self) -> dict[str, Any]:
+        """Get all metrics."""
+        metrics = {}
+        for key, entry in self._aggregate().items():
+            if entry['type'] == 'counter':
+                metrics[key] = {'type': 'counter', 'value': entry['value']}
+            elif entry['type'] == 'gauge':
+                metrics[key] = {'type': 'gauge', 'value': entry['value'], 'timestamp': entry['timestamp']}
+            else:
+                count = sum(entry['counts'])
+                if not count:
+                    continue
+                quantiles = {
+                    f'p{int(q * 100)}': _estimate_quantile(entry['buckets'], entry['counts'], q, entry['max'])
+                    for q in (0.5, 0.95, 0.99)
+                }
                 metrics[key] = {
                     'type': 'histogram',
                     'count': count,
-                    'sum': sum(sorted_values),
-                    'avg': sum(sorted_values) / count,
-                    'p50': sorted_values[int(count * 0.5)],
-                    'p95': sorted_values[int(count * 0.95)],
-                    'p99': sorted_values[int(count * 0.99)] if count > 100 else sorted_values[-1],
+                    'sum': entry['sum'],
+                    'avg': entry['sum'] / count,
+                    **quantiles,
+                    'max': entry['max'],
                 }
-
         return metrics
 
     def export_prometheus(self) -> str:
         """Export metrics in Prometheus format."""
-        lines = []
+        families: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        for key, entry in self._aggregate().items():
+            families.setdefault(entry['name'], []).append((key, entry))
 
-        for key, value in self._counters.items():
-            lines.append(f'{key} {value}')
-
-        for key, data in self._metrics.items():
-            lines.append(f'{key} {data["value"]}')
-
-        for key, values in self._histograms.items():
-            if values:
-                sorted_values = sorted(v['value'] for v in values)
-                count = len(sorted_values)
-                lines.append(f'{key}_count {count}')
-                lines.append(f'{key}_sum {sum(sorted_values)}')
-                lines.append(f'{key}{{quantile="0.5"}} {sorted_values[int(count * 0.5)]}')
-                lines.append(f'{key}{{quantile="0.95"}} {sorted_values[int(count * 0.95)]}')
-                lines.append(f'{key}{{quantile="0.99"}} {sorted_values[int(count * 0.99)] if count > 100 else sorted_values[-1]}')
+        lines = []
+        for name, series in families.items():
+            lines.append(f'# TYPE {name} {series[0][1]["type"]}')
+            for key, entry in series:
+                if entry['type'] != 'histogram':
+                    lines.append(f'{key} {entry["value"]}')
+                    continue
+
+                labels = key[len(name):]
+                cumulative = 0
+                for bound, count in zip([*entry['buckets'], '+Inf'], entry['counts'], strict=True):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    bucket_labels = f'{labels[:-1]},{le}}}' if labels else f'{{{le}}}'
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{labels} {entry["sum"]}')
+                lines.append(f'{name}_count{labels} {cumulative}')
 
         return '\n'.join(lines)
 
+    def reset(self) -> None:
+        """Discard everything recorded in this process."""
+        # A running flush loop exits once it is no longer the flusher
+        self._init_state()
+
 
 # Global metrics collector
 metrics = MetricsCollector()
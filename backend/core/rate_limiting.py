@@ -0,0 +1,264 @@
+"""
+Rate Limiting Engine
+GCRA (generic cell rate algorithm) limiter shared by the middleware,
+GraphQL permissions, DRF throttles and RateLimitCache
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .cache_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Share of the remaining allowance a process may reserve in one Redis call
+RATE_LIMIT_LEASE_FRACTION = 0.1
+RATE_LIMIT_LEASE_TTL = 1.0  # seconds
+# Expired per-client entries are pruned once this many accumulate
+MAX_TRACKED_KEYS = 10000
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check; times are in seconds"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+    reset_after: float = 0.0
+
+
+def _gcra(tat, now, interval, window, cost, extra):
+    """
+    One GCRA step shared by the local store (the Lua script mirrors it)
+
+    ``tat`` is the theoretical arrival time of the next request. A client
+    may run up to ``window`` ahead of now, i.e. ``window / interval``
+    requests in a burst, after which requests are spaced ``interval`` apart.
+
+    Returns:
+        (granted, remaining, retry_after, reset_after, new tat)
+    """
+    tat = max(tat if tat is not None else now, now)
+    available = math.floor((window - (tat - now)) / interval + 1e-9)
+    if available < cost:
+        retry_after = tat + interval * cost - window - now
+        return 0, max(available, 0), retry_after, tat - now, None
+    granted = min(cost + extra, available)
+    new_tat = tat + interval * granted
+    return granted, available - granted, 0.0, new_tat - now, new_tat
+
+
+class LocalRateLimitStore:
+    """Process-local store, used when no Redis is configured"""
+
+    shared = False
+
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, now, interval, window, cost, extra=0):
+        with self._lock:
+            granted, remaining, retry_after, reset_after, new_tat = _gcra(
+                self._tats.get(key), now, interval, window, cost, extra
+            )
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                if len(self._tats) > MAX_TRACKED_KEYS:
+                    self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+        return granted, remaining, retry_after, reset_after
+
+    def reset(self, key):
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class RedisRateLimitStore:
+    """
+    Redis store shared by all workers
+
+    The GCRA step runs in a Lua script so concurrent requests cannot race
+    between reading and writing the theoretical arrival time.
+    """
+
+    PREFIX = 'ratelimit'
+
+    # KEYS[1]: tat key; ARGV: now, interval, window (ms), cost, extra
+    ACQUIRE_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local window = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local extra = tonumber(ARGV[5])
+    local tat = tonumber(redis.call('GET', KEYS[1]))
+    if not tat or tat < now then
+        tat = now
+    end
+    local available = math.floor((window - (tat - now)) / interval + 1e-9)
+    if available < cost then
+        return {0, math.max(available, 0), math.ceil(tat + interval * cost - window - now), math.ceil(tat - now)}
+    end
+    local granted = math.min(cost + extra, available)
+    local new_tat = tat + interval * granted
+    redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+    return {granted, available - granted, 0, math.ceil(new_tat - now)}
+    """
+
+    shared = True
+
+    def __init__(self, client):
+        self.client = client
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+
+    def acquire(self, key, now, interval, window, cost, extra=0):
+        # The script works in milliseconds
+        granted, remaining, retry_after, reset_after = self._acquire(
+            keys=[f'{self.PREFIX}:{key}'],
+            args=[now * 1000, interval * 1000, window * 1000, cost, extra]
+        )
+        return int(granted), int(remaining), retry_after / 1000, reset_after / 1000
+
+    def reset(self, key):
+        self.client.delete(f'{self.PREFIX}:{key}')
+
+
+_local_store = LocalRateLimitStore()
+
+
+def get_rate_limit_store():
+    """Redis store when REDIS_URL is configured, otherwise the process-local store"""
+    client = get_redis_client()
+    return RedisRateLimitStore(client) if client is not None else _local_store
+
+
+class RateLimiter:
+    """
+    Allow ``limit`` requests per ``window`` seconds per identifier
+
+    With a shared store, clients well under their limit reserve a small
+    lease of requests per Redis call and spend it locally; clients over
+    their limit are refused locally until their retry time.
+    """
+
+    def __init__(self, limit, window, scope='default', store=None, clock=time.time):
+        self.limit = limit
+        self.window = window
+        self.scope = scope
+        self.interval = window / limit
+        self.store = store if store is not None else get_rate_limit_store()
+        self.clock = clock
+        self.lease_fraction = getattr(settings, 'RATE_LIMIT_LEASE_FRACTION', RATE_LIMIT_LEASE_FRACTION)
+        self.lease_ttl = getattr(settings, 'RATE_LIMIT_LEASE_TTL', RATE_LIMIT_LEASE_TTL)
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def _key(self, identifier):
+        return f'{self.scope}:{identifier}'
+
+    def hit(self, identifier, cost=1):
+        """
+        Record a request and report whether it is allowed
+
+        Args:
+            identifier: Client key (user id, IP, ...)
+            cost: Units this request consumes
+
+        Returns:
+            RateLimitResult
+        """
+        key = self._key(identifier)
+        now = self.clock()
+
+        local = self._spend_lease(key, now, cost)
+        if local is not None:
+            return local
+
+        extra = self._lease_size(key) if self.store.shared else 0
+        try:
+            granted, remaining, retry_after, reset_after = self.store.acquire(
+                key, now, self.interval, self.window, cost, extra
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, using local limits: {e}")
+            granted, remaining, retry_after, reset_after = _local_store.acquire(
+                key, now, self.interval, self.window, cost
+            )
+
+        with self._lock:
+            if len(self._leases) > MAX_TRACKED_KEYS:
+                self._leases = {k: lease for k, lease in self._leases.items() if lease['expires'] > now}
+            if granted:
+                self._leases[key] = {
+                    'tokens': granted - cost,
+                    'remaining': remaining,
+                    'expires': now + self.lease_ttl,
+                    'blocked_until': None,
+                }
+            else:
+                self._leases[key] = {
+                    'tokens': 0,
+                    'remaining': remaining,
+                    'expires': now + retry_after,
+                    'blocked_until': now + retry_after,
+                }
+
+        return RateLimitResult(
+            allowed=bool(granted),
+            limit=self.limit,
+            remaining=remaining + max(granted - cost, 0),
+            retry_after=retry_after,
+            reset_after=reset_after,
+        )
+
+    def _spend_lease(self, key, now, cost):
+        """Serve the request from the local lease, if one covers it"""
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None or lease['expires'] <= now:
+                return None
+            if lease['blocked_until'] is not None:
+                if cost <= lease['remaining']:
+                    return None
+                wait = lease['blocked_until'] - now
+                return RateLimitResult(False, self.limit, lease['remaining'], wait, wait)
+            if lease['tokens'] < cost:
+                return None
+            lease['tokens'] -= cost
+            return RateLimitResult(True, self.limit, lease['remaining'] + lease['tokens'])
+
+    def _lease_size(self, key):
+        """Extra requests to reserve, based on the allowance left at the last call"""
+        lease = self._leases.get(key)
+        if lease is None:
+            return 0
+        return int(lease['remaining'] * self.lease_fraction)
+
+    def reset(self, identifier):
+        """Forget an identifier's history"""
+        key = self._key(identifier)
+        with self._lock:
+            self._leases.pop(key, None)
+        self.store.reset(key)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(scope, limit, window):
+    """Process-wide limiter for a scope, so leases persist across requests"""
+    with _limiters_lock:
+        limiter = _limiters.get((scope, limit, window))
+        if limiter is None:
+            limiter = _limiters[(scope, limit, window)] = RateLimiter(limit, window, scope=scope)
+        return limiter
@@ -4,15 +4,303 @@ Provides full-text search, filters, and search analytics
 """
 
 import logging
+import re
+from abc import ABC, abstractmethod
 
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db import connection, models, transaction
+from django.db.models import Avg, Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Models kept in the persistent search index, with the fields indexed for each.
+# Override with the SEARCH_INDEX_FIELDS setting.
+DEFAULT_SEARCH_INDEX_FIELDS = {
+    'contact_management.Contact': [
+        'first_name', 'last_name', 'email', 'company_name', 'job_title',
+        'phone', 'mobile', 'city', 'country',
+    ],
+    'lead_management.Lead': [
+        'first_name', 'last_name', 'email', 'company_name', 'job_title', 'phone',
+    ],
+    'opportunity_management.Opportunity': ['name', 'company_name', 'description'],
+}
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_index_fields():
+    """Indexed fields per model label"""
+    return getattr(settings, 'SEARCH_INDEX_FIELDS', DEFAULT_SEARCH_INDEX_FIELDS)
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(str(text).lower()) if text else []
+
+
+class SearchBackend(ABC):
+    """
+    Base class for persistent search index backends
+
+    Documents are stored in SearchIndexEntry, one row per record, and
+    refreshed from model signals so queries never scan the source tables.
+    """
+
+    def build_document(self, instance, fields):
+        """Normalized, space-delimited token string for an instance"""
+        tokens = []
+        for field in fields:
+            tokens.extend(tokenize(getattr(instance, field, '')))
+        # Leading/trailing spaces let token prefixes be matched with ' token'
+        return f" {' '.join(tokens)} " if tokens else ''
+
+    def index_instance(self, instance, fields):
+        """Create or refresh the index entry for an instance"""
+        from .models import SearchIndexEntry
+
+        entry, _ = SearchIndexEntry.objects.update_or_create(
+            model_name=instance._meta.label,
+            object_id=str(instance.pk),
+            defaults={'document': self.build_document(instance, fields)}
+        )
+        return entry
+
+    def remove_instance(self, model_label, pk):
+        """Drop the index entry for a deleted record"""
+        from .models import SearchIndexEntry
+
+        SearchIndexEntry.objects.filter(model_name=model_label, object_id=str(pk)).delete()
+
+    def rebuild(self, model_label, batch_size=1000):
+        """Reindex every record of a model"""
+        from .models import SearchIndexEntry
+
+        model = apps.get_model(model_label)
+        fields = get_search_index_fields()[model_label]
+        SearchIndexEntry.objects.filter(model_name=model_label).delete()
+
+        batch = []
+        count = 0
+        for instance in model.objects.only('pk', *fields).iterator(chunk_size=batch_size):
+            batch.append(SearchIndexEntry(
+                model_name=model_label,
+                object_id=str(instance.pk),
+                document=self.build_document(instance, fields)
+            ))
+            if len(batch) >= batch_size:
+                count += self._bulk_insert(batch)
+                batch = []
+        if batch:
+            count += self._bulk_insert(batch)
+        return count
+
+    def index_records(self, model_label, pks, batch_size=1000):
+        """Create or refresh the index entries for records written in bulk"""
+        from .models import SearchIndexEntry
+
+        model = apps.get_model(model_label)
+        fields = get_search_index_fields()[model_label]
+        entries = [
+            SearchIndexEntry(
+                model_name=model_label,
+                object_id=str(instance.pk),
+                document=self.build_document(instance, fields)
+            )
+            for instance in model.objects.filter(pk__in=pks).only('pk', *fields)
+        ]
+        SearchIndexEntry.objects.bulk_create(
+            entries,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['model_name', 'object_id'],
+            update_fields=['document', 'updated_at']
+        )
+        return len(entries)
+
+    def _bulk_insert(self, entries):
+        from .models import SearchIndexEntry
+
+        SearchIndexEntry.objects.bulk_create(entries)
+        return len(entries)
+
+    @abstractmethod
+    def match_entries(self, model_label, query):
+        """SearchIndexEntry queryset matching a query, annotated with 'rank'"""
+        pass
+
+    def search(self, queryset, query):
+        """Restrict a queryset to records matching the query, best matches first"""
+        model = queryset.model
+        entries = self.match_entries(model._meta.label, query)
+        pk_field = self._pk_cast_field(model)
+
+        return queryset.filter(
+            pk__in=entries.annotate(
+                record_pk=Cast('object_id', output_field=pk_field)
+            ).values('record_pk')
+        ).annotate(
+            rank=Subquery(
+                entries.filter(
+                    object_id=Cast(OuterRef('pk'), output_field=models.CharField())
+                ).values('rank')[:1]
+            )
+        ).order_by('-rank')
+
+    @staticmethod
+    def _pk_cast_field(model):
+        pk = model._meta.pk
+        if isinstance(pk, models.UUIDField):
+            return models.UUIDField()
+        if isinstance(pk, (models.AutoField, models.BigAutoField, models.IntegerField)):
+            return models.BigIntegerField()
+        return models.CharField()
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    Portable backend for SQLite and tests
+
+    Matches every query token as a prefix of a token in the stored
+    document; rank is the number of matched query tokens.
+    """
+
+    def match_entries(self, model_label, query):
+        from .models import SearchIndexEntry
+
+        entries = SearchIndexEntry.objects.filter(model_name=model_label)
+        for token in tokenize(query):
+            entries = entries.filter(document__contains=f' {token}')
+        return entries.annotate(rank=models.Value(1.0, output_field=models.FloatField()))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL backend using a stored tsvector and pg_trgm GIN indexes
+
+    Prefix tsquery matching serves search-as-you-type; trigram word
+    similarity catches misspellings.
+    """
+
+    SEARCH_CONFIG = 'simple'
+
+    def index_instance(self, instance, fields):
+        from .models import SearchIndexEntry
+
+        entry = super().index_instance(instance, fields)
+        SearchIndexEntry.objects.filter(pk=entry.pk).update(
+            search_vector=SearchVector('document', config=self.SEARCH_CONFIG)
+        )
+        return entry
+
+    def rebuild(self, model_label, batch_size=1000):
+        from .models import SearchIndexEntry
+
+        count = super().rebuild(model_label, batch_size=batch_size)
+        SearchIndexEntry.objects.filter(model_name=model_label).update(
+            search_vector=SearchVector('document', config=self.SEARCH_CONFIG)
+        )
+        return count
+
+    def index_records(self, model_label, pks, batch_size=1000):
+        from .models import SearchIndexEntry
+
+        count = super().index_records(model_label, pks, batch_size=batch_size)
+        SearchIndexEntry.objects.filter(
+            model_name=model_label, object_id__in=[str(pk) for pk in pks]
+        ).update(search_vector=SearchVector('document', config=self.SEARCH_CONFIG))
+        return count
+
+    def match_entries(self, model_label, query):
+        from .models import SearchIndexEntry
+
+        tokens = tokenize(query)
+        entries = SearchIndexEntry.objects.filter(model_name=model_label)
+        if not tokens:
+            return entries.annotate(rank=models.Value(0.0, output_field=models.FloatField()))
+
+        # Tokens are \w+ only, so they are safe inside a raw tsquery
+        search_query = SearchQuery(
+            ' & '.join(f'{token}:*' for token in tokens),
+            search_type='raw',
+            config=self.SEARCH_CONFIG
+        )
+        return entries.filter(
+            Q(search_vector=search_query) | Q(document__trigram_word_similar=' '.join(tokens))
+        ).annotate(rank=SearchRank(F('search_vector'), search_query))
+
+
+_search_backend = None
+
+
+def get_search_backend():
+    """Return the configured search backend, chosen by database vendor by default"""
+    global _search_backend
+    if _search_backend is None:
+        backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+        if backend_path:
+            _search_backend = import_string(backend_path)()
+        elif connection.vendor == 'postgresql':
+            _search_backend = PostgresSearchBackend()
+        else:
+            _search_backend = SimpleSearchBackend()
+    return _search_backend
+
+
+def _index_saved_instance(sender, instance, **kwargs):
+    fields = get_search_index_fields().get(sender._meta.label)
+    if fields:
+        try:
+            get_search_backend().index_instance(instance, fields)
+        except Exception as e:
+            logger.warning(f"Failed to index {sender._meta.label}:{instance.pk}: {str(e)}")
+
+
+def _remove_deleted_instance(sender, instance, **kwargs):
+    try:
+        get_search_backend().remove_instance(sender._meta.label, instance.pk)
+    except Exception as e:
+        logger.warning(f"Failed to unindex {sender._meta.label}:{instance.pk}: {str(e)}")
+
+
+def index_records(model_label, pks):
+    """
+    Index records written without model signals
+
+    bulk_create, bulk_update and QuerySet.update skip post_save, so bulk
+    write paths call this with the primary keys they touched. Failures are
+    logged rather than raised, like the signal handlers.
+    """
+    pks = list(pks)
+    if not pks or model_label not in get_search_index_fields():
+        return 0
+    try:
+        with transaction.atomic():
+            return get_search_backend().index_records(model_label, pks)
+    except Exception as e:
+        logger.warning(f"Failed to index {len(pks)} {model_label} records: {str(e)}")
+        return 0
+
+
+def register_search_index_signals():
+    """Keep the search index in sync with writes to indexed models"""
+    for model_label in get_search_index_fields():
+        post_save.connect(
+            _index_saved_instance, sender=model_label,
+            dispatch_uid=f'search_index_save_{model_label}'
+        )
+        post_delete.connect(
+            _remove_deleted_instance, sender=model_label,
+            dispatch_uid=f'search_index_delete_{model_label}'
+        )
+
 
 class AdvancedSearch:
     """Advanced search engine with multiple search strategies"""
@@ -29,6 +317,8 @@ class AdvancedSearch:
         self.model = apps.get_model(model_name)
         self.user = user
         self.queryset = self.model.objects.all()
+        self.backend = get_search_backend()
+        self.is_indexed = self.model._meta.label in get_search_index_fields()
 
     def search(self, query=None, filters=None, full_text_fields=None,
                order_by=None, limit=None):
@@ -48,7 +338,9 @@ class AdvancedSearch:
         results = self.queryset
 
         # Apply full-text search
-        if query and full_text_fields:
+        if query and self.is_indexed:
+            results = self.backend.search(results, query)
+        elif query and full_text_fields:
             results = self._full_text_search(results, query, full_text_fields)
         elif query:
             # Fallback to basic search
@@ -67,7 +359,7 @@ class AdvancedSearch:
             results = results[:limit]
 
         # Log search for analytics
-        self._log_search(query, filters, results.count())
+        self._log_search(query, filters, self._result_count(results))
 
         return results
 
@@ -191,17 +483,28 @@ class AdvancedSearch:
 
         return self.queryset.aggregate(**agg_dict)
 
+    def _result_count(self, results):
+        """Result count for the search log, per the SEARCH_LOG_COUNT setting"""
+        from .search_logging import estimate_result_count, get_count_mode
+
+        mode = get_count_mode()
+        if mode == 'none':
+            return None
+        if mode == 'exact':
+            return results.count()
+        return estimate_result_count(results)
+
     def _log_search(self, query, filters, result_count):
-        """Log search for analytics"""
-        from .models import SearchLog
+        """Queue search for analytics; SearchLog rows are written in batches"""
+        from .search_logging import SearchLogBuffer
 
         try:
-            SearchLog.objects.create(
-                user=self.user,
+            SearchLogBuffer().record(
                 model_name=self.model_name,
-                query=query or '',
-                filters=filters or {},
-                result_count=result_count
+                query=query,
+                filters=filters,
+                result_count=result_count,
+                user=self.user
             )
         except Exception as e:
             logger.warning(f"Failed to log search: {str(e)}")
@@ -303,9 +606,20 @@ class SearchSuggestions:
         Returns:
             List of suggestions
         """
+        from .autocomplete import AutocompleteIndex
+
         model = apps.get_model(model_name)
+        autocomplete = AutocompleteIndex()
+        if autocomplete.is_indexed(model._meta.label, field):
+            return autocomplete.suggest(model._meta.label, field, partial_query, limit=limit)
 
-        suggestions = model.objects.filter(
+        queryset = model.objects.all()
+
+        # Narrow candidates through the index before matching the field itself
+        if field in get_search_index_fields().get(model._meta.label, []):
+            queryset = get_search_backend().search(queryset, partial_query).order_by()
+
+        suggestions = queryset.filter(
             **{f"{field}__istartswith": partial_query}
         ).values_list(field, flat=True).distinct()[:limit]
 
@@ -323,16 +637,9 @@ class SearchSuggestions:
         Returns:
             List of popular search queries
         """
-        from .models import SearchLog
-
-        popular = SearchLog.objects.filter(
-            model_name=model_name,
-            query__isnull=False
-        ).exclude(query='').values('query').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
+        from .autocomplete import AutocompleteIndex
 
-        return [item['query'] for item in popular]
+        return AutocompleteIndex().popular_searches(apps.get_model(model_name)._meta.label, limit=limit)
 
 
 class SmartSearch:
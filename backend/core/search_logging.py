@@ -0,0 +1,241 @@
+"""
+Buffered Search Logging
+Queues search analytics records and writes them to SearchLog in batches
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+SEARCH_LOG_FLUSH_SIZE = 500
+SEARCH_LOG_FLUSH_INTERVAL = 30  # seconds
+SEARCH_LOG_EXACT_COUNT_LIMIT = 1000
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def get_count_mode():
+    """How AdvancedSearch counts results for the log: exact, estimate or none"""
+    mode = getattr(settings, 'SEARCH_LOG_COUNT', 'estimate')
+    return mode if mode in COUNT_MODES else 'estimate'
+
+
+def planner_row_estimate(queryset):
+    """Row count estimated by the PostgreSQL planner, or None on other backends"""
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_result_count(queryset, limit=SEARCH_LOG_EXACT_COUNT_LIMIT):
+    """
+    Cheap result count for analytics
+
+    Counts exactly up to ``limit`` rows; beyond that the planner estimate
+    is used where available, otherwise ``limit`` as a lower bound.
+
+    Args:
+        queryset: Search results
+        limit: Largest result set counted exactly
+
+    Returns:
+        Exact or estimated number of results
+    """
+    if queryset._result_cache is not None:
+        return len(queryset._result_cache)
+
+    query = queryset.query
+    if query.high_mark is not None and query.high_mark - query.low_mark <= limit:
+        return queryset.count()
+
+    # COUNT over a LIMIT subquery stops scanning after limit + 1 rows
+    unordered = queryset if query.is_sliced else queryset.order_by()
+    bounded = unordered[:limit + 1].count()
+    if bounded <= limit:
+        return bounded
+
+    estimate = planner_row_estimate(queryset)
+    return max(estimate, bounded) if estimate is not None else limit
+
+
+def _serialize(record):
+    return json.dumps(record, cls=DjangoJSONEncoder)
+
+
+def _deserialize(payload):
+    record = json.loads(payload)
+    record['created_at'] = parse_datetime(record['created_at'])
+    return record
+
+
+class LocalSearchLogQueue:
+    """
+    Process-local queue
+
+    Without a shared store each process flushes its own queue once it
+    reaches SEARCH_LOG_FLUSH_SIZE records or SEARCH_LOG_FLUSH_INTERVAL age.
+    """
+
+    def __init__(self):
+        self._records = deque()
+        self._lock = threading.Lock()
+        self._oldest = None
+
+    def push(self, record):
+        with self._lock:
+            if not self._records:
+                self._oldest = time.monotonic()
+            self._records.append(_serialize(record))
+            return len(self._records)
+
+    def pop_batch(self, count):
+        with self._lock:
+            batch = [self._records.popleft() for _ in range(min(count, len(self._records)))]
+            self._oldest = time.monotonic() if self._records else None
+        return [_deserialize(payload) for payload in batch]
+
+    def is_due(self, size, interval):
+        with self._lock:
+            if not self._records:
+                return False
+            return len(self._records) >= size or time.monotonic() - self._oldest >= interval
+
+    def __len__(self):
+        return len(self._records)
+
+
+class RedisSearchLogQueue:
+    """Redis list shared by all workers, drained by the flush_search_logs task"""
+
+    KEY = 'search_log:queue'
+
+    def __init__(self, client):
+        self.client = client
+
+    def push(self, record):
+        return self.client.rpush(self.KEY, _serialize(record))
+
+    def pop_batch(self, count):
+        pipe = self.client.pipeline()
+        pipe.lrange(self.KEY, 0, count - 1)
+        pipe.ltrim(self.KEY, count, -1)
+        payloads, _ = pipe.execute()
+        return [_deserialize(payload) for payload in payloads]
+
+    def is_due(self, size, interval):
+        # The periodic task flushes the shared queue
+        return False
+
+    def __len__(self):
+        return self.client.llen(self.KEY)
+
+
+_local_queue = LocalSearchLogQueue()
+
+
+def get_search_log_queue():
+    """Redis queue when REDIS_URL is configured, otherwise the process-local queue"""
+    client = get_redis_client()
+    return RedisSearchLogQueue(client) if client is not None else _local_queue
+
+
+class SearchLogBuffer:
+    """Queues search records in the request path and flushes them with bulk_create"""
+
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else get_search_log_queue()
+        self.flush_size = getattr(settings, 'SEARCH_LOG_FLUSH_SIZE', SEARCH_LOG_FLUSH_SIZE)
+        self.flush_interval = getattr(settings, 'SEARCH_LOG_FLUSH_INTERVAL', SEARCH_LOG_FLUSH_INTERVAL)
+
+    def record(self, model_name, query, filters=None, result_count=None, user=None):
+        """Queue a search for logging"""
+        self.queue.push({
+            'user_id': getattr(user, 'pk', None),
+            'model_name': model_name,
+            'query': query or '',
+            'filters': filters or {},
+            'result_count': result_count,
+            'created_at': timezone.now(),
+        })
+        if self.queue.is_due(self.flush_size, self.flush_interval):
+            self.flush()
+
+    def flush(self, max_batches=None):
+        """
+        Write queued searches to SearchLog
+
+        Args:
+            max_batches: Stop after this many batches (None drains the queue)
+
+        Returns:
+            Number of SearchLog rows written
+        """
+        from .autocomplete import AutocompleteIndex
+        from .models import SearchLog
+
+        written = 0
+        batches = 0
+        index = AutocompleteIndex()
+
+        while max_batches is None or batches < max_batches:
+            records = self.queue.pop_batch(self.flush_size)
+            if not records:
+                break
+
+            try:
+                with transaction.atomic():
+                    SearchLog.objects.bulk_create(
+                        [SearchLog(**record) for record in records],
+                        batch_size=self.flush_size
+                    )
+            except Exception as e:
+                logger.warning(f"Search log batch insert failed, retrying row by row: {str(e)}")
+                records = self._insert_rows(records)
+            written += len(records)
+            batches += 1
+
+            popular = defaultdict(Counter)
+            for record in records:
+                if record['query']:
+                    popular[record['model_name']][record['query']] += 1
+            for model_label, counts in popular.items():
+                index.record_searches(model_label, counts)
+
+        if written:
+            logger.info(f"Flushed {written} search log records")
+        return written
+
+    @staticmethod
+    def _insert_rows(records):
+        """Insert records one at a time, dropping those that still fail; returns the written ones"""
+        from .models import SearchLog
+
+        written = []
+        for record in records:
+            try:
+                with transaction.atomic():
+                    SearchLog.objects.create(**record)
+            except Exception as e:
+                logger.error(f"Dropped search log record {_serialize(record)}: {str(e)}")
+            else:
+                written.append(record)
+        return written
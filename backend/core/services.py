@@ -383,7 +383,10 @@ class BaseService(Generic[ModelType]):
             instance = self.model(**data)
             instances.append(instance)
 
+        from .search import index_records
+
         created = self.model.objects.bulk_create(instances)
+        index_records(self.model._meta.label, [instance.pk for instance in created if instance.pk is not None])
         logger.info(f"Bulk created {len(created)} {self.model.__name__} instances")
         return created
 
@@ -404,7 +407,10 @@ class BaseService(Generic[ModelType]):
         Returns:
             Number of updated instances
         """
+        from .search import index_records
+
         count = self.model.objects.bulk_update(instances, fields)
+        index_records(self.model._meta.label, [instance.pk for instance in instances])
         logger.info(f"Bulk updated {count} {self.model.__name__} instances")
         return count
 
@@ -3,7 +3,7 @@ Django signals for enterprise features
 """
 
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -87,6 +87,43 @@ def model_updated(sender, instance, **kwargs):
             pass  # New instance, will be logged by post_save
 
 
+_LEAD_SCORING_INPUTS = None
+
+
+def _lead_scoring_inputs():
+    """Lead attributes read by rule-based scoring"""
+    global _LEAD_SCORING_INPUTS
+    if _LEAD_SCORING_INPUTS is None:
+        from .lead_scoring import RuleBasedScoring
+        _LEAD_SCORING_INPUTS = frozenset(RuleBasedScoring().input_fields())
+    return _LEAD_SCORING_INPUTS
+
+
+def _lead_scoring_values(instance):
+    # Read from __dict__ so deferred fields are never fetched
+    return {name: instance.__dict__.get(name) for name in _lead_scoring_inputs()}
+
+
+@receiver(post_init, sender='lead_management.Lead')
+def remember_lead_scoring_inputs(sender, instance, **kwargs):
+    """Snapshot rule-based scoring inputs as loaded from the database"""
+    instance._scoring_inputs = _lead_scoring_values(instance)
+
+
+@receiver(post_save, sender='lead_management.Lead')
+def mark_lead_for_rescoring(sender, instance, created, update_fields=None, **kwargs):
+    """Queue leads whose scoring inputs changed for incremental rescoring"""
+    from .lead_scoring import LeadScoreDirtySet
+
+    if update_fields is not None and not _lead_scoring_inputs().intersection(update_fields):
+        return
+
+    current = _lead_scoring_values(instance)
+    if created or current != getattr(instance, '_scoring_inputs', None):
+        LeadScoreDirtySet().add(instance.pk)
+    instance._scoring_inputs = current
+
+
 def schedule_health_checks():
     """Schedule periodic system health checks"""
     from django.core.management import call_command
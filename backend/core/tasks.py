@@ -18,7 +18,7 @@ def retrain_lead_scoring_model(self):
     Runs weekly to improve predictions based on new data
     """
     try:
-        from core.lead_scoring import LeadScoringEngine
+        from core.lead_scoring import LeadFeatureSnapshot, LeadScoringEngine
         from lead_management.models import Lead
 
         logger.info("Starting lead scoring model retraining...")
@@ -35,9 +35,10 @@ def retrain_lead_scoring_model(self):
                 'message': 'Insufficient training data'
             }
 
-        # Train model
+        # Train model, recomputing features only for leads changed since the last snapshot
         engine = LeadScoringEngine()
-        metrics = engine.train_model(leads)
+        training_data = LeadFeatureSnapshot().refresh(engine, leads)
+        metrics = engine.train_model(leads, training_data=training_data)
 
         # Save model
         engine.save_model()
@@ -138,6 +139,124 @@ def bulk_score_leads(self, lead_ids=None):
         }
 
 
+@shared_task(bind=True)
+def rescore_dirty_leads(self, batch_size=1000, max_batches=None):
+    """
+    Rescore leads whose rule-based scoring inputs changed
+    Runs periodically and only touches leads marked dirty by signals
+    """
+    try:
+        from core.lead_scoring import LeadScoringManager
+
+        stats = LeadScoringManager.rescore_dirty_leads(
+            batch_size=batch_size,
+            max_batches=max_batches
+        )
+
+        return {
+            'success': True,
+            **stats
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to rescore dirty leads: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+@shared_task(bind=True)
+def flush_search_logs(self, max_batches=None):
+    """
+    Write buffered search analytics to SearchLog
+    Runs periodically and drains the shared search log queue in batches
+    """
+    try:
+        from core.search_logging import SearchLogBuffer
+
+        written = SearchLogBuffer().flush(max_batches=max_batches)
+
+        return {
+            'success': True,
+            'written': written
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to flush search logs: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+@shared_task(bind=True, ignore_result=True)
+def build_autocomplete_index(self, model_label, field):
+    """
+    Build one autocomplete prefix index
+    Queued by core.autocomplete on the first suggestion for an unbuilt index
+    """
+    from core.autocomplete import AutocompleteIndex
+
+    try:
+        AutocompleteIndex().build(model_label, field, claimed=True)
+    except Exception as e:
+        logger.error(f"Failed to build autocomplete index {model_label}:{field}: {str(e)}")
+
+
+@shared_task(bind=True)
+def dispatch_workflow_timers(self, max_batches=None):
+    """
+    Resume waiting workflow instances whose resume_at has passed
+    Runs periodically; claims due instances in batches and fans them out
+    """
+    try:
+        from core.workflow_timers import WorkflowTimerScheduler
+
+        dispatched = WorkflowTimerScheduler().run_due(max_batches=max_batches)
+
+        return {
+            'success': True,
+            'dispatched': dispatched
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to dispatch workflow timers: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+@shared_task(bind=True, ignore_result=True)
+def resume_workflow_instances(self, instance_ids):
+    """
+    Resume a batch of workflow instances claimed by core.workflow_timers
+    Instances no longer waiting are skipped by resume_workflow
+    """
+    from core.workflow_services import WorkflowEngineService
+
+    engine = WorkflowEngineService()
+    for instance_id in instance_ids:
+        try:
+            engine.resume_workflow(instance_id)
+        except Exception as e:
+            logger.error(f"Failed to resume workflow instance {instance_id}: {str(e)}")
+
+
+@shared_task(bind=True, ignore_result=True)
+def refresh_cached_value(self, key, func_path, args, kwargs, ttl, stale_ttl, token):
+    """
+    Recompute a cached value that is being served stale
+    Queued by core.cache_coalescing; the refresh lock is released afterwards
+    """
+    from django.utils.module_loading import import_string
+
+    from core.cache_coalescing import get_coalescer
+
+    get_coalescer().refresh(key, import_string(func_path), ttl, stale_ttl, tuple(args), kwargs, token)
+
+
 @shared_task(bind=True, max_retries=3)
 def execute_workflow(self, workflow_id, trigger_data=None):
     """
@@ -166,26 +285,71 @@ def execute_workflow(self, workflow_id, trigger_data=None):
         raise self.retry(exc=e, countdown=60)
 
 
+# Resource types accepted by import_csv_data, besides full model labels
+IMPORT_RESOURCE_MODELS = {
+    'contacts': 'contact_management.Contact',
+    'leads': 'lead_management.Lead',
+    'opportunities': 'opportunity_management.Opportunity',
+}
+
+
 @shared_task(bind=True)
-def import_csv_data(self, resource_type, file_path, mapping, user_id):
+def import_csv_data(self, resource_type, file_path, mapping, user_id,
+                    mode=None, unique_fields=None, import_log_id=None):
     """
     Import CSV data in background
+    Upserts on the model's natural keys when configured, so re-importing
+    a file updates records instead of duplicating them
     """
+    importer = None
+
     try:
-        # Import logic here (similar to CSV import view)
-        # This is a placeholder for the actual implementation
+        from django.conf import settings
+        from django.contrib.auth import get_user_model
+
+        from core.data_operations import DataImporter, get_import_natural_keys
+        from core.models import DataImportLog
 
         logger.info(f"CSV import started for {resource_type}")
 
+        batch_size = getattr(settings, 'IMPORT_BATCH_SIZE', 1000)
+
+        if import_log_id:
+            # Continue an interrupted import from its last committed batch
+            import_log = DataImportLog.objects.get(id=import_log_id)
+            results = DataImporter.resume(import_log, file_obj=file_path, batch_size=batch_size)
+        else:
+            model_label = IMPORT_RESOURCE_MODELS.get(resource_type, resource_type)
+            user = get_user_model().objects.filter(id=user_id).first()
+            if mode is None:
+                mode = 'upsert' if unique_fields or get_import_natural_keys(model_label) else 'insert'
+
+            importer = DataImporter(
+                model_label,
+                file_path,
+                'csv',
+                field_mapping=mapping,
+                user=user,
+                mode=mode,
+                unique_fields=unique_fields
+            )
+            results = importer.import_data(batch_size=batch_size)
+
         return {
             'success': True,
             'resource_type': resource_type,
+            'imported': results['imported'],
+            'skipped': results['skipped'],
+            'duplicates': results['duplicates'],
+            'import_log_id': results['import_log_id'],
             'completed_at': timezone.now().isoformat()
         }
 
     except Exception as e:
         logger.error(f"Failed to import CSV: {str(e)}")
+        import_log = getattr(importer, 'import_log', None)
         return {
             'success': False,
-            'error': str(e)
+            'error': str(e),
+            'import_log_id': str(import_log.pk) if import_log else import_log_id
         }
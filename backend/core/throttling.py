@@ -5,8 +5,44 @@ Throttling classes for API endpoints
 
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
+from .rate_limiting import get_rate_limiter
 
-class BurstRateThrottle(UserRateThrottle):
+
+class RateLimiterThrottleMixin:
+    """
+    Count requests with the shared rate limiting engine instead of DRF's
+    cache-stored request history, which is not atomic across workers
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.result = get_rate_limiter(self.scope, self.num_requests, self.duration).hit(self.key)
+        return self.result.allowed
+
+    def wait(self):
+        result = getattr(self, 'result', None)
+        return result.retry_after if result is not None and not result.allowed else None
+
+
+class EngineUserRateThrottle(RateLimiterThrottleMixin, UserRateThrottle):
+    """
+    Per-user throttle on the shared rate limiting engine
+    """
+
+
+class EngineAnonRateThrottle(RateLimiterThrottleMixin, AnonRateThrottle):
+    """
+    Per-IP throttle for anonymous requests on the shared rate limiting engine
+    """
+
+
+class BurstRateThrottle(EngineUserRateThrottle):
     """
     Throttle for burst requests (short-term)
     """
@@ -14,7 +50,7 @@ class BurstRateThrottle(UserRateThrottle):
     rate = '60/minute'
 
 
-class SustainedRateThrottle(UserRateThrottle):
+class SustainedRateThrottle(EngineUserRateThrottle):
     """
     Throttle for sustained requests (long-term)
     """
@@ -22,7 +58,7 @@ class SustainedRateThrottle(UserRateThrottle):
     rate = '1000/hour'
 
 
-class AnonBurstRateThrottle(AnonRateThrottle):
+class AnonBurstRateThrottle(EngineAnonRateThrottle):
     """
     Throttle for anonymous burst requests
     """
@@ -30,7 +66,7 @@ class AnonBurstRateThrottle(AnonRateThrottle):
     rate = '20/minute'
 
 
-class AnonSustainedRateThrottle(AnonRateThrottle):
+class AnonSustainedRateThrottle(EngineAnonRateThrottle):
     """
     Throttle for anonymous sustained requests
     """
@@ -38,7 +74,7 @@ class AnonSustainedRateThrottle(AnonRateThrottle):
     rate = '100/hour'
 
 
-class ExportRateThrottle(UserRateThrottle):
+class ExportRateThrottle(EngineUserRateThrottle):
     """
     Special throttle for export operations (resource-intensive)
     """
@@ -46,7 +82,7 @@ class ExportRateThrottle(UserRateThrottle):
     rate = '10/hour'
 
 
-class SearchRateThrottle(UserRateThrottle):
+class SearchRateThrottle(EngineUserRateThrottle):
     """
     Throttle for search operations
     """
@@ -54,7 +90,7 @@ class SearchRateThrottle(UserRateThrottle):
     rate = '120/minute'
 
 
-class AIRateThrottle(UserRateThrottle):
+class AIRateThrottle(EngineUserRateThrottle):
     """
     Throttle for AI operations (computationally expensive)
     """
@@ -62,7 +98,7 @@ class AIRateThrottle(UserRateThrottle):
     rate = '30/minute'
 
 
-class BulkOperationThrottle(UserRateThrottle):
+class BulkOperationThrottle(EngineUserRateThrottle):
     """
     Throttle for bulk operations
     """
@@ -70,7 +106,7 @@ class BulkOperationThrottle(UserRateThrottle):
     rate = '5/hour'
 
 
-class WebhookThrottle(UserRateThrottle):
+class WebhookThrottle(EngineUserRateThrottle):
     """
     Throttle for webhook endpoints
     """
@@ -78,7 +114,7 @@ class WebhookThrottle(UserRateThrottle):
     rate = '1000/minute'
 
 
-class LoginRateThrottle(AnonRateThrottle):
+class LoginRateThrottle(EngineAnonRateThrottle):
     """
     Throttle for login attempts (security)
     """
@@ -86,7 +122,7 @@ class LoginRateThrottle(AnonRateThrottle):
     rate = '5/minute'
 
 
-class PasswordResetThrottle(AnonRateThrottle):
+class PasswordResetThrottle(EngineAnonRateThrottle):
     """
     Throttle for password reset attempts
     """
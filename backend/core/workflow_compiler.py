@@ -0,0 +1,207 @@
+"""
+Workflow Compilation
+Turns workflow conditions and templates into plain callables once per
+workflow version, so executing a node does no parsing
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+TEMPLATE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+MAX_COMPILED_WORKFLOWS = 256
+
+# Each returns True when the condition holds
+CONDITION_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    'equals': lambda field_value, value: field_value == value,
+    'not_equals': lambda field_value, value: field_value != value,
+    'contains': lambda field_value, value: value in str(field_value),
+    'greater_than': lambda field_value, value: bool(field_value and field_value > value),
+    'less_than': lambda field_value, value: bool(field_value and field_value < value),
+    'is_empty': lambda field_value, value: not field_value,
+    'is_not_empty': lambda field_value, value: bool(field_value),
+    'in': lambda field_value, value: field_value in value,
+}
+
+
+def _always_true(context: dict) -> bool:
+    return True
+
+
+def compile_path(path: str | None) -> Callable[[Any], Any]:
+    """Getter for a dotted path into nested dicts; missing keys give None"""
+    if not path:
+        return lambda data: None
+
+    keys = tuple(path.split('.'))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: data.get(key) if isinstance(data, dict) else None
+
+    def get(data):
+        for key in keys:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+    return get
+
+
+def compile_conditions(conditions: list[dict] | None) -> Callable[[dict], bool]:
+    """
+    Predicate that is True when every condition holds
+
+    Conditions with an unknown operator are ignored, as the interpreter
+    always did.
+    """
+    if not conditions:
+        return _always_true
+
+    checks = tuple(
+        (compile_path(condition.get('field')), CONDITION_OPERATORS[operator], condition.get('value'))
+        for condition in conditions
+        if (operator := condition.get('operator', 'equals')) in CONDITION_OPERATORS
+    )
+
+    def evaluate(context: dict) -> bool:
+        for get, operator, value in checks:
+            if not operator(get(context), value):
+                return False
+        return True
+    return evaluate
+
+
+def compile_template(template: str) -> Callable[[dict], str]:
+    """Renderer for ``{{dotted.path}}`` placeholders; None renders as ''"""
+    parts = TEMPLATE_PATTERN.split(template) if template else [template]
+    if len(parts) == 1:
+        return lambda context: template
+
+    literals = parts[0::2]
+    getters = tuple(zip((compile_path(path.strip()) for path in parts[1::2]), literals[1:], strict=True))
+    head = literals[0]
+
+    def render(context: dict) -> str:
+        out = [head]
+        for get, literal in getters:
+            value = get(context)
+            out.append('' if value is None else str(value))
+            out.append(literal)
+        return ''.join(out)
+    return render
+
+
+def _strings(value: Any) -> Iterator[str]:
+    """Every string inside a node config"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+@dataclass(frozen=True)
+class CompiledNode:
+    """Callables for one node's config"""
+    updated_at: Any
+    conditions: Callable[[dict], bool]
+    branches: tuple[tuple[str, Callable[[dict], bool]], ...]
+
+
+class CompiledWorkflow:
+    """
+    Compiled conditions and templates of one workflow version
+
+    Filled eagerly by compile_workflow when a workflow is activated or its
+    canvas saved, and lazily for anything met later (another process, a
+    node edited on its own). Nodes are recompiled when their updated_at
+    changes; connections are never edited in place, so they are keyed by pk.
+    """
+
+    def __init__(self, stamp: tuple, entry_conditions: list[dict] | None):
+        self.stamp = stamp
+        self.entry = compile_conditions(entry_conditions)
+        self.nodes: dict[Any, CompiledNode] = {}
+        self.connections: dict[Any, Callable[[dict], bool]] = {}
+        self.templates: dict[str, Callable[[dict], str]] = {}
+
+    def node(self, node) -> CompiledNode:
+        compiled = self.nodes.get(node.pk)
+        if compiled is None or compiled.updated_at != node.updated_at:
+            config = node.config or {}
+            compiled = self.nodes[node.pk] = CompiledNode(
+                updated_at=node.updated_at,
+                conditions=compile_conditions(config.get('conditions', [])),
+                branches=tuple(
+                    (branch.get('name'), compile_conditions(branch.get('conditions', [])))
+                    for branch in config.get('branches', [])
+                ),
+            )
+            for text in _strings(config):
+                self.template(text)
+        return compiled
+
+    def connection(self, connection) -> Callable[[dict], bool]:
+        compiled = self.connections.get(connection.pk)
+        if compiled is None:
+            condition = connection.condition
+            compiled = self.connections[connection.pk] = compile_conditions([condition] if condition else [])
+        return compiled
+
+    def template(self, text: str) -> Callable[[dict], str]:
+        compiled = self.templates.get(text)
+        if compiled is None:
+            compiled = self.templates[text] = compile_template(text)
+        return compiled
+
+
+_compiled: OrderedDict[str, CompiledWorkflow] = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def _stamp(workflow) -> tuple:
+    return (workflow.version, workflow.updated_at)
+
+
+def _store(workflow, compiled: CompiledWorkflow) -> None:
+    with _compiled_lock:
+        _compiled[str(workflow.pk)] = compiled
+        _compiled.move_to_end(str(workflow.pk))
+        while len(_compiled) > MAX_COMPILED_WORKFLOWS:
+            _compiled.popitem(last=False)
+
+
+def compile_workflow(workflow) -> CompiledWorkflow:
+    """Compile every node and connection of a workflow now"""
+    compiled = CompiledWorkflow(_stamp(workflow), workflow.entry_conditions)
+    for node in workflow.nodes.all():
+        compiled.node(node)
+    for connection in workflow.connections.all():
+        compiled.connection(connection)
+    _store(workflow, compiled)
+    return compiled
+
+
+def get_compiled_workflow(workflow) -> CompiledWorkflow:
+    """Compiled form of the workflow's current version, without querying"""
+    key = str(workflow.pk)
+    with _compiled_lock:
+        compiled = _compiled.get(key)
+        if compiled is not None and compiled.stamp == _stamp(workflow):
+            _compiled.move_to_end(key)
+            return compiled
+
+    compiled = CompiledWorkflow(_stamp(workflow), workflow.entry_conditions)
+    _store(workflow, compiled)
+    return compiled
+
+
+def clear_compiled_workflows() -> None:
+    with _compiled_lock:
+        _compiled.clear()
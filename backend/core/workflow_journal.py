@@ -0,0 +1,144 @@
+"""
+Workflow Execution Journal
+Buffers node executions, logs and instance updates while a workflow
+instance runs and writes them in a few bulk statements
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+LOG_LEVELS = ('all', 'summary')
+
+# What the 'summary' level keeps: failures and whole-run records
+SUMMARY_LOG_TYPES = frozenset({
+    'workflow_completed', 'workflow_failed', 'node_failed', 'error', 'warning',
+})
+
+# Executions in these states are always recorded; approvals point at
+# waiting executions and resuming needs them
+RECORDED_STATUSES = frozenset({'failed', 'waiting'})
+
+EXECUTION_UPDATE_FIELDS = [
+    'status', 'input_data', 'output_data', 'completed_at', 'execution_time_ms', 'error_message',
+]
+
+
+def get_log_level(workflow) -> str:
+    """Workflow's log level, falling back to the WORKFLOW_LOG_LEVEL setting"""
+    level = getattr(workflow, 'log_level', '') or getattr(settings, 'WORKFLOW_LOG_LEVEL', 'all')
+    return level if level in LOG_LEVELS else 'all'
+
+
+class ExecutionJournal:
+    """
+    Write-behind journal for one synchronous run segment of an instance
+
+    A segment runs from start_workflow or resume_workflow until the
+    instance waits, ends or fails. Node executions, logs and changed
+    instance fields are held in memory until flush(), which the engine
+    calls at each of those points, so the five or so writes each node used
+    to cost become a bulk_create per table and one instance update.
+
+    At the 'summary' level only failed and waiting executions are kept,
+    and only the log types in SUMMARY_LOG_TYPES.
+    """
+
+    def __init__(self, instance, level: str | None = None):
+        self.instance = instance
+        self.level = level or get_log_level(instance.workflow)
+        self.nodes_executed = 0
+        self._initial_status = instance.status
+        self._executions = {}
+        self._logs = []
+        self._instance_fields = set()
+
+    @property
+    def verbose(self) -> bool:
+        return self.level == 'all'
+
+    def start_node(self, node):
+        """Unsaved execution record for a node about to run"""
+        from .workflow_models import WorkflowNodeExecution
+
+        self.nodes_executed += 1
+        return WorkflowNodeExecution(
+            instance=self.instance,
+            node=node,
+            status='running',
+            started_at=timezone.now(),
+            input_data=None,
+        )
+
+    def record(self, execution) -> None:
+        """
+        Keep an execution for the next flush
+
+        Call before the node's output is merged into the instance context;
+        input_data is taken from the context at that point.
+        """
+        if not (self.verbose or execution.status in RECORDED_STATUSES or not execution._state.adding):
+            return
+        if execution.input_data is None:
+            execution.input_data = dict(self.instance.context)
+        self._executions[execution.pk] = execution
+
+    def save_execution(self, execution) -> None:
+        """Write an execution now, for handlers that need its primary key"""
+        if execution.input_data is None:
+            execution.input_data = dict(self.instance.context)
+        execution.save()
+        self._executions[execution.pk] = execution
+
+    def log(self, log_type: str, message: str, node_id: str = '', details: dict | None = None) -> None:
+        """Queue a WorkflowLog row if the level keeps this log type"""
+        from .workflow_models import WorkflowLog
+
+        if not self.verbose and log_type not in SUMMARY_LOG_TYPES:
+            return
+        self._logs.append(WorkflowLog(
+            instance=self.instance,
+            log_type=log_type,
+            node_id=node_id,
+            message=message,
+            details=details or {},
+        ))
+
+    def mark(self, *fields: str) -> None:
+        """Note instance fields to save at the next flush"""
+        self._instance_fields.update(fields)
+
+    def flush(self) -> None:
+        """Write everything buffered so far"""
+        from .workflow_models import WorkflowLog, WorkflowNodeExecution
+
+        if not (self._executions or self._logs or self._instance_fields):
+            return
+
+        executions = list(self._executions.values())
+        created = [execution for execution in executions if execution._state.adding]
+        updated = [execution for execution in executions if not execution._state.adding]
+
+        with transaction.atomic():
+            if created:
+                WorkflowNodeExecution.objects.bulk_create(created)
+            if updated:
+                WorkflowNodeExecution.objects.bulk_update(updated, EXECUTION_UPDATE_FIELDS)
+            if self._logs:
+                WorkflowLog.objects.bulk_create(self._logs)
+            if self._instance_fields:
+                self.instance.save(update_fields=sorted(self._instance_fields | {'last_activity_at'}))
+
+        self._executions.clear()
+        self._logs.clear()
+        self._instance_fields.clear()
+
+    def close(self) -> None:
+        """Log a summary if the segment ended the run, then flush"""
+        status = self.instance.status
+        if status != self._initial_status and status in ('completed', 'failed'):
+            details = {'nodes_executed': self.nodes_executed}
+            if status == 'failed':
+                details['error_node'] = self.instance.error_node
+            self.log(f'workflow_{status}', f'Workflow "{self.instance.workflow.name}" {status}', details=details)
+        self.flush()
@@ -7,6 +7,7 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class WorkflowDefinition(models.Model):
@@ -27,6 +28,11 @@ class WorkflowDefinition(models.Model):
         ('record_change', 'Record Change'),
     ]
 
+    LOG_LEVEL_CHOICES = [
+        ('all', 'Every Node'),
+        ('summary', 'Failures and Summaries'),
+    ]
+
     CATEGORY_CHOICES = [
         ('sales', 'Sales'),
         ('marketing', 'Marketing'),
@@ -65,6 +71,8 @@ class WorkflowDefinition(models.Model):
     allow_multiple = models.BooleanField(default=False)  # Multiple instances per record
     max_concurrent = models.IntegerField(blank=True)
     timeout_hours = models.IntegerField(blank=True)
+    # Blank uses settings.WORKFLOW_LOG_LEVEL
+    log_level = models.CharField(max_length=20, choices=LOG_LEVEL_CHOICES, blank=True)
 
     # Version control
     version = models.IntegerField(default=1)
@@ -271,6 +279,14 @@ class WorkflowInstance(models.Model):
     class Meta:
         db_table = 'workflow_instances'
         ordering = ['-started_at']
+        indexes = [
+            # Due-time index for core.workflow_timers
+            models.Index(
+                fields=['resume_at'],
+                name='workflow_instance_due_idx',
+                condition=models.Q(status='waiting'),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.workflow.name} - {self.status}"
@@ -330,7 +346,8 @@ class WorkflowNodeExecution(models.Model):
     )
     approval_comment = models.TextField(blank=True)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the node ran, not when the journal flushed it
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'workflow_node_executions'
@@ -590,7 +607,8 @@ class WorkflowLog(models.Model):
     message = models.TextField()
     details = models.JSONField(default=dict)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happened, not when the journal flushed it
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'workflow_logs'
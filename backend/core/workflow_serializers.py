@@ -92,7 +92,7 @@ class WorkflowDefinitionSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'category',
             'status', 'trigger_type', 'trigger_config',
             'entry_conditions', 'canvas_data',
-            'allow_multiple', 'max_concurrent', 'timeout_hours',
+            'allow_multiple', 'max_concurrent', 'timeout_hours', 'log_level',
             'version', 'is_template', 'shared_with',
             'run_count', 'success_count', 'failure_count',
             'nodes', 'connections', 'variables', 'triggers',
@@ -2,6 +2,7 @@
 Advanced Workflow Engine Services
 """
 
+from contextlib import contextmanager
 from datetime import timedelta
 from typing import Any
 
@@ -9,12 +10,23 @@ import openai
 from django.conf import settings
 from django.utils import timezone
 
+from .workflow_compiler import (
+    compile_conditions,
+    compile_path,
+    compile_template,
+    compile_workflow,
+    get_compiled_workflow,
+)
+from .workflow_journal import ExecutionJournal
+
 
 class WorkflowEngineService:
     """Main workflow execution engine"""
 
     def __init__(self, user=None):
         self.user = user
+        self._compiled = None
+        self._journal = None
 
     def start_workflow(
         self,
@@ -23,7 +35,7 @@ class WorkflowEngineService:
         target_object: tuple | None = None
     ) -> dict[str, Any]:
         """Start a new workflow instance"""
-        from .workflow_models import WorkflowDefinition, WorkflowInstance, WorkflowLog
+        from .workflow_models import WorkflowDefinition, WorkflowInstance
 
         workflow = WorkflowDefinition.objects.get(id=workflow_id)
 
@@ -31,9 +43,7 @@ class WorkflowEngineService:
             return {'error': 'Workflow is not active'}
 
         # Check entry conditions
-        if workflow.entry_conditions and not self._evaluate_conditions(
-            workflow.entry_conditions, trigger_data or {}
-        ):
+        if workflow.entry_conditions and not get_compiled_workflow(workflow).entry(trigger_data or {}):
             return {'error': 'Entry conditions not met'}
 
         # Check concurrent limit
@@ -57,26 +67,22 @@ class WorkflowEngineService:
             context={'trigger': trigger_data or {}}
         )
 
-        # Log start
-        WorkflowLog.objects.create(
-            instance=instance,
-            log_type='workflow_started',
-            message=f'Workflow "{workflow.name}" started'
-        )
-
         # Update workflow stats
         workflow.run_count += 1
         workflow.save(update_fields=['run_count'])
 
-        # Find start node and execute
-        start_node = self._find_start_node(workflow)
+        with self._segment(instance) as journal:
+            journal.log('workflow_started', f'Workflow "{workflow.name}" started')
 
-        if start_node:
-            instance.current_node = start_node.node_id
-            instance.save(update_fields=['current_node'])
+            # Find start node and execute
+            start_node = self._find_start_node(workflow)
 
-            # Execute first node
-            self._execute_node(instance, start_node)
+            if start_node:
+                instance.current_node = start_node.node_id
+                journal.mark('current_node')
+
+                # Execute first node
+                self._execute_node(instance, start_node)
 
         return {
             'instance_id': str(instance.id),
@@ -85,6 +91,21 @@ class WorkflowEngineService:
             'started_at': instance.started_at.isoformat()
         }
 
+    @contextmanager
+    def _segment(self, instance):
+        """
+        Journal the writes of one synchronous run of an instance
+
+        Everything buffered is flushed when the run waits, ends or fails,
+        which is where the segment returns.
+        """
+        journal = self._journal = ExecutionJournal(instance)
+        try:
+            yield journal
+        finally:
+            self._journal = None
+            journal.close()
+
     def _find_start_node(self, workflow):
         """Find the starting node of a workflow"""
 
@@ -101,23 +122,12 @@ class WorkflowEngineService:
 
     def _execute_node(self, instance, node):
         """Execute a workflow node"""
-        from .workflow_models import WorkflowLog, WorkflowNodeExecution
+        self._compiled_for(instance)
+        journal = self._journal
 
         # Create execution record
-        execution = WorkflowNodeExecution.objects.create(
-            instance=instance,
-            node=node,
-            status='running',
-            started_at=timezone.now(),
-            input_data=instance.context
-        )
-
-        WorkflowLog.objects.create(
-            instance=instance,
-            log_type='node_started',
-            node_id=node.node_id,
-            message=f'Executing node: {node.name}'
-        )
+        execution = journal.start_node(node)
+        journal.log('node_started', f'Executing node: {node.name}', node_id=node.node_id)
 
         try:
             # Route to appropriate handler
@@ -131,20 +141,16 @@ class WorkflowEngineService:
             execution.execution_time_ms = int(
                 (execution.completed_at - execution.started_at).total_seconds() * 1000
             )
-            execution.save()
+            journal.record(execution)
 
             # Update context with output
-            instance.context = {
-                **instance.context,
-                f'node_{node.node_id}': result.get('output', {})
-            }
-            instance.save(update_fields=['context'])
+            instance.context[f'node_{node.node_id}'] = result.get('output', {})
+            journal.mark('context')
 
-            WorkflowLog.objects.create(
-                instance=instance,
-                log_type='node_completed',
+            journal.log(
+                'node_completed',
+                f'Node completed: {node.name}',
                 node_id=node.node_id,
-                message=f'Node completed: {node.name}',
                 details=result.get('output', {})
             )
 
@@ -153,7 +159,8 @@ class WorkflowEngineService:
                 instance.status = 'waiting'
                 instance.resume_at = result.get('resume_at')
                 instance.resume_data = result.get('resume_data', {})
-                instance.save()
+                journal.mark('status', 'resume_at', 'resume_data')
+                journal.flush()
             elif result.get('status') == 'completed':
                 # Find and execute next node
                 self._proceed_to_next(instance, node, result)
@@ -350,11 +357,9 @@ class WorkflowEngineService:
 
     def _handle_condition(self, instance, node, execution) -> dict:
         """Evaluate condition node"""
-        config = node.config
         context = instance.context
 
-        conditions = config.get('conditions', [])
-        result = self._evaluate_conditions(conditions, context)
+        result = self._compiled_for(instance).node(node).conditions(context)
 
         return {
             'status': 'completed',
@@ -366,15 +371,12 @@ class WorkflowEngineService:
 
     def _handle_branch(self, instance, node, execution) -> dict:
         """Handle branch/split node"""
-        config = node.config
         context = instance.context
 
-        branches = config.get('branches', [])
-        selected_branches = []
-
-        for branch in branches:
-            if self._evaluate_conditions(branch.get('conditions', []), context):
-                selected_branches.append(branch.get('name'))
+        selected_branches = [
+            name for name, conditions in self._compiled_for(instance).node(node).branches
+            if conditions(context)
+        ]
 
         return {
             'status': 'completed',
@@ -423,6 +425,7 @@ class WorkflowEngineService:
         description = self._render_template(config.get('description', ''), context)
 
         # Create approval request
+        self._journal.save_execution(execution)
         approval = WorkflowApprovalRequest.objects.create(
             node_execution=execution,
             approver_id=approver_id,
@@ -460,6 +463,7 @@ class WorkflowEngineService:
 
         title = self._render_template(config.get('title', 'Approval Required'), context)
 
+        self._journal.save_execution(execution)
         approval_ids = []
         for approver_id in approver_ids:
             approval = WorkflowApprovalRequest.objects.create(
@@ -536,7 +540,7 @@ class WorkflowEngineService:
         """Handle successful end of workflow"""
         instance.status = 'completed'
         instance.completed_at = timezone.now()
-        instance.save()
+        self._journal.mark('status', 'completed_at')
 
         # Update workflow stats
         instance.workflow.success_count += 1
@@ -551,7 +555,7 @@ class WorkflowEngineService:
         """Handle failed end of workflow"""
         instance.status = 'failed'
         instance.completed_at = timezone.now()
-        instance.save()
+        self._journal.mark('status', 'completed_at')
 
         instance.workflow.failure_count += 1
         instance.workflow.save(update_fields=['failure_count'])
@@ -577,11 +581,12 @@ class WorkflowEngineService:
             workflow=instance.workflow,
             source_node=current_node.node_id
         ).order_by('priority')
+        compiled = self._compiled_for(instance)
 
         for conn in connections:
             # Check condition if present
             if conn.condition:
-                if not self._evaluate_conditions([conn.condition], result.get('output', {})):
+                if not compiled.connection(conn)(result.get('output', {})):
                     continue
 
             # Check for branch matching
@@ -598,7 +603,7 @@ class WorkflowEngineService:
                 )
 
                 instance.current_node = next_node.node_id
-                instance.save(update_fields=['current_node'])
+                self._journal.mark('current_node')
 
                 self._execute_node(instance, next_node)
                 return
@@ -608,22 +613,22 @@ class WorkflowEngineService:
         # No valid next node - workflow complete
         instance.status = 'completed'
         instance.completed_at = timezone.now()
-        instance.save()
+        self._journal.mark('status', 'completed_at')
+        self._journal.flush()
 
     def _handle_node_error(self, instance, node, execution, error_message):
         """Handle node execution error"""
-        from .workflow_models import WorkflowLog
+        journal = self._journal
 
         execution.status = 'failed'
         execution.error_message = error_message
         execution.completed_at = timezone.now()
-        execution.save()
+        journal.record(execution)
 
-        WorkflowLog.objects.create(
-            instance=instance,
-            log_type='node_failed',
+        journal.log(
+            'node_failed',
+            f'Node failed: {error_message}',
             node_id=node.node_id,
-            message=f'Node failed: {error_message}',
             details={'error': error_message}
         )
 
@@ -641,88 +646,37 @@ class WorkflowEngineService:
                 instance.status = 'failed'
                 instance.error_message = error_message
                 instance.error_node = node.node_id
-                instance.save()
+                journal.mark('status', 'error_message', 'error_node')
+                journal.flush()
         else:
             instance.status = 'failed'
             instance.error_message = error_message
             instance.error_node = node.node_id
             instance.completed_at = timezone.now()
-            instance.save()
+            journal.mark('status', 'error_message', 'error_node', 'completed_at')
+            journal.flush()
 
             instance.workflow.failure_count += 1
             instance.workflow.save(update_fields=['failure_count'])
 
+    def _compiled_for(self, instance):
+        """Compiled conditions and templates of the instance's workflow version"""
+        self._compiled = get_compiled_workflow(instance.workflow)
+        return self._compiled
+
     def _evaluate_conditions(self, conditions: list[dict], context: dict) -> bool:
         """Evaluate conditions against context"""
-        if not conditions:
-            return True
-
-        for condition in conditions:
-            field = condition.get('field')
-            operator = condition.get('operator', 'equals')
-            value = condition.get('value')
-
-            field_value = self._get_nested_value(context, field)
-
-            if operator == 'equals':
-                if field_value != value:
-                    return False
-            elif operator == 'not_equals':
-                if field_value == value:
-                    return False
-            elif operator == 'contains':
-                if value not in str(field_value):
-                    return False
-            elif operator == 'greater_than':
-                if not (field_value and field_value > value):
-                    return False
-            elif operator == 'less_than':
-                if not (field_value and field_value < value):
-                    return False
-            elif operator == 'is_empty':
-                if field_value:
-                    return False
-            elif operator == 'is_not_empty':
-                if not field_value:
-                    return False
-            elif operator == 'in' and field_value not in value:
-                return False
-
-        return True
+        return compile_conditions(conditions)(context)
 
     def _get_nested_value(self, data: dict, path: str) -> Any:
         """Get nested value from dict using dot notation"""
-        if not path:
-            return None
-
-        keys = path.split('.')
-        value = data
-
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-            else:
-                return None
-
-        return value
+        return compile_path(path)(data)
 
     def _render_template(self, template: str, context: dict) -> str:
         """Render template string with context variables"""
-        if not template:
-            return template
-
-        result = template
-
-        # Replace {{variable}} patterns
-        import re
-        pattern = r'\{\{([^}]+)\}\}'
-
-        def replace(match):
-            path = match.group(1).strip()
-            value = self._get_nested_value(context, path)
-            return str(value) if value is not None else ''
-
-        return re.sub(pattern, replace, result)
+        if self._compiled is not None:
+            return self._compiled.template(template)(context)
+        return compile_template(template)(context)
 
     def resume_workflow(self, instance_id: str, resume_data: dict | None = None):
         """Resume a waiting workflow"""
@@ -738,24 +692,26 @@ class WorkflowEngineService:
             instance.context = {**instance.context, 'resume': resume_data}
 
         instance.status = 'running'
-        instance.save()
 
-        # Get current node and proceed
-        try:
-            current_node = WorkflowNode.objects.get(
-                workflow=instance.workflow,
-                node_id=instance.current_node
-            )
+        with self._segment(instance) as journal:
+            journal.mark('status', 'context')
 
-            self._proceed_to_next(instance, current_node, {
-                'status': 'completed',
-                'output': resume_data or {}
-            })
+            # Get current node and proceed
+            try:
+                current_node = WorkflowNode.objects.get(
+                    workflow=instance.workflow,
+                    node_id=instance.current_node
+                )
 
-        except WorkflowNode.DoesNotExist:
-            instance.status = 'failed'
-            instance.error_message = 'Current node not found'
-            instance.save()
+                self._proceed_to_next(instance, current_node, {
+                    'status': 'completed',
+                    'output': resume_data or {}
+                })
+
+            except WorkflowNode.DoesNotExist:
+                instance.status = 'failed'
+                instance.error_message = 'Current node not found'
+                journal.mark('error_message')
 
         return {
             'instance_id': str(instance.id),
@@ -910,6 +866,8 @@ class WorkflowDesignerService:
                 label=conn_data.get('label', '')
             )
 
+        compile_workflow(workflow)
+
         return {
             'workflow_id': str(workflow.id),
             'nodes_count': workflow.nodes.count(),
@@ -932,6 +890,7 @@ class WorkflowDesignerService:
 
         workflow.status = 'active'
         workflow.save(update_fields=['status', 'updated_at'])
+        compile_workflow(workflow)
 
         return {
             'workflow_id': str(workflow.id),
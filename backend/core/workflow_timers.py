@@ -0,0 +1,250 @@
+"""
+Workflow Timers
+Resumes waiting workflow instances when their resume_at comes due
+
+WorkflowInstance.resume_at, under a partial index on waiting instances, is
+the durable timer store. Due instances are claimed in batches with
+SELECT ... FOR UPDATE SKIP LOCKED and handed to Celery workers as one
+group, so any number of schedulers can run side by side. A claim moves
+resume_at forward by a lease; if the worker dies the timer fires again
+once the lease runs out.
+
+The dispatch_workflow_timers beat task sweeps everything overdue. For
+second-level precision without rescanning, run_workflow_timers keeps the
+timers due within the next WORKFLOW_TIMER_HORIZON seconds in a
+hierarchical TimerWheel and claims exactly the instances it fires.
+"""
+
+import logging
+import math
+import time
+from collections.abc import Callable, Hashable, Iterable
+from datetime import UTC, datetime, timedelta
+
+from celery import group
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_TIMER_BATCH_SIZE = 500
+WORKFLOW_TIMER_DISPATCH_SIZE = 50  # instances per worker task
+WORKFLOW_TIMER_LEASE = 300  # seconds
+WORKFLOW_TIMER_HORIZON = 60  # seconds of timers held in the wheel
+WORKFLOW_TIMER_REFILL_INTERVAL = 10  # seconds
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel
+
+    Level 0 has one slot per tick; each higher level has slots spanning a
+    whole lower wheel, so with 64 slots and four levels a one-second wheel
+    covers about 194 days, and anything later waits in an overflow list.
+    Scheduling is O(1). Entries in a higher-level slot cascade down when
+    the wheel below wraps round to that slot, and fire from level 0 on
+    their tick.
+
+    Cancelling or rescheduling leaves the old entry in its slot; it is
+    skipped when reached.
+    """
+
+    def __init__(self, start: float, tick: float = 1.0, slot_bits: int = 6, levels: int = 4):
+        self.tick = tick
+        self.slot_bits = slot_bits
+        self.levels = levels
+        self.mask = (1 << slot_bits) - 1
+        self.current = int(start // tick)
+        self.wheels = [[[] for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.overflow: list[tuple[Hashable, int]] = []
+        self.ready: list[tuple[Hashable, int]] = []
+        self._due: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key) -> bool:
+        return key in self._due
+
+    def schedule(self, key: Hashable, due: float) -> None:
+        """Fire ``key`` at timestamp ``due``; replaces any earlier schedule"""
+        due_tick = math.ceil(due / self.tick)
+        if self._due.get(key) == due_tick:
+            return
+        self._due[key] = due_tick
+        self._place(key, due_tick)
+
+    def cancel(self, key: Hashable) -> None:
+        self._due.pop(key, None)
+
+    def advance(self, now: float) -> list[Hashable]:
+        """Move the wheel to ``now`` and return the keys that came due"""
+        fired = []
+        target = int(now // self.tick)
+
+        level0 = self.wheels[0]
+        while self.current < target:
+            self.current += 1
+            index = self.current & self.mask
+            if not index:
+                self._cascade()
+            if level0[index]:
+                self._fire(level0[index], fired)
+                level0[index] = []
+
+        # Scheduled in the past, or cascaded onto the tick being fired
+        if self.ready:
+            self._fire(self.ready, fired)
+            self.ready = []
+        return fired
+
+    def _fire(self, entries: list[tuple[Hashable, int]], fired: list) -> None:
+        for key, due_tick in entries:
+            if self._due.get(key) == due_tick:
+                del self._due[key]
+                fired.append(key)
+
+    def _place(self, key, due_tick: int) -> None:
+        delta = due_tick - self.current
+        if delta <= 0:
+            self.ready.append((key, due_tick))
+            return
+        level = (delta.bit_length() - 1) // self.slot_bits
+        if level < self.levels:
+            shift = self.slot_bits * level
+            self.wheels[level][(due_tick >> shift) & self.mask].append((key, due_tick))
+        else:
+            self.overflow.append((key, due_tick))
+
+    def _cascade(self) -> None:
+        """Move entries down from higher wheels whose slot has come round"""
+        for level in range(1, self.levels + 1):
+            if level > 1 and (self.current >> (self.slot_bits * (level - 1))) & self.mask:
+                return
+            if level == self.levels:
+                entries, self.overflow = self.overflow, []
+            else:
+                index = (self.current >> (self.slot_bits * level)) & self.mask
+                entries, self.wheels[level][index] = self.wheels[level][index], []
+            for key, due_tick in entries:
+                if self._due.get(key) == due_tick:
+                    self._place(key, due_tick)
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class WorkflowTimerScheduler:
+    """Claims due waiting instances and fans their resumption out to workers"""
+
+    def __init__(
+        self,
+        batch_size: int = WORKFLOW_TIMER_BATCH_SIZE,
+        dispatch_size: int = WORKFLOW_TIMER_DISPATCH_SIZE,
+        lease: int = WORKFLOW_TIMER_LEASE,
+        horizon: int = WORKFLOW_TIMER_HORIZON,
+    ):
+        self.batch_size = batch_size
+        self.dispatch_size = dispatch_size
+        self.lease = lease
+        self.horizon = horizon
+
+    def claim_due(self, now=None, instance_ids: list | None = None) -> list[str]:
+        """
+        Claim up to batch_size due instances
+
+        Rows locked by another scheduler are skipped. Claimed rows get
+        resume_at pushed out by the lease, so they are not claimed again
+        unless the resume never happens.
+
+        Args:
+            now: Current time, defaults to timezone.now()
+            instance_ids: Only consider these instances
+
+        Returns:
+            Claimed instance ids as strings
+        """
+        from .workflow_models import WorkflowInstance
+
+        now = now or timezone.now()
+        due = WorkflowInstance.objects.filter(status='waiting', resume_at__lte=now)
+        if instance_ids is not None:
+            due = due.filter(pk__in=instance_ids)
+
+        with transaction.atomic():
+            claimed = list(
+                due.order_by('resume_at')
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:self.batch_size]
+            )
+            if claimed:
+                WorkflowInstance.objects.filter(pk__in=claimed).update(
+                    resume_at=now + timedelta(seconds=self.lease)
+                )
+        return [str(pk) for pk in claimed]
+
+    def dispatch(self, instance_ids: list[str]) -> None:
+        """Queue resumption of claimed instances as one Celery group"""
+        from .tasks import resume_workflow_instances
+
+        if instance_ids:
+            group(
+                resume_workflow_instances.s(chunk) for chunk in _chunks(instance_ids, self.dispatch_size)
+            ).apply_async()
+
+    def run_due(self, now=None, max_batches: int | None = None) -> int:
+        """Claim and dispatch everything due; returns the number dispatched"""
+        dispatched = batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed = self.claim_due(now)
+            if not claimed:
+                break
+            self.dispatch(claimed)
+            dispatched += len(claimed)
+            batches += 1
+            if len(claimed) < self.batch_size:
+                break
+        return dispatched
+
+    def refill(self, wheel: TimerWheel, now: float) -> int:
+        """Load timers due within the horizon into the wheel"""
+        from .workflow_models import WorkflowInstance
+
+        until = datetime.fromtimestamp(now + self.horizon, tz=UTC)
+        timers = WorkflowInstance.objects.filter(
+            status='waiting', resume_at__lte=until
+        ).values_list('pk', 'resume_at')
+
+        loaded = 0
+        for pk, resume_at in timers.iterator(chunk_size=self.batch_size):
+            wheel.schedule(str(pk), resume_at.timestamp())
+            loaded += 1
+        return loaded
+
+    def run_forever(
+        self,
+        tick: float = 1.0,
+        refill_interval: float = WORKFLOW_TIMER_REFILL_INTERVAL,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> None:
+        """Fire timers from a wheel, refilling it from the database periodically"""
+        wheel = TimerWheel(start=time.time(), tick=tick)
+        next_refill = 0.0
+
+        while not should_stop():
+            now = time.time()
+            if now >= next_refill:
+                self.refill(wheel, now)
+                next_refill = now + refill_interval
+
+            fired = wheel.advance(now)
+            for chunk in _chunks(fired, self.batch_size):
+                try:
+                    self.dispatch(self.claim_due(instance_ids=chunk))
+                except Exception as e:
+                    # Unclaimed timers are still due and come back on the next refill
+                    logger.error(f"Failed to dispatch workflow timers: {str(e)}")
+
+            time.sleep(max(0.0, tick - (time.time() - now)))
@@ -5,15 +5,30 @@ Automates business processes with triggers and actions
 
 import json
 import logging
-
-from celery import shared_task
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from celery import group, shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
+from .cache_utils import CacheManager
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Seconds a process trusts its trigger index before checking the shared version
+WORKFLOW_TRIGGER_INDEX_CHECK_INTERVAL = 5.0
+TRIGGER_INDEX_NAMESPACE = 'workflow_triggers'
+ANY = '*'
+
 
 class WorkflowEngine:
     """Central workflow automation engine"""
@@ -316,39 +331,152 @@ def execute_workflow_async(workflow_id, trigger_data=None):
         logger.error(f"Error executing workflow {workflow_id}: {str(e)}")
 
 
+@dataclass(frozen=True)
+class IndexedWorkflow:
+    """An active workflow with its trigger rules extracted"""
+    workflow_id: str
+    trigger_type: str
+    rules: tuple[tuple[str, str, Any], ...]
+
+    def matches(self, record, field_changes=None) -> bool:
+        return all(
+            WorkflowEngine._evaluate_condition(record, field, operator, value, field_changes)
+            for field, operator, value in self.rules
+        )
+
+
+class WorkflowTriggerIndex:
+    """
+    Record-triggered workflows indexed by (model, trigger type, changed field)
+
+    Built once per process from the active workflows and rebuilt when a
+    workflow is saved or deleted here, or when another process bumps the
+    shared version (checked every WORKFLOW_TRIGGER_INDEX_CHECK_INTERVAL
+    seconds). Workflows are scoped to models through an optional
+    ``trigger_conditions['model']`` (a name or list of names); without it
+    they apply to every model. Workflows with a ``changed``/``changed_to``
+    rule are indexed under that field, so saves that leave it alone never
+    look at them.
+    """
+
+    TRIGGER_TYPES = ('record_created', 'record_updated', 'field_changed')
+    CHANGE_OPERATORS = ('changed', 'changed_to')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def candidates(self, model_name, trigger_types, changed_fields=()) -> list[IndexedWorkflow]:
+        """Workflows that can match a save of ``model_name``"""
+        entries = self._get_entries()
+        fields = [ANY, *changed_fields]
+        seen, found = set(), []
+        for model in (model_name.lower(), ANY):
+            for trigger_type in trigger_types:
+                for field in fields:
+                    for workflow in entries.get((model, trigger_type, field), ()):
+                        if workflow.workflow_id not in seen:
+                            seen.add(workflow.workflow_id)
+                            found.append(workflow)
+        return found
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+
+    def _get_entries(self) -> dict[tuple[str, str, str], list[IndexedWorkflow]]:
+        now = time.monotonic()
+        interval = getattr(settings, 'WORKFLOW_TRIGGER_INDEX_CHECK_INTERVAL', WORKFLOW_TRIGGER_INDEX_CHECK_INTERVAL)
+        entries = self._entries
+        if entries is not None and now - self._checked_at < interval:
+            return entries
+
+        version = CacheManager.namespace_version(TRIGGER_INDEX_NAMESPACE)
+        with self._lock:
+            if self._entries is None or version != self._version:
+                self._entries = self._build()
+                self._version = version
+            self._checked_at = now
+            return self._entries
+
+    @classmethod
+    def _build(cls) -> dict[tuple[str, str, str], list[IndexedWorkflow]]:
+        from .models import Workflow
+
+        entries = defaultdict(list)
+        workflows = Workflow.objects.filter(
+            status='active', trigger_type__in=cls.TRIGGER_TYPES
+        ).only('id', 'trigger_type', 'trigger_conditions')
+
+        for workflow in workflows:
+            conditions = workflow.trigger_conditions or {}
+            rules = tuple(
+                (rule.get('field'), rule.get('operator'), rule.get('value'))
+                for rule in conditions.get('rules', [])
+            )
+            changed = [field for field, operator, _ in rules if operator in cls.CHANGE_OPERATORS]
+            if changed and workflow.trigger_type == 'record_created':
+                # Creates carry no field changes, so these can never match
+                continue
+
+            models = conditions.get('model') or ANY
+            if isinstance(models, str):
+                models = [models]
+            entry = IndexedWorkflow(str(workflow.id), workflow.trigger_type, rules)
+            for model in models:
+                entries[(model.lower(), workflow.trigger_type, changed[0] if changed else ANY)].append(entry)
+
+        logger.debug(f"Built workflow trigger index with {len(entries)} keys")
+        return dict(entries)
+
+
+trigger_index = WorkflowTriggerIndex()
+
+
+def _invalidate_trigger_index(sender, instance, **kwargs):
+    def bump():
+        trigger_index.invalidate()
+        CacheManager.bump_namespace(TRIGGER_INDEX_NAMESPACE)
+
+    transaction.on_commit(bump)
+
+
+def register_workflow_trigger_signals():
+    """Rebuild trigger indexes when workflows change"""
+    post_save.connect(
+        _invalidate_trigger_index, sender='core.Workflow',
+        dispatch_uid='workflow_trigger_index_save'
+    )
+    post_delete.connect(
+        _invalidate_trigger_index, sender='core.Workflow',
+        dispatch_uid='workflow_trigger_index_delete'
+    )
+
+
 class WorkflowTriggerManager:
     """Manages workflow triggers"""
 
     @staticmethod
     def on_record_created(model_name, record):
         """Trigger workflows when a record is created"""
-        from .models import Workflow
-
-        workflows = Workflow.objects.filter(
-            trigger_type='record_created',
-            status='active'
-        )
-
         trigger_data = {
             'model': model_name,
             'record_id': record.pk,
             'action': 'created'
         }
 
-        for workflow in workflows:
-            if WorkflowEngine.check_trigger_conditions(workflow, record):
-                execute_workflow_async.delay(str(workflow.id), trigger_data)
+        workflow_ids = [
+            workflow.workflow_id
+            for workflow in trigger_index.candidates(model_name, ['record_created'])
+            if workflow.matches(record)
+        ]
+        WorkflowTriggerManager._enqueue(workflow_ids, trigger_data)
 
     @staticmethod
     def on_record_updated(model_name, record, field_changes=None):
         """Trigger workflows when a record is updated"""
-        from .models import Workflow
-
-        workflows = Workflow.objects.filter(
-            trigger_type__in=['record_updated', 'field_changed'],
-            status='active'
-        )
-
         trigger_data = {
             'model': model_name,
             'record_id': record.pk,
@@ -356,6 +484,17 @@ class WorkflowTriggerManager:
             'changes': field_changes or {}
         }
 
-        for workflow in workflows:
-            if WorkflowEngine.check_trigger_conditions(workflow, record, field_changes):
-                execute_workflow_async.delay(str(workflow.id), trigger_data)
+        candidates = trigger_index.candidates(
+            model_name, ['record_updated', 'field_changed'], list(field_changes or ())
+        )
+        workflow_ids = [
+            workflow.workflow_id for workflow in candidates
+            if workflow.matches(record, field_changes)
+        ]
+        WorkflowTriggerManager._enqueue(workflow_ids, trigger_data)
+
+    @staticmethod
+    def _enqueue(workflow_ids, trigger_data):
+        """Queue all matched workflows in one round trip to the broker"""
+        if workflow_ids:
+            group(execute_workflow_async.s(workflow_id, trigger_data) for workflow_id in workflow_ids).apply_async()
@@ -96,11 +96,12 @@ def __getattr__(name):
 
     # Caching
     if name in ('CacheManager', 'MultiTierCache', 'InMemoryCache', 'RedisCache',
-                'CacheStampedeProtection', 'CircuitBreaker', 'cached',
+                'CacheSerializer', 'CacheStampedeProtection', 'CircuitBreaker', 'cached',
                 'cache_invalidate', 'CachedModelMixin'):
         from .caching import (
             CachedModelMixin,
             CacheManager,
+            CacheSerializer,
             CacheStampedeProtection,
             CircuitBreaker,
             InMemoryCache,
@@ -120,7 +121,8 @@ def __getattr__(name):
         return graphql_view
 
     # Database
-    if name in ('ReadReplicaRouter', 'ReplicaContext', 'ConnectionPoolManager',
+    if name in ('ReadReplicaRouter', 'ReplicaContext', 'ReplicaHealthMonitor',
+                'ReplicaStickinessMiddleware', 'ConnectionPoolManager',
                 'QueryAnalyzer', 'SlowQueryLogger', 'PartitionManager',
                 'DatabaseHealthMonitor', 'QueryOptimizer', 'use_primary',
                 'log_slow_queries', 'query_timer'):
@@ -132,6 +134,8 @@ def __getattr__(name):
             QueryOptimizer,
             ReadReplicaRouter,
             ReplicaContext,
+            ReplicaHealthMonitor,
+            ReplicaStickinessMiddleware,
             SlowQueryLogger,
             log_slow_queries,
             query_timer,
@@ -221,6 +225,7 @@ __all__ = [
     'MultiTierCache',
     'InMemoryCache',
     'RedisCache',
+    'CacheSerializer',
     'CacheStampedeProtection',
     'CircuitBreaker',
     'cached',
@@ -234,6 +239,8 @@ __all__ = [
     # Database
     'ReadReplicaRouter',
     'ReplicaContext',
+    'ReplicaHealthMonitor',
+    'ReplicaStickinessMiddleware',
     'ConnectionPoolManager',
     'QueryAnalyzer',
     'SlowQueryLogger',
@@ -18,11 +18,16 @@ Version: 1.0.0
 import builtins
 import contextlib
 import hashlib
+import importlib
+import itertools
+import json
 import logging
 import pickle
-import random
+import sys
 import threading
 import time
+import uuid
+import weakref
 import zlib
 from abc import ABC, abstractmethod
 from collections import OrderedDict
@@ -118,116 +123,444 @@ class CacheBackend(ABC):
         pass
 
 
-class InMemoryCache(CacheBackend):
+# Sizes of containers are estimated from a sample of their items
+SIZE_SAMPLE_ITEMS = 8
+# Share of each shard's capacity reserved for entries hit more than once
+PROTECTED_FRACTION = 0.8
+# Shards are only added once each would hold at least this many entries
+MIN_SHARD_ENTRIES = 64
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Cheap approximation of a value's memory footprint in bytes.
+
+    Walks one level into containers and extrapolates from a sample of
+    their items, instead of serializing the whole value.
     """
-    LRU-based in-memory cache (L1).
-    Thread-safe with TTL support.
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        count = len(value)
+        if count:
+            sample = list(itertools.islice(value.items(), SIZE_SAMPLE_ITEMS))
+            sampled = sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in sample)
+            size += sampled * count // len(sample)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if count:
+            sample = list(itertools.islice(value, SIZE_SAMPLE_ITEMS))
+            size += sum(sys.getsizeof(item) for item in sample) * count // len(sample)
+    elif hasattr(value, '__dict__'):
+        size += sys.getsizeof(value.__dict__)
+    return size
+
+
+class _Slot:
+    """Stored value with its expiry and estimated size."""
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: float | None, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class _CacheShard:
     """
+    One independently locked segment of the L1 cache.
 
-    def __init__(self, max_size: int = 10000, default_ttl: int = 300):
-        self.max_size = max_size
-        self.default_ttl = default_ttl
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._lock = threading.RLock()
-        self._stats = CacheStats()
-        self._response_times: list[float] = []
+    Segmented LRU: new keys enter the probation segment and move to the
+    protected segment when hit again, so one-off scans evict each other
+    instead of the working set.
+    """
 
-    def get(self, key: str) -> Any | None:
-        """Get value from in-memory cache."""
-        start_time = time.time()
+    def __init__(self, max_entries: int, max_bytes: int | None):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.protected_capacity = int(self.max_entries * PROTECTED_FRACTION)
+        self.probation: OrderedDict[str, _Slot] = OrderedDict()
+        self.protected: OrderedDict[str, _Slot] = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.response_time_total = 0.0
+
+    def get(self, key: str, now: float) -> _Slot | None:
+        slot = self.protected.get(key)
+        if slot is not None:
+            if slot.expires_at is not None and now > slot.expires_at:
+                self._remove(self.protected, key)
+                return None
+            self.protected.move_to_end(key)
+            return slot
 
-        with self._lock:
-            self._stats.total_requests += 1
+        slot = self.probation.get(key)
+        if slot is None:
+            return None
+        if slot.expires_at is not None and now > slot.expires_at:
+            self._remove(self.probation, key)
+            return None
 
-            if key not in self._cache:
-                self._stats.misses += 1
-                self._record_response_time(start_time)
-                return None
+        # Second hit: promote, demoting the protected LRU entry if full
+        del self.probation[key]
+        self.protected[key] = slot
+        if len(self.protected) > self.protected_capacity:
+            demoted_key, demoted = self.protected.popitem(last=False)
+            self.probation[demoted_key] = demoted
+        return slot
+
+    def set(self, key: str, slot: _Slot):
+        for segment in (self.protected, self.probation):
+            if key in segment:
+                self._remove(segment, key)
+                break
+        self.probation[key] = slot
+        self.bytes += slot.size
+        self._evict()
 
-            entry = self._cache[key]
+    def delete(self, key: str) -> bool:
+        for segment in (self.protected, self.probation):
+            if key in segment:
+                self._remove(segment, key)
+                return True
+        return False
+
+    def sweep(self, now: float) -> int:
+        expired = [
+            (segment, key)
+            for segment in (self.probation, self.protected)
+            for key, slot in segment.items()
+            if slot.expires_at is not None and now > slot.expires_at
+        ]
+        for segment, key in expired:
+            self._remove(segment, key)
+        return len(expired)
 
-            # Check expiration
-            if entry.expires_at and time.time() > entry.expires_at:
-                del self._cache[key]
-                self._stats.misses += 1
-                self._record_response_time(start_time)
-                return None
+    def clear(self):
+        self.probation.clear()
+        self.protected.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.probation) + len(self.protected)
+
+    def _remove(self, segment: OrderedDict, key: str):
+        self.bytes -= segment.pop(key).size
+
+    def _evict(self):
+        while len(self) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self) > 1
+        ):
+            segment = self.probation if self.probation else self.protected
+            _, slot = segment.popitem(last=False)
+            self.bytes -= slot.size
+            self.evictions += 1
+
+
+def _sweep_loop(cache_ref: weakref.ref, interval: float, stop: threading.Event):
+    """Drop expired L1 entries until the cache is garbage collected."""
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.sweep()
+        del cache
 
-            # Move to end (LRU)
-            self._cache.move_to_end(key)
-            entry.access_count += 1
-            entry.last_accessed = time.time()
 
-            self._stats.hits += 1
-            self._record_response_time(start_time)
+class InMemoryCache(CacheBackend):
+    """
+    Sharded, segmented-LRU in-memory cache (L1).
 
-            return entry.value
+    Keys hash to independently locked shards so threads rarely contend.
+    Entries are bounded by count and by an estimated byte budget; expired
+    entries are dropped on access and by a background sweeper. Statistics
+    are plain counters kept per shard.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        default_ttl: int = 300,
+        max_bytes: int | None = 64 * 1024 * 1024,
+        shards: int = 16,
+        sweep_interval: float | None = 30.0
+    ):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+
+        # Power-of-two shard count, small caches keep exact LRU order
+        shard_count = 1
+        while shard_count * 2 <= shards and max_size // (shard_count * 2) >= MIN_SHARD_ENTRIES:
+            shard_count *= 2
+        self._shard_mask = shard_count - 1
+        shard_bytes = max_bytes // shard_count if max_bytes is not None else None
+        self._shards = [
+            _CacheShard(-(-max_size // shard_count), shard_bytes) for _ in range(shard_count)
+        ]
+
+        if sweep_interval:
+            stop = threading.Event()
+            threading.Thread(
+                target=_sweep_loop,
+                args=(weakref.ref(self), sweep_interval, stop),
+                name='l1-cache-sweeper',
+                daemon=True
+            ).start()
+            weakref.finalize(self, stop.set)
+
+    def _shard(self, key: str) -> _CacheShard:
+        return self._shards[hash(key) & self._shard_mask]
+
+    def get(self, key: str) -> Any | None:
+        """Get value from in-memory cache."""
+        start_time = time.perf_counter()
+        shard = self._shard(key)
+
+        with shard.lock:
+            slot = shard.get(key, time.time())
+            if slot is None:
+                shard.misses += 1
+            else:
+                shard.hits += 1
+            shard.response_time_total += time.perf_counter() - start_time
+
+        return slot.value if slot is not None else None
 
     def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
         """Set value in in-memory cache."""
-        with self._lock:
-            # Evict if at capacity
-            while len(self._cache) >= self.max_size:
-                self._cache.popitem(last=False)
-                self._stats.evictions += 1
-
-            expires_at = None
-            if ttl is not None:
-                expires_at = time.time() + ttl
-            elif self.default_ttl:
-                expires_at = time.time() + self.default_ttl
-
-            entry = CacheEntry(
-                value=value,
-                created_at=time.time(),
-                expires_at=expires_at,
-                size_bytes=len(pickle.dumps(value))
-            )
-
-            self._cache[key] = entry
-            return True
+        expires_at = None
+        if ttl is not None:
+            expires_at = time.time() + ttl
+        elif self.default_ttl:
+            expires_at = time.time() + self.default_ttl
+        slot = _Slot(value, expires_at, estimate_size(value))
+
+        shard = self._shard(key)
+        with shard.lock:
+            shard.set(key, slot)
+        return True
 
     def delete(self, key: str) -> bool:
         """Delete key from cache."""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.delete(key)
 
     def exists(self, key: str) -> bool:
         """Check if key exists and is not expired."""
-        with self._lock:
-            if key not in self._cache:
-                return False
-            entry = self._cache[key]
-            if entry.expires_at and time.time() > entry.expires_at:
-                del self._cache[key]
-                return False
-            return True
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            for segment in (shard.protected, shard.probation):
+                slot = segment.get(key)
+                if slot is not None:
+                    if slot.expires_at is not None and now > slot.expires_at:
+                        shard._remove(segment, key)
+                        return False
+                    return True
+        return False
 
     def clear(self) -> bool:
         """Clear all cache entries."""
-        with self._lock:
-            self._cache.clear()
-            return True
+        for shard in self._shards:
+            with shard.lock:
+                shard.clear()
+        return True
+
+    def sweep(self) -> int:
+        """Drop expired entries, one shard at a time."""
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.sweep(time.time())
+        return removed
 
     def get_stats(self) -> CacheStats:
         """Get cache statistics."""
-        with self._lock:
-            self._stats.keys_count = len(self._cache)
-            self._stats.cache_size_bytes = sum(
-                entry.size_bytes for entry in self._cache.values()
-            )
-            return self._stats
+        stats = CacheStats()
+        response_time_total = 0.0
+        for shard in self._shards:
+            stats.hits += shard.hits
+            stats.misses += shard.misses
+            stats.evictions += shard.evictions
+            stats.keys_count += len(shard)
+            stats.cache_size_bytes += shard.bytes
+            response_time_total += shard.response_time_total
+        stats.total_requests = stats.hits + stats.misses
+        if stats.total_requests:
+            stats.avg_response_time_ms = response_time_total * 1000 / stats.total_requests
+        return stats
 
-    def _record_response_time(self, start_time: float):
-        """Record response time for metrics."""
-        elapsed = (time.time() - start_time) * 1000
-        self._response_times.append(elapsed)
-        if len(self._response_times) > 1000:
-            self._response_times = self._response_times[-1000:]
-        self._stats.avg_response_time_ms = sum(self._response_times) / len(self._response_times)
+
+# =============================================================================
+# Serialization
+# =============================================================================
+
+def _pickle_dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    import msgpack
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    import msgpack
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    import orjson
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _orjson_loads(data: bytes) -> Any:
+    import orjson
+    return orjson.loads(data)
+
+
+def _lz4_compress(data: bytes) -> bytes:
+    import lz4.frame
+    return lz4.frame.compress(data)
+
+
+def _lz4_decompress(data: bytes) -> bytes:
+    import lz4.frame
+    return lz4.frame.decompress(data)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# name: (header byte, dumps, loads, module needed)
+SERIALIZATION_FORMATS = {
+    'pickle': (b'P', _pickle_dumps, pickle.loads, None),
+    'msgpack': (b'M', _msgpack_dumps, _msgpack_loads, 'msgpack'),
+    'orjson': (b'J', _orjson_dumps, _orjson_loads, 'orjson'),
+}
+
+# name: (header byte, compress, decompress, module needed)
+COMPRESSION_CODECS = {
+    'none': (b'-', None, None, None),
+    'zlib': (b'z', zlib.compress, zlib.decompress, None),
+    'lz4': (b'l', _lz4_compress, _lz4_decompress, 'lz4.frame'),
+    'zstd': (b's', _zstd_compress, _zstd_decompress, 'zstandard'),
+}
+
+_FORMATS_BY_HEADER = {spec[0]: spec for spec in SERIALIZATION_FORMATS.values()}
+_CODECS_BY_HEADER = {spec[0]: spec for spec in COMPRESSION_CODECS.values()}
+
+
+def _module_available(module: str | None) -> bool:
+    if module is None:
+        return True
+    try:
+        importlib.import_module(module)
+        return True
+    except ImportError:
+        return False
+
+
+class CacheSerializer:
+    """
+    Encodes cache values as ``<format byte><codec byte><payload>``.
+
+    The header records what was actually used, so any serializer can read
+    values written by another. Values the chosen format can't represent
+    (e.g. datetimes with msgpack) are stored with pickle instead. msgpack
+    and orjson return lists for tuples; pick them for JSON-shaped payloads.
+    Formats or codecs whose library isn't installed fall back to pickle
+    and zlib.
+    """
+
+    def __init__(
+        self,
+        format: str = 'pickle',
+        compression: str = 'zlib',
+        compression_threshold: int = 1024
+    ):
+        if format not in SERIALIZATION_FORMATS:
+            raise ValueError(f"Unknown cache serialization format: {format}")
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown cache compression codec: {compression}")
+
+        if not _module_available(SERIALIZATION_FORMATS[format][3]):
+            logger.warning(f"Cache serialization format {format} not installed, using pickle")
+            format = 'pickle'
+        if not _module_available(COMPRESSION_CODECS[compression][3]):
+            logger.warning(f"Cache compression codec {compression} not installed, using zlib")
+            compression = 'zlib'
+
+        self.format = format
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self._format_header, self._dumps, _, _ = SERIALIZATION_FORMATS[format]
+        self._codec_header, self._compress, _, _ = COMPRESSION_CODECS[compression]
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize and, above the threshold, compress a value."""
+        format_header, dumps = self._format_header, self._dumps
+        if format_header != b'P':
+            try:
+                data = dumps(value)
+            except (TypeError, ValueError, OverflowError):
+                format_header, dumps = b'P', _pickle_dumps
+        if format_header == b'P':
+            data = dumps(value)
+
+        if self._compress is not None and len(data) > self.compression_threshold:
+            compressed = self._compress(data)
+            # Only use compression if it actually reduces size
+            if len(compressed) < len(data):
+                return format_header + self._codec_header + compressed
+
+        return format_header + b'-' + data
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        """Decode a value written by any CacheSerializer or the legacy format."""
+        flag = data[0:1]
+
+        # Values written before serializers were pluggable: pickle, maybe zlib
+        if flag in (b'C', b'U'):
+            payload = data[1:]
+            if flag == b'C':
+                payload = zlib.decompress(payload)
+            return pickle.loads(payload)
+
+        _, _, loads, _ = _FORMATS_BY_HEADER[flag]
+        _, _, decompress, _ = _CODECS_BY_HEADER[data[1:2]]
+        payload = data[2:]
+        if decompress is not None:
+            payload = decompress(payload)
+        return loads(payload)
+
+
+def build_serializers(config: dict | None) -> dict[str, CacheSerializer]:
+    """
+    Serializers by key prefix from settings-style configuration.
+
+    Example:
+        {'dashboard:': {'format': 'orjson', 'compression': 'zstd'},
+         'report:': CacheSerializer('msgpack')}
+    """
+    return {
+        prefix: spec if isinstance(spec, CacheSerializer) else CacheSerializer(**spec)
+        for prefix, spec in (config or {}).items()
+    }
 
 
 class RedisCache(CacheBackend):
@@ -248,11 +581,17 @@ class RedisCache(CacheBackend):
         default_ttl: int = 3600,
         compression_threshold: int = 1024,
         socket_timeout: float = 5.0,
-        retry_on_timeout: bool = True
+        retry_on_timeout: bool = True,
+        serializers: dict[str, CacheSerializer | dict] | None = None
     ):
         self.prefix = prefix
         self.default_ttl = default_ttl
         self.compression_threshold = compression_threshold
+        self.serializer = CacheSerializer(compression_threshold=compression_threshold)
+        # Longest prefix wins
+        self.serializers = dict(sorted(
+            build_serializers(serializers).items(), key=lambda item: len(item[0]), reverse=True
+        ))
         self._stats = CacheStats()
         self._response_times: list[float] = []
 
@@ -280,30 +619,23 @@ class RedisCache(CacheBackend):
         """Create prefixed key."""
         return f"{self.prefix}{key}"
 
-    def _serialize(self, value: Any) -> bytes:
-        """Serialize value with optional compression."""
-        data = pickle.dumps(value)
+    def _serializer_for(self, key: str | None) -> CacheSerializer:
+        """Serializer configured for the key's prefix."""
+        if key is not None:
+            for prefix, serializer in self.serializers.items():
+                if key.startswith(prefix):
+                    return serializer
+        return self.serializer
 
-        if len(data) > self.compression_threshold:
-            compressed = zlib.compress(data)
-            # Only use compression if it actually reduces size
-            if len(compressed) < len(data):
-                return b'C' + compressed
-
-        return b'U' + data
+    def _serialize(self, value: Any, key: str | None = None) -> bytes:
+        """Serialize value with the key's serializer."""
+        return self._serializer_for(key).dumps(value)
 
     def _deserialize(self, data: bytes) -> Any:
-        """Deserialize value with decompression support."""
+        """Deserialize value written by any serializer."""
         if not data:
             return None
-
-        flag = data[0:1]
-        payload = data[1:]
-
-        if flag == b'C':
-            payload = zlib.decompress(payload)
-
-        return pickle.loads(payload)
+        return CacheSerializer.loads(data)
 
     def get(self, key: str) -> Any | None:
         """Get value from Redis cache."""
@@ -336,7 +668,7 @@ class RedisCache(CacheBackend):
         """Set value in Redis cache."""
         try:
             redis_key = self._make_key(key)
-            data = self._serialize(value)
+            data = self._serialize(value, key)
 
             if ttl is None:
                 ttl = self.default_ttl
@@ -362,6 +694,69 @@ class RedisCache(CacheBackend):
             logger.error(f"Redis DELETE error for key {key}: {e}")
             return False
 
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Get several values in one round trip; missing keys are omitted."""
+        if not keys:
+            return {}
+        start_time = time.time()
+
+        try:
+            redis_keys = [self._make_key(key) for key in keys]
+            if isinstance(self.client, RedisCluster):
+                values = self.client.mget_nonatomic(redis_keys)
+            else:
+                values = self.client.mget(redis_keys)
+
+            found = {key: self._deserialize(data) for key, data in zip(keys, values, strict=True) if data is not None}
+            self._stats.total_requests += len(keys)
+            self._stats.hits += len(found)
+            self._stats.misses += len(keys) - len(found)
+            self._record_response_time(start_time)
+            return found
+
+        except RedisError as e:
+            logger.error(f"Redis MGET error for {len(keys)} keys: {e}")
+            self._stats.errors += 1
+            self._record_response_time(start_time)
+            return {}
+
+    def set_many(self, mapping: dict[str, Any], ttl: int | None = None) -> bool:
+        """Set several values in one pipelined round trip."""
+        if not mapping:
+            return True
+        if ttl is None:
+            ttl = self.default_ttl
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                data = self._serialize(value, key)
+                if ttl > 0:
+                    pipe.setex(self._make_key(key), ttl, data)
+                else:
+                    pipe.set(self._make_key(key), data)
+            pipe.execute()
+            return True
+
+        except RedisError as e:
+            logger.error(f"Redis pipelined SET error for {len(mapping)} keys: {e}")
+            self._stats.errors += 1
+            return False
+
+    def delete_many(self, keys: list[str]) -> int:
+        """Delete several keys in one pipelined round trip."""
+        if not keys:
+            return 0
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.delete(self._make_key(key))
+            return sum(pipe.execute())
+        except RedisError as e:
+            logger.error(f"Redis pipelined DELETE error for {len(keys)} keys: {e}")
+            self._stats.errors += 1
+            return 0
+
     def delete_pattern(self, pattern: str) -> int:
         """Delete all keys matching pattern."""
         try:
@@ -376,6 +771,69 @@ class RedisCache(CacheBackend):
             logger.error(f"Redis DELETE pattern error: {e}")
             return 0
 
+    def tag(self, key: str, tags: builtins.set[str], ttl: int | None = None) -> bool:
+        """Add key to the Redis SET of each tag; a set lives as long as its longest-lived key."""
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                tag_key = self._make_key(f"tag:{tag}")
+                pipe.sadd(tag_key, key)
+                if ttl > 0:
+                    pipe.expire(tag_key, ttl, nx=True)
+                    pipe.expire(tag_key, ttl, gt=True)
+                else:
+                    pipe.persist(tag_key)
+            pipe.execute()
+            return True
+        except RedisError as e:
+            logger.error(f"Redis TAG error for key {key}: {e}")
+            self._stats.errors += 1
+            return False
+
+    def pop_tagged(self, tags: builtins.set[str]) -> list[str]:
+        """Delete the keys indexed under the tags and the tag sets; return the keys."""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                tag_key = self._make_key(f"tag:{tag}")
+                pipe.smembers(tag_key)
+                pipe.delete(tag_key)
+            results = pipe.execute()
+
+            keys = sorted({
+                member.decode() if isinstance(member, bytes) else member
+                for members in results[::2] for member in members
+            })
+            if keys:
+                pipe = self.client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.delete(self._make_key(key))
+                pipe.execute()
+            return keys
+
+        except RedisError as e:
+            logger.error(f"Redis tag invalidation error for {tags}: {e}")
+            self._stats.errors += 1
+            return []
+
+    def get_version(self, namespace: str) -> int:
+        """Current version counter of a namespace."""
+        try:
+            version = self.client.get(self._make_key(f"ns:{namespace}"))
+            return int(version) if version else 1
+        except RedisError as e:
+            logger.error(f"Redis namespace read error for {namespace}: {e}")
+            return 1
+
+    def incr_version(self, namespace: str) -> int:
+        """Move a namespace to its next version."""
+        version_key = self._make_key(f"ns:{namespace}")
+        pipe = self.client.pipeline()
+        pipe.setnx(version_key, 1)
+        pipe.incr(version_key)
+        return pipe.execute()[1]
+
     def exists(self, key: str) -> bool:
         """Check if key exists."""
         try:
@@ -412,10 +870,42 @@ class RedisCache(CacheBackend):
         self._stats.avg_response_time_ms = sum(self._response_times) / len(self._response_times)
 
 
+def _invalidation_loop(cache_ref: weakref.ref, pubsub, stop: threading.Event):
+    """Apply invalidations published by other nodes until the cache is garbage collected."""
+    while not stop.is_set():
+        try:
+            message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        except RedisError as e:
+            logger.warning(f"Cache invalidation channel error: {e}")
+            cache = cache_ref()
+            if cache is None:
+                return
+            # Messages missed while disconnected can't be replayed
+            cache.l1.clear()
+            cache._namespace_versions.clear()
+            del cache
+            stop.wait(1.0)
+            continue
+
+        cache = cache_ref()
+        if cache is None:
+            return
+        if message is not None:
+            cache._apply_invalidation(message['data'])
+        del cache
+
+    with contextlib.suppress(RedisError):
+        pubsub.close()
+
+
 class MultiTierCache:
     """
     Multi-tier caching with L1 (memory) and L2 (Redis).
     Implements cache-aside pattern with automatic promotion.
+
+    Tagged keys are indexed in Redis SETs and namespaces carry a version
+    counter, so invalidation touches only the affected keys. Invalidations
+    are published over Redis pub/sub and every node drops its L1 copies.
     """
 
     def __init__(
@@ -423,13 +913,46 @@ class MultiTierCache:
         l1_cache: InMemoryCache | None = None,
         l2_cache: RedisCache | None = None,
         l1_ttl: int = 60,
-        l2_ttl: int = 3600
+        l2_ttl: int = 3600,
+        listen: bool = True
     ):
         self.l1 = l1_cache or InMemoryCache(default_ttl=l1_ttl)
         self.l2 = l2_cache
         self.l1_ttl = l1_ttl
         self.l2_ttl = l2_ttl
         self._lock = threading.RLock()
+        self.node_id = uuid.uuid4().hex
+        self.channel = l2_cache._make_key('invalidations') if l2_cache else None
+        # L1 keys by tag, only needed when there is no L2 to hold the index
+        self._tags: dict[str, builtins.set[str]] = {}
+        self._tagged_since_prune = 0
+        self._namespace_versions: dict[str, tuple[int, float]] = {}
+        self._stop = threading.Event()
+
+        if self.l2 and listen:
+            self._start_listener()
+
+    def _start_listener(self):
+        """Subscribe to invalidations from other nodes."""
+        try:
+            pubsub = self.l2.client.pubsub()
+            pubsub.subscribe(self.channel)
+        except RedisError as e:
+            logger.warning(f"Cache invalidation listener unavailable: {e}")
+            return
+
+        stop = self._stop
+        threading.Thread(
+            target=_invalidation_loop,
+            args=(weakref.ref(self), pubsub, stop),
+            name='cache-invalidation-listener',
+            daemon=True
+        ).start()
+        weakref.finalize(self, stop.set)
+
+    def close(self):
+        """Stop listening for invalidations."""
+        self._stop.set()
 
     def get(self, key: str) -> Any | None:
         """
@@ -450,9 +973,15 @@ class MultiTierCache:
 
         return None
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        tags: builtins.set[str] | None = None
+    ) -> bool:
         """
-        Set in both L1 and L2.
+        Set in both L1 and L2, indexing the key under ``tags``.
         """
         l1_ttl = min(ttl or self.l1_ttl, self.l1_ttl)
         l2_ttl = ttl or self.l2_ttl
@@ -465,25 +994,151 @@ class MultiTierCache:
         if self.l2:
             l2_success = self.l2.set(key, value, l2_ttl)
 
+        if tags:
+            if self.l2:
+                l2_success = self.l2.tag(key, tags, l2_ttl) and l2_success
+            else:
+                self._tag_locally(key, tags)
+
         return l1_success and l2_success
 
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """
+        Get several values: L1 first, then one MGET for the rest.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.l1.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+
+        if missing and self.l2:
+            from_l2 = self.l2.get_many(missing)
+            for key, value in from_l2.items():
+                # Promote to L1
+                self.l1.set(key, value, self.l1_ttl)
+            found.update(from_l2)
+
+        return found
+
+    def set_many(self, mapping: dict[str, Any], ttl: int | None = None) -> bool:
+        """
+        Set several values in L1 and, in one pipeline, in L2.
+        """
+        l1_ttl = min(ttl or self.l1_ttl, self.l1_ttl)
+        for key, value in mapping.items():
+            self.l1.set(key, value, l1_ttl)
+
+        if self.l2:
+            return self.l2.set_many(mapping, ttl or self.l2_ttl)
+        return True
+
+    def delete_many(self, keys: list[str]) -> int:
+        """Delete several keys from both tiers and from other nodes' L1."""
+        deleted = sum(self.l1.delete(key) for key in keys)
+        if self.l2:
+            deleted = max(deleted, self.l2.delete_many(keys))
+            self._publish(keys=list(keys))
+        return deleted
+
+    def _tag_locally(self, key: str, tags: builtins.set[str]):
+        with self._lock:
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._tagged_since_prune += 1
+            if self._tagged_since_prune > self.l1.max_size:
+                # Forget keys L1 has already evicted
+                self._tags = {
+                    tag: live for tag, keys in self._tags.items()
+                    if (live := {k for k in keys if self.l1.exists(k)})
+                }
+                self._tagged_since_prune = 0
+
     def delete(self, key: str) -> bool:
-        """Delete from both tiers."""
+        """Delete from both tiers and from other nodes' L1."""
         l1_success = self.l1.delete(key)
         l2_success = True
         if self.l2:
             l2_success = self.l2.delete(key)
+            self._publish(keys=[key])
         return l1_success or l2_success
 
     def invalidate_by_tags(self, tags: builtins.set[str]) -> int:
         """Invalidate all entries with given tags."""
-        count = 0
-        # This requires tag tracking - implement via Redis sets
+        with self._lock:
+            keys = set().union(*(self._tags.pop(tag, set()) for tag in tags))
         if self.l2:
-            for tag in tags:
-                pattern = f"tag:{tag}:*"
-                count += self.l2.delete_pattern(pattern)
-        return count
+            keys.update(self.l2.pop_tagged(tags))
+
+        for key in keys:
+            self.l1.delete(key)
+        self._publish(keys=sorted(keys))
+        return len(keys)
+
+    def namespace_version(self, namespace: str) -> int:
+        """Current version of a namespace, cached locally for up to l1_ttl."""
+        with self._lock:
+            cached = self._namespace_versions.get(namespace)
+        if cached and (self.l2 is None or time.monotonic() - cached[1] < self.l1_ttl):
+            return cached[0]
+
+        version = self.l2.get_version(namespace) if self.l2 else 1
+        with self._lock:
+            self._namespace_versions[namespace] = (version, time.monotonic())
+        return version
+
+    def namespaced_key(self, namespace: str, key: str) -> str:
+        """Key inside the current version of a namespace."""
+        return f"{namespace}:v{self.namespace_version(namespace)}:{key}"
+
+    def bump_namespace(self, namespace: str) -> int:
+        """Invalidate a whole namespace in O(1); old entries expire on their own."""
+        if self.l2:
+            try:
+                version = self.l2.incr_version(namespace)
+            except RedisError as e:
+                logger.error(f"Redis namespace bump error for {namespace}: {e}")
+                return self.namespace_version(namespace)
+        else:
+            version = self.namespace_version(namespace) + 1
+
+        with self._lock:
+            self._namespace_versions[namespace] = (version, time.monotonic())
+        self._publish(namespaces=[namespace])
+        return version
+
+    def _publish(self, keys: list[str] = (), namespaces: list[str] = ()):
+        """Tell other nodes to drop L1 copies."""
+        if not self.l2 or not (keys or namespaces):
+            return
+        message = json.dumps({
+            'origin': self.node_id,
+            'keys': list(keys),
+            'namespaces': list(namespaces),
+        })
+        try:
+            self.l2.client.publish(self.channel, message)
+        except RedisError as e:
+            logger.error(f"Redis invalidation publish error: {e}")
+
+    def _apply_invalidation(self, data: bytes | str):
+        """Apply an invalidation message from another node."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return
+        if message.get('origin') == self.node_id:
+            return
+
+        for key in message.get('keys', ()):
+            self.l1.delete(key)
+        with self._lock:
+            for namespace in message.get('namespaces', ()):
+                self._namespace_versions.pop(namespace, None)
 
     def get_stats(self) -> dict[str, CacheStats]:
         """Get statistics for all tiers."""
@@ -495,8 +1150,12 @@ class MultiTierCache:
 
 class CacheStampedeProtection:
     """
-    Prevents cache stampede using probabilistic early recomputation
-    and distributed locking.
+    Prevents cache stampede using request coalescing, distributed locking,
+    probabilistic early recomputation (XFetch) and stale-while-revalidate.
+
+    Thin adapter over core.cache_coalescing.RequestCoalescer, so every
+    cache-aside helper shares one implementation. Refreshes run in-process
+    because L1 lives in this process.
     """
 
     def __init__(
@@ -505,107 +1164,29 @@ class CacheStampedeProtection:
         lock_timeout: int = 30,
         beta: float = 1.0
     ):
+        from core.cache_coalescing import RequestCoalescer
+
         self.cache = cache
         self.lock_timeout = lock_timeout
         self.beta = beta  # XFetch algorithm parameter
-        self._locks: dict[str, threading.Lock] = {}
+        self.coalescer = RequestCoalescer(
+            cache, name=f'enterprise:{id(cache)}', lock_timeout=lock_timeout, beta=beta
+        )
 
     def get_or_compute(
         self,
         key: str,
         compute_fn: Callable[[], T],
         ttl: int = 3600,
-        recompute_window: int = 60
+        stale_ttl: int = 0
     ) -> T:
         """
         Get value from cache or compute with stampede protection.
 
-        Uses XFetch algorithm for probabilistic early recomputation.
+        Within ``stale_ttl`` seconds after expiry the old value is served
+        while a background refresh runs.
         """
-        # Try to get from cache with metadata
-        cached_data = self._get_with_metadata(key)
-
-        if cached_data:
-            value, created_at, expires_at = cached_data
-
-            # XFetch: Probabilistic early recomputation
-            if expires_at:
-                time_left = expires_at - time.time()
-                delta = self.beta * recompute_window * random.random()
-
-                # Early recompute if within window
-                if time_left < delta:
-                    # Try to acquire lock for recomputation
-                    if self._try_acquire_lock(key):
-                        try:
-                            new_value = compute_fn()
-                            self._set_with_metadata(key, new_value, ttl)
-                            return new_value
-                        finally:
-                            self._release_lock(key)
-
-            return value
-
-        # Cache miss - compute with lock
-        with self._get_lock(key):
-            # Double-check after acquiring lock
-            cached_data = self._get_with_metadata(key)
-            if cached_data:
-                return cached_data[0]
-
-            # Compute and cache
-            value = compute_fn()
-            self._set_with_metadata(key, value, ttl)
-            return value
-
-    def _get_with_metadata(self, key: str) -> tuple | None:
-        """Get value with creation and expiration metadata."""
-        meta_key = f"{key}:meta"
-
-        if isinstance(self.cache, MultiTierCache):
-            value = self.cache.get(key)
-            meta = self.cache.get(meta_key)
-        else:
-            value = self.cache.get(key)
-            meta = self.cache.get(meta_key)
-
-        if value is not None and meta:
-            return (value, meta.get('created_at'), meta.get('expires_at'))
-
-        return None
-
-    def _set_with_metadata(self, key: str, value: Any, ttl: int):
-        """Set value with metadata."""
-        meta_key = f"{key}:meta"
-        now = time.time()
-        meta = {
-            'created_at': now,
-            'expires_at': now + ttl
-        }
-
-        if isinstance(self.cache, MultiTierCache):
-            self.cache.set(key, value, ttl)
-            self.cache.set(meta_key, meta, ttl)
-        else:
-            self.cache.set(key, value, ttl)
-            self.cache.set(meta_key, meta, ttl)
-
-    def _get_lock(self, key: str) -> threading.Lock:
-        """Get or create lock for key."""
-        if key not in self._locks:
-            self._locks[key] = threading.Lock()
-        return self._locks[key]
-
-    def _try_acquire_lock(self, key: str) -> bool:
-        """Try to acquire lock without blocking."""
-        lock = self._get_lock(key)
-        return lock.acquire(blocking=False)
-
-    def _release_lock(self, key: str):
-        """Release lock for key."""
-        if key in self._locks:
-            with contextlib.suppress(RuntimeError):
-                self._locks[key].release()
+        return self.coalescer.get_or_compute(key, compute_fn, ttl, stale_ttl=stale_ttl)
 
 
 class CircuitBreaker:
@@ -702,9 +1283,11 @@ class CacheManager:
         redis_url: str | None = None,
         redis_cluster_nodes: list[dict] | None = None,
         l1_max_size: int = 10000,
+        l1_max_bytes: int | None = 64 * 1024 * 1024,
         l1_ttl: int = 60,
         l2_ttl: int = 3600,
-        enable_circuit_breaker: bool = True
+        enable_circuit_breaker: bool = True,
+        serializers: dict[str, CacheSerializer | dict] | None = None
     ):
         if hasattr(self, '_initialized'):
             return
@@ -712,7 +1295,9 @@ class CacheManager:
         self._initialized = True
 
         # Initialize L1 cache
-        self.l1_cache = InMemoryCache(max_size=l1_max_size, default_ttl=l1_ttl)
+        self.l1_cache = InMemoryCache(
+            max_size=l1_max_size, default_ttl=l1_ttl, max_bytes=l1_max_bytes
+        )
 
         # Initialize L2 cache (Redis)
         self.l2_cache = None
@@ -725,13 +1310,15 @@ class CacheManager:
                 port=parsed.port or 6379,
                 db=int(parsed.path.lstrip('/') or 0),
                 password=parsed.password,
-                default_ttl=l2_ttl
+                default_ttl=l2_ttl,
+                serializers=serializers
             )
         elif redis_cluster_nodes:
             self.l2_cache = RedisCache(
                 cluster_mode=True,
                 cluster_nodes=redis_cluster_nodes,
-                default_ttl=l2_ttl
+                default_ttl=l2_ttl,
+                serializers=serializers
             )
 
         # Initialize multi-tier cache
@@ -764,30 +1351,67 @@ class CacheManager:
             )
         return self.cache.get(key)
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        tags: builtins.set[str] | None = None
+    ) -> bool:
         """Set value in cache."""
         if self.circuit_breaker:
             return self.circuit_breaker.call(
-                lambda: self.cache.set(key, value, ttl),
+                lambda: self.cache.set(key, value, ttl, tags),
                 fallback=lambda: False
             )
-        return self.cache.set(key, value, ttl)
+        return self.cache.set(key, value, ttl, tags)
 
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
         return self.cache.delete(key)
 
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Get several values; missing keys are omitted."""
+        if self.circuit_breaker:
+            return self.circuit_breaker.call(
+                lambda: self.cache.get_many(keys),
+                fallback=lambda: {}
+            )
+        return self.cache.get_many(keys)
+
+    def set_many(self, mapping: dict[str, Any], ttl: int | None = None) -> bool:
+        """Set several values."""
+        if self.circuit_breaker:
+            return self.circuit_breaker.call(
+                lambda: self.cache.set_many(mapping, ttl),
+                fallback=lambda: False
+            )
+        return self.cache.set_many(mapping, ttl)
+
+    def delete_many(self, keys: list[str]) -> int:
+        """Delete several values."""
+        return self.cache.delete_many(keys)
+
     def get_or_compute(
         self,
         key: str,
         compute_fn: Callable[[], T],
-        ttl: int = 3600
+        ttl: int = 3600,
+        stale_ttl: int = 0
     ) -> T:
         """Get from cache or compute with stampede protection."""
-        return self.stampede_protection.get_or_compute(key, compute_fn, ttl)
+        return self.stampede_protection.get_or_compute(key, compute_fn, ttl, stale_ttl)
+
+    def invalidate_by_tags(self, tags: builtins.set[str]) -> int:
+        """Invalidate all keys indexed under the tags, on every node."""
+        return self.cache.invalidate_by_tags(tags)
+
+    def bump_namespace(self, namespace: str) -> int:
+        """Invalidate every key built with namespaced_key for a namespace."""
+        return self.cache.bump_namespace(namespace)
 
     def invalidate_by_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching pattern."""
+        """Invalidate all keys matching pattern (scans the keyspace)."""
         count = 0
         if self.l2_cache:
             count = self.l2_cache.delete_pattern(pattern)
@@ -820,11 +1444,15 @@ class CacheManager:
 def cached(
     key_prefix: str,
     ttl: int = 3600,
-    key_builder: Callable[..., str] | None = None
+    key_builder: Callable[..., str] | None = None,
+    stale_ttl: int = 0
 ):
     """
     Decorator for caching function results.
 
+    Concurrent callers share one computation; with ``stale_ttl`` the
+    previous result is served for that long after expiry while refreshing.
+
     Usage:
         @cached('user', ttl=300)
         def get_user(user_id: int) -> dict:
@@ -855,7 +1483,8 @@ def cached(
             return cache_manager.get_or_compute(
                 cache_key,
                 lambda: func(*args, **kwargs),
-                ttl=ttl
+                ttl=ttl,
+                stale_ttl=stale_ttl
             )
 
         return wrapper
@@ -902,6 +1531,9 @@ class DjangoCacheBackend:
                     'L1_MAX_SIZE': 10000,
                     'L1_TTL': 60,
                     'L2_TTL': 3600,
+                    'SERIALIZERS': {
+                        'dashboard:': {'format': 'orjson', 'compression': 'zstd'},
+                    },
                 }
             }
         }
@@ -912,7 +1544,8 @@ class DjangoCacheBackend:
             redis_url=params.get('REDIS_URL'),
             l1_max_size=params.get('L1_MAX_SIZE', 10000),
             l1_ttl=params.get('L1_TTL', 60),
-            l2_ttl=params.get('L2_TTL', 3600)
+            l2_ttl=params.get('L2_TTL', 3600),
+            serializers=params.get('SERIALIZERS')
         )
         self.key_prefix = params.get('KEY_PREFIX', '')
         self.default_timeout = params.get('TIMEOUT', 300)
@@ -945,18 +1578,22 @@ class DjangoCacheBackend:
         self._cache.invalidate_by_pattern(f"{self.key_prefix}:*")
 
     def get_many(self, keys: list[str], version=None) -> dict:
-        """Get multiple values."""
-        return {key: self.get(key, version=version) for key in keys}
+        """Get multiple values in one round trip; missing keys are omitted."""
+        cache_keys = {self.make_key(key, version): key for key in keys}
+        found = self._cache.get_many(list(cache_keys))
+        return {cache_keys[cache_key]: value for cache_key, value in found.items()}
 
-    def set_many(self, mapping: dict, timeout=None, version=None):
-        """Set multiple values."""
-        for key, value in mapping.items():
-            self.set(key, value, timeout, version)
+    def set_many(self, mapping: dict, timeout=None, version=None) -> list:
+        """Set multiple values in one round trip; returns keys that failed."""
+        ttl = timeout if timeout is not None else self.default_timeout
+        cache_mapping = {self.make_key(key, version): value for key, value in mapping.items()}
+        if self._cache.set_many(cache_mapping, ttl):
+            return []
+        return list(mapping)
 
     def delete_many(self, keys: list[str], version=None):
-        """Delete multiple keys."""
-        for key in keys:
-            self.delete(key, version)
+        """Delete multiple keys in one round trip."""
+        self._cache.delete_many([self.make_key(key, version) for key in keys])
 
 
 # Model caching mixin for Django
@@ -15,11 +15,13 @@ Version: 1.0.0
 """
 
 import logging
+import random
 import re
 import threading
 import time
 from collections.abc import Callable
 from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -39,12 +41,158 @@ T = TypeVar('T')
 # Read Replica Router
 # =============================================================================
 
+REPLICA_HEALTH_CHECK_INTERVAL = 5.0  # seconds
+REPLICA_STICKY_SECONDS = 10.0
+REPLICA_PIN_COOKIE = 'db_pin_primary'
+LATENCY_SMOOTHING = 0.3  # EWMA weight of the newest sample
+
+
+@dataclass
+class ReplicaHealth:
+    """Last sampled state of a read replica."""
+    alias: str
+    healthy: bool = False
+    lag_seconds: float | None = None
+    latency_ms: float | None = None
+    checked_at: float | None = None
+
+
+class ReplicaHealthMonitor:
+    """
+    Samples replica lag and latency on a background thread.
+
+    Routing decisions read the cached samples, so no health query runs in
+    the request path. Until the first sample completes reads go to primary.
+    """
+
+    def __init__(self, replicas: list[str], interval: float | None = None):
+        self.replicas = list(replicas)
+        self.interval = interval or getattr(
+            settings, 'REPLICA_HEALTH_CHECK_INTERVAL', REPLICA_HEALTH_CHECK_INTERVAL
+        )
+        self.max_lag_seconds = getattr(settings, 'MAX_REPLICA_LAG_SECONDS', 5.0)
+        self._health = {alias: ReplicaHealth(alias) for alias in self.replicas}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sampling thread if it isn't running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='replica-health-monitor', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+        connections.close_all()
+
+    def sample(self):
+        """Measure every replica once and update the cache."""
+        for alias in self.replicas:
+            started = time.perf_counter()
+            lag = self._get_replica_lag(alias)
+            latency_ms = (time.perf_counter() - started) * 1000
+
+            with self._lock:
+                health = self._health[alias]
+                health.lag_seconds = lag
+                health.checked_at = time.monotonic()
+                health.healthy = lag is not None and lag <= self.max_lag_seconds
+                if lag is not None:
+                    health.latency_ms = latency_ms if health.latency_ms is None else (
+                        LATENCY_SMOOTHING * latency_ms + (1 - LATENCY_SMOOTHING) * health.latency_ms
+                    )
+            if not health.healthy:
+                logger.warning(f"Replica {alias} unhealthy, lag: {lag}s")
+
+    def _get_replica_lag(self, replica: str) -> float | None:
+        """Get replication lag for a replica in seconds."""
+        try:
+            with connections[replica].cursor() as cursor:
+                # PostgreSQL-specific query for replication lag
+                cursor.execute("""
+                    SELECT EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
+                    AS lag_seconds
+                """)
+                result = cursor.fetchone()
+                return float(result[0]) if result and result[0] else 0.0
+        except Exception as e:
+            logger.error(f"Error checking replica lag for {replica}: {e}")
+            connections[replica].close()
+            return None
+
+    def healthy_replicas(self) -> list[ReplicaHealth]:
+        """Replicas whose latest sample is healthy and not stale."""
+        stale_after = self.interval * 3
+        now = time.monotonic()
+        with self._lock:
+            return [
+                health for health in self._health.values()
+                if health.healthy and health.checked_at is not None
+                and now - health.checked_at <= stale_after
+            ]
+
+    def snapshot(self) -> dict[str, ReplicaHealth]:
+        """Copy of the cached replica state."""
+        with self._lock:
+            return {alias: ReplicaHealth(**vars(health)) for alias, health in self._health.items()}
+
+
+class _RoutingState:
+    """Read-your-writes state for one request or task."""
+
+    def __init__(self):
+        self.pinned_until = 0.0
+        self.wrote = False
+
+
+# A context variable rather than a thread-local, so the state follows a
+# request into asyncio.to_thread and sync_to_async workers. The state object
+# is shared with those copied contexts, so their writes pin the request too.
+_routing_state_var: ContextVar[_RoutingState | None] = ContextVar('replica_routing_state', default=None)
+
+
+def _routing_state() -> _RoutingState:
+    state = _routing_state_var.get()
+    if state is None:
+        state = _RoutingState()
+        _routing_state_var.set(state)
+    return state
+
+
+def pin_to_primary(seconds: float | None = None):
+    """Send reads in the current context to primary for the next ``seconds``."""
+    if seconds is None:
+        seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', REPLICA_STICKY_SECONDS)
+    state = _routing_state()
+    state.pinned_until = max(state.pinned_until, time.monotonic() + seconds)
+
+
+def reset_routing_state():
+    """Clear stickiness, e.g. at the start of a request."""
+    _routing_state_var.set(_RoutingState())
+
+
 class ReadReplicaRouter:
     """
     Database router for read/write splitting.
 
     Configure in settings.py:
         DATABASE_ROUTERS = ['enterprise.database.ReadReplicaRouter']
+        MIDDLEWARE += ['enterprise.database.ReplicaStickinessMiddleware']
 
         DATABASES = {
             'default': {...},  # Primary (write)
@@ -53,17 +201,21 @@ class ReadReplicaRouter:
         }
 
         READ_REPLICA_DATABASES = ['replica1', 'replica2']
+
+    Replica health comes from a background ReplicaHealthMonitor. Reads
+    after a write in the same request, or from a client holding the pin
+    cookie, go to primary for REPLICA_STICKY_SECONDS. Healthy replicas
+    are picked with probability inversely proportional to their latency.
     """
 
-    def __init__(self):
-        self._replica_index = 0
-        self._lock = threading.Lock()
+    def __init__(self, monitor: ReplicaHealthMonitor | None = None):
         self._replicas = getattr(settings, 'READ_REPLICA_DATABASES', [])
-        self._lag_thresholds: dict[str, float] = {}
+        self._monitor = monitor or (ReplicaHealthMonitor(self._replicas) if self._replicas else None)
+        self._random = random.Random()  # noqa: S311 - load balancing, not security
 
     def db_for_read(self, model, **hints):
         """Route read queries to replicas with health-aware load balancing."""
-        # Check if we should use primary (e.g., immediately after write)
+        # Keep reads of an instance on the database it came from
         if hints.get('instance') and hints['instance']._state.db:
             return hints['instance']._state.db
 
@@ -71,25 +223,34 @@ class ReadReplicaRouter:
         if hints.get('use_primary'):
             return 'default'
 
+        override = ReplicaContext.get_override()
+        if override:
+            return override
+
+        # Read-your-writes
+        if _routing_state().pinned_until > time.monotonic():
+            return 'default'
+
         # Check if replicas are configured
         if not self._replicas:
             return 'default'
 
-        # Health-aware replica selection
-        healthy_replicas = self._get_healthy_replicas()
+        self._monitor.start()
+        healthy_replicas = self._monitor.healthy_replicas()
         if not healthy_replicas:
-            logger.warning("No healthy replicas available, using primary")
             return 'default'
 
-        # Round-robin with thread safety
-        with self._lock:
-            replica = healthy_replicas[self._replica_index % len(healthy_replicas)]
-            self._replica_index += 1
+        return self._choose(healthy_replicas)
 
-        return replica
+    def _choose(self, replicas: list[ReplicaHealth]) -> str:
+        """Pick a replica weighted by inverse latency."""
+        weights = [1.0 / max(health.latency_ms or 1.0, 0.1) for health in replicas]
+        return self._random.choices(replicas, weights=weights)[0].alias
 
     def db_for_write(self, model, **hints):
-        """Route write queries to primary."""
+        """Route write queries to primary and pin this context's reads there."""
+        _routing_state().wrote = True
+        pin_to_primary()
         return 'default'
 
     def allow_relation(self, obj1, obj2, **hints):
@@ -103,34 +264,32 @@ class ReadReplicaRouter:
         """Only allow migrations on primary."""
         return db == 'default'
 
-    def _get_healthy_replicas(self) -> list[str]:
-        """Get list of healthy replicas based on lag."""
-        healthy = []
-        max_lag_seconds = getattr(settings, 'MAX_REPLICA_LAG_SECONDS', 5.0)
 
-        for replica in self._replicas:
-            lag = self._get_replica_lag(replica)
-            if lag is not None and lag <= max_lag_seconds:
-                healthy.append(replica)
-            else:
-                logger.warning(f"Replica {replica} unhealthy, lag: {lag}s")
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes across requests.
+
+    A request that writes sets a short-lived cookie; follow-up requests
+    carrying it read from primary until it expires.
+    """
 
-        return healthy
+    def __init__(self, get_response):
+        self.get_response = get_response
 
-    def _get_replica_lag(self, replica: str) -> float | None:
-        """Get replication lag for a replica in seconds."""
-        try:
-            with connections[replica].cursor() as cursor:
-                # PostgreSQL-specific query for replication lag
-                cursor.execute("""
-                    SELECT EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
-                    AS lag_seconds
-                """)
-                result = cursor.fetchone()
-                return float(result[0]) if result and result[0] else 0.0
-        except Exception as e:
-            logger.error(f"Error checking replica lag for {replica}: {e}")
-            return None
+    def __call__(self, request):
+        reset_routing_state()
+        sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', REPLICA_STICKY_SECONDS)
+        if request.COOKIES.get(REPLICA_PIN_COOKIE):
+            pin_to_primary(sticky_seconds)
+
+        response = self.get_response(request)
+
+        if _routing_state().wrote:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=int(sticky_seconds), httponly=True, samesite='Lax'
+            )
+        reset_routing_state()
+        return response
 
 
 class ReplicaContext:
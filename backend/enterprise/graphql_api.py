@@ -5,7 +5,8 @@ Enterprise GraphQL API Layer for MyCRM
 GraphQL implementation with:
 - Strawberry GraphQL framework
 - DataLoader for N+1 prevention
-- Rate limiting and complexity analysis
+- Rate limiting and query cost analysis
+- Persisted queries and parsed-document caching
 - Real-time subscriptions via WebSockets
 - Federation support for microservices
 - Comprehensive type system
@@ -15,8 +16,13 @@ Version: 1.0.0
 """
 
 import asyncio
+import base64
+import hashlib
+import json
 import logging
-from collections.abc import AsyncGenerator
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
@@ -29,14 +35,31 @@ from typing import (
 )
 
 import strawberry
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+    parse,
+)
+from graphql.utilities import value_from_ast_untyped
 from strawberry.dataloader import DataLoader
-from strawberry.extensions import QueryDepthLimiter
+from strawberry.extensions import QueryDepthLimiter, SchemaExtension
 from strawberry.permission import BasePermission
 from strawberry.scalars import JSON
 from strawberry.types import Info
+from strawberry.utils.str_converters import to_snake_case
 
 logger = logging.getLogger(__name__)
 
+# Rows a relationship list returns when the query gives no limit
+RELATED_LIST_LIMIT = 100
+
 # =============================================================================
 # Custom Scalars
 # =============================================================================
@@ -63,6 +86,8 @@ class LeadStatus(Enum):
     NEW = "new"
     CONTACTED = "contacted"
     QUALIFIED = "qualified"
+    UNQUALIFIED = "unqualified"
+    CONVERTED = "converted"
     PROPOSAL = "proposal"
     NEGOTIATION = "negotiation"
     WON = "won"
@@ -72,6 +97,7 @@ class LeadStatus(Enum):
 @strawberry.enum
 class ContactType(Enum):
     LEAD = "lead"
+    PROSPECT = "prospect"
     CUSTOMER = "customer"
     PARTNER = "partner"
     VENDOR = "vendor"
@@ -153,30 +179,26 @@ class RateLimitPermission(BasePermission):
         self.requests_per_minute = requests_per_minute
 
     async def has_permission(self, source: Any, info: Info, **kwargs) -> bool:
-        # Implement rate limiting logic using Redis
+        from core.rate_limiting import get_rate_limiter
+
         request = info.context.get("request")
         if not request:
             return True
 
-        # Get client identifier
-        client_id = self._get_client_id(request)
-
-        # Check rate limit (simplified - should use Redis in production)
-        cache = info.context.get("cache")
-        if cache:
-            key = f"rate_limit:{client_id}"
-            count = cache.get(key) or 0
-            if count >= self.requests_per_minute:
-                return False
-            cache.set(key, count + 1, ttl=60)
-
-        return True
+        limiter = get_rate_limiter("graphql", self.requests_per_minute, 60)
+        result = await asyncio.to_thread(limiter.hit, self._get_client_id(request))
+        return result.allowed
 
     def _get_client_id(self, request) -> str:
         """Get unique client identifier."""
-        if request.user and request.user.is_authenticated:
-            return f"user:{request.user.id}"
-        return f"ip:{request.META.get('REMOTE_ADDR', 'unknown')}"
+        return _get_client_id(request)
+
+
+def _get_client_id(request) -> str:
+    """Get unique client identifier."""
+    if request.user and request.user.is_authenticated:
+        return f"user:{request.user.id}"
+    return f"ip:{request.META.get('REMOTE_ADDR', 'unknown')}"
 
 
 # =============================================================================
@@ -185,9 +207,17 @@ class RateLimitPermission(BasePermission):
 
 @strawberry.input
 class PaginationInput:
-    """Pagination parameters."""
+    """
+    Pagination parameters.
+
+    Pass the previous page's ``end_cursor`` as ``after`` for keyset paging;
+    ``page`` is only used when no cursor is given. Totals are estimated
+    unless ``exact_count`` is set.
+    """
     page: int = 1
     page_size: int = 20
+    after: str | None = None
+    exact_count: bool = False
 
     def __post_init__(self):
         if self.page < 1:
@@ -331,6 +361,9 @@ class PageInfo:
     total_count: int
     has_next: bool
     has_previous: bool
+    start_cursor: str | None = None
+    end_cursor: str | None = None
+    total_count_is_exact: bool = True
 
 
 T = TypeVar("T")
@@ -380,9 +413,10 @@ class Company:
         info: Info,
         pagination: PaginationInput | None = None
     ) -> "Connection[Contact]":
-        """Get contacts for this company."""
+        """Get the first page of contacts for this company."""
+        page_size = (pagination or PaginationInput()).page_size
         loader = info.context["loaders"]["company_contacts"]
-        return await loader.load(self.id)
+        return await loader.load((self.name, page_size))
 
 
 @strawberry.type
@@ -416,10 +450,14 @@ class Contact:
         return await loader.load(self._company_id)
 
     @strawberry.field
-    async def opportunities(self, info: Info) -> list["Opportunity"]:
-        """Get opportunities for this contact."""
+    async def opportunities(
+        self,
+        info: Info,
+        limit: int = RELATED_LIST_LIMIT
+    ) -> list["Opportunity"]:
+        """Get the most recent opportunities for this contact."""
         loader = info.context["loaders"]["contact_opportunities"]
-        return await loader.load(self.id)
+        return await loader.load((self.id, limit))
 
     @strawberry.field
     async def activities(
@@ -429,7 +467,7 @@ class Contact:
     ) -> list["Activity"]:
         """Get recent activities for this contact."""
         loader = info.context["loaders"]["contact_activities"]
-        return await loader.load(self.id)
+        return await loader.load((self.id, limit))
 
 
 @strawberry.type
@@ -469,7 +507,7 @@ class Lead:
     ) -> list["Activity"]:
         """Get recent activities for this lead."""
         loader = info.context["loaders"]["lead_activities"]
-        return await loader.load(self.id)
+        return await loader.load((self.id, limit))
 
     @strawberry.field
     async def ai_insights(self, info: Info) -> Optional["LeadInsights"]:
@@ -537,7 +575,7 @@ class Opportunity:
     ) -> list["Activity"]:
         """Get recent activities for this opportunity."""
         loader = info.context["loaders"]["opportunity_activities"]
-        return await loader.load(self.id)
+        return await loader.load((self.id, limit))
 
 
 @strawberry.type
@@ -695,7 +733,7 @@ def create_loaders(context: dict) -> dict[str, DataLoader]:
         contacts = await asyncio.to_thread(
             lambda: list(ContactModel.objects.filter(id__in=keys))
         )
-        contact_map = {str(c.id): c for c in contacts}
+        contact_map = {str(c.id): _convert_contact(c) for c in contacts}
         return [contact_map.get(str(k)) for k in keys]
 
     async def load_companies(keys: list[strawberry.ID]) -> list[Company | None]:
@@ -713,7 +751,7 @@ def create_loaders(context: dict) -> dict[str, DataLoader]:
         leads = await asyncio.to_thread(
             lambda: list(LeadModel.objects.filter(id__in=keys))
         )
-        lead_map = {str(l.id): l for l in leads}
+        lead_map = {str(l.id): _convert_lead(l) for l in leads}
         return [lead_map.get(str(k)) for k in keys]
 
     async def load_opportunities(keys: list[strawberry.ID]) -> list[Opportunity | None]:
@@ -722,7 +760,7 @@ def create_loaders(context: dict) -> dict[str, DataLoader]:
         opps = await asyncio.to_thread(
             lambda: list(OppModel.objects.filter(id__in=keys))
         )
-        opp_map = {str(o.id): o for o in opps}
+        opp_map = {str(o.id): _convert_opportunity(o) for o in opps}
         return [opp_map.get(str(k)) for k in keys]
 
     return {
@@ -731,41 +769,80 @@ def create_loaders(context: dict) -> dict[str, DataLoader]:
         "companies": DataLoader(load_fn=load_companies),
         "leads": DataLoader(load_fn=load_leads),
         "opportunities": DataLoader(load_fn=load_opportunities),
-        "contact_opportunities": DataLoader(load_fn=lambda keys: asyncio.gather(
-            *[load_contact_opportunities(k) for k in keys]
-        )),
-        "contact_activities": DataLoader(load_fn=lambda keys: asyncio.gather(
-            *[load_contact_activities(k) for k in keys]
-        )),
-        "lead_activities": DataLoader(load_fn=lambda keys: asyncio.gather(
-            *[load_lead_activities(k) for k in keys]
-        )),
+        "contact_opportunities": DataLoader(load_fn=load_contact_opportunities),
+        "contact_activities": DataLoader(load_fn=load_contact_activities),
+        "lead_activities": DataLoader(load_fn=load_lead_activities),
         "lead_insights": DataLoader(load_fn=lambda keys: asyncio.gather(
             *[load_lead_insights(k) for k in keys]
         )),
-        "opportunity_activities": DataLoader(load_fn=lambda keys: asyncio.gather(
-            *[load_opportunity_activities(k) for k in keys]
-        )),
-        "company_contacts": DataLoader(load_fn=lambda keys: asyncio.gather(
-            *[load_company_contacts(k) for k in keys]
-        )),
+        "opportunity_activities": DataLoader(load_fn=load_opportunity_activities),
+        "company_contacts": DataLoader(load_fn=load_company_contacts),
     }
 
 
-async def load_contact_opportunities(contact_id: strawberry.ID) -> list[Opportunity]:
-    """Load opportunities for a contact."""
-    # Implementation would query the database
-    return []
+def _load_grouped(queryset, key_field: str, keys: list, convert) -> list[list]:
+    """
+    Fetch related rows for every key with a single ``key_field IN (...)`` query.
+
+    ``keys`` are ``(key, limit)`` pairs. Each key gets at most the largest
+    limit in the batch, counted in the database with ROW_NUMBER() over the
+    queryset's ordering, and the group is then cut to its own limit. Groups
+    are returned in the order of ``keys``; keys without rows get an empty list.
+    """
+    from django.db.models import F, Window
+    from django.db.models.functions import RowNumber
+
+    limit = max(max(row_limit for _, row_limit in keys), 0)
+    grouped = {str(key): [] for key, _ in keys}
+    ordering = [
+        F(name[1:]).desc() if name.startswith("-") else F(name).asc()
+        for name in queryset.query.order_by
+    ]
+    rows = queryset.filter(**{f"{key_field}__in": list(grouped)}).annotate(
+        _group_row=Window(RowNumber(), partition_by=[F(key_field)], order_by=ordering)
+    ).filter(_group_row__lte=limit)
+
+    for row in rows:
+        bucket = grouped.get(str(getattr(row, key_field)))
+        if bucket is not None:
+            bucket.append(convert(row))
+    return [grouped[str(key)][:max(row_limit, 0)] for key, row_limit in keys]
+
+
+async def load_contact_opportunities(keys: list[tuple[strawberry.ID, int]]) -> list[list[Opportunity]]:
+    """Batch load the most recent opportunities for contacts."""
+    from opportunity_management.models import Opportunity as OppModel
+    return await asyncio.to_thread(
+        _load_grouped,
+        OppModel.objects.order_by("-created_at", "-id"),
+        "contact_id", keys, _convert_opportunity
+    )
+
+
+async def load_contact_activities(keys: list[tuple[strawberry.ID, int]]) -> list[list[Activity]]:
+    """Batch load recent activity feed entries for contacts."""
+    from django.contrib.contenttypes.models import ContentType
 
+    from activity_feed.models import Activity as ActivityModel
+    from contact_management.models import Contact as ContactModel
 
-async def load_contact_activities(contact_id: strawberry.ID) -> list[Activity]:
-    """Load activities for a contact."""
-    return []
+    def fetch():
+        queryset = ActivityModel.objects.filter(
+            content_type=ContentType.objects.get_for_model(ContactModel)
+        ).order_by("-created_at", "-id")
+        return _load_grouped(queryset, "object_id", keys, _convert_feed_activity)
 
+    return await asyncio.to_thread(fetch)
 
-async def load_lead_activities(lead_id: strawberry.ID) -> list[Activity]:
-    """Load activities for a lead."""
-    return []
+
+async def load_lead_activities(keys: list[tuple[strawberry.ID, int]]) -> list[list[Activity]]:
+    """Batch load recent activities for leads."""
+    from lead_management.models import LeadActivity
+    return await asyncio.to_thread(
+        _load_grouped,
+        LeadActivity.objects.order_by("-created_at", "-id"),
+        "lead_id", keys, lambda a: _convert_activity(a, "lead", a.lead_id)
+    )
 
 
 async def load_lead_insights(lead_id: strawberry.ID) -> LeadInsights | None:
@@ -773,26 +850,439 @@ async def load_lead_insights(lead_id: strawberry.ID) -> LeadInsights | None:
     return None
 
 
-async def load_opportunity_activities(opp_id: strawberry.ID) -> list[Activity]:
-    """Load activities for an opportunity."""
-    return []
+async def load_opportunity_activities(keys: list[tuple[strawberry.ID, int]]) -> list[list[Activity]]:
+    """Batch load recent activities for opportunities."""
+    from opportunity_management.models import OpportunityActivity
+    return await asyncio.to_thread(
+        _load_grouped,
+        OpportunityActivity.objects.order_by("-created_at", "-id"),
+        "opportunity_id", keys, lambda a: _convert_activity(a, "opportunity", a.opportunity_id)
+    )
+
+
+async def load_company_contacts(keys: list[tuple[str, int]]) -> list[Connection[Contact]]:
+    """Batch load the first page of contacts for companies, keyed by company name."""
+    from contact_management.models import Contact as ContactModel
+
+    # One extra row per company tells whether there is a next page
+    groups = await asyncio.to_thread(
+        _load_grouped,
+        ContactModel.objects.order_by("last_name", "first_name", "id"),
+        "company_name", [(name, page_size + 1) for name, page_size in keys], _convert_contact
+    )
+    connections = []
+    for (_, page_size), contacts in zip(keys, groups, strict=True):
+        has_next = len(contacts) > page_size
+        contacts = contacts[:page_size]
+        connections.append(Connection(
+            items=contacts,
+            page_info=PageInfo(
+                page=1,
+                page_size=page_size,
+                total_pages=(2 if has_next else 1) if contacts else 0,
+                total_count=len(contacts) + (1 if has_next else 0),
+                has_next=has_next,
+                has_previous=False,
+                total_count_is_exact=not has_next
+            )
+        ))
+    return connections
+
+
+# =============================================================================
+# Keyset Pagination
+# =============================================================================
+
+COUNT_CACHE_TTL = 60  # seconds
+
+
+def _cursor_value(value):
+    """JSON-safe sort value that round-trips exactly through a cursor."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_cursor(row, field: str) -> str:
+    """Opaque cursor holding the row's sort value and primary key."""
+    values = [_cursor_value(getattr(row, field)), _cursor_value(row.pk)]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    """Sort value and primary key from a cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def _sort_field(model, sort: SortInput | None) -> tuple[str, bool]:
+    """
+    Validated sort field and direction.
+
+    Only non-null concrete columns can be keyset-paginated; the primary key
+    breaks ties.
+
+    Returns:
+        (field name, descending)
+    """
+    from django.core.exceptions import FieldDoesNotExist
+
+    if not sort:
+        return "created_at", True
+
+    try:
+        field = model._meta.get_field(to_snake_case(sort.field))
+    except FieldDoesNotExist:
+        field = None
+    if field is None or not field.concrete or field.is_relation or field.null:
+        raise ValueError(f"Cannot sort by '{sort.field}'")
+    return field.name, sort.direction == SortDirection.DESC
+
+
+def _after_cursor(field: str, descending: bool, cursor: str):
+    """Filter for rows strictly after the cursor in (field, pk) order."""
+    from django.db.models import Q
+
+    value, pk = _decode_cursor(cursor)
+    op = "lt" if descending else "gt"
+    return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"pk__{op}": pk})
+
+
+def _total_count(queryset, exact: bool) -> tuple[int, bool]:
+    """
+    Total rows in the filtered queryset.
+
+    Exact counts run COUNT(*) on every call; otherwise a bounded count or
+    the planner estimate is cached for GRAPHQL_COUNT_CACHE_TTL seconds,
+    keyed on the query's SQL.
+
+    Returns:
+        (count, whether the count is exact)
+    """
+    if exact:
+        return queryset.count(), True
+
+    from django.conf import settings
+    from django.core.cache import cache
+
+    from core.search_logging import estimate_result_count
+
+    unordered = queryset.order_by()
+    sql, params = unordered.query.sql_with_params()
+    key = f"graphql:count:{hashlib.md5(f'{sql}{params}'.encode(), usedforsecurity=False).hexdigest()}"
+    count = cache.get(key)
+    if count is None:
+        count = estimate_result_count(unordered)
+        cache.set(key, count, getattr(settings, "GRAPHQL_COUNT_CACHE_TTL", COUNT_CACHE_TTL))
+    return count, False
+
+
+async def _paginate(queryset, pagination: PaginationInput | None, sort: SortInput | None,
+                    convert) -> Connection:
+    """
+    Paginate a queryset ordered by the sort field and primary key.
 
+    With an ``after`` cursor the page is a keyset seek, so deep pages cost
+    the same as the first one. One extra row is fetched to detect the next page.
+    """
+    pagination = pagination or PaginationInput()
+    page_size = pagination.page_size
+    field, descending = _sort_field(queryset.model, sort)
+    prefix = "-" if descending else ""
+    ordered = queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+
+    if pagination.after:
+        page_query = ordered.filter(_after_cursor(field, descending, pagination.after))[:page_size + 1]
+    else:
+        offset = (pagination.page - 1) * page_size
+        page_query = ordered[offset:offset + page_size + 1]
 
-async def load_company_contacts(company_id: strawberry.ID) -> Connection[Contact]:
-    """Load contacts for a company."""
+    rows = await asyncio.to_thread(list, page_query)
+    total_count, exact = await asyncio.to_thread(_total_count, queryset, pagination.exact_count)
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
     return Connection(
-        items=[],
+        items=[convert(row) for row in rows],
         page_info=PageInfo(
-            page=1,
-            page_size=20,
-            total_pages=0,
-            total_count=0,
-            has_next=False,
-            has_previous=False
+            page=pagination.page,
+            page_size=page_size,
+            total_pages=(total_count + page_size - 1) // page_size,
+            total_count=total_count,
+            has_next=has_next,
+            has_previous=bool(pagination.after) or pagination.page > 1,
+            start_cursor=_encode_cursor(rows[0], field) if rows else None,
+            end_cursor=_encode_cursor(rows[-1], field) if rows else None,
+            total_count_is_exact=exact
         )
     )
 
 
+def _filter_date_range(queryset, field: str, date_range: DateRangeInput | None):
+    """Restrict a queryset to a date range."""
+    if date_range:
+        if date_range.start:
+            queryset = queryset.filter(**{f"{field}__gte": date_range.start})
+        if date_range.end:
+            queryset = queryset.filter(**{f"{field}__lte": date_range.end})
+    return queryset
+
+
+# =============================================================================
+# Query Cost Analysis & Persisted Queries
+# =============================================================================
+
+MAX_QUERY_COST = 5000
+COST_BUDGET_PER_MINUTE = 50000
+DEFAULT_LIST_SIZE = 10
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+DOCUMENT_CACHE_SIZE = 256
+PERSISTED_QUERY_TTL = 86400  # seconds
+
+
+def _int_argument(value, default: int) -> int:
+    """Integer argument value, or the default for missing/variable-less values."""
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
+
+
+class QueryCostAnalyzer:
+    """
+    Static cost estimate for a GraphQL document.
+
+    Every object resolved costs 1; scalars are free. List fields multiply
+    the cost of one item by the expected number of items: ``limit``/``first``
+    arguments, the page size for ``items`` of a ``*Connection``, or
+    DEFAULT_LIST_SIZE otherwise.
+    """
+
+    def __init__(self, schema, document, variables: dict | None = None):
+        self.schema = schema
+        self.document = document
+        self.variables = variables or {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    def cost(self, operation_name: str | None = None) -> int:
+        """Cost of the named operation (the most expensive one if unnamed)."""
+        costs = [
+            self._selection_cost(
+                definition.selection_set,
+                self.schema.get_root_type(definition.operation),
+                DEFAULT_LIST_SIZE,
+                frozenset()
+            )
+            for definition in self.document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+            and (operation_name is None or (definition.name and definition.name.value == operation_name))
+        ]
+        return max(costs, default=0)
+
+    def _selection_cost(self, selection_set, parent_type, list_size: int, fragments: frozenset) -> int:
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self._field_cost(selection, parent_type, list_size, fragments)
+            elif isinstance(selection, InlineFragmentNode):
+                type_condition = selection.type_condition
+                fragment_type = self.schema.get_type(type_condition.name.value) if type_condition else parent_type
+                cost += self._selection_cost(selection.selection_set, fragment_type, list_size, fragments)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                # Fragment cycles are rejected by validation; don't recurse into them here
+                if fragment is None or name in fragments:
+                    continue
+                cost += self._selection_cost(
+                    fragment.selection_set,
+                    self.schema.get_type(fragment.type_condition.name.value),
+                    list_size,
+                    fragments | {name}
+                )
+        return cost
+
+    def _field_cost(self, node: FieldNode, parent_type, list_size: int, fragments: frozenset) -> int:
+        fields = getattr(parent_type, "fields", None)
+        field = fields.get(node.name.value) if fields else None
+        if field is None or node.selection_set is None:
+            return 0
+
+        arguments = {
+            argument.name.value: value_from_ast_untyped(argument.value, self.variables)
+            for argument in node.arguments or ()
+        }
+        field_type = get_named_type(field.type)
+
+        multiplier = 1
+        if is_list_type(get_nullable_type(field.type)):
+            multiplier = _int_argument(arguments.get("limit", arguments.get("first")), list_size)
+
+        child_list_size = DEFAULT_LIST_SIZE
+        if field_type.name.endswith("Connection"):
+            pagination = arguments.get("pagination")
+            page_size = pagination.get("pageSize") if isinstance(pagination, dict) else None
+            child_list_size = min(max(_int_argument(page_size, DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+
+        return multiplier * (1 + self._selection_cost(node.selection_set, field_type, child_list_size, fragments))
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Reject documents before execution when their estimated cost exceeds
+    GRAPHQL_MAX_QUERY_COST, or when the client has spent its
+    GRAPHQL_COST_BUDGET_PER_MINUTE.
+    """
+
+    def __init__(self, max_cost: int | None = None, budget_per_minute: int | None = None):
+        from django.conf import settings
+
+        super().__init__()
+        self.max_cost = max_cost or getattr(settings, "GRAPHQL_MAX_QUERY_COST", MAX_QUERY_COST)
+        self.budget_per_minute = budget_per_minute or getattr(
+            settings, "GRAPHQL_COST_BUDGET_PER_MINUTE", COST_BUDGET_PER_MINUTE
+        )
+        self.cost = None
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        execution_context = self.execution_context
+        self.cost = QueryCostAnalyzer(
+            execution_context.schema._schema,
+            execution_context.graphql_document,
+            execution_context.variables
+        ).cost(execution_context.provided_operation_name)
+
+        if self.cost > self.max_cost:
+            raise GraphQLError(f"Query cost {self.cost} exceeds the maximum of {self.max_cost}")
+        if not await asyncio.to_thread(self._charge, self.cost):
+            raise GraphQLError("Query cost budget exceeded, try again later")
+        yield
+
+    def _charge(self, cost: int) -> bool:
+        """Spend cost from the client's budget for the current minute."""
+        from core.rate_limiting import get_rate_limiter
+
+        context = self.execution_context.context
+        request = context.get("request") if isinstance(context, dict) else None
+        if request is None:
+            return True
+
+        limiter = get_rate_limiter("graphql_cost", self.budget_per_minute, 60)
+        return limiter.hit(_get_client_id(request), cost=cost).allowed
+
+    def get_results(self) -> dict[str, Any]:
+        if self.cost is None:
+            return {}
+        return {"cost": {"requested": self.cost, "maximum": self.max_cost}}
+
+
+class DocumentCache:
+    """Thread-safe LRU of parsed documents and their validation errors, keyed by query hash."""
+
+    def __init__(self, maxsize: int = DOCUMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, document) -> dict:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {"document": document, "errors": None}
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_document_cache = DocumentCache()
+
+
+class PersistedQueryCache(SchemaExtension):
+    """
+    Persisted queries and parsed-document caching.
+
+    Supports the Automatic Persisted Queries protocol: a request carrying
+    ``extensions.persistedQuery.sha256Hash`` without a query is resolved
+    from the shared store, and a request with both registers the query.
+    Parsed documents and their validation errors are kept in a
+    process-local LRU keyed by the same hash, so hot queries skip parse
+    and validate.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.entry = None
+
+    def on_operation(self) -> Iterator[None]:
+        from django.conf import settings
+        from django.core.cache import cache
+
+        execution_context = self.execution_context
+        persisted = (execution_context.operation_extensions or {}).get("persistedQuery")
+        digest = persisted.get("sha256Hash") if isinstance(persisted, dict) else None
+
+        if digest:
+            key = f"graphql:persisted:{digest}"
+            if execution_context.query:
+                if _query_hash(execution_context.query) != digest:
+                    raise GraphQLError("provided sha does not match query")
+                cache.set(key, execution_context.query,
+                          getattr(settings, "GRAPHQL_PERSISTED_QUERY_TTL", PERSISTED_QUERY_TTL))
+            elif _document_cache.get(digest) is None:
+                query = cache.get(key)
+                if query is None:
+                    raise GraphQLError("PersistedQueryNotFound")
+                execution_context.query = query
+        elif execution_context.query:
+            digest = _query_hash(execution_context.query)
+
+        self.entry = _document_cache.get(digest) if digest else None
+        if digest and self.entry is None and execution_context.query:
+            self.entry = _document_cache.set(
+                digest, parse(execution_context.query, **execution_context.parse_options)
+            )
+        if self.entry is not None:
+            execution_context.graphql_document = self.entry["document"]
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if self.entry is not None and self.entry["errors"] is not None:
+            execution_context.pre_execution_errors = list(self.entry["errors"])
+            yield
+            return
+        yield
+        if self.entry is not None and execution_context.pre_execution_errors is not None:
+            self.entry["errors"] = list(execution_context.pre_execution_errors)
+
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
 # =============================================================================
 # Query Resolvers
 # =============================================================================
@@ -839,57 +1329,29 @@ class Query:
 
         from lead_management.models import Lead as LeadModel
 
-        pagination = pagination or PaginationInput()
-
-        # Build queryset
         queryset = LeadModel.objects.all()
 
         if filter:
             if filter.status:
                 queryset = queryset.filter(status__in=[s.value for s in filter.status])
             if filter.source:
-                queryset = queryset.filter(source__in=filter.source)
+                queryset = queryset.filter(lead_source__in=filter.source)
             if filter.assigned_to:
                 queryset = queryset.filter(assigned_to_id__in=filter.assigned_to)
             if filter.score_min is not None:
-                queryset = queryset.filter(score__gte=filter.score_min)
+                queryset = queryset.filter(lead_score__gte=filter.score_min)
             if filter.score_max is not None:
-                queryset = queryset.filter(score__lte=filter.score_max)
+                queryset = queryset.filter(lead_score__lte=filter.score_max)
+            queryset = _filter_date_range(queryset, "created_at", filter.created_at)
             if filter.search:
                 queryset = queryset.filter(
                     Q(first_name__icontains=filter.search) |
                     Q(last_name__icontains=filter.search) |
                     Q(email__icontains=filter.search) |
-                    Q(company__icontains=filter.search)
+                    Q(company_name__icontains=filter.search)
                 )
 
-        if sort:
-            order = '-' if sort.direction == SortDirection.DESC else ''
-            queryset = queryset.order_by(f"{order}{sort.field}")
-        else:
-            queryset = queryset.order_by('-created_at')
-
-        # Get total count
-        total_count = await asyncio.to_thread(queryset.count)
-        total_pages = (total_count + pagination.page_size - 1) // pagination.page_size
-
-        # Get page
-        offset = (pagination.page - 1) * pagination.page_size
-        leads = await asyncio.to_thread(
-            lambda: list(queryset[offset:offset + pagination.page_size])
-        )
-
-        return Connection(
-            items=[_convert_lead(l) for l in leads],
-            page_info=PageInfo(
-                page=pagination.page,
-                page_size=pagination.page_size,
-                total_pages=total_pages,
-                total_count=total_count,
-                has_next=pagination.page < total_pages,
-                has_previous=pagination.page > 1
-            )
-        )
+        return await _paginate(queryset, pagination, sort, _convert_lead)
 
     @strawberry.field(permission_classes=[IsAuthenticated])
     async def contact(
@@ -910,19 +1372,30 @@ class Query:
         sort: SortInput | None = None
     ) -> Connection[Contact]:
         """Get paginated list of contacts."""
-        # Similar implementation to leads
-        pagination = pagination or PaginationInput()
-        return Connection(
-            items=[],
-            page_info=PageInfo(
-                page=pagination.page,
-                page_size=pagination.page_size,
-                total_pages=0,
-                total_count=0,
-                has_next=False,
-                has_previous=False
-            )
-        )
+        from django.db.models import Q
+
+        from contact_management.models import Contact as ContactModel
+
+        queryset = ContactModel.objects.all()
+
+        if filter:
+            if filter.type:
+                queryset = queryset.filter(contact_type__in=[t.value for t in filter.type])
+            if filter.company:
+                # Contacts reference companies by name
+                queryset = queryset.filter(company_name__in=filter.company)
+            if filter.tags:
+                queryset = queryset.filter(tags__contains=filter.tags)
+            queryset = _filter_date_range(queryset, "created_at", filter.created_at)
+            if filter.search:
+                queryset = queryset.filter(
+                    Q(first_name__icontains=filter.search) |
+                    Q(last_name__icontains=filter.search) |
+                    Q(email__icontains=filter.search) |
+                    Q(company_name__icontains=filter.search)
+                )
+
+        return await _paginate(queryset, pagination, sort, _convert_contact)
 
     @strawberry.field(permission_classes=[IsAuthenticated])
     async def opportunity(
@@ -943,18 +1416,31 @@ class Query:
         sort: SortInput | None = None
     ) -> Connection[Opportunity]:
         """Get paginated list of opportunities."""
-        pagination = pagination or PaginationInput()
-        return Connection(
-            items=[],
-            page_info=PageInfo(
-                page=pagination.page,
-                page_size=pagination.page_size,
-                total_pages=0,
-                total_count=0,
-                has_next=False,
-                has_previous=False
-            )
-        )
+        from django.db.models import Q
+
+        from opportunity_management.models import Opportunity as OppModel
+
+        queryset = OppModel.objects.all()
+
+        if filter:
+            if filter.stage:
+                queryset = queryset.filter(stage__in=[s.value for s in filter.stage])
+            if filter.owner:
+                queryset = queryset.filter(owner_id__in=filter.owner)
+            if filter.value_min is not None:
+                queryset = queryset.filter(amount__gte=filter.value_min)
+            if filter.value_max is not None:
+                queryset = queryset.filter(amount__lte=filter.value_max)
+            queryset = _filter_date_range(queryset, "expected_close_date", filter.close_date)
+            if filter.probability_min is not None:
+                queryset = queryset.filter(probability__gte=filter.probability_min)
+            if filter.search:
+                queryset = queryset.filter(
+                    Q(name__icontains=filter.search) |
+                    Q(company_name__icontains=filter.search)
+                )
+
+        return await _paginate(queryset, pagination, sort, _convert_opportunity)
 
     @strawberry.field(permission_classes=[IsAuthenticated])
     async def dashboard_metrics(self, info: Info) -> DashboardMetrics:
@@ -1005,11 +1491,11 @@ def _convert_lead(lead_model) -> Lead:
         last_name=lead_model.last_name,
         email=lead_model.email,
         phone=lead_model.phone,
-        company=lead_model.company,
+        company=lead_model.company_name or None,
         status=LeadStatus(lead_model.status),
-        source=lead_model.source,
-        score=lead_model.score,
-        notes=lead_model.notes,
+        source=lead_model.lead_source,
+        score=lead_model.lead_score,
+        notes=lead_model.notes or None,
         custom_fields=lead_model.custom_fields,
         created_at=lead_model.created_at,
         updated_at=lead_model.updated_at
@@ -1018,6 +1504,81 @@ def _convert_lead(lead_model) -> Lead:
     return lead
 
 
+def _convert_contact(contact_model) -> Contact:
+    """Convert Django model to GraphQL type."""
+    contact = Contact(
+        id=strawberry.ID(str(contact_model.id)),
+        first_name=contact_model.first_name,
+        last_name=contact_model.last_name,
+        email=contact_model.email,
+        phone=contact_model.phone or None,
+        mobile=contact_model.mobile or None,
+        job_title=contact_model.job_title or None,
+        department=contact_model.department or None,
+        type=ContactType(contact_model.contact_type),
+        address=contact_model.address_line_1 or None,
+        tags=contact_model.tags or [],
+        custom_fields=contact_model.custom_fields,
+        created_at=contact_model.created_at,
+        updated_at=contact_model.updated_at
+    )
+    return contact
+
+
+def _convert_opportunity(opp_model) -> Opportunity:
+    """Convert Django model to GraphQL type."""
+    opportunity = Opportunity(
+        id=strawberry.ID(str(opp_model.id)),
+        name=opp_model.name,
+        value=opp_model.amount,
+        stage=OpportunityStage(opp_model.stage),
+        probability=opp_model.probability,
+        expected_close_date=opp_model.expected_close_date,
+        actual_close_date=opp_model.actual_close_date,
+        description=opp_model.description or None,
+        win_reason=None,
+        loss_reason=None,
+        custom_fields=opp_model.custom_fields,
+        created_at=opp_model.created_at,
+        updated_at=opp_model.updated_at
+    )
+    opportunity._contact_id = opp_model.contact_id
+    opportunity._owner_id = opp_model.owner_id
+    return opportunity
+
+
+def _convert_activity(activity_model, related_to_type: str, related_to_id) -> Activity:
+    """Convert a lead or opportunity activity to the GraphQL type."""
+    activity = Activity(
+        id=strawberry.ID(str(activity_model.id)),
+        type=activity_model.activity_type,
+        title=activity_model.subject,
+        description=activity_model.description or None,
+        related_to_type=related_to_type,
+        related_to_id=strawberry.ID(str(related_to_id)),
+        metadata=None,
+        created_at=activity_model.created_at
+    )
+    activity._user_id = activity_model.user_id
+    return activity
+
+
+def _convert_feed_activity(activity_model) -> Activity:
+    """Convert an activity feed entry to the GraphQL type."""
+    activity = Activity(
+        id=strawberry.ID(str(activity_model.id)),
+        type=activity_model.action,
+        title=activity_model.get_action_display(),
+        description=activity_model.description or None,
+        related_to_type="contact",
+        related_to_id=strawberry.ID(activity_model.object_id),
+        metadata=activity_model.metadata,
+        created_at=activity_model.created_at
+    )
+    activity._user_id = activity_model.actor_id
+    return activity
+
+
 # =============================================================================
 # Mutation Resolvers
 # =============================================================================
@@ -1317,7 +1878,9 @@ schema = strawberry.Schema(
     mutation=Mutation,
     subscription=Subscription,
     extensions=[
+        PersistedQueryCache,
         QueryDepthLimiter(max_depth=10),
+        QueryCostLimiter,
     ]
 )
 
@@ -66,6 +66,9 @@ CACHES = {
     }
 }
 
+# Direct Redis access for autocomplete indexes, counters and similar structures
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/2')
+
 # Cache session data
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -0,0 +1,150 @@
+"""
+Autocomplete Tests
+
+Test suite for the autocomplete prefix index:
+- Local and Redis prefix stores
+- Incremental updates from record changes
+- Popular searches from aggregated counts
+"""
+
+import fakeredis
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from core import tasks
+from core.autocomplete import AutocompleteIndex, LocalPrefixStore, RedisPrefixStore, _local_store
+from core.search import SearchSuggestions
+
+User = get_user_model()
+
+CONTACT_MODEL = 'contact_management.Contact'
+
+
+@pytest.fixture(params=['local', 'redis'])
+def prefix_store(request):
+    """Return each prefix store implementation."""
+    if request.param == 'redis':
+        pytest.importorskip('lupa')  # fakeredis needs lupa for Lua scripts
+        return RedisPrefixStore(fakeredis.FakeRedis(decode_responses=True))
+    return LocalPrefixStore()
+
+
+@pytest.fixture
+def contacts(db):
+    """Create contacts to build indexes from."""
+    from contact_management.models import Contact
+
+    owner = User.objects.bulk_create([User(username='completer', email='completer@example.com')])[0]
+    Contact.objects.bulk_create([
+        Contact(first_name='Alice', last_name='Smith', email='alice@acme.com',
+                company_name='Acme Corp', tags=['vip'], created_by_id=owner.pk),
+        Contact(first_name='Alan', last_name='Jones', email='alan@acme.com',
+                company_name='Acme Corp', tags=['vip', 'partner'], created_by_id=owner.pk),
+        Contact(first_name='Bob', last_name='Brown', email='bob@globex.com',
+                company_name='Globex', created_by_id=owner.pk),
+    ])
+    return Contact.objects.all()
+
+
+class TestPrefixStore:
+    """Tests shared by the local and Redis prefix stores."""
+
+    def test_prefix_lookup_is_case_insensitive(self, prefix_store):
+        """Values are matched by lowercase prefix and returned as stored."""
+        prefix_store.load('companies', {'Acme Corp': 2, 'acme labs': 1, 'Globex': 1})
+
+        assert prefix_store.prefix('companies', 'acm', 10) == ['Acme Corp', 'acme labs']
+        assert prefix_store.prefix('companies', 'acm', 1) == ['Acme Corp']
+        assert prefix_store.prefix('companies', 'x', 10) == []
+
+    def test_reference_counts(self, prefix_store):
+        """A value disappears only when no record holds it."""
+        prefix_store.load('companies', {'Acme Corp': 2})
+
+        prefix_store.add('companies', ['Acme Corp'], -1)
+        assert prefix_store.prefix('companies', 'acme', 10) == ['Acme Corp']
+
+        prefix_store.add('companies', ['Acme Corp'], -1)
+        assert prefix_store.prefix('companies', 'acme', 10) == []
+
+        prefix_store.add('companies', ['Initech'], 1)
+        assert prefix_store.prefix('companies', 'ini', 10) == ['Initech']
+
+    def test_popular_counts(self, prefix_store):
+        """Popular queries are ordered by count."""
+        prefix_store.incr_popular(CONTACT_MODEL, 'acme')
+        prefix_store.incr_popular(CONTACT_MODEL, 'globex', 3)
+
+        assert list(prefix_store.top_popular(CONTACT_MODEL, 10)) == ['globex', 'acme']
+
+
+@pytest.mark.django_db
+class TestAutocompleteIndex:
+    """Tests for index builds and incremental maintenance."""
+
+    def test_warmed_index_serves_suggestions(self, contacts):
+        """Suggestions include derived email domains and tags."""
+        index = AutocompleteIndex(store=LocalPrefixStore())
+        index.warm([CONTACT_MODEL])
+
+        assert index.suggest(CONTACT_MODEL, 'company_name', 'ac') == ['Acme Corp']
+        assert index.suggest(CONTACT_MODEL, 'email_domain', 'g') == ['globex.com']
+        assert index.suggest(CONTACT_MODEL, 'tags', 'p') == ['partner']
+        assert index.suggest(CONTACT_MODEL, 'first_name', 'al') == ['Alan', 'Alice']
+
+    def test_updates_follow_record_changes(self, contacts):
+        """Changing a record moves its value between entries."""
+        index = AutocompleteIndex(store=LocalPrefixStore())
+        index.build(CONTACT_MODEL, 'company_name')
+
+        index.update(CONTACT_MODEL, 'company_name', ['Globex'], ['Initech'])
+
+        assert index.suggest(CONTACT_MODEL, 'company_name', 'g') == []
+        assert index.suggest(CONTACT_MODEL, 'company_name', 'i') == ['Initech']
+
+    def test_unbuilt_index_falls_back_and_queues_one_build(self, contacts, monkeypatch):
+        """Requests never build the index; the first one queues the build."""
+        queued = []
+        monkeypatch.setattr(tasks.build_autocomplete_index, 'delay', lambda *args: queued.append(args))
+        index = AutocompleteIndex(store=LocalPrefixStore())
+
+        assert index.suggest(CONTACT_MODEL, 'company_name', 'ac') == ['Acme Corp']
+        assert index.suggest(CONTACT_MODEL, 'company_name', 'gl') == ['Globex']
+        assert index.suggest(CONTACT_MODEL, 'email_domain', 'g') == []
+        assert queued == [(CONTACT_MODEL, 'company_name'), (CONTACT_MODEL, 'email_domain')]
+        assert not index.store.is_built(index.index_name(CONTACT_MODEL, 'company_name'))
+
+    def test_warm_command_builds_indexes(self, contacts, settings):
+        """The management command builds each configured field once."""
+        settings.REDIS_URL = ''
+        _local_store.clear()
+        try:
+            call_command('warm_autocomplete_index', CONTACT_MODEL, stdout=None)
+
+            index = AutocompleteIndex(store=_local_store)
+            assert index.suggest(CONTACT_MODEL, 'tags', 'v') == ['vip']
+            assert index.warm([CONTACT_MODEL]) == []
+        finally:
+            _local_store.clear()
+
+    def test_search_suggestions_use_index(self, contacts):
+        """SearchSuggestions.suggest is served by the prefix index."""
+        assert SearchSuggestions.suggest(CONTACT_MODEL, 'company_name', 'Glo') == ['Globex']
+
+    def test_popular_searches_seed_from_log(self, db):
+        """Popular searches seed from SearchLog once, then count in the index."""
+        from core.models import SearchLog
+
+        SearchLog.objects.bulk_create([
+            SearchLog(model_name=CONTACT_MODEL, query='acme'),
+            SearchLog(model_name=CONTACT_MODEL, query='acme'),
+            SearchLog(model_name=CONTACT_MODEL, query='globex'),
+        ])
+        index = AutocompleteIndex(store=LocalPrefixStore())
+
+        assert index.popular_searches(CONTACT_MODEL) == ['acme', 'globex']
+
+        for _ in range(2):
+            index.record_search(CONTACT_MODEL, 'globex')
+        assert index.popular_searches(CONTACT_MODEL) == ['globex', 'acme']
@@ -0,0 +1,282 @@
+"""
+Cache Coalescing Tests
+
+Test suite for core.cache_coalescing and the helpers built on it:
+- Single-flight computation of concurrent misses
+- Distributed lock waiting and lock-holder failure
+- XFetch early refresh and stale-while-revalidate
+- Celery refresh of importable computations
+- core CacheManager, SmartCacheService and enterprise caching entry points
+"""
+
+import threading
+import time
+
+import fakeredis
+import pytest
+from django.core.cache import cache
+
+from core import cache_coalescing, cache_utils
+from core.cache_coalescing import RequestCoalescer
+from core.cache_utils import CacheManager
+from enterprise.caching import CacheStampedeProtection, InMemoryCache, MultiTierCache
+
+
+class FakeClock:
+    """Controllable time source."""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    """Runs background refreshes immediately."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def expensive_total(base):
+    """Module-level so Celery can import it."""
+    return base * 2
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(cache_coalescing, '_default_coalescer', None)
+    monkeypatch.setattr(cache_coalescing, '_refresh_executor', InlineExecutor())
+
+
+@pytest.fixture
+def redis_client(settings, monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    settings.REDIS_URL = 'redis://fake:6379/0'
+    monkeypatch.setattr(cache_utils, '_redis_client', client)
+    return client
+
+
+def run_concurrently(fn, count=10):
+    barrier = threading.Barrier(count)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class SlowCompute:
+    """Counts calls and takes long enough for callers to pile up."""
+
+    def __init__(self, value='report', delay=0.2, error=None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.value
+
+
+class TestSingleFlight:
+    """Concurrent misses share one computation"""
+
+    @pytest.mark.parametrize('backend', ['local', 'redis'])
+    def test_one_computation_per_miss(self, backend, request):
+        if backend == 'redis':
+            request.getfixturevalue('redis_client')
+        coalescer = RequestCoalescer()
+        compute = SlowCompute()
+
+        results, errors = run_concurrently(lambda: coalescer.get_or_compute('k', compute, 60))
+
+        assert errors == []
+        assert results == ['report'] * 10
+        assert compute.calls == 1
+        assert cache.get('k') == 'report'
+
+    def test_errors_reach_every_waiter(self):
+        coalescer = RequestCoalescer()
+        compute = SlowCompute(error=RuntimeError('db down'))
+
+        results, errors = run_concurrently(lambda: coalescer.get_or_compute('k', compute, 60))
+
+        assert results == []
+        assert len(errors) == 10
+        assert compute.calls == 1
+        compute.error = None
+        assert coalescer.get_or_compute('k', compute, 60) == 'report'
+
+
+class TestDistributedLock:
+    """Coordination between processes"""
+
+    def test_waits_for_other_process(self, redis_client):
+        # Separate names stand in for separate processes
+        first, second = RequestCoalescer(name='p1'), RequestCoalescer(name='p2')
+        started, finish = threading.Event(), threading.Event()
+        other = SlowCompute(value='other')
+
+        def compute():
+            # Runs while holding the lock
+            started.set()
+            finish.wait(5)
+            return 'report'
+
+        thread = threading.Thread(target=lambda: first.get_or_compute('k', compute, 60))
+        thread.start()
+        assert started.wait(5)
+        threading.Timer(0.2, finish.set).start()
+        assert second.get_or_compute('k', other, 60) == 'report'
+        thread.join()
+
+        assert other.calls == 0
+
+    def test_lock_holder_failure(self, redis_client):
+        coalescer = RequestCoalescer(lock_timeout=0.3)
+        redis_client.set(coalescer._lock_key('k', 'compute'), 'dead-process', px=10_000)
+
+        assert coalescer.get_or_compute('k', lambda: 'computed', 60) == 'computed'
+
+    def test_release_leaves_foreign_lock(self, redis_client):
+        coalescer = RequestCoalescer()
+        lock_key = coalescer._lock_key('k', 'compute')
+        redis_client.set(lock_key, 'someone-else')
+
+        coalescer._release(lock_key, 'stale-token')
+        assert redis_client.get(lock_key) == 'someone-else'
+
+
+class TestRefresh:
+    """XFetch and stale-while-revalidate"""
+
+    def test_early_refresh_near_expiry(self, monkeypatch):
+        clock = FakeClock()
+        coalescer = RequestCoalescer(clock=clock)
+        values = iter(['v1', 'v2'])
+        coalescer.get_or_compute('k', lambda: next(values), 60)
+
+        # Far from expiry nothing happens, even with the largest draw
+        monkeypatch.setattr(cache_coalescing.random, 'random', lambda: 0.999999)
+        clock.now += 30
+        assert coalescer.get_or_compute('k', lambda: next(values), 60) == 'v1'
+        assert cache.get('k') == 'v1'
+
+        # One second before expiry a slow computation is refreshed early
+        cache.set('k:xf', {**cache.get('k:xf'), 'delta': 2.0})
+        clock.now += 29
+        assert coalescer.get_or_compute('k', lambda: next(values), 60) == 'v1'
+        assert cache.get('k') == 'v2'
+
+    def test_stale_value_served_while_refreshing(self, monkeypatch):
+        clock = FakeClock()
+        coalescer = RequestCoalescer(clock=clock)
+        coalescer.get_or_compute('k', lambda: 'old', 60, stale_ttl=120)
+
+        pending = []
+        monkeypatch.setattr(
+            cache_coalescing, '_refresh_executor',
+            type('Deferred', (), {'submit': lambda self, fn, *args: pending.append((fn, args))})()
+        )
+        clock.now += 90
+        for _ in range(5):
+            assert coalescer.get_or_compute('k', lambda: 'new', 60, stale_ttl=120) == 'old'
+        assert len(pending) == 1
+
+        fn, args = pending[0]
+        fn(*args)
+        assert coalescer.get_or_compute('k', lambda: 'newer', 60, stale_ttl=120) == 'new'
+
+    def test_past_stale_window_recomputes(self):
+        clock = FakeClock()
+        coalescer = RequestCoalescer(clock=clock)
+        coalescer.get_or_compute('k', lambda: 'old', 60, stale_ttl=10)
+
+        clock.now += 71
+        assert coalescer.get_or_compute('k', lambda: 'new', 60, stale_ttl=10) == 'new'
+
+    def test_refresh_queued_on_celery(self, monkeypatch):
+        from core import tasks
+
+        clock = FakeClock()
+        coalescer = RequestCoalescer(clock=clock, celery_refresh=True)
+        monkeypatch.setattr(cache_coalescing, 'get_coalescer', lambda: coalescer)
+        queued = []
+        monkeypatch.setattr(tasks.refresh_cached_value, 'delay', lambda *args: queued.append(args))
+        coalescer.get_or_compute('total', expensive_total, 60, stale_ttl=60, args=(21,))
+
+        clock.now += 61
+        assert coalescer.get_or_compute('total', expensive_total, 60, stale_ttl=60, args=(21,)) == 42
+        path = f'{expensive_total.__module__}.expensive_total'
+        assert queued[0][:6] == ('total', path, [21], {}, 60, 60)
+
+        # What the worker runs
+        cache.set('total', 0)
+        tasks.refresh_cached_value.run(*queued[0])
+        assert cache.get('total') == 42
+
+    def test_closures_refresh_in_process(self, monkeypatch):
+        from core import tasks
+
+        clock = FakeClock()
+        coalescer = RequestCoalescer(clock=clock, celery_refresh=True)
+        monkeypatch.setattr(tasks.refresh_cached_value, 'delay', pytest.fail)
+        coalescer.get_or_compute('k', lambda: 'old', 60, stale_ttl=60)
+
+        clock.now += 61
+        assert coalescer.get_or_compute('k', lambda: 'new', 60, stale_ttl=60) == 'old'
+        assert cache.get('k') == 'new'
+
+
+class TestEntryPoints:
+    """Helpers that share the coalescer"""
+
+    def test_core_cache_manager(self):
+        compute = SlowCompute()
+
+        results, _ = run_concurrently(lambda: CacheManager.get_or_set('k', compute, 60))
+
+        assert results == ['report'] * 10
+        assert compute.calls == 1
+        assert CacheManager.get_or_set('v', lambda: 'versioned', 60, version=3) == 'versioned'
+        assert cache.get('v', version=3) == 'versioned'
+
+    def test_smart_cache_service_stale(self, monkeypatch):
+        from core.caching_services import SmartCacheService
+
+        clock = FakeClock()
+        monkeypatch.setattr(cache_coalescing, '_default_coalescer', RequestCoalescer(clock=clock))
+        service = SmartCacheService()
+        service.get_with_stale('dashboard', lambda: 'old', ttl=60, stale_ttl=60)
+
+        clock.now += 61
+        assert service.get_with_stale('dashboard', lambda: 'new', ttl=60, stale_ttl=60) == 'old'
+        assert service.get_with_stale('dashboard', lambda: 'newer', ttl=60, stale_ttl=60) == 'new'
+
+    def test_enterprise_stampede_protection(self):
+        tiered = MultiTierCache(l1_cache=InMemoryCache(sweep_interval=None))
+        protection = CacheStampedeProtection(tiered)
+        compute = SlowCompute()
+
+        results, _ = run_concurrently(lambda: protection.get_or_compute('k', compute, ttl=60))
+
+        assert results == ['report'] * 10
+        assert compute.calls == 1
+        assert tiered.get('k') == 'report'
@@ -0,0 +1,198 @@
+"""
+Cache Invalidation Tests
+
+Test suite for tag and namespace based invalidation:
+- core.cache_utils.CacheManager tags in-process and in Redis SETs
+- Versioned namespaces for model list caches and cached_query
+- enterprise MultiTierCache tag sets and pub/sub L1 invalidation across nodes
+"""
+
+import time
+
+import fakeredis
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+from core import cache_utils
+from core.cache_utils import CacheKey, CacheManager, cached_query
+from enterprise.caching import InMemoryCache, MultiTierCache, RedisCache
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    cache.clear()
+    cache_utils._local_tags.clear()
+
+
+@pytest.fixture
+def redis_client(settings, monkeypatch):
+    """Point get_redis_client at fakeredis."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    settings.REDIS_URL = 'redis://fake:6379/0'
+    monkeypatch.setattr(cache_utils, '_redis_client', client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_scans(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('keyspace scan')
+
+    monkeypatch.setattr(CacheManager, 'delete_pattern', fail)
+
+
+def fill(key, value, tags=None):
+    return CacheManager.get_or_set(key, lambda: value, tags=tags)
+
+
+class TestCoreTags:
+    """CacheManager tag index"""
+
+    @pytest.mark.parametrize('backend', ['local', 'redis'])
+    def test_invalidate_only_tagged_keys(self, backend, request):
+        if backend == 'redis':
+            request.getfixturevalue('redis_client')
+        fill('a', 1, tags=['lead:1'])
+        fill('b', 2, tags=['lead:1', 'owner:7'])
+        fill('c', 3, tags=['owner:7'])
+        fill('d', 4)
+
+        assert CacheManager.invalidate_tags(['lead:1']) == 2
+        assert cache.get_many(['a', 'b', 'c', 'd']) == {'c': 3, 'd': 4}
+        assert CacheManager.invalidate_tags(['lead:1']) == 0
+
+    def test_redis_tag_sets_track_longest_ttl(self, redis_client):
+        CacheManager.get_or_set('long', lambda: 1, timeout=600, tags=['t'])
+        CacheManager.get_or_set('short', lambda: 2, timeout=60, tags=['t'])
+
+        tag_key = CacheKey.make('tag', 't')
+        assert redis_client.smembers(tag_key) == {'long', 'short'}
+        assert 590 < redis_client.ttl(tag_key) <= 600
+
+        CacheManager.invalidate_tags(['t'])
+        assert not redis_client.exists(tag_key)
+
+
+class TestNamespaces:
+    """Versioned namespaces"""
+
+    def test_bump_moves_to_new_keys(self):
+        first = CacheManager.namespaced_key('reports', 'q1')
+        CacheManager.bump_namespace('reports')
+        second = CacheManager.namespaced_key('reports', 'q1')
+
+        assert first != second
+        assert second.endswith(':v2:q1')
+
+    def test_invalidate_model(self):
+        instance_key = CacheKey.for_model(Group, 5)
+        other_key = CacheKey.for_model(Group, 6)
+        list_key = CacheManager.namespaced_key(CacheKey.for_model(Group, 'list'), 'active')
+        cache.set_many({instance_key: 'five', other_key: 'six', list_key: ['five', 'six']})
+        fill('group-5-summary', 'summary', tags=[instance_key])
+
+        CacheManager.invalidate_model(Group, 5)
+
+        assert cache.get(instance_key) is None
+        assert cache.get('group-5-summary') is None
+        assert cache.get(other_key) == 'six'
+        assert CacheManager.namespaced_key(CacheKey.for_model(Group, 'list'), 'active') != list_key
+
+    def test_cached_query_invalidate(self):
+        calls = []
+
+        @cached_query('stats')
+        def count(status):
+            calls.append(status)
+            return len(calls)
+
+        @cached_query('stats', key_builder=lambda status: f'custom:{status}')
+        def custom(status):
+            calls.append(status)
+            return len(calls)
+
+        assert count('open') == count('open') == 1
+        assert custom('open') == 2
+
+        count.invalidate()
+        assert count('open') == 3
+        assert custom('open') == 4
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_node(server, **kwargs):
+    l2 = RedisCache()
+    l2.client = fakeredis.FakeRedis(server=server)
+    return MultiTierCache(
+        l1_cache=InMemoryCache(sweep_interval=None), l2_cache=l2, l1_ttl=60, **kwargs
+    )
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestMultiTierInvalidation:
+    """Tag sets and cross-node L1 invalidation"""
+
+    def test_tags_without_l2(self):
+        node = MultiTierCache(l1_cache=InMemoryCache(sweep_interval=None))
+        node.set('lead:1', 'a', tags={'leads'})
+        node.set('lead:2', 'b', tags={'leads', 'owner:1'})
+        node.set('contact:1', 'c', tags={'contacts'})
+
+        assert node.invalidate_by_tags({'leads'}) == 2
+        assert node.get('lead:2') is None
+        assert node.get('contact:1') == 'c'
+
+    def test_invalidation_reaches_other_nodes_l1(self, server):
+        writer, reader = make_node(server), make_node(server)
+        writer.set('lead:1', {'name': 'old'}, tags={'lead:1'})
+        writer.set('lead:2', {'name': 'other'}, tags={'lead:2'})
+        assert reader.get('lead:1') == {'name': 'old'}
+        assert reader.get('lead:2') == {'name': 'other'}
+
+        assert writer.invalidate_by_tags({'lead:1'}) == 1
+
+        assert wait_for(lambda: reader.l1.get('lead:1') is None)
+        assert reader.get('lead:1') is None
+        assert reader.l1.get('lead:2') == {'name': 'other'}
+        writer.close()
+        reader.close()
+
+    def test_delete_reaches_other_nodes_l1(self, server):
+        writer, reader = make_node(server), make_node(server)
+        writer.set('k', 1)
+        reader.get('k')
+
+        writer.delete('k')
+        assert wait_for(lambda: reader.l1.get('k') is None)
+        writer.close()
+        reader.close()
+
+    def test_namespace_bump_reaches_other_nodes(self, server):
+        writer, reader = make_node(server), make_node(server)
+        old_key = reader.namespaced_key('reports', 'daily')
+
+        writer.bump_namespace('reports')
+
+        assert wait_for(lambda: reader.namespaced_key('reports', 'daily') != old_key)
+        assert reader.namespaced_key('reports', 'daily') == writer.namespaced_key('reports', 'daily')
+        writer.close()
+        reader.close()
+
+    def test_own_messages_ignored(self, server):
+        node = make_node(server, listen=False)
+        node.l1.set('k', 1)
+        node._apply_invalidation(f'{{"origin": "{node.node_id}", "keys": ["k"]}}')
+
+        assert node.l1.get('k') == 1
+        node._apply_invalidation('not json')
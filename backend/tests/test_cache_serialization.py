@@ -0,0 +1,161 @@
+"""
+Cache Serialization Tests
+
+Test suite for enterprise.caching serializers and multi-key operations:
+- Pluggable formats and compression codecs selected per key prefix
+- Reading values written by other serializers and the legacy format
+- MGET / pipelined get_many, set_many and delete_many across the tiers
+"""
+
+import datetime
+import pickle
+import zlib
+from decimal import Decimal
+
+import fakeredis
+import pytest
+
+from enterprise import caching
+from enterprise.caching import (
+    CacheManager,
+    CacheSerializer,
+    DjangoCacheBackend,
+    InMemoryCache,
+    MultiTierCache,
+    RedisCache,
+)
+
+PAYLOAD = {
+    'lead_id': 42,
+    'name': 'Ada Lovelace',
+    'score': 87.5,
+    'tags': ['enterprise', 'inbound'],
+    'owner': None,
+    'activities': [{'type': 'call', 'note': f'Call {i} ' + 'x' * 200} for i in range(20)],
+}
+
+
+def make_l2(**kwargs):
+    l2 = RedisCache(**kwargs)
+    l2.client = fakeredis.FakeRedis()
+    return l2
+
+
+class TestSerializers:
+    """Formats, codecs and headers"""
+
+    @pytest.mark.parametrize('format', ['pickle', 'msgpack', 'orjson'])
+    @pytest.mark.parametrize('compression', ['none', 'zlib'])
+    def test_round_trip(self, format, compression):
+        serializer = CacheSerializer(format, compression)
+
+        data = serializer.dumps(PAYLOAD)
+        assert CacheSerializer.loads(data) == PAYLOAD
+        assert data[1:2] == (b'-' if compression == 'none' else b'z')
+
+    def test_small_values_are_not_compressed(self):
+        data = CacheSerializer('msgpack', 'zlib').dumps({'a': 1})
+
+        assert data[:2] == b'M-'
+
+    def test_unsupported_values_fall_back_to_pickle(self):
+        value = {'closed_at': datetime.datetime(2024, 1, 1), 'amount': Decimal('10.50')}
+
+        for format in ('msgpack', 'orjson'):
+            data = CacheSerializer(format).dumps(value)
+            assert data[:1] == b'P'
+            assert CacheSerializer.loads(data) == value
+
+    def test_missing_codec_falls_back_to_zlib(self, monkeypatch):
+        monkeypatch.setattr(caching, '_module_available', lambda module: module is None)
+
+        serializer = CacheSerializer('orjson', 'zstd')
+        assert (serializer.format, serializer.compression) == ('pickle', 'zlib')
+
+    def test_unknown_names_rejected(self):
+        with pytest.raises(ValueError):
+            CacheSerializer('yaml')
+        with pytest.raises(ValueError):
+            CacheSerializer('pickle', 'brotli')
+
+    def test_reads_legacy_values(self):
+        assert CacheSerializer.loads(b'U' + pickle.dumps(PAYLOAD)) == PAYLOAD
+        assert CacheSerializer.loads(b'C' + zlib.compress(pickle.dumps(PAYLOAD))) == PAYLOAD
+
+
+class TestRedisCache:
+    """Per-prefix serializers and multi-key operations"""
+
+    def test_serializer_chosen_by_longest_prefix(self):
+        l2 = make_l2(serializers={
+            'dashboard:': {'format': 'msgpack'},
+            'dashboard:live:': CacheSerializer('orjson'),
+        })
+        l2.set('dashboard:weekly', PAYLOAD)
+        l2.set('dashboard:live:pipeline', PAYLOAD)
+        l2.set('lead:1', PAYLOAD)
+
+        assert l2.client.get(l2._make_key('dashboard:weekly'))[:1] == b'M'
+        assert l2.client.get(l2._make_key('dashboard:live:pipeline'))[:1] == b'J'
+        assert l2.client.get(l2._make_key('lead:1'))[:1] == b'P'
+        assert l2.get('dashboard:live:pipeline') == PAYLOAD
+
+    def test_multi_key_operations_avoid_single_key_commands(self, monkeypatch):
+        l2 = make_l2()
+
+        def single_key(*args, **kwargs):
+            raise AssertionError('single-key round trip')
+
+        for command in ('get', 'set', 'setex', 'delete'):
+            monkeypatch.setattr(l2.client, command, single_key)
+
+        assert l2.set_many({f'k{i}': i for i in range(50)}, ttl=60)
+        found = l2.get_many([f'k{i}' for i in range(60)])
+        assert found == {f'k{i}': i for i in range(50)}
+        assert l2.get_stats().hits == 50
+        assert l2.get_stats().misses == 10
+
+        assert l2.delete_many(['k1', 'k2', 'missing']) == 2
+        assert 'k1' not in l2.get_many(['k1'])
+
+    def test_set_many_applies_ttl(self):
+        l2 = make_l2()
+        l2.set_many({'a': 1}, ttl=30)
+
+        assert 0 < l2.client.ttl(l2._make_key('a')) <= 30
+
+
+class TestMultiTier:
+    """get_many across L1 and L2"""
+
+    def test_get_many_reads_l1_then_l2(self):
+        l2 = make_l2()
+        cache = MultiTierCache(l1_cache=InMemoryCache(sweep_interval=None), l2_cache=l2, listen=False)
+        cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        cache.l1.delete('b')
+
+        assert cache.get_many(['a', 'b', 'c', 'd']) == {'a': 1, 'b': 2, 'c': 3}
+        # b was promoted back into L1
+        assert cache.l1.get('b') == 2
+
+        cache.delete_many(['a', 'b'])
+        assert cache.get_many(['a', 'b', 'c']) == {'c': 3}
+
+
+@pytest.fixture
+def django_backend(monkeypatch):
+    monkeypatch.setattr(CacheManager, '_instance', None)
+    return DjangoCacheBackend('', {'KEY_PREFIX': 'crm'})
+
+
+class TestDjangoCacheBackend:
+    """Django cache API semantics"""
+
+    def test_many_operations(self, django_backend):
+        assert django_backend.set_many({'a': 1, 'b': 2}, version=2) == []
+
+        assert django_backend.get_many(['a', 'b', 'missing'], version=2) == {'a': 1, 'b': 2}
+        assert django_backend.get_many(['a']) == {}
+
+        django_backend.delete_many(['a'], version=2)
+        assert django_backend.get_many(['a', 'b'], version=2) == {'b': 2}
@@ -0,0 +1,277 @@
+"""
+Data Import Tests
+
+Test suite for the streaming DataImporter:
+- CSV, Excel and JSON lines streaming
+- Row validation and error reporting
+- Checkpoints and resuming interrupted imports
+"""
+
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+import openpyxl
+import pytest
+from django.contrib.auth import get_user_model
+
+from core.data_operations import DataImporter
+from core.models import DataImportLog
+
+User = get_user_model()
+
+CONTACT_MODEL = 'contact_management.Contact'
+
+MAPPING = {
+    'First Name': 'first_name',
+    'Last Name': 'last_name',
+    'Email': 'email',
+    'Company': 'company_name',
+}
+
+
+def contacts_csv(count, bad_rows=()):
+    """Build a contacts CSV with invalid emails on the given rows."""
+    lines = ['First Name,Last Name,Email,Company']
+    for i in range(count):
+        email = 'not-an-email' if i in bad_rows else f'contact{i}@example.com'
+        lines.append(f'First{i},Last{i},{email},Company {i % 3}')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+@pytest.fixture
+def importer_user(db):
+    """User performing imports."""
+    return User.objects.bulk_create([User(username='importer', email='importer@example.com')])[0]
+
+
+@pytest.mark.django_db
+class TestDataImporter:
+    """Tests for streaming imports."""
+
+    def test_csv_import(self, importer_user):
+        """CSV rows are imported in batches and logged."""
+        from contact_management.models import Contact
+
+        importer = DataImporter(CONTACT_MODEL, contacts_csv(25), 'csv', MAPPING, importer_user)
+        results = importer.import_data(batch_size=10)
+
+        assert results['imported'] == 25
+        assert results['total'] == 25
+        assert Contact.objects.filter(created_by=importer_user).count() == 25
+
+        log = DataImportLog.objects.get(pk=results['import_log_id'])
+        assert log.status == 'completed'
+        assert (log.total_records, log.processed_records, log.imported_records) == (25, 25, 25)
+        assert log.completed_at is not None
+
+    def test_invalid_rows_are_skipped(self, importer_user):
+        """Invalid rows are reported with their file row number."""
+        importer = DataImporter(CONTACT_MODEL, contacts_csv(5, bad_rows={1, 3}), 'csv', MAPPING, importer_user)
+        results = importer.import_data(batch_size=2)
+
+        assert (results['imported'], results['skipped']) == (3, 2)
+        assert [error['row'] for error in results['errors']] == [3, 5]
+        assert DataImportLog.objects.get().status == 'completed_with_errors'
+
+    def test_validate_only(self, importer_user):
+        """validate_only reports errors without writing records."""
+        from contact_management.models import Contact
+
+        importer = DataImporter(CONTACT_MODEL, contacts_csv(4, bad_rows={0}), 'csv', MAPPING, importer_user)
+        results = importer.import_data(validate_only=True)
+
+        assert (results['imported'], results['skipped'], results['total']) == (0, 1, 4)
+        assert not Contact.objects.exists()
+
+    def test_reimport_reports_existing_emails(self, importer_user):
+        """Insert mode reports taken unique values as row errors instead of failing."""
+        from contact_management.models import Contact
+
+        DataImporter(CONTACT_MODEL, contacts_csv(5), 'csv', MAPPING, importer_user).import_data()
+        extra = b'Dup,Row,contact5@example.com,Company 0\n'
+        importer = DataImporter(CONTACT_MODEL, contacts_csv(6) + extra, 'csv', MAPPING, importer_user)
+        results = importer.import_data(batch_size=4)
+
+        assert (results['imported'], results['skipped']) == (1, 6)
+        assert [error['row'] for error in results['errors']] == [2, 3, 4, 5, 6, 8]
+        assert 'already exists' in results['errors'][0]['errors'][0]
+        assert Contact.objects.count() == 6
+        assert DataImportLog.objects.get(pk=results['import_log_id']).status == 'completed_with_errors'
+
+    def test_excel_import(self, importer_user):
+        """Excel files stream through a read-only workbook."""
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(list(MAPPING))
+        ws.append(['Ada', 'Lovelace', 'ada@example.com', 'Engines'])
+        ws.append(['Alan', 'Turing', 'alan@example.com', 'Bletchley'])
+        buffer = BytesIO()
+        wb.save(buffer)
+
+        results = DataImporter(CONTACT_MODEL, buffer.getvalue(), 'xlsx', MAPPING, importer_user).import_data()
+
+        assert results['imported'] == 2
+
+    def test_json_lines_import(self, importer_user):
+        """JSON lines stream one object per line."""
+        from contact_management.models import Contact
+
+        rows = [
+            {'First Name': 'Grace', 'Last Name': 'Hopper', 'Email': 'grace@example.com'},
+            {'First Name': 'Linus', 'Last Name': 'Torvalds', 'Email': 'linus@example.com'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows).encode()
+
+        results = DataImporter(CONTACT_MODEL, content, 'jsonl', MAPPING, importer_user).import_data()
+
+        assert results['imported'] == 2
+        assert set(Contact.objects.values_list('last_name', flat=True)) == {'Hopper', 'Torvalds'}
+
+    def test_json_array_import(self, importer_user):
+        """JSON arrays are still supported."""
+        content = json.dumps([
+            {'First Name': 'Edsger', 'Last Name': 'Dijkstra', 'Email': 'edsger@example.com'},
+        ]).encode()
+
+        assert DataImporter(CONTACT_MODEL, content, 'json', MAPPING, importer_user).import_data()['imported'] == 1
+
+    def test_resume_from_checkpoint(self, importer_user):
+        """A failed import resumes after its last committed batch."""
+        from contact_management.models import Contact
+
+        content = contacts_csv(30, bad_rows={2})
+        importer = DataImporter(CONTACT_MODEL, content, 'csv', MAPPING, importer_user)
+        original_bulk_create = importer._bulk_create
+        calls = []
+
+        def fail_on_third_batch(records):
+            calls.append(len(records))
+            if len(calls) == 3:
+                raise RuntimeError('worker lost')
+            original_bulk_create(records)
+
+        with patch.object(importer, '_bulk_create', side_effect=fail_on_third_batch), pytest.raises(RuntimeError):
+            importer.import_data(batch_size=10)
+
+        log = DataImportLog.objects.get()
+        assert log.status == 'failed'
+        assert (log.processed_records, log.imported_records, log.skipped_records) == (20, 19, 1)
+        assert Contact.objects.count() == 19
+
+        results = DataImporter.resume(log, file_obj=content)
+
+        log.refresh_from_db()
+        assert log.status == 'completed_with_errors'
+        assert (results['imported'], results['skipped'], results['total']) == (29, 1, 30)
+        assert Contact.objects.count() == 29
+        assert [error['row'] for error in log.errors] == [4]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestParallelValidation:
+    """Tests for validation in worker processes."""
+
+    def test_process_pool_matches_in_process(self, importer_user):
+        """Validation in worker processes gives the same results."""
+        content = contacts_csv(40, bad_rows={5, 33})
+
+        results = DataImporter(CONTACT_MODEL, content, 'csv', MAPPING, importer_user).import_data(
+            validate_only=True, batch_size=8, workers=2
+        )
+
+        assert (results['skipped'], results['total']) == (2, 40)
+        assert [error['row'] for error in results['errors']] == [7, 35]
+
+    def test_daemonic_worker_validates_in_process(self, importer_user):
+        """Celery prefork children cannot start a pool, so they validate in-process."""
+        content = contacts_csv(20, bad_rows={3})
+
+        with (
+            patch('core.data_operations.multiprocessing.current_process') as current,
+            patch('core.data_operations.ProcessPoolExecutor') as pool,
+        ):
+            current.return_value.daemon = True
+            results = DataImporter(CONTACT_MODEL, content, 'csv', MAPPING, importer_user).import_data(
+                validate_only=True, batch_size=8, workers=2
+            )
+
+        pool.assert_not_called()
+        assert [error['row'] for error in results['errors']] == [5]
+
+
+@pytest.mark.django_db
+class TestUpsertImport:
+    """Tests for upserting on natural keys."""
+
+    def test_reimport_updates_instead_of_duplicating(self, importer_user):
+        """Re-importing a file updates the matching records."""
+        from contact_management.models import Contact
+
+        DataImporter(CONTACT_MODEL, contacts_csv(12), 'csv', MAPPING, importer_user).import_data(batch_size=5)
+
+        changed = contacts_csv(12).replace(b'Company 0', b'Renamed')
+        results = DataImporter(
+            CONTACT_MODEL, changed, 'csv', MAPPING, importer_user, mode='upsert'
+        ).import_data(batch_size=5)
+
+        assert results['imported'] == 12
+        assert Contact.objects.count() == 12
+        assert Contact.objects.filter(company_name='Renamed').count() == 4
+        assert DataImportLog.objects.latest('created_at').mode == 'upsert'
+
+    def test_duplicates_in_batch_keep_last_row(self, importer_user):
+        """Rows sharing a natural key collapse to the last one in the file."""
+        from contact_management.models import Contact
+
+        content = (
+            b'First Name,Last Name,Email,Company\n'
+            b'Ada,Lovelace,ada@example.com,First\n'
+            b'Ada,Lovelace,ada@example.com,Second\n'
+            b'Alan,Turing,alan@example.com,Bletchley\n'
+        )
+        results = DataImporter(
+            CONTACT_MODEL, content, 'csv', MAPPING, importer_user, mode='upsert'
+        ).import_data()
+
+        assert (results['imported'], results['duplicates']) == (2, 1)
+        assert Contact.objects.get(email='ada@example.com').company_name == 'Second'
+
+    def test_lookup_fallback(self, importer_user):
+        """Without ON CONFLICT support existing records are matched per batch."""
+        from contact_management.models import Contact
+
+        DataImporter(CONTACT_MODEL, contacts_csv(6), 'csv', MAPPING, importer_user).import_data()
+        original_ids = set(Contact.objects.values_list('id', flat=True))
+
+        importer = DataImporter(
+            CONTACT_MODEL, contacts_csv(8).replace(b'Last1,', b'Changed,'), 'csv',
+            MAPPING, importer_user, mode='upsert'
+        )
+        with patch.object(importer, '_supports_conflict_upsert', return_value=False):
+            importer.import_data(batch_size=3)
+
+        assert Contact.objects.count() == 8
+        assert original_ids <= set(Contact.objects.values_list('id', flat=True))
+        assert Contact.objects.get(email='contact1@example.com').last_name == 'Changed'
+
+    def test_upsert_requires_mapped_keys(self, importer_user):
+        """Upserts fail fast when the natural keys are not mapped."""
+        with pytest.raises(ValueError):
+            DataImporter(CONTACT_MODEL, b'', 'csv', {'First Name': 'first_name'}, mode='upsert')
+
+    def test_import_csv_data_task_upserts(self, importer_user, tmp_path):
+        """The background CSV import upserts by default for keyed models."""
+        from contact_management.models import Contact
+        from core.tasks import import_csv_data
+
+        path = tmp_path / 'contacts.csv'
+        path.write_bytes(contacts_csv(5))
+
+        first = import_csv_data('contacts', str(path), MAPPING, importer_user.id)
+        second = import_csv_data('contacts', str(path), MAPPING, importer_user.id)
+
+        assert first['success'] and second['success']
+        assert second['imported'] == 5
+        assert Contact.objects.count() == 5
+        assert DataImportLog.objects.get(id=second['import_log_id']).source_file == str(path)
@@ -0,0 +1,151 @@
+"""
+Export Job Tests
+
+Test suite for streaming export jobs:
+- CSV, JSON, ZIP and Excel output written from streamed rows
+- Progress tracking by rows written
+"""
+
+import csv
+import io
+import json
+import zipfile
+
+import openpyxl
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from core.export_tasks import ExportProgress, process_export_job
+from core.export_views import DataExportService
+from core.settings_models import ExportJob
+
+User = get_user_model()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Store export files in a temporary directory."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def quiet_notifications(monkeypatch):
+    """Skip export-ready notifications sent when jobs are saved."""
+    from core.notification_service import notification_service
+
+    monkeypatch.setattr(notification_service, 'send', lambda **kwargs: None)
+
+
+@pytest.fixture
+def exporter(db, monkeypatch):
+    """User exporting 30 task rows (served from users to keep fixtures small)."""
+    users = User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@example.com') for i in range(30)
+    ])
+    monkeypatch.setattr(
+        DataExportService, 'tasks_queryset',
+        lambda service: User.objects.order_by('id').values('id', 'username', 'email', 'date_joined')
+    )
+    return users[0]
+
+
+def make_job(user, export_format, entities):
+    """Create a pending export job."""
+    now = timezone.now()
+    return ExportJob.objects.create(
+        user=user,
+        format=export_format,
+        entities=entities,
+        file_size=0,
+        started_at=now,
+        completed_at=now,
+        expires_at=now,
+    )
+
+
+def read_export(job):
+    """Read the stored export file of a finished job."""
+    job.refresh_from_db()
+    with default_storage.open(job.file_path, 'rb') as stored:
+        return stored.read()
+
+
+@pytest.mark.django_db
+class TestProcessExportJob:
+    """Tests for streamed export files."""
+
+    def test_csv_export(self, exporter, media_root):
+        """A single entity is written as CSV."""
+        job = make_job(exporter, 'csv', ['tasks'])
+        result = process_export_job(job.id)
+
+        content = read_export(job)
+        lines = content.decode().splitlines()
+        assert lines[0] == '# TASKS'
+        rows = list(csv.DictReader(lines[1:-1]))
+        assert len(rows) == 30
+        assert rows[0]['username'] == 'user0'
+
+        assert job.status == 'completed'
+        assert job.progress == 100
+        assert result['file_size'] == job.file_size == len(content)
+
+    def test_json_export(self, exporter, media_root):
+        """JSON exports stay valid documents with every entity requested."""
+        job = make_job(exporter, 'json', ['tasks', 'companies'])
+        process_export_job(job.id)
+
+        document = json.loads(read_export(job))
+        assert document['exported_by'] == 'user0'
+        assert len(document['data']['tasks']) == 30
+        assert 'companies' in document['data']
+
+    def test_zip_export(self, exporter, media_root):
+        """Several entities are written as CSV and JSON files in a ZIP."""
+        job = make_job(exporter, 'csv', ['tasks', 'companies'])
+        process_export_job(job.id)
+
+        with zipfile.ZipFile(io.BytesIO(read_export(job))) as archive:
+            assert sorted(archive.namelist()) == ['tasks.csv', 'tasks.json']
+            assert len(json.loads(archive.read('tasks.json'))) == 30
+            assert len(archive.read('tasks.csv').decode().splitlines()) == 31
+
+    def test_excel_export(self, exporter, media_root):
+        """Excel exports get one worksheet per entity."""
+        job = make_job(exporter, 'xlsx', ['tasks'])
+        process_export_job(job.id)
+
+        wb = openpyxl.load_workbook(io.BytesIO(read_export(job)), read_only=True)
+        rows = list(wb['Tasks'].iter_rows(values_only=True))
+        assert rows[0][:2] == ('id', 'username')
+        assert len(rows) == 31
+
+    def test_export_all_unchanged(self, exporter):
+        """The in-memory export still returns lists per entity."""
+        service = DataExportService(exporter, {'entities': ['tasks']})
+
+        data = service.export_all()
+
+        assert list(data) == ['tasks']
+        assert len(data['tasks']) == 30
+
+
+@pytest.mark.django_db
+class TestExportProgress:
+    """Tests for row-based progress."""
+
+    def test_progress_follows_rows(self, exporter):
+        """Progress moves with rows written and is saved to the job."""
+        job = make_job(exporter, 'csv', ['tasks'])
+        progress = ExportProgress(job, total_rows=200)
+
+        assert ExportJob.objects.get(id=job.id).progress == ExportProgress.START
+
+        for _ in range(100):
+            progress()
+
+        assert ExportJob.objects.get(id=job.id).progress == 50
+        assert progress.rows == 100
@@ -0,0 +1,167 @@
+"""
+Export Utilities Tests
+
+Test suite for core.export_utils exporters:
+- Querysets projected to the exported columns
+- Related columns without N+1 queries
+- Streaming CSV and Excel output, row-capped PDF output
+"""
+
+import csv
+import io
+import json
+
+import openpyxl
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import Value
+from rest_framework.exceptions import ValidationError
+
+from core import export_utils
+from core.export_utils import CSVExporter, ExcelExporter, ExportColumn, JSONExporter, PDFExporter
+
+User = get_user_model()
+
+COLUMNS = [
+    ExportColumn('first_name', 'First Name'),
+    ExportColumn('email', 'Email'),
+    ExportColumn('created_by__username', 'Owner'),
+    ExportColumn('company', 'Company'),  # Not a Contact field
+]
+
+
+@pytest.fixture
+def contacts(db):
+    """Contacts owned by two users."""
+    from contact_management.models import Contact
+
+    owners = User.objects.bulk_create([
+        User(username='owner1', email='owner1@example.com'),
+        User(username='owner2', email='owner2@example.com'),
+    ])
+    Contact.objects.bulk_create([
+        Contact(first_name=f'Contact{i}', last_name='Smith', email=f'c{i}@example.com',
+                created_by=owners[i % 2], custom_fields={'tier': 'gold'})
+        for i in range(6)
+    ])
+    return Contact.objects.order_by('email')
+
+
+def read_csv(response):
+    """Parse a CSV response into rows."""
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return list(csv.reader(io.StringIO(content.decode())))
+
+
+@pytest.mark.django_db
+class TestColumnProjection:
+    """Tests for projected row extraction."""
+
+    def test_field_columns_use_one_query(self, contacts, django_assert_num_queries):
+        """Plain and related field paths are read with a single values_list query."""
+        exporter = CSVExporter(contacts, COLUMNS)
+
+        with django_assert_num_queries(1):
+            rows = exporter.get_rows()
+
+        assert rows[0] == ['Contact0', 'c0@example.com', 'owner1', '']
+        assert rows[1][2] == 'owner2'
+
+    def test_object_columns_are_select_related(self, contacts, django_assert_num_queries):
+        """Properties and related objects load instances with select_related."""
+        columns = [
+            ExportColumn('full_name', 'Name'),
+            ExportColumn('created_by', 'Owner'),
+            ExportColumn('created_by__email', 'Owner Email'),
+        ]
+
+        with django_assert_num_queries(1):
+            rows = CSVExporter(contacts, columns).get_rows()
+
+        assert rows[0] == ['Contact0 Smith', 'owner1', 'owner1@example.com']
+
+    def test_json_keys_and_annotations(self, contacts):
+        """JSON field keys and annotations are read from the projection."""
+        columns = [
+            ExportColumn('custom_fields__tier', 'Tier'),
+            ExportColumn('label', 'Label', formatter=str.upper),
+        ]
+        queryset = contacts.annotate(label=Value('vip'))
+
+        assert CSVExporter(queryset, columns).get_rows()[0] == ['gold', 'VIP']
+
+    def test_matches_get_value(self, contacts):
+        """Compiled accessors format values like get_value."""
+        exporter = CSVExporter(contacts, COLUMNS)
+        expected = [[exporter.get_value(obj, col) for col in COLUMNS] for obj in contacts]
+
+        assert exporter.get_rows() == expected
+
+
+@pytest.mark.django_db
+class TestStreamingExports:
+    """Tests for streamed exporter output."""
+
+    def test_csv_streams_batches(self, contacts, monkeypatch):
+        """Streaming CSV yields one chunk per batch of rows."""
+        monkeypatch.setattr(export_utils, 'STREAM_BATCH_ROWS', 4)
+        response = CSVExporter(contacts, COLUMNS).export_streaming()
+
+        chunks = list(response.streaming_content)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+
+        assert len(chunks) == 2
+        assert rows[0] == ['First Name', 'Email', 'Owner', 'Company']
+        assert len(rows) == 7
+
+    def test_json_export(self, contacts):
+        """JSON exports key values by column field."""
+        data = json.loads(JSONExporter(contacts, COLUMNS).export().content)
+
+        assert data[0]['created_by__username'] == 'owner1'
+
+    def test_excel_export(self, contacts):
+        """Excel exports stream from a write-only workbook."""
+        response = ExcelExporter(contacts, COLUMNS, 'contacts').export()
+
+        wb = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        ws = wb['contacts']
+        assert ws.freeze_panes == 'A2'
+        assert [cell.value for cell in ws[1]] == ['First Name', 'Email', 'Owner', 'Company']
+        assert ws.max_row == 7
+
+    def test_pdf_export(self, contacts, monkeypatch):
+        """PDF exports are split into tables of PDF_TABLE_ROWS rows."""
+        monkeypatch.setattr(export_utils, 'PDF_TABLE_ROWS', 4)
+        response = PDFExporter(contacts, COLUMNS, 'contacts').export()
+
+        assert response['Content-Type'] == 'application/pdf'
+        assert b''.join(response.streaming_content).startswith(b'%PDF')
+
+    def test_pdf_export_is_capped(self, contacts, settings):
+        """PDF exports over EXPORT_PDF_MAX_ROWS are rejected before rendering."""
+        settings.EXPORT_PDF_MAX_ROWS = contacts.count() - 1
+
+        with pytest.raises(ValidationError, match='limited to'):
+            PDFExporter(contacts, COLUMNS, 'contacts').export()
+
+    def test_failed_pdf_closes_spool_file(self, contacts, monkeypatch):
+        """The spooled file is closed when building the document fails."""
+        spooled = []
+        original = export_utils.tempfile.SpooledTemporaryFile
+
+        def spool(*args, **kwargs):
+            spooled.append(original(*args, **kwargs))
+            return spooled[-1]
+
+        def fail():
+            raise RuntimeError('query failed')
+            yield
+
+        monkeypatch.setattr(export_utils.tempfile, 'SpooledTemporaryFile', spool)
+        exporter = PDFExporter(contacts, COLUMNS, 'contacts')
+        monkeypatch.setattr(exporter, 'iter_rows', fail)
+
+        with pytest.raises(RuntimeError):
+            exporter.export()
+        assert spooled[0].closed
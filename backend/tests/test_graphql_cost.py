@@ -0,0 +1,162 @@
+"""
+GraphQL Query Cost Tests
+
+Test suite for the enterprise GraphQL schema extensions:
+- Static query cost analysis with connection and list multipliers
+- Rejection of expensive documents and per-client cost budgets
+- Automatic persisted queries and the parsed-document cache
+"""
+
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from graphql import parse
+
+from core import rate_limiting
+from enterprise import graphql_api
+from enterprise.graphql_api import QueryCostAnalyzer, create_loaders, schema
+
+LEADS_QUERY = '{ leads(pagination: {pageSize: 50}) { items { id } pageInfo { totalCount } } }'
+
+NESTED_QUERY = """
+query Nested($size: Int) {
+    contacts(pagination: {pageSize: $size}) {
+        items { opportunities { activities(limit: 5) { title } } }
+    }
+}
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    graphql_api._document_cache.clear()
+    rate_limiting._local_store.clear()
+
+
+def cost_of(query, variables=None):
+    return QueryCostAnalyzer(schema._schema, parse(query), variables).cost()
+
+
+def execute(query, variables=None, extensions=None):
+    # Anonymous requests are rejected by IsAuthenticated after the extensions run
+    request = SimpleNamespace(user=AnonymousUser(), META={'REMOTE_ADDR': '10.0.0.1'})
+    context = {'request': request, 'loaders': create_loaders({})}
+    return async_to_sync(schema.execute)(
+        query, variable_values=variables, context_value=context, operation_extensions=extensions
+    )
+
+
+class TestQueryCostAnalyzer:
+    """Static cost estimates"""
+
+    def test_scalars_are_free(self):
+        assert cost_of('{ me { id email } }') == 1
+
+    def test_connection_items_multiply_by_page_size(self):
+        # leads + 50 items + pageInfo
+        assert cost_of(LEADS_QUERY) == 1 + 50 + 1
+
+    def test_page_size_is_capped(self):
+        assert cost_of('{ leads(pagination: {pageSize: 5000}) { items { id } } }') == 1 + 100
+
+    def test_nested_lists_and_variables(self):
+        # items * (1 + opportunities * (1 + activities(limit) * 1))
+        expected = 1 + 30 * (1 + 10 * (1 + 5))
+        assert cost_of(NESTED_QUERY, {'size': 30}) == expected
+
+    def test_fragments(self):
+        query = """
+        { leads { items { ...LeadFields } } }
+        fragment LeadFields on Lead { id activities { title } }
+        """
+        assert cost_of(query) == 1 + 20 * (1 + 10)
+
+
+class TestQueryCostLimiter:
+    """Rejecting and throttling expensive documents"""
+
+    def test_expensive_query_rejected_before_execution(self):
+        result = execute(NESTED_QUERY, {'size': 100})
+
+        assert result.data is None
+        assert 'exceeds the maximum' in result.errors[0].message
+
+    def test_cost_reported_in_extensions(self):
+        result = execute(LEADS_QUERY)
+
+        assert result.extensions['cost'] == {'requested': 52, 'maximum': graphql_api.MAX_QUERY_COST}
+        assert 'not authenticated' in result.errors[0].message
+
+    def test_budget_per_client(self, settings):
+        settings.GRAPHQL_COST_BUDGET_PER_MINUTE = 120
+
+        assert 'not authenticated' in execute(LEADS_QUERY).errors[0].message
+        assert 'not authenticated' in execute(LEADS_QUERY).errors[0].message
+        result = execute(LEADS_QUERY)
+        assert 'budget exceeded' in result.errors[0].message
+
+
+class TestPersistedQueries:
+    """Automatic persisted queries and document caching"""
+
+    def test_unknown_hash(self):
+        result = execute(None, extensions={'persistedQuery': {'version': 1, 'sha256Hash': 'abc'}})
+
+        assert result.errors[0].message == 'PersistedQueryNotFound'
+
+    def test_register_then_execute_by_hash(self):
+        digest = hashlib.sha256(LEADS_QUERY.encode()).hexdigest()
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': digest}}
+        execute(LEADS_QUERY, extensions=extensions)
+        graphql_api._document_cache.clear()
+
+        result = execute(None, extensions=extensions)
+        assert result.extensions['cost']['requested'] == 52
+
+    def test_hash_mismatch(self):
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': 'not-the-hash'}}
+
+        result = execute(LEADS_QUERY, extensions=extensions)
+        assert 'does not match' in result.errors[0].message
+
+    def test_documents_parsed_and_validated_once(self, monkeypatch):
+        calls = {'parse': 0, 'validate': 0}
+        original_parse = graphql_api.parse
+
+        def counting_parse(*args, **kwargs):
+            calls['parse'] += 1
+            return original_parse(*args, **kwargs)
+
+        from strawberry.schema import schema as strawberry_schema
+        original_validate = strawberry_schema.validate_document
+
+        def counting_validate(*args, **kwargs):
+            calls['validate'] += 1
+            return original_validate(*args, **kwargs)
+
+        monkeypatch.setattr(graphql_api, 'parse', counting_parse)
+        monkeypatch.setattr(strawberry_schema, 'validate_document', counting_validate)
+        for _ in range(3):
+            execute(LEADS_QUERY)
+
+        assert calls == {'parse': 1, 'validate': 1}
+
+    def test_validation_errors_are_cached(self):
+        first = execute('{ leads { nope } }')
+        second = execute('{ leads { nope } }')
+
+        assert first.errors[0].message == second.errors[0].message
+        assert "Cannot query field 'nope'" in second.errors[0].message
+
+    def test_document_cache_is_bounded(self):
+        document_cache = graphql_api.DocumentCache(maxsize=2)
+        for key in ('a', 'b', 'c'):
+            document_cache.set(key, object())
+
+        assert len(document_cache) == 2
+        assert document_cache.get('a') is None
@@ -0,0 +1,208 @@
+"""
+GraphQL DataLoader Tests
+
+Test suite for the enterprise GraphQL relationship loaders:
+- One IN query per relationship regardless of the number of parents
+- Rows grouped back onto the right parent key
+- Per-request memoization
+"""
+
+import asyncio
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+
+from enterprise.graphql_api import create_loaders, schema
+
+User = get_user_model()
+
+
+@pytest.fixture
+def sync_loaders(monkeypatch):
+    """Run loader queries on the test thread so they see the test transaction."""
+
+    async def to_thread(func, *args, **kwargs):
+        return await sync_to_async(func)(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, 'to_thread', to_thread)
+
+
+@pytest.fixture
+def owner(db):
+    return User.objects.bulk_create([User(username='owner', email='owner@example.com')])[0]
+
+
+@pytest.fixture
+def contacts(owner):
+    """Contacts with two opportunities each and two activities per opportunity."""
+    from contact_management.models import Contact
+    from opportunity_management.models import Opportunity, OpportunityActivity
+
+    contacts = Contact.objects.bulk_create([
+        Contact(first_name=f'Contact{i}', last_name='Smith', email=f'c{i}@example.com',
+                company_name='Acme' if i % 2 else 'Globex', created_by=owner)
+        for i in range(10)
+    ])
+    today = datetime.date.today()
+    opportunities = Opportunity.objects.bulk_create([
+        Opportunity(name=f'{contact.first_name} deal {n}', contact=contact, amount=Decimal('1000'),
+                    owner=owner, expected_close_date=today, actual_close_date=today,
+                    last_activity_date=datetime.datetime.now(datetime.UTC))
+        for contact in contacts for n in range(2)
+    ])
+    OpportunityActivity.objects.bulk_create([
+        OpportunityActivity(opportunity=opp, activity_type='call', subject=f'Call {n}', user=owner)
+        for opp in opportunities for n in range(2)
+    ])
+    return contacts
+
+
+def run_query(query, user):
+    request = SimpleNamespace(user=user, META={})
+    context = {'request': request, 'loaders': create_loaders({})}
+    return async_to_sync(schema.execute)(query, context_value=context)
+
+
+def nested_contacts_query(contacts):
+    fields = 'id opportunities { name activities { title relatedToId } }'
+    aliases = ' '.join(f'c{c.id}: contact(id: "{c.id}") {{ {fields} }}' for c in contacts)
+    return f'{{ {aliases} }}'
+
+
+@pytest.mark.django_db
+class TestRelationshipLoaders:
+    """Batched relationship loaders"""
+
+    def test_nested_query_cost_is_constant(self, sync_loaders, owner, contacts,
+                                           django_assert_num_queries):
+        # contacts, contact_opportunities and opportunity_activities: one query each
+        with django_assert_num_queries(3):
+            result = run_query(nested_contacts_query(contacts[:2]), owner)
+        assert result.errors is None
+
+        with django_assert_num_queries(3):
+            result = run_query(nested_contacts_query(contacts), owner)
+        assert result.errors is None
+        assert len(result.data) == 10
+
+    def test_rows_grouped_by_parent(self, sync_loaders, owner, contacts):
+        result = run_query(nested_contacts_query(contacts), owner)
+
+        for contact in contacts:
+            data = result.data[f'c{contact.id}']
+            assert sorted(opp['name'] for opp in data['opportunities']) == [
+                f'{contact.first_name} deal 0', f'{contact.first_name} deal 1'
+            ]
+            for opp in data['opportunities']:
+                assert len(opp['activities']) == 2
+                assert len({a['relatedToId'] for a in opp['activities']}) == 1
+
+    def test_missing_keys_get_empty_lists(self, sync_loaders, contacts, django_assert_num_queries):
+        loaders = create_loaders({})
+
+        async def load():
+            return await asyncio.gather(
+                loaders['contact_opportunities'].load((str(contacts[0].id), 10)),
+                loaders['contact_opportunities'].load(('999999', 10)),
+            )
+
+        with django_assert_num_queries(1):
+            found, missing = async_to_sync(load)()
+        assert len(found) == 2
+        assert missing == []
+
+    def test_loads_are_memoized_per_request(self, sync_loaders, contacts, django_assert_num_queries):
+        loaders = create_loaders({})
+
+        async def load_twice():
+            first = await loaders['contact_opportunities'].load((str(contacts[0].id), 10))
+            second = await loaders['contact_opportunities'].load((str(contacts[0].id), 10))
+            return first, second
+
+        with django_assert_num_queries(1):
+            first, second = async_to_sync(load_twice)()
+        assert first is second
+
+    def test_activity_limit(self, sync_loaders, owner, contacts):
+        opp_fields = 'activities(limit: 1) { title }'
+        query = f'{{ contact(id: "{contacts[0].id}") {{ opportunities {{ {opp_fields} }} }} }}'
+        result = run_query(query, owner)
+
+        assert result.errors is None
+        for opp in result.data['contact']['opportunities']:
+            assert len(opp['activities']) == 1
+
+    def test_rows_are_limited_per_parent_in_the_query(self, sync_loaders, owner, contacts,
+                                                      django_assert_num_queries):
+        from opportunity_management.models import OpportunityActivity
+
+        opportunity = contacts[0].opportunities.order_by('id').first()
+        OpportunityActivity.objects.bulk_create([
+            OpportunityActivity(opportunity=opportunity, activity_type='call', subject=f'Extra {n}', user=owner)
+            for n in range(20)
+        ])
+        loaders = create_loaders({})
+
+        async def load():
+            return await loaders['opportunity_activities'].load_many([
+                (str(opportunity.id), 3), (str(opportunity.id), 5), ('999999', 3)
+            ])
+
+        with django_assert_num_queries(1) as captured:
+            three, five, missing = async_to_sync(load)()
+        assert [len(three), len(five), len(missing)] == [3, 5, 0]
+        assert 'ROW_NUMBER' in captured.captured_queries[0]['sql'].upper()
+
+    def test_company_contacts_page(self, sync_loaders, contacts):
+        loaders = create_loaders({})
+
+        async def load():
+            return await loaders['company_contacts'].load_many([('Acme', 2), ('Globex', 5)])
+
+        acme, globex = async_to_sync(load)()
+        assert len(acme.items) == 2
+        assert acme.page_info.has_next and not acme.page_info.total_count_is_exact
+        assert len(globex.items) == 5
+        assert not globex.page_info.has_next and globex.page_info.total_count == 5
+
+    def test_company_contacts_keyed_by_name(self, sync_loaders, contacts, django_assert_num_queries):
+        loaders = create_loaders({})
+
+        async def load():
+            return await loaders['company_contacts'].load_many([('Acme', 20), ('Globex', 20), ('Initech', 20)])
+
+        with django_assert_num_queries(1):
+            acme, globex, initech = async_to_sync(load)()
+        assert acme.page_info.total_count == 5
+        assert {c.email for c in globex.items} == {f'c{i}@example.com' for i in range(0, 10, 2)}
+        assert initech.items == []
+
+    def test_lead_activities(self, sync_loaders, owner, django_assert_num_queries):
+        from lead_management.models import Lead, LeadActivity
+
+        now = datetime.datetime.now(datetime.UTC)
+        leads = Lead.objects.bulk_create([
+            Lead(first_name=f'Lead{i}', last_name='Doe', email=f'l{i}@example.com', owner=owner,
+                 estimated_value=Decimal('0'), last_contact_date=now, next_follow_up=now,
+                 converted_at=now)
+            for i in range(3)
+        ])
+        LeadActivity.objects.bulk_create([
+            LeadActivity(lead=lead, activity_type='email', subject=f'Email {lead.first_name}', user=owner)
+            for lead in leads
+        ])
+        loaders = create_loaders({})
+
+        async def load():
+            return await loaders['lead_activities'].load_many([(str(lead.id), 10) for lead in leads])
+
+        with django_assert_num_queries(1):
+            groups = async_to_sync(load)()
+        assert [[a.title for a in group] for group in groups] == [
+            [f'Email {lead.first_name}'] for lead in leads
+        ]
+        assert groups[0][0].related_to_type == 'lead'
@@ -0,0 +1,195 @@
+"""
+GraphQL Pagination Tests
+
+Test suite for keyset pagination of the enterprise GraphQL list queries:
+- Cursor pages cover every row exactly once
+- Deep pages cost the same as the first page
+- Cached estimated totals and optional exact counts
+"""
+
+import asyncio
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from enterprise.graphql_api import create_loaders, schema
+
+User = get_user_model()
+
+LEADS_QUERY = """
+query Leads($pagination: PaginationInput, $sort: SortInput, $filter: LeadFilterInput) {
+    leads(pagination: $pagination, sort: $sort, filter: $filter) {
+        items { id email score }
+        pageInfo { totalCount totalCountIsExact hasNext hasPrevious startCursor endCursor }
+    }
+}
+"""
+
+
+@pytest.fixture(autouse=True)
+def sync_loaders(monkeypatch):
+    """Run resolver queries on the test thread so they see the test transaction."""
+
+    async def to_thread(func, *args, **kwargs):
+        return await sync_to_async(func)(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, 'to_thread', to_thread)
+    cache.clear()
+
+
+@pytest.fixture
+def owner(db):
+    return User.objects.bulk_create([User(username='owner', email='owner@example.com')])[0]
+
+
+@pytest.fixture
+def leads(owner):
+    """Leads sharing created_at timestamps so the primary key must break ties."""
+    from lead_management.models import Lead
+
+    now = datetime.datetime.now(datetime.UTC)
+    created = Lead.objects.bulk_create([
+        Lead(first_name=f'Lead{i}', last_name='Doe', email=f'l{i:02d}@example.com', owner=owner,
+             lead_score=i % 7, estimated_value=Decimal('0'), last_contact_date=now,
+             next_follow_up=now, converted_at=now)
+        for i in range(25)
+    ])
+    # Three rows per timestamp
+    for i, lead in enumerate(created):
+        Lead.objects.filter(pk=lead.pk).update(created_at=now - datetime.timedelta(minutes=i // 3))
+    return created
+
+
+def add_lead(owner):
+    from lead_management.models import Lead
+
+    now = datetime.datetime.now(datetime.UTC)
+    Lead.objects.bulk_create([
+        Lead(first_name='Extra', last_name='Doe', email='extra@example.com', owner=owner,
+             estimated_value=Decimal('0'), last_contact_date=now, next_follow_up=now, converted_at=now)
+    ])
+
+
+def run_query(user, **variables):
+    request = SimpleNamespace(user=user, META={})
+    context = {'request': request, 'loaders': create_loaders({})}
+    return async_to_sync(schema.execute)(LEADS_QUERY, variable_values=variables, context_value=context)
+
+
+def walk_pages(user, page_size, sort=None):
+    """Follow end cursors until the last page."""
+    seen, after = [], None
+    while True:
+        result = run_query(user, pagination={'pageSize': page_size, 'after': after}, sort=sort)
+        assert result.errors is None, result.errors
+        connection = result.data['leads']
+        seen.extend(connection['items'])
+        if not connection['pageInfo']['hasNext']:
+            return seen
+        after = connection['pageInfo']['endCursor']
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Cursor pagination of Query.leads"""
+
+    def test_cursor_pages_cover_all_rows_once(self, owner, leads):
+        items = walk_pages(owner, page_size=4)
+
+        assert len(items) == 25
+        assert len({item['id'] for item in items}) == 25
+
+    def test_sort_field_with_ties(self, owner, leads):
+        items = walk_pages(owner, page_size=5, sort={'field': 'leadScore', 'direction': 'ASC'})
+
+        scores = [item['score'] for item in items]
+        assert scores == sorted(scores)
+        assert len({item['id'] for item in items}) == 25
+
+    def test_deep_page_costs_same_as_first(self, owner, leads, django_assert_num_queries):
+        first = run_query(owner, pagination={'pageSize': 3})
+        cursor = first.data['leads']['pageInfo']['endCursor']
+        for _ in range(5):
+            result = run_query(owner, pagination={'pageSize': 3, 'after': cursor})
+            cursor = result.data['leads']['pageInfo']['endCursor']
+
+        # The cached estimate leaves a single keyset query per page
+        with django_assert_num_queries(1):
+            result = run_query(owner, pagination={'pageSize': 3, 'after': cursor})
+        assert result.data['leads']['pageInfo']['hasPrevious'] is True
+        assert len(result.data['leads']['items']) == 3
+
+    def test_estimated_count_is_cached(self, owner, leads):
+        result = run_query(owner, pagination={'pageSize': 10})
+        page_info = result.data['leads']['pageInfo']
+        assert page_info['totalCount'] == 25
+        assert page_info['totalCountIsExact'] is False
+
+        add_lead(owner)
+        assert run_query(owner).data['leads']['pageInfo']['totalCount'] == 25
+
+    def test_exact_count(self, owner, leads):
+        run_query(owner)
+        add_lead(owner)
+
+        result = run_query(owner, pagination={'exactCount': True})
+        page_info = result.data['leads']['pageInfo']
+        assert page_info['totalCount'] == 26
+        assert page_info['totalCountIsExact'] is True
+
+    def test_filters_apply_to_items_and_count(self, owner, leads):
+        result = run_query(owner, filter={'scoreMin': 6}, pagination={'exactCount': True})
+
+        connection = result.data['leads']
+        assert {item['score'] for item in connection['items']} == {6}
+        assert connection['pageInfo']['totalCount'] == 3
+
+    def test_unsortable_field_is_rejected(self, owner, leads):
+        result = run_query(owner, sort={'field': 'password; DROP', 'direction': 'ASC'})
+
+        assert result.errors
+        assert "Cannot sort by" in result.errors[0].message
+
+    def test_invalid_cursor_is_rejected(self, owner, leads):
+        result = run_query(owner, pagination={'after': 'not-a-cursor'})
+
+        assert result.errors
+        assert "Invalid pagination cursor" in result.errors[0].message
+
+
+@pytest.mark.django_db
+class TestOtherConnections:
+    """Contacts and opportunities share the same pagination"""
+
+    def test_contacts_cursor_pages(self, owner):
+        from contact_management.models import Contact
+
+        Contact.objects.bulk_create([
+            Contact(first_name=f'Contact{i}', last_name='Smith', email=f'c{i}@example.com',
+                    contact_type='prospect', created_by=owner)
+            for i in range(7)
+        ])
+        query = """
+        query Contacts($after: String) {
+            contacts(pagination: {pageSize: 3, after: $after}) {
+                items { email type }
+                pageInfo { hasNext endCursor }
+            }
+        }
+        """
+        context = {'request': SimpleNamespace(user=owner, META={}), 'loaders': create_loaders({})}
+        emails, after = [], None
+        while True:
+            result = async_to_sync(schema.execute)(query, variable_values={'after': after}, context_value=context)
+            assert result.errors is None, result.errors
+            emails.extend(item['email'] for item in result.data['contacts']['items'])
+            if not result.data['contacts']['pageInfo']['hasNext']:
+                break
+            after = result.data['contacts']['pageInfo']['endCursor']
+
+        assert sorted(emails) == sorted(f'c{i}@example.com' for i in range(7))
@@ -0,0 +1,162 @@
+"""
+L1 Cache Tests
+
+Test suite for enterprise.caching.InMemoryCache:
+- Segmented LRU eviction and scan resistance
+- Entry count and estimated byte budgets
+- TTL expiry on access and by the background sweeper
+- Sharding and counter-based statistics under concurrency
+"""
+
+import threading
+import time
+
+import pytest
+
+from enterprise import caching
+from enterprise.caching import InMemoryCache, estimate_size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for TTL checks."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(caching.time, 'time', lambda: now[0])
+    return now
+
+
+class TestEviction:
+    """Capacity limits"""
+
+    def test_get_set_delete(self):
+        cache = InMemoryCache(sweep_interval=None)
+
+        cache.set('a', {'x': 1})
+        assert cache.get('a') == {'x': 1}
+        assert cache.exists('a')
+        assert cache.delete('a')
+        assert cache.get('a') is None
+        assert not cache.delete('a')
+
+    def test_least_recently_used_evicted(self):
+        cache = InMemoryCache(max_size=3, sweep_interval=None)
+        for key in 'abc':
+            cache.set(key, key)
+        cache.get('a')
+
+        cache.set('d', 'd')
+        assert cache.get('b') is None
+        assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+        assert cache.get_stats().evictions == 1
+
+    def test_scan_does_not_flush_working_set(self):
+        cache = InMemoryCache(max_size=10, sweep_interval=None)
+        for key in ('hot1', 'hot2'):
+            cache.set(key, key)
+            cache.get(key)
+
+        for i in range(100):
+            cache.set(f'scan{i}', i)
+
+        assert cache.get('hot1') == 'hot1'
+        assert cache.get('hot2') == 'hot2'
+
+    def test_overwrite_replaces_size(self):
+        cache = InMemoryCache(sweep_interval=None)
+        cache.set('a', 'x' * 10_000)
+        cache.set('a', 'y')
+
+        assert cache.get_stats().cache_size_bytes == estimate_size('y')
+
+    def test_byte_budget(self):
+        cache = InMemoryCache(max_size=100, max_bytes=10_000, sweep_interval=None)
+        for i in range(10):
+            cache.set(f'k{i}', 'x' * 2_000)
+
+        stats = cache.get_stats()
+        assert stats.cache_size_bytes <= 10_000
+        assert stats.keys_count == 4
+        assert cache.get('k9') is not None
+
+    def test_set_does_not_pickle(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError('pickled')
+
+        monkeypatch.setattr(caching.pickle, 'dumps', fail)
+        cache = InMemoryCache(sweep_interval=None)
+        cache.set('a', {'rows': list(range(1000))})
+
+        assert cache.get('a')['rows'][-1] == 999
+
+
+class TestExpiry:
+    """TTL handling"""
+
+    def test_expired_on_access(self, clock):
+        cache = InMemoryCache(default_ttl=60, sweep_interval=None)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=300)
+
+        clock[0] += 61
+        assert cache.get('a') is None
+        assert not cache.exists('a')
+        assert cache.get('b') == 2
+
+    def test_sweep_removes_expired(self, clock):
+        cache = InMemoryCache(default_ttl=60, sweep_interval=None)
+        for i in range(5):
+            cache.set(f'k{i}', i)
+        cache.set('keep', 1, ttl=600)
+
+        clock[0] += 61
+        assert cache.sweep() == 5
+        stats = cache.get_stats()
+        assert stats.keys_count == 1
+        assert stats.cache_size_bytes == estimate_size(1)
+
+    def test_background_sweeper(self):
+        cache = InMemoryCache(sweep_interval=0.01)
+        cache.set('a', 1, ttl=0)
+
+        deadline = time.time() + 2
+        while cache.get_stats().keys_count and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get_stats().keys_count == 0
+
+
+class TestShardingAndStats:
+    """Sharded layout and O(1) counters"""
+
+    def test_small_caches_use_one_shard(self):
+        assert len(InMemoryCache(max_size=100, sweep_interval=None)._shards) == 1
+        assert len(InMemoryCache(max_size=10_000, sweep_interval=None)._shards) == 16
+
+    def test_concurrent_access(self):
+        cache = InMemoryCache(max_size=10_000, sweep_interval=None)
+
+        def worker(n):
+            for i in range(500):
+                cache.set(f'{n}:{i}', i)
+                assert cache.get(f'{n}:{i}') == i
+                cache.get(f'missing:{n}:{i}')
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.get_stats()
+        assert stats.hits == stats.misses == 4000
+        assert stats.total_requests == 8000
+        assert stats.hit_rate == 50.0
+        assert stats.keys_count == 4000
+        assert stats.avg_response_time_ms > 0
+
+    def test_size_estimate_scales_with_content(self):
+        small = estimate_size({'rows': [1, 2]})
+        large_list = estimate_size(list(range(10_000)))
+
+        assert estimate_size('x' * 10_000) > 10_000
+        assert large_list > 100 * estimate_size([1, 2])
+        assert small < large_list
@@ -0,0 +1,216 @@
+"""
+Lead Scoring Tests
+
+Test suite for core lead scoring:
+- Batch ML scoring
+- Columnar feature snapshots
+- Incremental rule-based rescoring
+"""
+
+import fakeredis
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core import lead_scoring
+from core.lead_scoring import (
+    LeadFeatureSnapshot,
+    LeadScoreDirtySet,
+    LeadScoringEngine,
+    LeadScoringManager,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def scoring_leads(db):
+    """Create leads with a mix of converted and lost outcomes."""
+    from lead_management.models import Lead
+
+    User.objects.bulk_create([User(username='scorer', email='scorer@example.com')])
+    owner = User.objects.get(username='scorer')
+    now = timezone.now()
+    Lead.objects.bulk_create([
+        Lead(
+            first_name='Lead',
+            last_name=str(i),
+            email=f'lead{i}@example.com' if i % 3 else '',
+            phone='+1-555-0100' if i % 2 else '',
+            owner=owner,
+            estimated_value=i * 1000,
+            last_contact_date=now,
+            next_follow_up=now,
+            converted_at=now,
+            status='converted' if i % 4 == 0 else 'lost',
+        )
+        for i in range(40)
+    ])
+    return Lead.objects.filter(status__in=['converted', 'lost'])
+
+
+@pytest.fixture
+def trained_engine(scoring_leads):
+    """Return an engine trained on the scoring leads."""
+    engine = LeadScoringEngine()
+    engine.train_model(scoring_leads)
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def local_dirty_set(settings):
+    """Keep the dirty set process-local and empty."""
+    settings.REDIS_URL = ''
+    lead_scoring._local_dirty.clear()
+    yield
+    lead_scoring._local_dirty.clear()
+
+
+@pytest.mark.django_db
+class TestBatchScoring:
+    """Tests for vectorized ML scoring."""
+
+    def test_batch_scores_match_single_scores(self, trained_engine, scoring_leads):
+        """Batch scoring returns the same scores as score_lead."""
+        batch_scores = {}
+        for lead_ids, scores in trained_engine.score_leads_batch(scoring_leads, chunk_size=7):
+            batch_scores.update(zip(lead_ids, scores, strict=True))
+
+        assert len(batch_scores) == 40
+        for lead in scoring_leads:
+            score, _ = trained_engine.score_lead(lead)
+            assert batch_scores[lead.pk] == score
+
+    def test_ml_update_writes_batch_scores(self, scoring_leads, tmp_path, monkeypatch):
+        """update_lead_scores(method='ml') writes the batch scores back in bulk."""
+        monkeypatch.chdir(tmp_path)
+
+        count = LeadScoringManager.update_lead_scores(scoring_leads, method='ml', batch_size=7)
+
+        engine = LeadScoringEngine()
+        engine.load_model('lead_scoring_model.pkl')
+        expected = {}
+        for lead_ids, scores in engine.score_leads_batch(scoring_leads):
+            expected.update(zip(lead_ids, scores.tolist(), strict=True))
+
+        assert count == 40
+        assert dict(scoring_leads.values_list('pk', 'lead_score')) == expected
+
+    def test_untrained_engine_refuses_to_score(self, scoring_leads):
+        """Batch scoring needs a trained model."""
+        with pytest.raises(ValueError):
+            next(LeadScoringEngine().score_leads_batch(scoring_leads))
+
+
+@pytest.mark.django_db
+class TestFeatureSnapshot:
+    """Tests for columnar feature extraction and snapshots."""
+
+    def test_feature_matrix_is_float32(self, scoring_leads):
+        """Columnar extraction fills a float32 matrix with labels."""
+        engine = LeadScoringEngine()
+        lead_ids, X, y, _ = engine.extract_feature_matrix(scoring_leads, chunk_size=9)
+
+        assert X.shape == (40, len(LeadScoringEngine.FEATURE_NAMES))
+        assert X.dtype.name == 'float32'
+        assert len(lead_ids) == 40
+        assert y.sum() == 10
+
+    def test_snapshot_recomputes_only_changed_rows(self, scoring_leads, tmp_path):
+        """A snapshot refresh only re-extracts leads updated since the last one."""
+        engine = LeadScoringEngine()
+        snapshot = LeadFeatureSnapshot(directory=tmp_path)
+        snapshot.refresh(engine, scoring_leads)
+
+        lead = scoring_leads.first()
+        scoring_leads.filter(pk=lead.pk).update(estimated_value=5, updated_at=timezone.now())
+        X, _ = snapshot.refresh(engine, scoring_leads)
+
+        meta = snapshot.load_meta()
+        assert meta['version'] == 2
+        assert meta['recomputed_rows'] == 1
+        assert len(X) == 40
+
+        _, expected, _, _ = engine.extract_feature_matrix(scoring_leads.filter(pk=lead.pk))
+        arrays = snapshot.load_arrays(2)
+        row = list(arrays['lead_ids']).index(lead.pk)
+        assert arrays['features'][row].tolist() == expected[0].tolist()
+
+    def test_matrix_matches_per_lead_features(self, scoring_leads):
+        """Columnar rows equal the features built from model instances."""
+        engine = LeadScoringEngine()
+        lead_ids, X, _, _ = engine.extract_feature_matrix(scoring_leads, chunk_size=9)
+
+        leads = scoring_leads.in_bulk(lead_ids.tolist())
+        for row, lead_id in enumerate(lead_ids.tolist()):
+            assert X[row].tolist() == [float(value) for value in engine._extract_features(leads[lead_id])]
+
+    def test_feature_version_change_rebuilds_snapshot(self, scoring_leads, tmp_path, monkeypatch):
+        """A new feature version recomputes every row and drops old versions."""
+        engine = LeadScoringEngine()
+        snapshot = LeadFeatureSnapshot(directory=tmp_path)
+        snapshot.refresh(engine, scoring_leads)
+
+        monkeypatch.setattr(LeadScoringEngine, 'FEATURE_VERSION', LeadScoringEngine.FEATURE_VERSION + 1)
+        snapshot.refresh(engine, scoring_leads)
+
+        meta = snapshot.load_meta()
+        assert meta['recomputed_rows'] == 40
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['meta.json', 'v2']
+
+
+@pytest.mark.django_db
+class TestIncrementalRescoring:
+    """Tests for dirty-set driven rule-based rescoring."""
+
+    def test_dirty_set_deduplicates(self):
+        """Popping the dirty set returns each lead once."""
+        dirty = LeadScoreDirtySet()
+        dirty.add(1, 2, 1)
+
+        assert len(dirty) == 2
+        assert dirty.pop_batch(10) == [1, 2]
+        assert dirty.pop_batch(10) == []
+
+    def test_redis_dirty_set_drains_disjoint_batches(self):
+        """Drainers sharing the Redis set never pop the same lead twice."""
+        client = fakeredis.FakeRedis(decode_responses=True)
+        drainer, other = LeadScoreDirtySet(client), LeadScoreDirtySet(client)
+        drainer.add(*range(1, 11))
+
+        first = drainer.pop_batch(4)
+        other.add(11)
+        second = other.pop_batch(100)
+
+        assert len(first) == 4
+        assert sorted(first + second) == list(range(1, 12))
+        assert len(drainer) == 0
+
+    def test_only_scoring_inputs_mark_dirty(self, scoring_leads):
+        """Changes to unrelated fields do not queue a rescore."""
+        from core.signals import mark_lead_for_rescoring
+
+        dirty = LeadScoreDirtySet()
+        lead = scoring_leads.first()
+
+        lead.notes = 'Called twice'
+        mark_lead_for_rescoring(type(lead), lead, created=False)
+        assert len(dirty) == 0
+
+        lead.email = 'changed@example.com'
+        mark_lead_for_rescoring(type(lead), lead, created=False)
+        assert dirty.pop_batch(10) == [lead.pk]
+
+    def test_rescore_skips_unchanged_rows(self, scoring_leads):
+        """Rescoring writes once and then skips unchanged leads."""
+        lead_ids = list(scoring_leads.values_list('pk', flat=True)[:2])
+        scoring_leads.filter(pk=lead_ids[0]).update(status='new')
+        dirty = LeadScoreDirtySet()
+
+        dirty.add(*lead_ids)
+        stats = LeadScoringManager.rescore_dirty_leads()
+        assert stats == {'scanned': 2, 'rescored': 1, 'written': 1}
+
+        dirty.add(lead_ids[0])
+        stats = LeadScoringManager.rescore_dirty_leads()
+        assert stats == {'scanned': 1, 'rescored': 1, 'written': 0}
@@ -0,0 +1,155 @@
+"""
+Metrics Registry Tests
+
+Test suite for core.monitoring.MetricsCollector:
+- Per-thread counters and fixed-bucket histograms
+- Folding exited threads and bounding the number of series
+- Prometheus exposition with cumulative buckets
+- Multiprocess aggregation through snapshot files
+"""
+
+import gc
+import json
+import os
+import threading
+
+import pytest
+
+from core.monitoring import DROPPED_SERIES_METRIC, MetricsCollector, metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(settings):
+    settings.METRICS_MULTIPROCESS_DIR = ''
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestRecording:
+    """Counters, gauges and histograms"""
+
+    def test_singleton(self):
+        assert MetricsCollector() is metrics
+
+    def test_counters_and_gauges(self):
+        metrics.increment('leads_created', labels={'source': 'web'})
+        metrics.increment('leads_created', 2, labels={'source': 'web'})
+        metrics.gauge('queue_depth', 7)
+        metrics.gauge('queue_depth', 4)
+
+        result = metrics.get_metrics()
+        assert result['leads_created{source="web"}'] == {'type': 'counter', 'value': 3}
+        assert result['queue_depth']['value'] == 4
+
+    def test_histogram_quantiles_from_buckets(self):
+        metrics.configure_histogram('latency', [10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+        for value in range(1, 101):
+            metrics.histogram('latency', value)
+
+        result = metrics.get_metrics()['latency']
+        assert (result['count'], result['sum'], result['max']) == (100, 5050, 100)
+        assert result['p50'] == pytest.approx(50)
+        assert result['p95'] == pytest.approx(95)
+        assert result['p99'] == pytest.approx(99)
+
+    def test_overflow_bucket_reports_max(self):
+        metrics.configure_histogram('latency', [10])
+        for value in (1, 500, 900):
+            metrics.histogram('latency', value)
+
+        assert metrics.get_metrics()['latency']['p99'] == 900
+
+
+class TestConcurrency:
+    """Per-thread cells"""
+
+    def test_no_lost_updates_and_exited_threads_folded(self):
+        def work():
+            for _ in range(2000):
+                metrics.increment('requests')
+                metrics.histogram('duration', 12)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        del threads
+        gc.collect()
+
+        assert metrics._live == {}
+        result = metrics.get_metrics()
+        assert result['requests']['value'] == 16000
+        assert result['duration']['count'] == 16000
+
+    def test_series_limit(self, settings):
+        settings.METRICS_MAX_SERIES = 3
+        for user_id in range(5):
+            metrics.increment('logins', labels={'user': str(user_id)})
+
+        result = metrics.get_metrics()
+        assert len([key for key in result if key.startswith('logins')]) == 3
+        assert result[DROPPED_SERIES_METRIC]['value'] == 2
+
+
+class TestPrometheusExport:
+    """Text exposition format"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.configure_histogram('http_request_duration_ms', [50, 100])
+        for value in (20, 70, 80, 300):
+            metrics.histogram('http_request_duration_ms', value, labels={'method': 'GET'})
+        metrics.increment('http_requests_total', labels={'method': 'GET'})
+
+        lines = metrics.export_prometheus().splitlines()
+        assert '# TYPE http_request_duration_ms histogram' in lines
+        assert 'http_request_duration_ms_bucket{method="GET",le="50"} 1' in lines
+        assert 'http_request_duration_ms_bucket{method="GET",le="100"} 3' in lines
+        assert 'http_request_duration_ms_bucket{method="GET",le="+Inf"} 4' in lines
+        assert 'http_request_duration_ms_count{method="GET"} 4' in lines
+        assert 'http_request_duration_ms_sum{method="GET"} 470.0' in lines
+        assert 'http_requests_total{method="GET"} 1' in lines
+
+
+class TestMultiprocess:
+    """Aggregation across worker processes"""
+
+    def test_sums_other_processes(self, settings, tmp_path):
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        metrics.increment('requests', 5)
+        metrics.gauge('workers_busy', 1)
+        dead_pid = 2 ** 22 + 1  # above pid_max
+        snapshots = {
+            os.getppid(): {'requests': {'type': 'counter', 'name': 'requests', 'value': 7},
+                           'workers_busy': {'type': 'gauge', 'name': 'workers_busy',
+                                            'value': 3, 'timestamp': 9e9}},
+            dead_pid: {'requests': {'type': 'counter', 'name': 'requests', 'value': 11},
+                       'workers_busy': {'type': 'gauge', 'name': 'workers_busy',
+                                        'value': 99, 'timestamp': 9e10}},
+        }
+        for pid, snapshot in snapshots.items():
+            (tmp_path / f'metrics_{pid}.json').write_text(json.dumps(snapshot))
+
+        result = metrics.get_metrics()
+        assert result['requests']['value'] == 23
+        # Gauges of exited processes are ignored
+        assert result['workers_busy']['value'] == 3
+        assert (tmp_path / f'metrics_{os.getpid()}.json').exists()
+
+    def test_forked_worker(self, settings, tmp_path):
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        metrics.histogram('duration', 40)
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                # The child starts empty, so the parent's sample is not counted twice
+                metrics.histogram('duration', 60)
+                metrics.flush()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        result = metrics.get_metrics()['duration']
+        assert (result['count'], result['sum']) == (2, 100)
@@ -0,0 +1,247 @@
+"""
+Rate Limiting Tests
+
+Test suite for the shared GCRA rate limiting engine:
+- Local and Redis (fakeredis) stores
+- Atomic limits under concurrency and across processes
+- Local leases and blocks that skip the shared store
+- Middleware, GraphQL, DRF throttle and RateLimitCache entry points
+"""
+
+import threading
+
+import fakeredis
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from core import rate_limiting
+from core.cache_utils import RateLimitCache
+from core.middleware import RateLimitMiddleware
+from core.rate_limiting import LocalRateLimitStore, RateLimiter, RedisRateLimitStore
+from core.throttling import LoginRateThrottle
+
+
+class FakeClock:
+    """Controllable time source."""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStore:
+    """Wrap a store and count round trips."""
+
+    def __init__(self, store):
+        self.store = store
+        self.shared = store.shared
+        self.calls = 0
+
+    def acquire(self, *args, **kwargs):
+        self.calls += 1
+        return self.store.acquire(*args, **kwargs)
+
+    def reset(self, key):
+        self.store.reset(key)
+
+
+@pytest.fixture
+def redis_client():
+    pytest.importorskip('lupa')  # fakeredis needs lupa for Lua scripts
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture(params=['local', 'redis'])
+def store(request):
+    """Return each rate limit store implementation."""
+    if request.param == 'redis':
+        return RedisRateLimitStore(request.getfixturevalue('redis_client'))
+    return LocalRateLimitStore()
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiting, '_limiters', {})
+    rate_limiting._local_store.clear()
+
+
+class TestGCRA:
+    """Limiter semantics on every store"""
+
+    def test_burst_then_spaced(self, store):
+        clock = FakeClock()
+        limiter = RateLimiter(3, 60, store=store, clock=clock)
+
+        results = [limiter.hit('client') for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert results[3].retry_after == pytest.approx(20, abs=0.01)
+
+        # One request regenerates every window / limit seconds
+        clock.now += 20
+        assert limiter.hit('client').allowed
+        assert not limiter.hit('client').allowed
+
+    def test_window_does_not_reset_on_every_hit(self, store):
+        clock = FakeClock()
+        limiter = RateLimiter(2, 60, store=store, clock=clock)
+        limiter.hit('client')
+        limiter.hit('client')
+
+        # Refused hits don't push the next allowed request further out
+        for _ in range(2):
+            clock.now += 14.5
+            assert not limiter.hit('client').allowed
+        clock.now += 1
+        assert limiter.hit('client').allowed
+
+    def test_identifiers_are_independent(self, store):
+        limiter = RateLimiter(1, 60, store=store, clock=FakeClock())
+
+        assert limiter.hit('a').allowed
+        assert limiter.hit('b').allowed
+        assert not limiter.hit('a').allowed
+
+    def test_cost(self, store):
+        limiter = RateLimiter(10, 60, store=store, clock=FakeClock())
+
+        assert limiter.hit('client', cost=7).allowed
+        assert not limiter.hit('client', cost=4).allowed
+        assert limiter.hit('client', cost=3).allowed
+
+    def test_reset(self, store):
+        limiter = RateLimiter(1, 60, store=store, clock=FakeClock())
+        limiter.hit('client')
+
+        limiter.reset('client')
+        assert limiter.hit('client').allowed
+
+
+class TestRedisStore:
+    """Atomic shared state"""
+
+    def test_key_expires_with_allowance(self, redis_client):
+        limiter = RateLimiter(5, 60, scope='api', store=RedisRateLimitStore(redis_client))
+        limiter.hit('client')
+
+        ttl = redis_client.pttl('ratelimit:api:client')
+        assert 0 < ttl <= 12_000
+
+    def test_concurrent_hits_never_exceed_limit(self, redis_client):
+        store = RedisRateLimitStore(redis_client)
+        clock = FakeClock()
+        allowed = []
+
+        def worker():
+            # Separate limiters behave like separate processes
+            limiter = RateLimiter(50, 60, store=store, clock=clock)
+            allowed.extend(limiter.hit('client').allowed for _ in range(40))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(allowed) == 50
+
+    def test_leases_skip_round_trips(self, redis_client):
+        store = CountingStore(RedisRateLimitStore(redis_client))
+        limiter = RateLimiter(1000, 60, store=store, clock=FakeClock())
+
+        results = [limiter.hit('client') for _ in range(101)]
+
+        assert all(r.allowed for r in results)
+        # First call learns the allowance, the second reserves 1 + 10% of it
+        assert store.calls == 2
+        assert results[-1].remaining == 1000 - 101
+
+    def test_leases_across_processes_stay_within_limit(self, redis_client):
+        store = RedisRateLimitStore(redis_client)
+        clock = FakeClock()
+        processes = [RateLimiter(100, 60, store=store, clock=clock) for _ in range(3)]
+
+        allowed = sum(processes[i % 3].hit('client').allowed for i in range(300))
+        assert allowed <= 100
+
+    def test_blocked_clients_refused_locally(self, redis_client):
+        store = CountingStore(RedisRateLimitStore(redis_client))
+        clock = FakeClock()
+        limiter = RateLimiter(1, 60, store=store, clock=clock)
+        limiter.hit('client')
+        limiter.hit('client')
+        calls = store.calls
+
+        for _ in range(10):
+            assert not limiter.hit('client').allowed
+        assert store.calls == calls
+
+        clock.now += 61
+        assert limiter.hit('client').allowed
+
+    def test_store_failure_falls_back_to_local_limits(self):
+        class BrokenStore:
+            shared = True
+
+            def acquire(self, *args, **kwargs):
+                raise ConnectionError('redis down')
+
+        limiter = RateLimiter(2, 60, store=BrokenStore(), clock=FakeClock())
+
+        assert [limiter.hit('client').allowed for _ in range(3)] == [True, True, False]
+
+
+class TestEntryPoints:
+    """Callers of the shared engine"""
+
+    def test_middleware_blocks_after_limit(self, settings):
+        settings.DEBUG = False
+        middleware = RateLimitMiddleware(lambda request: None)
+        factory = RequestFactory()
+
+        for _ in range(20):
+            assert middleware.process_request(factory.post('/api/auth/login/')) is None
+        response = middleware.process_request(factory.post('/api/auth/login/'))
+
+        assert response.status_code == 403
+        assert int(response['Retry-After']) > 0
+        # Other paths and clients keep their own allowance
+        assert middleware.process_request(factory.get('/api/contacts/')) is None
+        other = factory.post('/api/auth/login/', REMOTE_ADDR='10.0.0.2')
+        assert middleware.process_request(other) is None
+
+    def test_rate_limit_cache(self):
+        limits = RateLimitCache('exports', limit=2, window=60)
+
+        assert limits.is_allowed('user:1') == (True, 1)
+        assert limits.is_allowed('user:1') == (True, 0)
+        assert limits.is_allowed('user:1') == (False, 0)
+        limits.reset('user:1')
+        assert limits.is_allowed('user:1')[0] is True
+
+    def test_drf_throttle(self):
+        throttle = LoginRateThrottle()
+        request = RequestFactory().post('/api/auth/login/')
+        request.user = AnonymousUser()
+
+        assert all(throttle.allow_request(request, None) for _ in range(5))
+        assert throttle.wait() is None
+        assert not throttle.allow_request(request, None)
+        assert 0 < throttle.wait() <= 12
+
+    def test_graphql_permission(self):
+        from types import SimpleNamespace
+
+        from asgiref.sync import async_to_sync
+
+        from enterprise.graphql_api import RateLimitPermission
+
+        permission = RateLimitPermission(requests_per_minute=2)
+        request = SimpleNamespace(user=AnonymousUser(), META={'REMOTE_ADDR': '10.0.0.9'})
+        info = SimpleNamespace(context={'request': request})
+
+        results = [async_to_sync(permission.has_permission)(None, info) for _ in range(3)]
+        assert results == [True, True, False]
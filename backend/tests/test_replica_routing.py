@@ -0,0 +1,181 @@
+"""
+Read Replica Routing Tests
+
+Test suite for enterprise.database.ReadReplicaRouter:
+- Replica health sampled off the request path
+- Latency-weighted replica choice
+- Read-your-writes pinning per request context and via the stickiness cookie
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from enterprise import database
+from enterprise.database import (
+    REPLICA_PIN_COOKIE,
+    ReadReplicaRouter,
+    ReplicaContext,
+    ReplicaHealthMonitor,
+    ReplicaStickinessMiddleware,
+)
+
+
+class FakeMonitor(ReplicaHealthMonitor):
+    """Monitor with scripted lag and latency and no background thread."""
+
+    def __init__(self, replicas, lag=None, latency_ms=None):
+        super().__init__(replicas, interval=60)
+        self.lag = lag or {}
+        self.latency_ms = latency_ms or {}
+        self.checks = 0
+
+    def start(self):
+        pass
+
+    def _get_replica_lag(self, replica):
+        self.checks += 1
+        return self.lag.get(replica, 0.0)
+
+    def sample(self):
+        super().sample()
+        # Replace measured round trips with the scripted latency
+        for alias, latency in self.latency_ms.items():
+            self._health[alias].latency_ms = latency
+
+
+@pytest.fixture(autouse=True)
+def routing_state(settings):
+    settings.READ_REPLICA_DATABASES = ['replica1', 'replica2']
+    settings.MAX_REPLICA_LAG_SECONDS = 5.0
+    database.reset_routing_state()
+    yield
+    database.reset_routing_state()
+
+
+def make_router(**kwargs):
+    monitor = FakeMonitor(['replica1', 'replica2'], **kwargs)
+    return ReadReplicaRouter(monitor=monitor), monitor
+
+
+class TestReplicaHealth:
+    """Sampling and health filtering"""
+
+    def test_reads_do_not_query_replicas(self):
+        router, monitor = make_router()
+        monitor.sample()
+        checks = monitor.checks
+
+        for _ in range(100):
+            assert router.db_for_read(None) in ('replica1', 'replica2')
+        assert monitor.checks == checks
+
+    def test_primary_until_first_sample(self):
+        router, _ = make_router()
+
+        assert router.db_for_read(None) == 'default'
+
+    def test_lagging_replica_is_skipped(self):
+        router, monitor = make_router(lag={'replica1': 30.0})
+        monitor.sample()
+
+        assert {router.db_for_read(None) for _ in range(50)} == {'replica2'}
+        assert monitor.snapshot()['replica1'].healthy is False
+
+    def test_unreachable_replicas_fall_back_to_primary(self):
+        router, monitor = make_router(lag={'replica1': None, 'replica2': None})
+        monitor.lag = {'replica1': None, 'replica2': None}
+        monitor.sample()
+
+        assert router.db_for_read(None) == 'default'
+
+    def test_stale_samples_are_ignored(self, monkeypatch):
+        router, monitor = make_router()
+        monitor.sample()
+        later = database.time.monotonic() + monitor.interval * 4
+        monkeypatch.setattr(database.time, 'monotonic', lambda: later)
+
+        assert router.db_for_read(None) == 'default'
+
+    def test_weighted_by_latency(self):
+        router, monitor = make_router(latency_ms={'replica1': 1.0, 'replica2': 9.0})
+        monitor.sample()
+        router._random.seed(42)
+
+        counts = Counter(router.db_for_read(None) for _ in range(2000))
+        assert 0.85 < counts['replica1'] / 2000 < 0.95
+
+
+class TestReadYourWrites:
+    """Pinning reads to primary after writes"""
+
+    def test_write_pins_reads_to_primary(self, monkeypatch):
+        router, monitor = make_router()
+        monitor.sample()
+
+        assert router.db_for_write(None) == 'default'
+        assert router.db_for_read(None) == 'default'
+
+        later = database.time.monotonic() + database.REPLICA_STICKY_SECONDS + 1
+        monkeypatch.setattr(database.time, 'monotonic', lambda: later)
+        monitor.sample()
+        assert router.db_for_read(None) != 'default'
+
+    def test_pin_follows_request_into_worker_threads(self):
+        router, monitor = make_router()
+        monitor.sample()
+
+        async def resolve():
+            # A write in one resolver thread pins reads in the next
+            await asyncio.to_thread(router.db_for_write, None)
+            return await asyncio.to_thread(router.db_for_read, None)
+
+        async def request():
+            database.reset_routing_state()
+            return await resolve(), database._routing_state().wrote
+
+        assert asyncio.run(request()) == ('default', True)
+
+    def test_explicit_overrides(self):
+        router, monitor = make_router()
+        monitor.sample()
+
+        with ReplicaContext(use_primary=True):
+            assert router.db_for_read(None) == 'default'
+        with ReplicaContext(use_replica='replica2'):
+            assert router.db_for_read(None) == 'replica2'
+        assert router.db_for_read(None, use_primary=True) == 'default'
+
+    def test_middleware_sets_cookie_after_write(self, settings):
+        settings.REPLICA_STICKY_SECONDS = 7
+        router, monitor = make_router()
+        monitor.sample()
+
+        def write_view(request):
+            router.db_for_write(None)
+            return HttpResponse()
+
+        response = ReplicaStickinessMiddleware(write_view)(RequestFactory().post('/'))
+
+        assert response.cookies[REPLICA_PIN_COOKIE]['max-age'] == 7
+        # State doesn't leak into the next request on this thread
+        assert router.db_for_read(None) != 'default'
+
+    def test_middleware_honours_cookie(self):
+        router, monitor = make_router()
+        monitor.sample()
+        seen = []
+
+        def read_view(request):
+            seen.append(router.db_for_read(None))
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES[REPLICA_PIN_COOKIE] = '1'
+        response = ReplicaStickinessMiddleware(read_view)(request)
+
+        assert seen == ['default']
+        assert REPLICA_PIN_COOKIE not in response.cookies
@@ -0,0 +1,180 @@
+"""
+Report Formula Tests
+
+Test suite for advanced_reporting.formulas and calculated report fields:
+- Parsing and rejecting formulas
+- Column-wise evaluation
+- Calculated fields applied by ReportBuilderService
+- Pushdown into the report query
+"""
+
+import numpy as np
+import pytest
+
+from advanced_reporting.formulas import (
+    FormulaError,
+    column_values,
+    parse_formula,
+    to_python,
+    validate_calculated_fields,
+)
+from advanced_reporting.report_services import ReportBuilderService, ReportQueryBuilder
+
+ROWS = [
+    {'amount': 100, 'probability': 50, 'cost': None},
+    {'amount': 200.0, 'probability': 0, 'cost': 20},
+    {'amount': 'n/a', 'probability': 10, 'cost': 5},
+]
+
+
+def evaluate(formula, rows=ROWS):
+    parsed = parse_formula(formula)
+    columns = {name: column_values(rows, name) for name in parsed.fields}
+    return to_python(parsed.evaluate(columns, len(rows)))
+
+
+class TestParsing:
+    """Grammar and errors"""
+
+    def test_fields_and_reuse(self):
+        formula = parse_formula('amount * probability / 100')
+
+        assert formula.fields == {'amount', 'probability'}
+        assert parse_formula('amount * probability / 100') is formula
+
+    @pytest.mark.parametrize('formula', [
+        '',
+        'amount *',
+        '__import__("os").system("true")',
+        'amount.real',
+        'amount ** 2',
+        'unknown(amount)',
+        'if(amount, 1)',
+        '(amount + 1',
+        'x' * 1001,
+    ])
+    def test_rejected(self, formula):
+        with pytest.raises(FormulaError):
+            parse_formula(formula)
+
+
+class TestEvaluation:
+    """Column-wise results"""
+
+    @pytest.mark.parametrize('formula, expected', [
+        ('amount * probability / 100', [50.0, 0.0, None]),
+        ('amount / probability', [2.0, None, None]),
+        ('-amount + 1e3', [900.0, 800.0, None]),
+        ('coalesce(cost, 0) + 1', [1.0, 21.0, 6.0]),
+        ('if(probability >= 10, 1, 0)', [1.0, 0.0, 1.0]),
+        ('round(amount / 3, 2)', [33.33, 66.67, None]),
+        ('abs(cost - 10)', [None, 10.0, 5.0]),
+        ('max(amount, cost)', [None, 200.0, None]),
+        ('amount > 150 or not probability', [False, True, False]),
+        ('42', [42.0, 42.0, 42.0]),
+        ('missing + 1', [None, None, None]),
+    ])
+    def test_formula(self, formula, expected):
+        assert evaluate(formula) == expected
+
+    def test_large_result_set(self):
+        rows = [{'amount': float(i), 'probability': i % 100} for i in range(100_000)]
+
+        values = evaluate('amount * probability / 100', rows)
+
+        assert len(values) == 100_000
+        assert values[250] == pytest.approx(125.0)
+        assert isinstance(values[250], float)
+
+    def test_to_python_converts_non_finite(self):
+        assert to_python(np.array([1.5, np.nan, np.inf])) == [1.5, None, None]
+
+
+class TestCalculatedFields:
+    """ReportBuilderService._apply_calculated_fields"""
+
+    def test_fields_apply_in_order(self):
+        data = {'columns': [], 'rows': [dict(row) for row in ROWS]}
+        calculated = [
+            {'name': 'weighted', 'formula': 'amount * probability / 100', 'label': 'Weighted'},
+            {'name': 'weighted_net', 'formula': 'weighted - coalesce(cost, 0)'},
+            {'name': 'broken', 'formula': 'amount +'},
+        ]
+
+        data = ReportBuilderService(user=None)._apply_calculated_fields(data, calculated)
+
+        assert [row['weighted'] for row in data['rows']] == [50.0, 0.0, None]
+        assert [row['weighted_net'] for row in data['rows']] == [50.0, -20.0, None]
+        assert [row['broken'] for row in data['rows']] == [None, None, None]
+        assert [column['name'] for column in data['columns']] == ['weighted', 'weighted_net', 'broken']
+
+    def test_computed_fields_are_not_recalculated(self):
+        data = {'columns': [], 'rows': [{'amount': 10, 'ratio': 0.25}]}
+        calculated = [
+            {'name': 'ratio', 'formula': 'amount / 1000'},
+            {'name': 'scaled', 'formula': 'ratio * 100'},
+        ]
+
+        data = ReportBuilderService(user=None)._apply_calculated_fields(data, calculated, computed={'ratio'})
+
+        assert data['rows'] == [{'amount': 10, 'ratio': 0.25, 'scaled': 25.0}]
+        assert len(data['columns']) == 2
+
+    def test_validation_rejects_bad_formulas(self):
+        validate_calculated_fields([{'name': 'weighted', 'formula': 'amount * probability / 100'}])
+
+        with pytest.raises(FormulaError, match='^weighted: '):
+            validate_calculated_fields([{'name': 'weighted', 'formula': 'amount * '}])
+        with pytest.raises(FormulaError, match='need a name'):
+            validate_calculated_fields([{'formula': 'amount'}])
+
+
+@pytest.mark.django_db
+class TestPushdown:
+    """Formulas annotated onto the report query"""
+
+    def make_builder(self, calculated_fields):
+        return ReportQueryBuilder(
+            data_source='opportunities', columns=[], filters=[], grouping=[], sorting=[],
+            parameters={}, calculated_fields=calculated_fields
+        )
+
+    def test_arithmetic_pushed_down_until_first_unsupported(self):
+        from opportunity_management.models import Opportunity
+
+        builder = self.make_builder([
+            {'name': 'weighted', 'formula': 'amount * probability / 100'},
+            {'name': 'weighted_abs', 'formula': 'abs(weighted)'},
+            {'name': 'is_big', 'formula': 'amount > 10000'},
+            {'name': 'after', 'formula': 'amount + 1'},
+        ])
+
+        queryset = builder._annotate_calculated_fields(Opportunity.objects.all())
+
+        assert builder.annotated_fields == {'weighted', 'weighted_abs'}
+        assert 'NULLIF' in str(queryset.query).upper()
+
+    def test_names_clashing_with_model_fields_stay_in_python(self):
+        from opportunity_management.models import Opportunity
+
+        builder = self.make_builder([{'name': 'amount', 'formula': 'amount * 2'}])
+        builder._annotate_calculated_fields(Opportunity.objects.all())
+
+        assert builder.annotated_fields == set()
+
+    @pytest.mark.parametrize('formula', ['created_at * 1', 'stage + 1', 'amount + created_at'])
+    def test_non_numeric_columns_stay_in_python(self, formula):
+        from opportunity_management.models import Opportunity
+
+        builder = self.make_builder([{'name': 'value', 'formula': formula}])
+        builder._annotate_calculated_fields(Opportunity.objects.all())
+
+        assert builder.annotated_fields == set()
+
+    def test_foreign_key_ids_are_pushed_down(self):
+        from opportunity_management.models import Opportunity
+
+        builder = self.make_builder([{'name': 'owner_plus', 'formula': 'owner_id + 1'}])
+        builder._annotate_calculated_fields(Opportunity.objects.all())
+
+        assert builder.annotated_fields == {'owner_plus'}
@@ -0,0 +1,161 @@
+"""
+Search Index Tests
+
+Test suite for the persistent search index behind core.search:
+- Index maintenance on write, including bulk writes
+- Backfilling records that predate the index
+- AdvancedSearch / SearchBuilder queries
+- Suggestions narrowed through the index
+"""
+
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+
+from core.bulk_operations import BulkOperationService
+from core.data_operations import DataImporter
+from core.models import SearchIndexEntry
+from core.search import (
+    AdvancedSearch,
+    PostgresSearchBackend,
+    SearchBackend,
+    SearchBuilder,
+    SearchSuggestions,
+)
+
+User = get_user_model()
+
+CONTACT_MODEL = 'contact_management.Contact'
+
+
+@pytest.fixture
+def indexed_contacts(db):
+    """Create contacts and build their search index."""
+    from contact_management.models import Contact
+
+    owner = User.objects.bulk_create([User(username='searcher', email='searcher@example.com')])[0]
+    Contact.objects.bulk_create([
+        Contact(first_name='Alice', last_name='Smith', email='alice@acme.com',
+                company_name='Acme Corp', created_by_id=owner.pk),
+        Contact(first_name='Bob', last_name='Jones', email='bob@globex.com',
+                company_name='Globex', created_by_id=owner.pk),
+    ])
+    call_command('rebuild_search_index', CONTACT_MODEL, stdout=None)
+    return Contact.objects.all()
+
+
+@pytest.mark.django_db
+class TestSearchIndex:
+    """Tests for index-backed search."""
+
+    def test_rebuild_creates_one_entry_per_record(self, indexed_contacts):
+        """Rebuilding indexes every record once."""
+        assert SearchIndexEntry.objects.filter(model_name=CONTACT_MODEL).count() == 2
+
+    def test_search_matches_token_prefixes(self, indexed_contacts):
+        """Partial words match through the index."""
+        search = AdvancedSearch(CONTACT_MODEL)
+
+        assert [c.first_name for c in search.search(query='acm')] == ['Alice']
+        assert [c.first_name for c in search.search(query='bob glob')] == ['Bob']
+        assert list(search.search(query='bob acme')) == []
+
+    def test_search_builder_uses_index(self, indexed_contacts):
+        """SearchBuilder queries go through the index."""
+        results = SearchBuilder(CONTACT_MODEL).query('smith').execute()
+        assert [c.last_name for c in results] == ['Smith']
+
+    def test_suggestions(self, indexed_contacts):
+        """Suggestions return distinct field values for the prefix."""
+        assert SearchSuggestions.suggest(CONTACT_MODEL, 'company_name', 'Gl') == ['Globex']
+
+    def test_deleted_records_are_unindexed(self, indexed_contacts):
+        """Removing a record drops its index entry."""
+        from core.search import get_search_backend
+
+        contact = indexed_contacts.get(first_name='Bob')
+        get_search_backend().remove_instance(CONTACT_MODEL, contact.pk)
+
+        assert list(AdvancedSearch(CONTACT_MODEL).search(query='bob')) == []
+
+    def test_backends_must_match_entries(self):
+        """A backend without match_entries fails when it is created."""
+        class IncompleteBackend(SearchBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteBackend()
+
+    def test_imported_records_are_indexed(self, db):
+        """DataImporter's bulk writes reach the index."""
+        user = User.objects.bulk_create([User(username='importer', email='importer@example.com')])[0]
+        data = b'First Name,Last Name,Email\nGrace,Hopper,grace@navy.mil\n'
+        mapping = {'First Name': 'first_name', 'Last Name': 'last_name', 'Email': 'email'}
+
+        DataImporter(CONTACT_MODEL, data, 'csv', mapping, user).import_data()
+        DataImporter(
+            CONTACT_MODEL, data.replace(b'Hopper', b'Murray'), 'csv', mapping, user, mode='upsert'
+        ).import_data()
+
+        search = AdvancedSearch(CONTACT_MODEL)
+        assert [c.last_name for c in search.search(query='grace murray')] == ['Murray']
+        assert list(search.search(query='hopper')) == []
+
+    def test_bulk_updates_are_reindexed(self, indexed_contacts):
+        """QuerySet.update in bulk operations refreshes the index."""
+        contact = indexed_contacts.get(first_name='Bob')
+
+        BulkOperationService.bulk_update(indexed_contacts, [contact.pk], {'company_name': 'Initech'}, ['company_name'])
+
+        assert [c.first_name for c in AdvancedSearch(CONTACT_MODEL).search(query='initech')] == ['Bob']
+
+    def test_migration_backfills_existing_records(self, indexed_contacts):
+        """The backfill migration indexes records missing from the index."""
+        migration = importlib.import_module('core.migrations.0012_backfill_search_index')
+        SearchIndexEntry.objects.filter(object_id=str(indexed_contacts.get(first_name='Bob').pk)).delete()
+
+        migration.backfill_search_index(apps, SimpleNamespace(connection=connection))
+
+        assert SearchIndexEntry.objects.filter(model_name=CONTACT_MODEL).count() == 2
+        assert [c.first_name for c in AdvancedSearch(CONTACT_MODEL).search(query='globex')] == ['Bob']
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='Requires PostgreSQL')
+class TestPostgresSearchBackend:
+    """Tests for the tsvector and trigram backend."""
+
+    def matched_names(self, query):
+        from contact_management.models import Contact
+
+        object_ids = PostgresSearchBackend().match_entries(CONTACT_MODEL, query).values_list(
+            'object_id', flat=True
+        )
+        return sorted(Contact.objects.filter(pk__in=list(object_ids)).values_list('first_name', flat=True))
+
+    def test_prefix_matches(self, indexed_contacts):
+        """Token prefixes match through the tsvector."""
+        PostgresSearchBackend().rebuild(CONTACT_MODEL)
+
+        assert self.matched_names('acm') == ['Alice']
+        assert self.matched_names('bob glob') == ['Bob']
+
+    def test_misspellings_match_by_trigram(self, indexed_contacts):
+        """Word similarity catches a misspelled token."""
+        PostgresSearchBackend().rebuild(CONTACT_MODEL)
+
+        assert self.matched_names('globx') == ['Bob']
+
+    def test_search_through_index(self, indexed_contacts, monkeypatch):
+        """AdvancedSearch runs end to end on the PostgreSQL backend."""
+        from core import search
+
+        monkeypatch.setattr(search, '_search_backend', PostgresSearchBackend())
+        search.get_search_backend().rebuild(CONTACT_MODEL)
+
+        assert [c.first_name for c in AdvancedSearch(CONTACT_MODEL).search(query='smi')] == ['Alice']
@@ -0,0 +1,150 @@
+"""
+Search Logging Tests
+
+Test suite for buffered search analytics:
+- Queued records flushed to SearchLog in batches
+- Optional and estimated result counts
+- Shared Redis queue
+"""
+
+from datetime import timedelta
+
+import fakeredis
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core.autocomplete import AutocompleteIndex, _local_store
+from core.models import SearchLog
+from core.search import AdvancedSearch
+from core.search_logging import (
+    LocalSearchLogQueue,
+    RedisSearchLogQueue,
+    SearchLogBuffer,
+    _local_queue,
+    estimate_result_count,
+)
+
+User = get_user_model()
+
+CONTACT_MODEL = 'contact_management.Contact'
+
+
+@pytest.fixture(autouse=True)
+def empty_local_queue():
+    """Start each test with an empty process-local queue."""
+    _local_queue.pop_batch(len(_local_queue))
+    yield
+    _local_queue.pop_batch(len(_local_queue))
+
+
+@pytest.fixture
+def contacts(db):
+    """Create contacts to search."""
+    from contact_management.models import Contact
+
+    owner = User.objects.bulk_create([User(username='logger', email='logger@example.com')])[0]
+    Contact.objects.bulk_create([
+        Contact(first_name=f'Contact{i}', last_name='Smith', email=f'c{i}@acme.com',
+                company_name='Acme Corp', created_by_id=owner.pk)
+        for i in range(5)
+    ])
+    return Contact.objects.all()
+
+
+@pytest.mark.django_db
+class TestSearchLogBuffer:
+    """Tests for queued search logging."""
+
+    def test_search_queues_instead_of_inserting(self, contacts):
+        """Searches are written to SearchLog only on flush."""
+        search = AdvancedSearch(CONTACT_MODEL)
+        search.search(filters={'last_name': 'Smith'})
+        search.search(filters={'last_name': 'Jones'})
+
+        assert SearchLog.objects.count() == 0
+        assert SearchLogBuffer().flush() == 2
+        assert sorted(SearchLog.objects.values_list('result_count', flat=True)) == [0, 5]
+
+    def test_flush_keeps_search_time(self, db):
+        """created_at is the time of the search, not of the flush."""
+        buffer = SearchLogBuffer(queue=LocalSearchLogQueue())
+        buffer.record(CONTACT_MODEL, 'acme', result_count=3)
+        searched_at = SearchLog(created_at=timezone.now()).created_at
+
+        buffer.flush()
+
+        log = SearchLog.objects.get()
+        assert abs(log.created_at - searched_at) < timedelta(seconds=5)
+        assert (log.query, log.result_count) == ('acme', 3)
+
+    def test_flush_in_batches(self, db, settings):
+        """A full queue flushes itself in batches of SEARCH_LOG_FLUSH_SIZE."""
+        settings.SEARCH_LOG_FLUSH_SIZE = 3
+        buffer = SearchLogBuffer(queue=LocalSearchLogQueue())
+
+        for i in range(7):
+            buffer.record(CONTACT_MODEL, f'query {i}')
+
+        assert SearchLog.objects.count() == 6
+        assert buffer.flush(max_batches=1) == 1
+
+    def test_bad_record_is_dropped_not_requeued(self, db):
+        """A row that cannot be inserted is dropped; the rest of its batch is written."""
+        queue = LocalSearchLogQueue()
+        buffer = SearchLogBuffer(queue=queue)
+        buffer.record(CONTACT_MODEL, 'acme', result_count=1)
+        buffer.record(CONTACT_MODEL, 'broken', result_count='many')
+        buffer.record(CONTACT_MODEL, 'globex', result_count=2)
+
+        assert buffer.flush() == 2
+        assert sorted(SearchLog.objects.values_list('query', flat=True)) == ['acme', 'globex']
+        assert len(queue) == 0
+        assert buffer.flush() == 0
+
+    def test_count_modes(self, contacts, settings):
+        """SEARCH_LOG_COUNT can skip counting entirely."""
+        settings.SEARCH_LOG_COUNT = 'none'
+        AdvancedSearch(CONTACT_MODEL).search(query='smith')
+        SearchLogBuffer().flush()
+
+        assert SearchLog.objects.get().result_count is None
+
+    def test_estimate_is_exact_below_limit(self, contacts):
+        """Small result sets are counted exactly, large ones are bounded."""
+        assert estimate_result_count(contacts) == 5
+        assert estimate_result_count(contacts[:2]) == 2
+        assert estimate_result_count(contacts, limit=3) == 3
+
+    def test_flush_updates_popular_searches(self, db):
+        """Flushed searches count towards already seeded popular searches."""
+        _local_store.clear()
+        SearchLog.objects.create(model_name=CONTACT_MODEL, query='globex')
+        assert AutocompleteIndex().popular_searches(CONTACT_MODEL) == ['globex']
+
+        buffer = SearchLogBuffer(queue=LocalSearchLogQueue())
+        buffer.record(CONTACT_MODEL, 'acme')
+        buffer.record(CONTACT_MODEL, 'acme')
+        buffer.flush()
+
+        assert AutocompleteIndex().popular_searches(CONTACT_MODEL) == ['acme', 'globex']
+        _local_store.clear()
+
+
+@pytest.mark.django_db
+class TestRedisSearchLogQueue:
+    """Tests for the shared Redis queue."""
+
+    def test_round_trip(self, db):
+        """Records survive the Redis queue and flush in order."""
+        queue = RedisSearchLogQueue(fakeredis.FakeRedis(decode_responses=True))
+        buffer = SearchLogBuffer(queue=queue)
+
+        buffer.record(CONTACT_MODEL, 'first', filters={'status': 'new'})
+        buffer.record(CONTACT_MODEL, 'second')
+        assert len(queue) == 2
+        assert SearchLog.objects.count() == 0
+
+        assert buffer.flush() == 2
+        assert len(queue) == 0
+        assert SearchLog.objects.get(query='first').filters == {'status': 'new'}
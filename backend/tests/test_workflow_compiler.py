@@ -0,0 +1,159 @@
+"""
+Workflow Compiler Tests
+
+Test suite for core.workflow_compiler and its use by WorkflowEngineService:
+- Condition operators and dotted paths
+- Template rendering
+- Compiled workflows reused per version and refreshed on edits
+- Node handlers running without parsing
+"""
+
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from core import workflow_compiler, workflow_services
+from core.workflow_compiler import (
+    clear_compiled_workflows,
+    compile_conditions,
+    compile_template,
+    compile_workflow,
+    get_compiled_workflow,
+)
+from core.workflow_services import WorkflowEngineService
+
+CONTEXT = {'deal': {'amount': 5000, 'stage': 'proposal', 'owner': None}, 'tags': 'vip,renewal'}
+EDITED = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+
+
+class FakeManager(list):
+    def all(self):
+        return self
+
+
+def make_workflow(nodes=(), connections=(), version=1, entry_conditions=None):
+    return SimpleNamespace(
+        pk='wf-1', version=version, updated_at=EDITED, entry_conditions=entry_conditions or [],
+        nodes=FakeManager(nodes), connections=FakeManager(connections)
+    )
+
+
+def make_node(pk, config, updated_at=EDITED):
+    return SimpleNamespace(pk=pk, node_id=f'n{pk}', config=config, updated_at=updated_at)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_compiled_workflows()
+    yield
+    clear_compiled_workflows()
+
+
+class TestConditions:
+    """Operators and paths"""
+
+    @pytest.mark.parametrize('condition, expected', [
+        ({'field': 'deal.stage', 'value': 'proposal'}, True),
+        ({'field': 'deal.stage', 'operator': 'not_equals', 'value': 'proposal'}, False),
+        ({'field': 'tags', 'operator': 'contains', 'value': 'vip'}, True),
+        ({'field': 'deal.amount', 'operator': 'greater_than', 'value': 1000}, True),
+        ({'field': 'deal.amount', 'operator': 'less_than', 'value': 1000}, False),
+        ({'field': 'deal.missing', 'operator': 'greater_than', 'value': 0}, False),
+        ({'field': 'deal.owner', 'operator': 'is_empty'}, True),
+        ({'field': 'deal.owner', 'operator': 'is_not_empty'}, False),
+        ({'field': 'deal.stage', 'operator': 'in', 'value': ['proposal', 'won']}, True),
+        ({'field': 'tags.nested', 'operator': 'equals', 'value': None}, True),
+        ({'field': 'deal.stage', 'operator': 'matches_regex', 'value': 'x'}, True),
+    ])
+    def test_operators(self, condition, expected):
+        assert compile_conditions([condition])(CONTEXT) is expected
+
+    def test_all_conditions_must_hold(self):
+        conditions = compile_conditions([
+            {'field': 'deal.amount', 'operator': 'greater_than', 'value': 1000},
+            {'field': 'deal.stage', 'value': 'won'},
+        ])
+
+        assert conditions(CONTEXT) is False
+        assert compile_conditions([])(CONTEXT) is True
+
+    def test_engine_wrappers(self):
+        engine = WorkflowEngineService()
+
+        assert engine._evaluate_conditions([{'field': 'deal.stage', 'value': 'proposal'}], CONTEXT)
+        assert engine._get_nested_value(CONTEXT, 'deal.amount') == 5000
+        assert engine._get_nested_value(CONTEXT, '') is None
+
+
+class TestTemplates:
+    """Placeholder rendering"""
+
+    def test_render(self):
+        render = compile_template('{{ deal.stage }} deal worth {{deal.amount}}{{deal.owner}}{{missing.path}}!')
+
+        assert render(CONTEXT) == 'proposal deal worth 5000!'
+
+    @pytest.mark.parametrize('template', ['', None, 'No placeholders'])
+    def test_passthrough(self, template):
+        assert compile_template(template)(CONTEXT) == template
+
+
+class TestCompiledWorkflows:
+    """Registry keyed by workflow version"""
+
+    def test_reused_until_version_changes(self):
+        workflow = make_workflow(entry_conditions=[{'field': 'deal.stage', 'value': 'proposal'}])
+        compiled = compile_workflow(workflow)
+
+        assert get_compiled_workflow(workflow) is compiled
+        assert compiled.entry(CONTEXT)
+
+        workflow.version = 2
+        assert get_compiled_workflow(workflow) is not compiled
+
+    def test_edited_node_recompiled(self):
+        node = make_node(1, {'conditions': [{'field': 'deal.stage', 'value': 'proposal'}]})
+        compiled = compile_workflow(make_workflow([node]))
+        assert compiled.node(node).conditions(CONTEXT)
+
+        edited = make_node(1, {'conditions': [{'field': 'deal.stage', 'value': 'won'}]},
+                           updated_at=EDITED + datetime.timedelta(minutes=1))
+        assert not compiled.node(edited).conditions(CONTEXT)
+
+    def test_registry_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(workflow_compiler, 'MAX_COMPILED_WORKFLOWS', 2)
+        for pk in range(5):
+            workflow = make_workflow()
+            workflow.pk = pk
+            get_compiled_workflow(workflow)
+
+        assert list(workflow_compiler._compiled) == ['3', '4']
+
+
+class TestEngineHandlers:
+    """Handlers use the compiled workflow"""
+
+    def test_no_parsing_after_compile(self, monkeypatch):
+        condition = make_node(1, {'conditions': [{'field': 'deal.amount', 'operator': 'greater_than', 'value': 100}]})
+        branch = make_node(2, {'branches': [
+            {'name': 'big', 'conditions': [{'field': 'deal.amount', 'operator': 'greater_than', 'value': 1000}]},
+            {'name': 'won', 'conditions': [{'field': 'deal.stage', 'value': 'won'}]},
+        ]})
+        email = make_node(3, {'to': 'owner@example.com', 'subject': 'Stage: {{deal.stage}}', 'body': ''})
+        workflow = make_workflow([condition, branch, email])
+        compile_workflow(workflow)
+
+        def parse(*args):
+            raise AssertionError('parsed during execution')
+
+        for module in (workflow_compiler, workflow_services):
+            monkeypatch.setattr(module, 'compile_conditions', parse)
+            monkeypatch.setattr(module, 'compile_template', parse)
+
+        engine = WorkflowEngineService()
+        instance = SimpleNamespace(workflow=workflow, context=CONTEXT)
+
+        assert engine._handle_condition(instance, condition, None)['output']['branch'] == 'true'
+        assert engine._handle_branch(instance, branch, None)['output']['selected_branches'] == ['big']
+        assert engine._handle_email_action(instance, email, None)['output']['subject'] == 'Stage: proposal'
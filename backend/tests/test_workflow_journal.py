@@ -0,0 +1,164 @@
+"""
+Workflow Execution Journal Tests
+
+Test suite for core.workflow_journal:
+- Executions, logs and instance fields written in one flush
+- Log levels
+- Run summaries
+"""
+
+import pytest
+
+from core.workflow_journal import ExecutionJournal, get_log_level
+from core.workflow_models import (
+    WorkflowDefinition,
+    WorkflowInstance,
+    WorkflowLog,
+    WorkflowNode,
+    WorkflowNodeExecution,
+)
+
+
+@pytest.fixture
+def writes(db, monkeypatch):
+    """Captures the journal's writes instead of sending them to the database"""
+    calls = []
+
+    def bulk_create(objs):
+        for obj in objs:
+            obj._state.adding = False
+        calls.append(('create', objs[0].__class__.__name__, len(objs)))
+        return objs
+
+    monkeypatch.setattr(WorkflowNodeExecution.objects, 'bulk_create', bulk_create)
+    monkeypatch.setattr(WorkflowLog.objects, 'bulk_create', bulk_create)
+    monkeypatch.setattr(
+        WorkflowNodeExecution.objects, 'bulk_update',
+        lambda objs, fields: calls.append(('update', 'WorkflowNodeExecution', len(objs)))
+    )
+    monkeypatch.setattr(
+        WorkflowNodeExecution, 'save',
+        lambda self, **kwargs: (setattr(self._state, 'adding', False), calls.append(('save', 'WorkflowNodeExecution', 1)))
+    )
+    monkeypatch.setattr(
+        WorkflowInstance, 'save',
+        lambda self, update_fields=None: calls.append(('save', 'WorkflowInstance', tuple(update_fields)))
+    )
+    return calls
+
+
+def make_instance(log_level=''):
+    workflow = WorkflowDefinition(name='Onboarding', log_level=log_level)
+    return WorkflowInstance(workflow=workflow, status='running', context={'trigger': {'event': 'signup'}})
+
+
+def run_node(journal, name, status='completed'):
+    execution = journal.start_node(WorkflowNode(node_id=name, name=name))
+    journal.log('node_started', f'Executing node: {name}', node_id=name)
+    execution.status = status
+    journal.record(execution)
+    if status == 'failed':
+        journal.log('node_failed', 'Node failed', node_id=name)
+    else:
+        journal.log('node_completed', f'Node completed: {name}', node_id=name)
+    journal.instance.context[f'node_{name}'] = {'ok': status != 'failed'}
+    journal.mark('context')
+    return execution
+
+
+class TestFlush:
+    """Buffered writes"""
+
+    def test_one_write_per_table(self, writes):
+        journal = ExecutionJournal(make_instance())
+        for name in ('a', 'b', 'c'):
+            run_node(journal, name)
+
+        assert writes == []
+        journal.flush()
+
+        assert writes == [
+            ('create', 'WorkflowNodeExecution', 3),
+            ('create', 'WorkflowLog', 6),
+            ('save', 'WorkflowInstance', ('context', 'last_activity_at')),
+        ]
+
+    def test_input_is_context_before_output(self, writes):
+        journal = ExecutionJournal(make_instance())
+        first = run_node(journal, 'a')
+        second = run_node(journal, 'b')
+
+        assert first.input_data == {'trigger': {'event': 'signup'}}
+        assert set(second.input_data) == {'trigger', 'node_a'}
+
+    def test_saved_execution_is_updated(self, writes):
+        journal = ExecutionJournal(make_instance())
+        execution = journal.start_node(WorkflowNode(node_id='approve', name='approve'))
+        journal.save_execution(execution)
+        execution.status = 'waiting'
+        journal.record(execution)
+        journal.flush()
+        journal.flush()
+
+        assert writes == [
+            ('save', 'WorkflowNodeExecution', 1),
+            ('update', 'WorkflowNodeExecution', 1),
+        ]
+
+
+class TestLogLevels:
+    """What each level records"""
+
+    def test_summary_keeps_failures(self, writes):
+        journal = ExecutionJournal(make_instance(log_level='summary'))
+        run_node(journal, 'a')
+        failed = run_node(journal, 'b', status='failed')
+        journal.flush()
+
+        assert failed.input_data == {'trigger': {'event': 'signup'}, 'node_a': {'ok': True}}
+        assert writes[:2] == [
+            ('create', 'WorkflowNodeExecution', 1),
+            ('create', 'WorkflowLog', 1),
+        ]
+
+    def test_setting_fallback(self, settings):
+        settings.WORKFLOW_LOG_LEVEL = 'summary'
+
+        assert get_log_level(WorkflowDefinition(log_level='')) == 'summary'
+        assert get_log_level(WorkflowDefinition(log_level='all')) == 'all'
+
+        settings.WORKFLOW_LOG_LEVEL = 'chatty'
+        assert get_log_level(WorkflowDefinition(log_level='')) == 'all'
+
+
+class TestClose:
+    """Run summaries"""
+
+    def test_summary_logged_when_run_ends(self, writes, monkeypatch):
+        logged = []
+        monkeypatch.setattr(WorkflowLog.objects, 'bulk_create', logged.extend)
+        instance = make_instance(log_level='summary')
+        journal = ExecutionJournal(instance)
+        run_node(journal, 'a')
+        run_node(journal, 'b')
+        instance.status = 'completed'
+        journal.mark('status')
+        journal.close()
+
+        assert [(log.log_type, log.details) for log in logged] == [
+            ('workflow_completed', {'nodes_executed': 2}),
+        ]
+
+    def test_no_summary_while_waiting(self, writes):
+        instance = make_instance(log_level='summary')
+        journal = ExecutionJournal(instance)
+        execution = run_node(journal, 'delay', status='waiting')
+        instance.status = 'waiting'
+        journal.mark('status')
+        journal.close()
+
+        assert execution.status == 'waiting'
+        assert writes == [
+            ('create', 'WorkflowNodeExecution', 1),
+            ('save', 'WorkflowInstance', ('context', 'last_activity_at', 'status')),
+        ]
@@ -0,0 +1,142 @@
+"""
+Workflow Timer Tests
+
+Test suite for core.workflow_timers:
+- Timer wheel firing, cascading, cancelling and rescheduling
+- Claimed instances dispatched in batches as one Celery group
+"""
+
+import random
+
+import pytest
+
+from core import workflow_timers
+from core.workflow_timers import TimerWheel, WorkflowTimerScheduler
+
+START = 1_000.0
+
+
+class FakeGroup:
+    """Captures the signatures queued together."""
+
+    queued = []
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+
+    def apply_async(self):
+        FakeGroup.queued.append([sig.args[0] for sig in self.signatures])
+
+
+@pytest.fixture
+def fake_group(monkeypatch):
+    FakeGroup.queued = []
+    monkeypatch.setattr(workflow_timers, 'group', FakeGroup)
+    return FakeGroup
+
+
+class TestTimerWheel:
+    """Hierarchical wheel"""
+
+    def test_fires_on_due_tick(self):
+        wheel = TimerWheel(start=START)
+        wheel.schedule('a', START + 5)
+        wheel.schedule('b', START + 5.5)
+
+        assert wheel.advance(START + 4) == []
+        assert wheel.advance(START + 5) == ['a']
+        assert wheel.advance(START + 6) == ['b']
+        assert len(wheel) == 0
+
+    def test_past_timers_fire_on_next_advance(self):
+        wheel = TimerWheel(start=START)
+        wheel.schedule('late', START - 30)
+
+        assert wheel.advance(START) == ['late']
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(start=START)
+        wheel.schedule('cancelled', START + 10)
+        wheel.schedule('moved', START + 10)
+        wheel.cancel('cancelled')
+        wheel.schedule('moved', START + 5_000)
+
+        assert wheel.advance(START + 4_999) == []
+        assert wheel.advance(START + 5_000) == ['moved']
+
+    def test_overflow_beyond_span(self):
+        wheel = TimerWheel(start=START, slot_bits=2, levels=2)
+        wheel.schedule('far', START + 100)
+
+        assert wheel.overflow
+        assert wheel.advance(START + 99) == []
+        assert wheel.advance(START + 100) == ['far']
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)  # noqa: S311 - reproducible test data
+        wheel = TimerWheel(start=START, slot_bits=2, levels=3)
+        due = {}
+        for key in range(500):
+            due[key] = START + rng.uniform(-5, 200)
+            wheel.schedule(key, due[key])
+        for key in range(0, 500, 7):
+            due[key] = START + rng.uniform(0, 200)
+            wheel.schedule(key, due[key])
+        for key in range(0, 500, 11):
+            wheel.cancel(key)
+            del due[key]
+
+        fired = {}
+        now = START
+        while now < START + 260:
+            now += rng.uniform(0.1, 3)
+            for key in wheel.advance(now):
+                assert key not in fired
+                fired[key] = now
+
+        assert fired.keys() == due.keys()
+        for key, when in fired.items():
+            assert max(due[key], START) <= when < max(due[key], START) + 4
+
+
+class TestScheduler:
+    """Claiming and dispatch"""
+
+    def test_run_due_drains_in_batches(self, monkeypatch, fake_group):
+        due = [f'instance-{i}' for i in range(12)]
+
+        def claim_due(self, now=None, instance_ids=None):
+            batch = due[:self.batch_size]
+            del due[:self.batch_size]
+            return batch
+
+        monkeypatch.setattr(WorkflowTimerScheduler, 'claim_due', claim_due)
+        scheduler = WorkflowTimerScheduler(batch_size=5, dispatch_size=2)
+
+        assert scheduler.run_due() == 12
+        assert [len(batch) for batch in fake_group.queued] == [3, 3, 1]
+        assert fake_group.queued[0][0] == ['instance-0', 'instance-1']
+
+    def test_run_due_respects_max_batches(self, monkeypatch, fake_group):
+        monkeypatch.setattr(WorkflowTimerScheduler, 'claim_due', lambda self, now=None: ['a', 'b'])
+
+        assert WorkflowTimerScheduler(batch_size=2).run_due(max_batches=3) == 6
+        assert len(fake_group.queued) == 3
+
+    def test_run_forever_claims_fired_timers(self, monkeypatch, fake_group):
+        monkeypatch.setattr(workflow_timers.time, 'sleep', lambda seconds: None)
+        monkeypatch.setattr(
+            WorkflowTimerScheduler, 'refill',
+            lambda self, wheel, now: wheel.schedule('due', now - 1) or 1
+        )
+        claims = []
+        monkeypatch.setattr(
+            WorkflowTimerScheduler, 'claim_due',
+            lambda self, now=None, instance_ids=None: claims.append(instance_ids) or instance_ids
+        )
+        ticks = iter([False, True])
+
+        WorkflowTimerScheduler().run_forever(should_stop=lambda: next(ticks))
+
+        assert claims == [['due']]
+        assert fake_group.queued == [[['due']]]
@@ -0,0 +1,134 @@
+"""
+Workflow Trigger Index Tests
+
+Test suite for core.workflows trigger matching:
+- Candidates looked up by model, trigger type and changed field
+- Index rebuilt when workflows change, here or in another process
+- Matching executions queued as one Celery group
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from core import workflows
+from core.cache_utils import CacheManager
+from core.models import Workflow
+from core.workflows import TRIGGER_INDEX_NAMESPACE, WorkflowTriggerManager, trigger_index
+
+User = get_user_model()
+
+
+class FakeGroup:
+    """Captures the signatures queued together."""
+
+    queued = []
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+
+    def apply_async(self):
+        FakeGroup.queued.append([sig.args for sig in self.signatures])
+
+
+@pytest.fixture(autouse=True)
+def fake_group(monkeypatch):
+    FakeGroup.queued = []
+    monkeypatch.setattr(workflows, 'group', FakeGroup)
+    trigger_index.invalidate()
+    yield
+    trigger_index.invalidate()
+
+
+@pytest.fixture
+def make_workflow(db):
+    owner = User.objects.bulk_create([User(username='designer', email='designer@example.com')])[0]
+
+    def make(name, trigger_type, status='active', **conditions):
+        return Workflow.objects.create(
+            name=name, trigger_type=trigger_type, trigger_conditions=conditions,
+            status=status, created_by=owner
+        )
+    return make
+
+
+def queued_ids():
+    return [[args[0] for args in batch] for batch in FakeGroup.queued]
+
+
+def lead(**fields):
+    return SimpleNamespace(pk=1, status='new', lead_score=10, **fields)
+
+
+class TestCandidates:
+    """Index lookups"""
+
+    def test_changed_field_and_model_scoping(self, make_workflow):
+        won = make_workflow('won', 'field_changed', model='Lead',
+                            rules=[{'field': 'status', 'operator': 'changed_to', 'value': 'won'}])
+        any_update = make_workflow('any', 'record_updated')
+        make_workflow('contacts', 'record_updated', model=['Contact'])
+        make_workflow('draft', 'record_updated', status='draft')
+
+        WorkflowTriggerManager.on_record_updated('Lead', lead(), {'lead_score': {'old': 1, 'new': 2}})
+        WorkflowTriggerManager.on_record_updated('Lead', lead(), {'status': {'old': 'new', 'new': 'won'}})
+
+        assert queued_ids() == [[str(any_update.id)], [str(won.id), str(any_update.id)]]
+
+    def test_created_records(self, make_workflow):
+        hot = make_workflow('hot', 'record_created',
+                            rules=[{'field': 'lead_score', 'operator': 'greater_than', 'value': 5}])
+        make_workflow('cold', 'record_created',
+                      rules=[{'field': 'lead_score', 'operator': 'greater_than', 'value': 50}])
+        make_workflow('impossible', 'record_created',
+                      rules=[{'field': 'status', 'operator': 'changed'}])
+
+        WorkflowTriggerManager.on_record_created('lead', lead())
+
+        assert queued_ids() == [[str(hot.id)]]
+        assert FakeGroup.queued[0][0][1] == {'model': 'lead', 'record_id': 1, 'action': 'created'}
+        assert all(key[2] != 'status' for key in trigger_index._get_entries())
+
+    def test_no_queries_after_build(self, make_workflow, django_assert_num_queries):
+        make_workflow('any', 'record_updated')
+        WorkflowTriggerManager.on_record_updated('Lead', lead(), {})
+
+        with django_assert_num_queries(0):
+            for _ in range(20):
+                WorkflowTriggerManager.on_record_updated('Lead', lead(), {})
+        assert len(FakeGroup.queued) == 21
+
+    def test_nothing_queued_without_matches(self, db):
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+
+        assert FakeGroup.queued == []
+
+
+class TestInvalidation:
+    """Index rebuilds"""
+
+    def test_saving_a_workflow_rebuilds(self, make_workflow, django_capture_on_commit_callbacks):
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+        with django_capture_on_commit_callbacks(execute=True):
+            created = make_workflow('new', 'record_created')
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created.status = 'inactive'
+            created.save()
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+
+        assert queued_ids() == [[str(created.id)]]
+
+    def test_version_bump_from_another_process(self, make_workflow, settings):
+        settings.WORKFLOW_TRIGGER_INDEX_CHECK_INTERVAL = 0
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+        # Created without this process seeing the commit
+        created = make_workflow('remote', 'record_created')
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+        assert FakeGroup.queued == []
+
+        CacheManager.bump_namespace(TRIGGER_INDEX_NAMESPACE)
+        WorkflowTriggerManager.on_record_created('Lead', lead())
+        assert queued_ids() == [[str(created.id)]]
@@ -0,0 +1,104 @@
+"""
+Workflow Node Overhead Benchmark for MyCRM
+Measures the per-node cost of evaluating conditions and rendering templates
+when they are parsed on every execution versus compiled once per workflow
+version
+
+Usage:
+    python workflow_benchmark.py
+    python workflow_benchmark.py --iterations 50000
+"""
+
+import argparse
+import statistics
+import time
+
+from core.workflow_compiler import CompiledWorkflow, compile_conditions, compile_template
+
+CONTEXT = {
+    'trigger': {
+        'event': 'deal_stage_changed',
+        'deal': {'id': 812, 'name': 'Acme renewal', 'amount': 48_000, 'stage': 'negotiation'},
+        'owner': {'name': 'Sam Rivera', 'email': 'sam@example.com', 'region': 'EMEA'},
+    },
+    'node_score': {'result': True, 'branch': 'true', 'score': 82},
+}
+
+CONDITIONS = [
+    {'field': 'trigger.deal.amount', 'operator': 'greater_than', 'value': 10_000},
+    {'field': 'trigger.deal.stage', 'operator': 'in', 'value': ['proposal', 'negotiation']},
+    {'field': 'trigger.owner.region', 'operator': 'equals', 'value': 'EMEA'},
+    {'field': 'node_score.score', 'operator': 'greater_than', 'value': 50},
+    {'field': 'trigger.owner.email', 'operator': 'is_not_empty'},
+]
+
+EMAIL_NODE = {
+    'to': '{{trigger.owner.email}}',
+    'subject': 'Deal {{trigger.deal.name}} moved to {{trigger.deal.stage}}',
+    'body': (
+        'Hi {{trigger.owner.name}},\n\n{{trigger.deal.name}} ({{trigger.deal.amount}}) '
+        'is now in {{trigger.deal.stage}} with a score of {{node_score.score}}.'
+    ),
+}
+
+
+class _Node:
+    pk = 1
+    updated_at = None
+    config = {**EMAIL_NODE, 'conditions': CONDITIONS}
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Median microseconds per call over a few rounds"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        rounds.append((time.perf_counter() - start) / iterations * 1_000_000)
+    return statistics.median(rounds)
+
+
+def parsed_each_time():
+    """What every node did before: parse, then evaluate"""
+    compile_conditions(CONDITIONS)(CONTEXT)
+    for template in EMAIL_NODE.values():
+        compile_template(template)(CONTEXT)
+
+
+def precompiled(compiled: CompiledWorkflow):
+    node = compiled.node(_Node)
+    node.conditions(CONTEXT)
+    for template in EMAIL_NODE.values():
+        compiled.template(template)(CONTEXT)
+
+
+def run(iterations: int):
+    compiled = CompiledWorkflow(stamp=(1, None), entry_conditions=[])
+    compiled.node(_Node)
+
+    conditions = compile_conditions(CONDITIONS)
+    subject = compile_template(EMAIL_NODE['subject'])
+    rows = [
+        ('conditions, parsed', _time_per_call(lambda: compile_conditions(CONDITIONS)(CONTEXT), iterations)),
+        ('conditions, compiled', _time_per_call(lambda: conditions(CONTEXT), iterations)),
+        ('template, parsed', _time_per_call(lambda: compile_template(EMAIL_NODE['subject'])(CONTEXT), iterations)),
+        ('template, compiled', _time_per_call(lambda: subject(CONTEXT), iterations)),
+        ('email node, parsed', _time_per_call(parsed_each_time, iterations)),
+        ('email node, compiled', _time_per_call(lambda: precompiled(compiled), iterations)),
+    ]
+
+    print(f"\n{'='*60}")
+    print(f"Workflow Node Overhead ({len(CONDITIONS)} conditions, {len(EMAIL_NODE)} templates)")
+    print(f"{'='*60}")
+    for name, micros in rows:
+        print(f"{name:<28}{micros:>12.2f} us")
+    print(f"\nPer-node speedup:           {rows[4][1] / rows[5][1]:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    args = parser.parse_args()
+
+    run(args.iterations)
@@ -0,0 +1,132 @@
+"""
+Workflow Timer Benchmark for MyCRM
+Schedules a large population of workflow timers in the TimerWheel used by
+run_workflow_timers and fires them tick by tick, against a binary heap
+holding the same timers
+
+Usage:
+    python workflow_timer_benchmark.py
+    python workflow_timer_benchmark.py --timers 1000000 --days 30
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+from core.workflow_timers import TimerWheel
+
+START = 1_700_000_000.0
+DAY = 86_400
+
+
+def build_timers(count: int, days: int) -> list[tuple[str, float]]:
+    """Delays shaped like workflow waits: mostly minutes to hours, some weeks"""
+    rng = random.Random(11)  # noqa: S311 - seeded synthetic workload
+    timers = []
+    for i in range(count):
+        if rng.random() < 0.7:
+            delay = rng.uniform(1, DAY)
+        else:
+            delay = rng.uniform(DAY, days * DAY)
+        timers.append((f'instance-{i}', START + delay))
+    return timers
+
+
+def bench_wheel(timers, days: int) -> dict:
+    wheel = TimerWheel(start=START)
+
+    start = time.perf_counter()
+    for key, due in timers:
+        wheel.schedule(key, due)
+    scheduled = time.perf_counter() - start
+
+    # Reschedule a tenth, as resumed-then-waiting-again instances would
+    start = time.perf_counter()
+    for key, due in timers[::10]:
+        wheel.schedule(key, due + 3_600)
+    rescheduled = time.perf_counter() - start
+
+    fired = 0
+    slowest_tick = 0.0
+    start = time.perf_counter()
+    for second in range(1, days * DAY + 3_601):
+        tick_start = time.perf_counter()
+        fired += len(wheel.advance(START + second))
+        slowest_tick = max(slowest_tick, time.perf_counter() - tick_start)
+    fired_time = time.perf_counter() - start
+
+    return {
+        'scheduled': scheduled,
+        'rescheduled': rescheduled,
+        'fired': fired,
+        'fire_time': fired_time,
+        'slowest_tick': slowest_tick,
+    }
+
+
+def bench_heap(timers, days: int) -> dict:
+    heap = []
+    current = {}
+
+    start = time.perf_counter()
+    for key, due in timers:
+        current[key] = due
+        heapq.heappush(heap, (due, key))
+    scheduled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key, due in timers[::10]:
+        current[key] = due + 3_600
+        heapq.heappush(heap, (due + 3_600, key))
+    rescheduled = time.perf_counter() - start
+
+    fired = 0
+    slowest_tick = 0.0
+    start = time.perf_counter()
+    for second in range(1, days * DAY + 3_601):
+        tick_start = time.perf_counter()
+        now = START + second
+        while heap and heap[0][0] <= now:
+            due, key = heapq.heappop(heap)
+            if current.get(key) == due:
+                del current[key]
+                fired += 1
+        slowest_tick = max(slowest_tick, time.perf_counter() - tick_start)
+    fired_time = time.perf_counter() - start
+
+    return {
+        'scheduled': scheduled,
+        'rescheduled': rescheduled,
+        'fired': fired,
+        'fire_time': fired_time,
+        'slowest_tick': slowest_tick,
+    }
+
+
+def run(count: int, days: int):
+    timers = build_timers(count, days)
+    results = {'timer wheel': bench_wheel(timers, days), 'binary heap': bench_heap(timers, days)}
+
+    print(f"\n{'='*72}")
+    print(f"Workflow Timers ({count:,} timers over {days} days, 1s ticks)")
+    print(f"{'='*72}")
+    print(f"{'':<14}{'schedule':>14}{'reschedule':>14}{'fire all':>12}{'worst tick':>14}{'fired':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<14}"
+            f"{result['scheduled'] / count * 1e9:>11.0f} ns"
+            f"{result['rescheduled'] / (count // 10 or 1) * 1e9:>11.0f} ns"
+            f"{result['fire_time']:>10.2f} s"
+            f"{result['slowest_tick'] * 1000:>11.2f} ms"
+            f"{result['fired']:>12,}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--timers', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    run(args.timers, args.days)